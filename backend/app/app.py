@@ -2,7 +2,7 @@ import os
 import logging.config
 
 import mdc
-from flask import Flask
+from flask import Flask, request
 from flask_cors import CORS
 from waitress import serve
 from backend.security.csrf import csrf
@@ -21,6 +21,11 @@ from backend.data_harvesting.routes.appliance_information_routes import applianc
 from backend.data_harvesting.routes import appliance_information_routes
 from backend.home_bot_model.routes.home_bot_routes import home_bot_routes_blueprint
 from backend.home_bot_model.routes import home_bot_routes
+from backend.db.routes.database_metrics_routes import database_metrics_routes_blueprint
+from backend.db.routes import database_metrics_routes
+from backend.db.client.statement_metrics import statement_metrics
+from backend.db.client.ownership_index import ownership_index
+from backend.db.client.user_response_cache import tenant_analytics_cache
 
 
 def create_app():
@@ -35,19 +40,30 @@ def create_app():
     flask_app.register_blueprint(stripe_payment_routes_blueprint)
     flask_app.register_blueprint(appliance_information_routes_blueprint)
     flask_app.register_blueprint(home_bot_routes_blueprint)
+    flask_app.register_blueprint(database_metrics_routes_blueprint)
     flask_app.container.wire(modules=[home_pulse_db_routes,
                                       property_routes,
                                       profile_and_payment_routes,
                                       stripe_payment_routes,
                                       appliance_information_routes,
-                                      home_bot_routes])
-    CORS(flask_app)
+                                      home_bot_routes,
+                                      database_metrics_routes])
+    CORS(flask_app, expose_headers=['X-Next-Cursor'])
     csrf.init_app(flask_app)
 
     logging.config.dictConfig(logging_cfg.cfg)
+    statement_metrics.configure(container.config.home_pulse_ai_db.slow_query_threshold_ms())
+    ownership_index.configure(container.config.home_pulse_ai_db.ownership_index_max_users(),
+                              container.config.home_pulse_ai_db.ownership_index_ttl_seconds())
+    tenant_analytics_cache.configure(container.config.home_pulse_ai_db.tenant_analytics_cache_max_users(),
+                                     container.config.home_pulse_ai_db.tenant_analytics_cache_ttl_seconds())
+    # Fails the bulk upload jobs of instances that stopped, before this instance queues jobs of its own
+    container.bulk_upload_job_service().fail_interrupted_jobs()
     return flask_app
 
 
+WRITE_METHODS = frozenset(('POST', 'PUT', 'PATCH', 'DELETE'))
+
 app = create_app()
 port = int(os.getenv('PORT'))
 
@@ -60,6 +76,15 @@ def handle_error(error, ctx):
     return error.as_response()
 
 
+@app.after_request
+def record_user_write(response):
+    # Keeps the user's next reads on the primary until the replica has caught up with this write
+    user_id = getattr(request, 'user_id', None)
+    if user_id is not None and request.method in WRITE_METHODS and response.status_code < 400:
+        app.container.home_pulse_db_connection_pool().record_write(user_id)
+    return response
+
+
 @app.route('/api/healthcheck', methods=['GET'])
 @csrf.exempt
 def healthcheck():
@@ -3,6 +3,7 @@ import stripe
 
 from dependency_injector import containers, providers
 from backend.db.client.hp_ai_db_connection_pool import HpAIDbConnectionPool
+from backend.db.client.async_hp_ai_db_connection_pool import AsyncHpAIDbConnectionPool
 from backend.db.service.customer_creation_insertion_service import CustomerCreationInsertionService
 from backend.db.service.property_creation_insertion_service import PropertyCreationInsertionService
 from backend.db.service.customer_authentication_service import CustomerAuthenticationService
@@ -31,11 +32,14 @@ from backend.home_bot_model.client.sagemaker_client import SagemakerClient
 from backend.db.service.appliance_information_update_service import ApplianceInformationUpdateService
 from backend.db.service.structure_information_update_service import StructureInformationUpdateService
 from backend.db.service.property_creation_bulk_insertion_service import PropertyCreationBulkInsertionService
+from backend.db.service.bulk_upload_job_service import BulkUploadJobService
+from backend.db.client.bulk_upload_job_store import BulkUploadJobStore
 from backend.db.service.property_needs_attention_retrieval_service import PropertyNeedsAttentionRetrievalService
 from backend.db.service.unit_retrieval_service import UnitRetrievalService
 from backend.db.service.unit_appliance_retrieval_service import UnitApplianceRetrievalService
 from backend.db.service.property_note_insertion_service import PropertyNoteInsertionService
 from backend.db.service.property_note_retrieval_service import PropertyNoteRetrievalService
+from backend.db.service.property_detail_retrieval_service import PropertyDetailRetrievalService
 
 
 class Container(containers.DeclarativeContainer):
@@ -50,7 +54,27 @@ class Container(containers.DeclarativeContainer):
                                                         config.home_pulse_ai_db.port,
                                                         config.home_pulse_ai_db.user,
                                                         config.home_pulse_ai_db.password,
-                                                        config.home_pulse_ai_db.db)
+                                                        config.home_pulse_ai_db.db,
+                                                        config.home_pulse_ai_db.pool_size,
+                                                        config.home_pulse_ai_db.max_overflow,
+                                                        config.home_pulse_ai_db.acquire_timeout,
+                                                        config.home_pulse_ai_db.leak_detection_threshold,
+                                                        config.home_pulse_ai_db.max_idle_time,
+                                                        config.home_pulse_ai_db.max_lifetime,
+                                                        config.home_pulse_ai_db.replica_host,
+                                                        config.home_pulse_ai_db.replica_pool_size,
+                                                        config.home_pulse_ai_db.read_your_writes_window,
+                                                        config.home_pulse_ai_db.prepared_statements,
+                                                        config.home_pulse_ai_db.prepared_statement_cache_size)
+
+    async_home_pulse_db_connection_pool = providers.Singleton(AsyncHpAIDbConnectionPool,
+                                                              config.home_pulse_ai_db.host,
+                                                              config.home_pulse_ai_db.port,
+                                                              config.home_pulse_ai_db.user,
+                                                              config.home_pulse_ai_db.password,
+                                                              config.home_pulse_ai_db.db,
+                                                              config.home_pulse_ai_db.async_pool_size,
+                                                              config.home_pulse_ai_db.acquire_timeout)
 
     stripe_payment_session_creation_service = providers.Singleton(StripePaymentSessionCreationService,
                                                                   config.stripe.secret_key,
@@ -161,6 +185,17 @@ class Container(containers.DeclarativeContainer):
     property_creation_bulk_insertion_service = providers.Singleton(PropertyCreationBulkInsertionService,
                                                                    home_pulse_db_connection_pool)
 
+    bulk_upload_job_store = providers.Singleton(BulkUploadJobStore,
+                                                home_pulse_db_connection_pool)
+
+    bulk_upload_job_service = providers.Singleton(BulkUploadJobService,
+                                                  home_pulse_db_connection_pool,
+                                                  property_creation_bulk_insertion_service,
+                                                  bulk_upload_job_store,
+                                                  config.bulk_upload.workers,
+                                                  config.bulk_upload.max_active_jobs_per_user,
+                                                  config.bulk_upload.spool_directory)
+
     property_needs_attention_retrieval_service = providers.Singleton(PropertyNeedsAttentionRetrievalService,
                                                                      home_pulse_db_connection_pool)
 
@@ -178,4 +213,10 @@ class Container(containers.DeclarativeContainer):
     property_note_retrieval_service = providers.Singleton(PropertyNoteRetrievalService,
                                                           home_pulse_db_connection_pool,
                                                           s3_client,
-                                                          config.aws.bucket_name)
+                                                          config.aws.bucket_name,
+                                                          async_home_pulse_db_connection_pool)
+
+    property_detail_retrieval_service = providers.Singleton(PropertyDetailRetrievalService,
+                                                            home_pulse_db_connection_pool,
+                                                            property_image_retrieval_service,
+                                                            property_note_retrieval_service)
@@ -1,8 +1,8 @@
 import logging
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
 from common.logging.error.error import Error
-from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR
-from backend.db.model.query.sql_statements import UPDATE_APPLIANCE_INFORMATION
+from backend.db.client.connection_lease import acquire_connection, connection_lease
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
 
 
 class LowesAppliancePriceAnalysisService:
@@ -17,11 +17,10 @@ class LowesAppliancePriceAnalysisService:
         logging.info(START_OF_METHOD)
         update_statements = self.create_update_statements(
             average_prices=average_prices)
-        cnx = self.obtain_connection()
-        put_record_status = self.update_appliance_prices(
-            cnx=cnx,
-            update_statements=update_statements)
-        cnx.close()
+        with connection_lease(self.obtain_connection()) as cnx:
+            put_record_status = self.update_appliance_prices(
+                cnx=cnx,
+                update_statements=update_statements)
         logging.info(END_OF_METHOD)
         return put_record_status
 
@@ -36,28 +35,19 @@ class LowesAppliancePriceAnalysisService:
         logging.info(START_OF_METHOD)
         put_record_status = 200
         try:
-            cursor = cnx.cursor()
-            cursor.executemany(UPDATE_APPLIANCE_INFORMATION, update_statements)
-            cnx.commit()
-            cursor.close()
+            HpAIDbRepository.execute_many(
+                cnx=cnx,
+                statement_name='UPDATE_APPLIANCE_INFORMATION',
+                seq_params=update_statements,
+                commit=True)
             logging.info(END_OF_METHOD)
             return put_record_status
-        except Exception as e:
-            logging.error('An issue occurred uploading information to the database',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
+        except Error:
             put_record_status = 500
             return put_record_status
 
     def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        return acquire_connection(self.pool)
 
     @staticmethod
     def create_update_statements(average_prices):
@@ -0,0 +1,67 @@
+import io
+import time
+import argparse
+import tracemalloc
+import pandas as pd
+from backend.db.service.property_creation_bulk_insertion_service import (PropertyCreationBulkInsertionService,
+                                                                          REQUIRED_COLUMNS, BULK_UPLOAD_CHUNK_ROWS)
+
+
+def csv_file(row_count):
+    """
+    A bulk upload file of row_count multifamily rows with every appliance and structure filled in
+    :return: io.BytesIO, positioned at the start like the spooled upload the route hands the service
+    """
+    buffer = io.StringIO()
+    buffer.write(','.join(REQUIRED_COLUMNS) + '\n')
+    appliances = ','.join(['Brand,Model,5'] * 7)
+    for i in range(row_count):
+        buffer.write(f'{i} Benchmark St,Austin,TX,78701,20,{i % 40},{appliances},15,10,8,4\n')
+    return io.BytesIO(buffer.getvalue().encode('utf-8'))
+
+
+def parse_whole_file(content, user_id):
+    """
+    The path before streaming, the upload decoded to text, one DataFrame and one list of dicts for every row
+    :return: python int, the rows parsed
+    """
+    text = io.StringIO(content.read().decode('utf-8'))
+    data_to_upload = PropertyCreationBulkInsertionService.parse_csv_file_for_upload(pd.read_csv(text), user_id)
+    return len(data_to_upload)
+
+
+def parse_in_chunks(content, user_id, chunk_rows=BULK_UPLOAD_CHUNK_ROWS):
+    """
+    The current path, one chunk parsed and handed on at a time
+    :return: python int, the rows parsed
+    """
+    rows = 0
+    for chunk_df in PropertyCreationBulkInsertionService.validate_contents_of_csv_file(content, chunk_rows):
+        rows += len(PropertyCreationBulkInsertionService.parse_csv_file_for_upload(chunk_df, user_id))
+    return rows
+
+
+def run_benchmark(args):
+    paths = {'whole file': parse_whole_file, 'chunked': parse_in_chunks}
+    print(f'{"rows":>8}{"path":>12}{"seconds":>10}{"peak MiB":>10}')
+    for row_count in args.rows:
+        content = csv_file(row_count)
+        for path, parse in paths.items():
+            content.seek(0)
+            tracemalloc.start()
+            started = time.perf_counter()
+            parsed = parse(content, args.user_id)
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+            if parsed != row_count:
+                raise AssertionError(f'{path} parsed {parsed} of {row_count} rows')
+            print(f'{row_count:>8}{path:>12}{elapsed:>10.2f}{peak:>10.1f}')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compares the peak memory of parsing a bulk upload whole and in '
+                                                 'chunks, without a database')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--user-id', type=int, default=1)
+    run_benchmark(parser.parse_args())
@@ -0,0 +1,99 @@
+import io
+import time
+import random
+import argparse
+import statistics
+import pandas as pd
+from backend.db.service.property_creation_bulk_insertion_service import (PropertyCreationBulkInsertionService,
+                                                                          COMPONENT_SCHEMA, REQUIRED_COLUMNS,
+                                                                          TEXT_COLUMN_TYPES)
+
+
+def csv_chunk(row_count, seed=7):
+    """
+    A chunk of a bulk upload file mixing filled, blank, padded and invalid cells, so both parsers take every branch
+    :return: pandas DataFrame, read the way the streaming reader reads a chunk
+    """
+    generator = random.Random(seed)
+    age_cells = ['5', ' 12 ', '', 'abc', '0', '-3', '40']
+    text_cells = ['GE', ' Whirlpool ', '', 'LG', '   ']
+    lines = [','.join(REQUIRED_COLUMNS)]
+    for i in range(row_count):
+        cells = [f'{i} Benchmark St', 'Austin', 'TX', '78701', generator.choice(age_cells),
+                 generator.choice(['-1', str(i % 40)])]
+        for column in REQUIRED_COLUMNS[len(cells):]:
+            cells.append(generator.choice(age_cells if column.endswith('_age') else text_cells))
+        lines.append(','.join(cells))
+    return pd.read_csv(io.StringIO('\n'.join(lines)), dtype=TEXT_COLUMN_TYPES)
+
+
+def parse_row_by_row(bulk_properties_df, user_id):
+    """
+    The transformation before it was vectorized, an itertuples loop coercing each cell with safe_int and safe_str
+    :return: python list of dicts, the shape parse_csv_file_for_upload returns
+    """
+    def safe_int(value):
+        if pd.isna(value) or value == '' or str(value).strip() == '':
+            return None
+        try:
+            return int(value)
+        except (ValueError, TypeError):
+            return None
+
+    def safe_str(value):
+        if pd.isna(value) or value == '' or str(value).strip() == '':
+            return None
+        return str(value).strip()
+
+    data_to_upload = []
+    for row in bulk_properties_df.itertuples(index=False):
+        appliances = []
+        for appliance_type in COMPONENT_SCHEMA['appliances']['types']:
+            age = safe_int(getattr(row, f'{appliance_type}_age'))
+            brand = safe_str(getattr(row, f'{appliance_type}_brand'))
+            if age is not None and brand is not None:
+                appliances.append({'appliance_type': appliance_type, 'appliance_brand': brand,
+                                   'appliance_model': safe_str(getattr(row, f'{appliance_type}_model')),
+                                   'age_in_years': age})
+        structures = []
+        for structure_type in COMPONENT_SCHEMA['structures']['types']:
+            age = safe_int(getattr(row, f'{structure_type}_age'))
+            if age is not None:
+                structures.append({'structure_type': structure_type, 'age_in_years': age})
+        data_to_upload.append({
+            'property': {'user_id': user_id, 'street': str(row.street).strip(), 'city': str(row.city).strip(),
+                         'state': str(row.state).strip(), 'postal_code': str(row.postal_code).strip(),
+                         'property_age': safe_int(row.property_age), 'unit_number': str(row.unit_number),
+                         'address': f"{row.street}, {row.city}, {row.state}"},
+            'appliances': appliances,
+            'structures': structures
+        })
+    return data_to_upload
+
+
+def run_benchmark(args):
+    paths = {'row by row': parse_row_by_row, 'vectorized': PropertyCreationBulkInsertionService.parse_csv_file_for_upload}
+    print(f'{"rows":>8}{"path":>12}{"mean ms":>11}{"p50 ms":>11}')
+    for row_count in args.rows:
+        chunk = csv_chunk(row_count)
+        results, means = {}, {}
+        for path, parse in paths.items():
+            timings = []
+            for _ in range(args.iterations):
+                started = time.perf_counter()
+                results[path] = parse(chunk, args.user_id)
+                timings.append((time.perf_counter() - started) * 1000)
+            means[path] = statistics.fmean(timings)
+            print(f'{row_count:>8}{path:>12}{means[path]:>11.1f}{statistics.median(timings):>11.1f}')
+        if results['row by row'] != results['vectorized']:
+            raise AssertionError(f'The parsers disagree on the {row_count} row file')
+        print(f'{"":>8}{"speed up":>12}{means["row by row"] / means["vectorized"]:>10.1f}x')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compares the row by row and vectorized bulk upload transformation, '
+                                                 'without a database')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--iterations', type=int, default=3)
+    parser.add_argument('--user-id', type=int, default=1)
+    run_benchmark(parser.parse_args())
@@ -0,0 +1,116 @@
+import os
+import time
+import random
+import argparse
+from datetime import date, timedelta
+from backend.db.dev.synthetic_data import APPLIANCE_TYPES, STRUCTURE_TYPES
+from backend.db.client.connection_lease import acquire_connection, connection_lease
+from backend.db.client.hp_ai_db_connection_pool import HpAIDbConnectionPool
+from backend.db.service.property_retrieval_service import PropertyRetrievalService
+
+PORTFOLIO_SIZES = (10, 100, 1000)
+
+
+def create_portfolio(cnx, property_count, rng):
+    """
+    Inserts a user who owns property_count properties, each with five appliances and four structures
+    :return: python tuple of the owning user id and the list of its property ids
+    """
+    today = date.today()
+    cursor = cnx.cursor()
+    try:
+        cursor.execute('SELECT COALESCE(MAX(user_id), 0) + 1 FROM home_pulse_ai.properties')
+        user_id = cursor.fetchall()[0][0]
+        cursor.executemany('''INSERT INTO home_pulse_ai.properties (user_id, street, city, state, zip, age, address)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)''',
+                           [(user_id, f'{i} Portfolio St', 'Springfield', 'IL', '62701', rng.randint(1, 90),
+                             f'{i} Portfolio St, Springfield, IL 62701') for i in range(property_count)])
+        cursor.execute('SELECT id FROM home_pulse_ai.properties WHERE user_id = %s', [user_id])
+        property_ids = [row[0] for row in cursor.fetchall()]
+        cursor.executemany('''INSERT INTO home_pulse_ai.appliances (property_id, appliance_type, appliance_brand,
+            appliance_model, age_in_years, estimated_replacement_cost, forecasted_replacement_date)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)''',
+                           [(property_id, appliance_type, 'Brand', 'Model', rng.randint(0, 20),
+                             rng.randint(300, 9000), today + timedelta(days=rng.randint(-60, 3650)))
+                            for property_id in property_ids for appliance_type in rng.sample(APPLIANCE_TYPES, 5)])
+        cursor.executemany('''INSERT INTO home_pulse_ai.structures (property_id, structure_type, age_in_years,
+            estimated_replacement_cost, forecasted_replacement_date) VALUES (%s, %s, %s, %s, %s)''',
+                           [(property_id, structure_type, rng.randint(0, 60), rng.randint(2000, 40000),
+                             today + timedelta(days=rng.randint(-60, 7300)))
+                            for property_id in property_ids for structure_type in rng.sample(STRUCTURE_TYPES, 4)])
+        cnx.commit()
+    finally:
+        cursor.close()
+    return user_id, property_ids
+
+
+def drop_portfolio(cnx, user_id):
+    cursor = cnx.cursor()
+    try:
+        for table in ('appliances', 'structures'):
+            cursor.execute(f'''DELETE c FROM home_pulse_ai.{table} c
+                JOIN home_pulse_ai.properties p ON c.property_id = p.id WHERE p.user_id = %s''', [user_id])
+        cursor.execute('DELETE FROM home_pulse_ai.properties WHERE user_id = %s', [user_id])
+        cnx.commit()
+    finally:
+        cursor.close()
+
+
+def time_calls(call, iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2], timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+
+
+def run_benchmark(args):
+    hp_ai_db_connection_pool = HpAIDbConnectionPool(args.host, args.port, args.user, args.password, args.db,
+                                                    pool_size=1)
+    properties = PropertyRetrievalService(hp_ai_db_connection_pool)
+    rng = random.Random(args.seed)
+
+    def per_property(user_id, property_ids):
+        # The two requests the overview makes for every property today
+        for property_id in property_ids:
+            properties.fetch_property_information(user_id=user_id, property_id=property_id,
+                                                  retrieval_type='APPLIANCES')
+            properties.fetch_property_information(user_id=user_id, property_id=property_id,
+                                                  retrieval_type='STRUCTURES')
+
+    print(f'{"properties":>10}{"per-property p50":>18}{"per-property p95":>18}{"portfolio p50":>15}'
+          f'{"portfolio p95":>15}{"speedup":>9}')
+    for property_count in args.sizes:
+        with connection_lease(acquire_connection(hp_ai_db_connection_pool.pool)) as cnx:
+            user_id, property_ids = create_portfolio(cnx, property_count, rng)
+        try:
+            before = time_calls(lambda: per_property(user_id, property_ids), args.iterations)
+            after = time_calls(lambda: [entry for batch in properties.stream_portfolio_components(user_id)
+                                        for entry in batch],
+                               args.iterations)
+        finally:
+            with connection_lease(acquire_connection(hp_ai_db_connection_pool.pool)) as cnx:
+                drop_portfolio(cnx, user_id)
+        print(f'{property_count:>10}{before[0]:>18.3f}{before[1]:>18.3f}{after[0]:>15.3f}{after[1]:>15.3f}'
+              f'{before[0] / after[0]:>8.1f}x')
+    hp_ai_db_connection_pool.pool.stop_housekeeping()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compares loading a portfolio property by property against the '
+                                                 'streamed portfolio retrieval')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(PORTFOLIO_SIZES))
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=7)
+    arguments = parser.parse_args()
+    # Inserts and deletes a throwaway portfolio, so it only ever runs against a local server
+    if os.getenv('ENV') != 'local':
+        raise SystemExit('portfolio_retrieval_benchmark only runs with ENV=local')
+    arguments.host = os.getenv('MYSQL_HOST')
+    arguments.port = os.getenv('MYSQL_PORT')
+    arguments.user = os.getenv('MYSQL_USER')
+    arguments.password = os.getenv('MYSQL_PASS')
+    arguments.db = os.getenv('MYSQL_DB')
+    run_benchmark(arguments)
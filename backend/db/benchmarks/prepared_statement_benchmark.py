@@ -0,0 +1,97 @@
+import os
+import time
+import argparse
+import statistics
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
+from backend.db.client.hp_ai_db_connection_pool import HpAIDbConnectionPool
+
+HOT_STATEMENTS = ('SELECT_PROPERTIES_STREAM_BY_USER_ID', 'SELECT_APPLIANCES_BY_PROPERTY_ID', 'VERIFY_UNIT_OWNERSHIP',
+                  'SELECT_CUSTOMER_FOR_AUTHENTICATION')
+
+
+def hot_statement_params(args):
+    return {
+        'SELECT_PROPERTIES_STREAM_BY_USER_ID': [args.user_id, 0],
+        'SELECT_APPLIANCES_BY_PROPERTY_ID': [args.property_id],
+        'VERIFY_UNIT_OWNERSHIP': [args.unit_id, args.user_id],
+        'SELECT_CUSTOMER_FOR_AUTHENTICATION': [args.email]
+    }
+
+
+def session_status(cnx, variable_name):
+    cursor = cnx.cursor()
+    try:
+        cursor.execute('SHOW SESSION STATUS LIKE %s', [variable_name])
+        row = cursor.fetchone()
+        return int(row[1]) if row else 0
+    finally:
+        cursor.close()
+
+
+def run_statement(hp_ai_db_connection_pool, statement_name, params, iterations):
+    """
+    Runs a statement through HpAIDbRepository on a single pooled connection, one lease per call like a request
+    :return: python tuple of the per-call latencies in milliseconds and the statements the server prepared
+    """
+    timings = []
+    with HpAIDbRepository(hp_ai_db_connection_pool).connection() as cnx:
+        prepares_before = session_status(cnx, 'Com_stmt_prepare')
+    for _ in range(iterations):
+        started = time.perf_counter()
+        with HpAIDbRepository(hp_ai_db_connection_pool).connection() as cnx:
+            HpAIDbRepository.fetch_all(cnx, statement_name, params)
+        timings.append((time.perf_counter() - started) * 1000)
+    with HpAIDbRepository(hp_ai_db_connection_pool).connection() as cnx:
+        prepares = session_status(cnx, 'Com_stmt_prepare') - prepares_before
+    return timings, prepares
+
+
+def summarize(timings):
+    ordered = sorted(timings)
+    return {
+        'mean': statistics.fmean(ordered),
+        'p50': ordered[len(ordered) // 2],
+        'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    }
+
+
+def run_benchmark(args):
+    params = hot_statement_params(args)
+    pools = {
+        'text': HpAIDbConnectionPool(args.host, args.port, args.user, args.password, args.db, pool_size=1),
+        'prepared': HpAIDbConnectionPool(args.host, args.port, args.user, args.password, args.db, pool_size=1,
+                                         prepared_statements=True)
+    }
+    print(f'{"statement":<36}{"mode":<10}{"mean ms":>10}{"p50 ms":>10}{"p95 ms":>10}{"prepares":>10}')
+    for statement_name in HOT_STATEMENTS:
+        results = {}
+        for mode, hp_ai_db_connection_pool in pools.items():
+            # The first calls warm the buffer pool and, in prepared mode, the handle cache
+            run_statement(hp_ai_db_connection_pool, statement_name, params[statement_name], args.warm_up)
+            timings, prepares = run_statement(hp_ai_db_connection_pool, statement_name, params[statement_name],
+                                              args.iterations)
+            results[mode] = summarize(timings)
+            print(f'{statement_name:<36}{mode:<10}{results[mode]["mean"]:>10.3f}{results[mode]["p50"]:>10.3f}'
+                  f'{results[mode]["p95"]:>10.3f}{prepares:>10}')
+        saved = results['text']['mean'] - results['prepared']['mean']
+        print(f'{statement_name:<36}{"saved":<10}{saved:>10.3f} ms per call '
+              f'({saved / results["text"]["mean"] * 100:.1f}%)')
+    for hp_ai_db_connection_pool in pools.values():
+        hp_ai_db_connection_pool.pool.stop_housekeeping()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compares text and prepared execution of the hot statements')
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--warm-up', type=int, default=100)
+    parser.add_argument('--user-id', type=int, default=1)
+    parser.add_argument('--property-id', type=int, default=1)
+    parser.add_argument('--unit-id', type=int, default=1)
+    parser.add_argument('--email', default='benchmark@homepulse.ai')
+    arguments = parser.parse_args()
+    arguments.host = os.getenv('MYSQL_HOST')
+    arguments.port = os.getenv('MYSQL_PORT')
+    arguments.user = os.getenv('MYSQL_USER')
+    arguments.password = os.getenv('MYSQL_PASS')
+    arguments.db = os.getenv('MYSQL_DB')
+    run_benchmark(arguments)
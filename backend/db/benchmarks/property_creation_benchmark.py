@@ -0,0 +1,117 @@
+import os
+import time
+import argparse
+import statistics
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
+from backend.db.client.hp_ai_db_connection_pool import HpAIDbConnectionPool
+from backend.db.client.multi_row_insert import insert_rows_returning_ids
+from backend.db.model.query.sql_statements import (INSERT_CUSTOMER_PROPERTY_INTO_PROPERTY_TABLE,
+                                                   INSERT_UNITS_INTO_UNITS_TABLE)
+
+
+def property_rows(user_id, property_count):
+    return [(user_id, f'{i} Benchmark St', 'Austin', 'TX', '78701', 20, f'{i} Benchmark St, Austin, TX 78701')
+            for i in range(property_count)]
+
+
+def insert_per_row(cnx, user_id, property_count, unit_count):
+    """
+    The path execute_insertion_statement_for_properties_table and execute_insertion_statement_for_units_table took
+    before multi row inserts, an INSERT and a commit per property and per unit to read lastrowid
+    :return: python list of the new property ids
+    """
+    cursor = cnx.cursor()
+    property_ids = []
+    try:
+        for row in property_rows(user_id, property_count):
+            cursor.execute(INSERT_CUSTOMER_PROPERTY_INTO_PROPERTY_TABLE, row)
+            cnx.commit()
+            property_ids.append(cursor.lastrowid)
+            for unit in range(unit_count):
+                cursor.execute(INSERT_UNITS_INTO_UNITS_TABLE, (property_ids[-1], f'Unit {unit}'))
+                cnx.commit()
+    finally:
+        cursor.close()
+    return property_ids
+
+
+def insert_multi_row(cnx, user_id, property_count, unit_count):
+    """
+    The current path, multi row INSERTs with the ids recovered from the first id of each, committed once
+    :return: python list of the new property ids
+    """
+    property_ids = insert_rows_returning_ids(cnx, 'INSERT_CUSTOMER_PROPERTY_INTO_PROPERTY_TABLE',
+                                             property_rows(user_id, property_count))
+    unit_rows = [(property_id, f'Unit {unit}') for property_id in property_ids for unit in range(unit_count)]
+    if unit_rows:
+        insert_rows_returning_ids(cnx, 'INSERT_UNITS_INTO_UNITS_TABLE', unit_rows)
+    cnx.commit()
+    return property_ids
+
+
+def verify_unit_ids(cnx, property_ids, unit_count):
+    """
+    Checks the recovered ids against the rows the database stored, so the benchmark also proves the id strategy
+    """
+    cursor = cnx.cursor()
+    try:
+        placeholders = ', '.join(['%s'] * len(property_ids))
+        cursor.execute(f'SELECT id FROM home_pulse_ai.properties WHERE id IN ({placeholders})', property_ids)
+        stored = {row[0] for row in cursor.fetchall()}
+        cursor.execute(f'SELECT COUNT(*) FROM home_pulse_ai.units WHERE property_id IN ({placeholders})',
+                       property_ids)
+        units = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+    if stored != set(property_ids) or units != len(property_ids) * unit_count:
+        raise AssertionError('The recovered ids do not match the inserted rows')
+
+
+def delete_properties(cnx, property_ids):
+    cursor = cnx.cursor()
+    try:
+        placeholders = ', '.join(['%s'] * len(property_ids))
+        cursor.execute(f'DELETE FROM home_pulse_ai.units WHERE property_id IN ({placeholders})', property_ids)
+        cursor.execute(f'DELETE FROM home_pulse_ai.properties WHERE id IN ({placeholders})', property_ids)
+        cnx.commit()
+    finally:
+        cursor.close()
+
+
+def run_benchmark(args):
+    hp_ai_db_connection_pool = HpAIDbConnectionPool(args.host, args.port, args.user, args.password, args.db,
+                                                    pool_size=1)
+    paths = {'per row': insert_per_row, 'multi row': insert_multi_row}
+    print(f'{"properties":>10}{"units":>8}{"path":>12}{"mean ms":>10}{"p50 ms":>10}{"commits":>9}')
+    try:
+        for property_count, unit_count in ((1, 50), (10, 0), (10, 4), (100, 2)):
+            means = {}
+            for path, insert in paths.items():
+                timings = []
+                for _ in range(args.iterations):
+                    with HpAIDbRepository(hp_ai_db_connection_pool).connection() as cnx:
+                        started = time.perf_counter()
+                        property_ids = insert(cnx, args.user_id, property_count, unit_count)
+                        timings.append((time.perf_counter() - started) * 1000)
+                        verify_unit_ids(cnx, property_ids, unit_count)
+                        delete_properties(cnx, property_ids)
+                commits = property_count * (unit_count + 1) if path == 'per row' else 1
+                means[path] = statistics.fmean(timings)
+                print(f'{property_count:>10}{unit_count:>8}{path:>12}{means[path]:>10.2f}'
+                      f'{statistics.median(timings):>10.2f}{commits:>9}')
+            print(f'{"":>18}{"speed up":>12}{means["per row"] / means["multi row"]:>10.1f}x')
+    finally:
+        hp_ai_db_connection_pool.pool.stop_housekeeping()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compares per row and multi row property and unit creation')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--user-id', type=int, default=1)
+    arguments = parser.parse_args()
+    arguments.host = os.getenv('MYSQL_HOST')
+    arguments.port = os.getenv('MYSQL_PORT')
+    arguments.user = os.getenv('MYSQL_USER')
+    arguments.password = os.getenv('MYSQL_PASS')
+    arguments.db = os.getenv('MYSQL_DB')
+    run_benchmark(arguments)
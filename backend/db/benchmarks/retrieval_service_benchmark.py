@@ -0,0 +1,145 @@
+import os
+import time
+import random
+import argparse
+import mysql.connector
+from backend.db.client.connection_lease import acquire_connection, connection_lease
+from backend.db.client.hp_ai_db_connection_pool import HpAIDbConnectionPool
+from backend.db.migrations.migration_runner import MigrationRunner
+from backend.db.service.unit_retrieval_service import UnitRetrievalService
+from backend.db.service.property_retrieval_service import PropertyRetrievalService
+from backend.db.service.unit_appliance_retrieval_service import UnitApplianceRetrievalService
+from backend.db.service.property_note_retrieval_service import PropertyNoteRetrievalService
+from backend.db.service.property_image_retrieval_service import PropertyImageRetrievalService
+from backend.db.service.tenant_information_retrieval_service import TenantInformationRetrievalService
+from backend.db.service.customer_subscription_retrieval_service import CustomerSubscriptionRetrievalService
+from backend.db.service.property_needs_attention_retrieval_service import PropertyNeedsAttentionRetrievalService
+
+
+def sample_ids(hp_ai_db_connection_pool, sample_size, seed):
+    """
+    Picks owned (user_id, property_id, unit_id) triples so every call returns rows like a real dashboard load
+    :return: python list of tuples
+    """
+    with connection_lease(acquire_connection(hp_ai_db_connection_pool.pool)) as cnx:
+        cursor = cnx.cursor()
+        try:
+            cursor.execute('''SELECT p.user_id, p.id, MIN(u.unit_id) FROM home_pulse_ai.properties p
+                JOIN home_pulse_ai.units u ON u.property_id = p.id GROUP BY p.user_id, p.id''')
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+    return random.Random(seed).sample(rows, min(sample_size, len(rows)))
+
+
+def retrieval_calls(hp_ai_db_connection_pool):
+    """
+    One callable per retrieval service path. The note and image services are measured up to their database
+    lookup, leaving S3 out of the numbers
+    :return: python dict of name to callable taking (user_id, property_id, unit_id)
+    """
+    properties = PropertyRetrievalService(hp_ai_db_connection_pool)
+    needs_attention = PropertyNeedsAttentionRetrievalService(hp_ai_db_connection_pool)
+    tenants = TenantInformationRetrievalService(hp_ai_db_connection_pool)
+    units = UnitRetrievalService(hp_ai_db_connection_pool)
+    unit_appliances = UnitApplianceRetrievalService(hp_ai_db_connection_pool)
+    subscriptions = CustomerSubscriptionRetrievalService(hp_ai_db_connection_pool)
+
+    def with_connection(statement):
+        def call(user_id, property_id, unit_id):
+            with connection_lease(acquire_connection(hp_ai_db_connection_pool.pool)) as cnx:
+                return statement(cnx, user_id, property_id, unit_id)
+        return call
+
+    def property_retrieval(retrieval_type):
+        def call(user_id, property_id, unit_id):
+            return properties.fetch_property_information(user_id=user_id, property_id=property_id,
+                                                         retrieval_type=retrieval_type)
+        return call
+
+    calls = {f'properties:{retrieval_type}': property_retrieval(retrieval_type)
+             for retrieval_type in ('ALL', 'SINGLE', 'APPLIANCES', 'STRUCTURES', 'ADDRESSES')}
+    calls.update({
+        'properties:PORTFOLIO': lambda user_id, property_id, unit_id:
+            [entry for batch in properties.stream_portfolio_components(user_id) for entry in batch],
+        'needs_attention': lambda user_id, property_id, unit_id:
+            needs_attention.fetch_properties_that_need_attention(user_id),
+        'tenants': lambda user_id, property_id, unit_id: tenants.fetch_tenant_information(property_id, user_id),
+        'units': lambda user_id, property_id, unit_id: units.fetch_units_by_property_id(property_id, user_id),
+        'unit_appliances': lambda user_id, property_id, unit_id:
+            unit_appliances.fetch_appliances_by_unit_id(unit_id, user_id),
+        'subscription': lambda user_id, property_id, unit_id:
+            subscriptions.fetch_subscription_information_for_customer(user_id),
+        'notes': with_connection(lambda cnx, user_id, property_id, unit_id:
+                                 PropertyNoteRetrievalService.retrieve_property_note_records(cnx, property_id,
+                                                                                             user_id)),
+        'image': with_connection(lambda cnx, user_id, property_id, unit_id:
+                                 PropertyImageRetrievalService.retrieve_property_image_key(cnx, user_id,
+                                                                                           property_id))
+    })
+    return calls
+
+
+def percentiles(timings):
+    ordered = sorted(timings)
+    return ordered[len(ordered) // 2], ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+def measure(hp_ai_db_connection_pool, ids, iterations):
+    """
+    Runs every retrieval path for the sampled ids
+    :return: python dict of name to (p50, p95) in milliseconds
+    """
+    results = {}
+    for name, call in retrieval_calls(hp_ai_db_connection_pool).items():
+        timings = []
+        for i in range(iterations):
+            user_id, property_id, unit_id = ids[i % len(ids)]
+            started = time.perf_counter()
+            call(user_id, property_id, unit_id)
+            timings.append((time.perf_counter() - started) * 1000)
+        results[name] = percentiles(timings)
+    return results
+
+
+def run_benchmark(args):
+    hp_ai_db_connection_pool = HpAIDbConnectionPool(args.host, args.port, args.user, args.password, args.db,
+                                                    pool_size=1)
+    ids = sample_ids(hp_ai_db_connection_pool, args.sample_size, args.seed)
+    if not ids:
+        raise SystemExit('No multifamily properties found; load data with explain_advisor --load-synthetic-data')
+    before = measure(hp_ai_db_connection_pool, ids, args.iterations)
+
+    connection = mysql.connector.connect(host=args.host, port=args.port, user=args.user, password=args.password,
+                                         database=args.db)
+    try:
+        applied = MigrationRunner(connection).migrate(args.target)
+    finally:
+        connection.close()
+    print(f'applied migrations: {", ".join(f"V{m.version:03d}" for m in applied) or "none pending"}')
+    after = measure(hp_ai_db_connection_pool, ids, args.iterations)
+
+    print(f'{"service":<24}{"p50 before":>12}{"p50 after":>12}{"p95 before":>12}{"p95 after":>12}')
+    for name in before:
+        print(f'{name:<24}{before[name][0]:>12.3f}{after[name][0]:>12.3f}{before[name][1]:>12.3f}'
+              f'{after[name][1]:>12.3f}')
+    hp_ai_db_connection_pool.pool.stop_housekeeping()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measures the retrieval services before and after the pending '
+                                                 'migrations are applied')
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--sample-size', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--target', type=int, help='the last migration version to apply')
+    arguments = parser.parse_args()
+    # Applies the pending migrations, so it only ever runs against a local server
+    if os.getenv('ENV') != 'local':
+        raise SystemExit('retrieval_service_benchmark only runs with ENV=local')
+    arguments.host = os.getenv('MYSQL_HOST')
+    arguments.port = os.getenv('MYSQL_PORT')
+    arguments.user = os.getenv('MYSQL_USER')
+    arguments.password = os.getenv('MYSQL_PASS')
+    arguments.db = os.getenv('MYSQL_DB')
+    run_benchmark(arguments)
@@ -0,0 +1,139 @@
+import time
+import random
+import argparse
+from decimal import Decimal
+from datetime import datetime, timedelta
+from backend.db.service.property_retrieval_service import PropertyRetrievalService
+from backend.db.service.unit_appliance_retrieval_service import UnitApplianceRetrievalService
+from backend.db.service.property_needs_attention_retrieval_service import PropertyNeedsAttentionRetrievalService
+
+ROW_COUNT = 10000
+
+
+def appliance_rows(rng, row_count):
+    """
+    Rows shaped like SELECT_APPLIANCES_BY_PROPERTY_ID, one in ten without a replacement date
+    """
+    start = datetime(2026, 1, 1)
+    return [(i, rng.randint(1, 500), 'stove', 'GE', 'JB645', rng.randint(0, 20), Decimal(rng.randint(300, 9000)),
+             start + timedelta(days=rng.randint(0, 3650)) if i % 10 else None, rng.choice((None, 100)))
+            for i in range(row_count)]
+
+
+def unit_appliance_rows(rng, row_count):
+    """
+    Rows shaped like GET_APPLIANCES_BY_UNIT_ID
+    """
+    return [(row[0], row[1], row[8], row[2], row[3], row[4], row[5], row[6], row[7])
+            for row in appliance_rows(rng, row_count)]
+
+
+def management_rows(rng, row_count):
+    """
+    Rows shaped like SELECT_COMPONENTS_DUE_BY_USER_ID
+    """
+    return [(i, rng.randint(1, 500), 'Roof', rng.randint(0, 40), Decimal(rng.randint(300, 40000)),
+             datetime(2026, 1, 1) + timedelta(days=rng.randint(0, 90)), f'{i} Main St', rng.randint(-90, 30))
+            for i in range(row_count)]
+
+
+def format_appliances_per_row(results):
+    """
+    The positional loop format_property_results ran for APPLIANCES before the shared RowFormatter
+    """
+    formatted_results = []
+    for i in range(len(results)):
+        if results[i][7]:
+            forecasted_replacement_date = datetime.strftime(results[i][7], '%Y-%m-%d %H:%M:%S')
+        else:
+            forecasted_replacement_date = 'TBD'
+        formatted_results.append({
+            'id': results[i][0],
+            'property_id': results[i][1],
+            'unit_id': results[i][8] if results[i][8] is not None else None,
+            'appliance_type': results[i][2],
+            'applianceBrand': results[i][3],
+            'applianceModel': results[i][4],
+            'age_in_years': results[i][5],
+            'estimated_replacement_cost': results[i][6],
+            'forecasted_replacement_date': forecasted_replacement_date
+        })
+    return formatted_results
+
+
+def format_unit_appliances_per_row(results):
+    """
+    The row loop format_appliance_results ran before the shared RowFormatter
+    """
+    formatted_results = []
+    for row in results:
+        formatted_results.append({
+            'id': int(row[0]),
+            'property_id': int(row[1]),
+            'unit_id': int(row[2]) if row[2] is not None else None,
+            'appliance_type': row[3],
+            'appliance_brand': row[4],
+            'appliance_model': row[5],
+            'age_in_years': int(row[6]),
+            'estimated_replacement_cost': float(row[7]) if row[7] is not None else None,
+            'forecasted_replacement_date': datetime.strftime(row[8], '%Y-%m-%d %H:%M:%S') if row[8] else 'TBD'
+        })
+    return formatted_results
+
+
+def format_management_items_per_row(result):
+    """
+    The positional loop format_outdated_components_response ran before the shared RowFormatter
+    """
+    management_items = []
+    for i in range(len(result)):
+        days_difference = int(result[i][7])
+        management_items.append({
+            'id': result[i][0],
+            'property_id': result[i][1],
+            'name': result[i][2],
+            'age': result[i][3],
+            'cost': float(result[i][4]) if result[i][4] is not None else None,
+            'forecasted_replacement_date': result[i][5],
+            'property_address': result[i][6],
+            'days_difference': days_difference,
+            'status': 'overdue' if days_difference >= 0 else 'coming_due'
+        })
+    return management_items
+
+
+def best_of(call, rows, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call(rows)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run_benchmark(args):
+    rng = random.Random(args.seed)
+    cases = [
+        ('properties:APPLIANCES', appliance_rows(rng, args.rows), format_appliances_per_row,
+         lambda rows: PropertyRetrievalService.format_property_results(rows, 'APPLIANCES')),
+        ('unit appliances', unit_appliance_rows(rng, args.rows), format_unit_appliances_per_row,
+         UnitApplianceRetrievalService.format_appliance_results),
+        ('needs-attention items', management_rows(rng, args.rows), format_management_items_per_row,
+         PropertyNeedsAttentionRetrievalService.format_outdated_components_response)
+    ]
+    print(f'{"formatter":<24}{"rows":>8}{"per-row us":>12}{"planned us":>13}{"speedup":>9}')
+    for name, rows, per_row, compiled in cases:
+        if per_row(rows) != compiled(rows):
+            raise SystemExit(f'{name}: the RowFormatter disagrees with the per-row loop')
+        before = best_of(per_row, rows, args.repeat) / len(rows) * 1e6
+        after = best_of(compiled, rows, args.repeat) / len(rows) * 1e6
+        print(f'{name:<24}{len(rows):>8}{before:>12.3f}{after:>13.3f}{before / after:>8.1f}x')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compares the per-row result formatting loops against the '
+                                                 'shared RowFormatter, in microseconds per row')
+    parser.add_argument('--rows', type=int, default=ROW_COUNT)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=7)
+    run_benchmark(parser.parse_args())
@@ -0,0 +1,218 @@
+import time
+import asyncio
+import logging
+import threading
+import contextvars
+import collections
+import concurrent.futures
+from contextlib import asynccontextmanager, contextmanager
+import mdc
+import mysql.connector.aio
+from common.logging.error.error import Error
+from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
+from common.helpers.latency_histogram import LatencyHistogram
+from common.logging.error.error_messages import DATABASE_UNAVAILABLE, INTERNAL_SERVICE_ERROR, SERVICE_TIMEOUT
+
+# mdc keeps the correlation id in a thread local, which the loop thread and the executor threads do not share
+REQUEST_MDC_FIELDS = contextvars.ContextVar('request_mdc_fields', default={})
+VALIDATION_WINDOW = 0.5
+
+
+@contextmanager
+def request_log_context():
+    """
+    Re-applies the calling request's mdc fields for logging from the event loop. Only safe around code that does
+    not await, since other requests' coroutines share the loop thread
+    """
+    with mdc.new_log_context(**REQUEST_MDC_FIELDS.get()):
+        yield
+
+
+def _call_with_log_context(fields, func, args, kwargs):
+    with mdc.new_log_context(**fields):
+        return func(*args, **kwargs)
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Runs a blocking call, such as a boto3 request, on the default executor so several can be awaited together
+    :param func: The callable to run
+    :return: Whatever func returns
+    """
+    return await asyncio.to_thread(_call_with_log_context, REQUEST_MDC_FIELDS.get(), func, args, kwargs)
+
+
+class AsyncHpAIDbConnectionPool:
+    def __init__(self, host, port, user, password, db, pool_size=4, acquire_timeout=5.0):
+        """
+        A pool of mysql.connector.aio connections served by a dedicated event loop thread, so a request can overlap
+        its database and S3 round trips instead of running them one after another
+        :param pool_size: python int, the most connections open at once
+        :param acquire_timeout: python float, the number of seconds a coroutine waits for a connection
+        """
+        self.db_config = {
+            'database': db,
+            'port': port,
+            'host': host,
+            'user': user,
+            'password': password
+        }
+        self.pool_size = int(pool_size)
+        self.acquire_timeout = float(acquire_timeout)
+        self._idle = collections.deque()
+        self._slots = asyncio.Semaphore(self.pool_size)
+        self._opened = 0
+        self._in_use = 0
+        self._acquisitions = 0
+        self._timeouts = 0
+        self._acquire_latency = LatencyHistogram()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='hp_ai_db_async_loop', daemon=True)
+        self._thread.start()
+        self.start_hp_ai_db_async_pool()
+
+    def start_hp_ai_db_async_pool(self):
+        """
+        Opens the first connection at server startup so a misconfigured database fails fast
+        """
+        logging.info(START_OF_METHOD)
+        try:
+            self.run(self._warm_up())
+            logging.info(END_OF_METHOD)
+        except Exception as e:
+            logging.error('An issue occurred establishing the async connection pool to the database',
+                          extra={'information': {'error': str(e)}},
+                          exc_info=True)
+            raise Error(INTERNAL_SERVICE_ERROR)
+
+    def run(self, coroutine, timeout=None):
+        """
+        Runs a coroutine on the pool's event loop and blocks the calling Flask worker until it finishes. Request
+        paths pass a timeout, so a stuck call cannot hold the worker forever; the coroutine is cancelled when it
+        runs out
+        :param coroutine: The coroutine to run
+        :param timeout: python float or None, seconds to wait for the result
+        :return: Whatever the coroutine returns
+        """
+        fields = dict(mdc.get_mdc_fields())
+        future = asyncio.run_coroutine_threadsafe(self._with_request_context(coroutine, fields), self._loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            logging.error('Timed out waiting for a coroutine on the async pool',
+                          extra={'information': {'timeout': timeout}})
+            raise Error(SERVICE_TIMEOUT)
+
+    @asynccontextmanager
+    async def connection(self):
+        """
+        Leases a connection for the duration of the async with block, rolling back anything left uncommitted
+        :return: A mysql.connector.aio connection
+        """
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            with request_log_context():
+                logging.error('Timed out waiting for a connection from the async pool',
+                              extra={'information': {'acquireTimeout': self.acquire_timeout}})
+            raise Error(DATABASE_UNAVAILABLE)
+        cnx = None
+        try:
+            cnx = await self._checkout()
+            self._in_use += 1
+            self._acquisitions += 1
+            self._acquire_latency.record((time.monotonic() - started) * 1000)
+            yield cnx
+        finally:
+            if cnx is not None:
+                self._in_use -= 1
+                await self._checkin(cnx)
+            self._slots.release()
+
+    def stats(self):
+        """
+        Snapshot of the async pool gauges for the metrics route
+        :return: python dict
+        """
+        return {
+            'poolName': 'hp_ai_db_async_pool',
+            'poolSize': self.pool_size,
+            'inUse': self._in_use,
+            'idle': len(self._idle),
+            'opened': self._opened,
+            'acquisitions': self._acquisitions,
+            'acquireTimeouts': self._timeouts,
+            'acquireLatency': self._acquire_latency.snapshot()
+        }
+
+    def close(self):
+        """
+        Closes the idle connections and stops the event loop thread
+        """
+        self.run(self._close_idle())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=self.acquire_timeout)
+
+    @staticmethod
+    async def _with_request_context(coroutine, fields):
+        REQUEST_MDC_FIELDS.set(fields)
+        return await coroutine
+
+    async def _warm_up(self):
+        self._idle.append((await self._open(), time.monotonic()))
+
+    async def _open(self):
+        cnx = await mysql.connector.aio.connect(**self.db_config)
+        self._opened += 1
+        return cnx
+
+    async def _checkout(self):
+        # Every mutation of the idle deque and the counters happens on the loop thread, so no lock is needed
+        while self._idle:
+            cnx, last_used_at = self._idle.pop()
+            if time.monotonic() - last_used_at <= VALIDATION_WINDOW or await self._is_alive(cnx):
+                return cnx
+            await self._discard(cnx)
+        try:
+            return await self._open()
+        except Exception as e:
+            with request_log_context():
+                logging.error('An issue occurred opening an async connection to the database',
+                              extra={'information': {'error': str(e)}},
+                              exc_info=True)
+            raise Error(DATABASE_UNAVAILABLE)
+
+    async def _checkin(self, cnx):
+        try:
+            if cnx.in_transaction:
+                await cnx.rollback()
+        except Exception as e:
+            with request_log_context():
+                logging.warning('Discarding an async connection that could not be reset',
+                                extra={'information': {'error': str(e)}})
+            await self._discard(cnx)
+            return
+        self._idle.append((cnx, time.monotonic()))
+
+    @staticmethod
+    async def _is_alive(cnx):
+        try:
+            await cnx.ping()
+            return True
+        except Exception:
+            return False
+
+    async def _discard(self, cnx):
+        self._opened -= 1
+        try:
+            await cnx.close()
+        except Exception:
+            pass
+
+    async def _close_idle(self):
+        while self._idle:
+            cnx, _ = self._idle.pop()
+            await self._discard(cnx)
@@ -0,0 +1,83 @@
+import time
+import logging
+from common.logging.error.error import Error
+from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR
+from backend.db.client.statement_metrics import statement_metrics
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository, ExecutionResult
+from backend.db.client.async_hp_ai_db_connection_pool import request_log_context
+
+
+class AsyncHpAIDbRepository:
+    """
+    The coroutine counterpart of HpAIDbRepository for connections leased from AsyncHpAIDbConnectionPool. Statements
+    are resolved by the same names and recorded in the same statement_metrics registry
+    """
+
+    @classmethod
+    async def fetch_all(cls, cnx, statement_name, params=None, sql=None):
+        """
+        Runs a SELECT and returns every row
+        :param cnx: A mysql.connector.aio connection
+        :param statement_name: python str, the constant name in sql_statements.py
+        :param params: python list or tuple, the values bound to the statement
+        :param sql: python str, optional text to run instead, for statements extended with dynamic filters
+        :return: python list of named tuples, one field per selected column
+        """
+        return await cls._run(cnx, statement_name, params, sql, fetch='all')
+
+    @classmethod
+    async def fetch_one(cls, cnx, statement_name, params=None, sql=None):
+        """
+        Runs a SELECT and returns the first row
+        :return: python named tuple or None
+        """
+        return await cls._run(cnx, statement_name, params, sql, fetch='one')
+
+    @classmethod
+    async def execute(cls, cnx, statement_name, params=None, sql=None, commit=False):
+        """
+        Runs an INSERT, UPDATE or DELETE
+        :param commit: python bool, True to commit the connection after the statement
+        :return: ExecutionResult with the affected row count and the generated id
+        """
+        return await cls._run(cnx, statement_name, params, sql, fetch=None, commit=commit)
+
+    @classmethod
+    async def _run(cls, cnx, statement_name, params, sql, fetch, commit=False):
+        operation = sql if sql is not None else HpAIDbRepository.resolve_statement(statement_name)
+        started = time.perf_counter()
+        row_count = 0
+        failed = False
+        cursor = None
+        try:
+            cursor = await cnx.cursor()
+            await cursor.execute(operation, params)
+            if fetch == 'all':
+                result = HpAIDbRepository.to_typed_rows(statement_name, cursor.description, await cursor.fetchall())
+                row_count = len(result)
+            elif fetch == 'one':
+                # Draining the result keeps the connection reusable, the async cursor does not on close
+                rows = (await cursor.fetchall())[:1]
+                typed = HpAIDbRepository.to_typed_rows(statement_name, cursor.description, rows)
+                result = typed[0] if typed else None
+                row_count = len(typed)
+            else:
+                if commit:
+                    await cnx.commit()
+                result = ExecutionResult(rowcount=cursor.rowcount, lastrowid=cursor.lastrowid)
+                row_count = result.rowcount if isinstance(result.rowcount, int) else 0
+            return result
+        except Exception as e:
+            failed = True
+            with request_log_context():
+                logging.error('An issue occurred executing a statement against the database',
+                              exc_info=True,
+                              extra={'information': {'statement': statement_name, 'error': str(e)}})
+            raise Error(INTERNAL_SERVICE_ERROR)
+        finally:
+            if cursor is not None:
+                try:
+                    await cursor.close()
+                except Exception:
+                    pass
+            statement_metrics.record(statement_name, (time.perf_counter() - started) * 1000, row_count, failed)
@@ -0,0 +1,82 @@
+from flask import g, has_app_context
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
+from backend.db.client.ownership_index import ownership_index
+
+# Every property keyed read and its variant joined on properties.user_id, which takes the user id as its last
+# parameter and returns no rows for a property the user does not own
+SCOPED_STATEMENTS = {
+    'SELECT_PROPERTY_BY_PROPERTY_ID': 'SELECT_PROPERTY_BY_PROPERTY_ID_FOR_USER',
+    'SELECT_APPLIANCES_BY_PROPERTY_ID': 'SELECT_APPLIANCES_BY_PROPERTY_ID_FOR_USER',
+    'SELECT_STRUCTURES_BY_PROPERTY_ID': 'SELECT_STRUCTURES_BY_PROPERTY_ID_FOR_USER',
+    'SELECT_TENANT_INFORMATION_BY_PROPERTY_ID': 'SELECT_TENANT_INFORMATION_BY_PROPERTY_ID_FOR_USER',
+    'GET_UNITS_BY_PROPERTY_ID': 'GET_UNITS_BY_PROPERTY_ID_FOR_USER'
+}
+
+
+def _verified_properties():
+    """
+    The (user, property) pairs already proven owned while serving the current request, kept on flask.g so the
+    memo never outlives the request. Outside a request nothing is remembered
+    :return: python set or None
+    """
+    if not has_app_context():
+        return None
+    return g.setdefault('verified_properties', set())
+
+
+def remember_verified_property(user_id, property_id):
+    """
+    Records that user_id owns property_id for the rest of the request
+    """
+    verified = _verified_properties()
+    if verified is not None and user_id is not None:
+        verified.add((str(user_id), str(property_id)))
+
+
+def is_verified_property(user_id, property_id):
+    verified = _verified_properties()
+    return bool(verified) and (str(user_id), str(property_id)) in verified
+
+
+def is_owned_property(cnx, user_id, property_id):
+    """
+    Whether the request or the ownership index already knows the property is the user's, without a scoped read
+    :return: python bool, False means unknown rather than not owned
+    """
+    return is_verified_property(user_id, property_id) or ownership_index.owns_property(cnx, user_id, property_id)
+
+
+def fetch_all_for_user(cnx, statement_name, property_id, user_id):
+    """
+    Runs a property keyed read so it only returns rows of a property the user owns, in the same round trip as the
+    read itself. Once a read or the ownership index has shown the property to be the user's, reads skip the join
+    :param cnx: A pooled MySQL connection
+    :param statement_name: python str, a key of SCOPED_STATEMENTS
+    :param property_id: The internal id of the property
+    :param user_id: The internal id of the user making the request
+    :return: python list of named tuples, empty when the property is missing or not the user's
+    """
+    if is_owned_property(cnx, user_id, property_id):
+        return HpAIDbRepository.fetch_all(cnx=cnx, statement_name=statement_name, params=[property_id])
+    rows = HpAIDbRepository.fetch_all(cnx=cnx,
+                                      statement_name=SCOPED_STATEMENTS[statement_name],
+                                      params=[property_id, user_id])
+    if rows:
+        remember_verified_property(user_id, property_id)
+    return rows
+
+
+def fetch_one_for_user(cnx, statement_name, property_id, user_id):
+    """
+    Same as fetch_all_for_user for a read of a single row
+    :return: python named tuple or None
+    """
+    if is_owned_property(cnx, user_id, property_id):
+        return HpAIDbRepository.fetch_one(cnx=cnx, statement_name=statement_name, params=[property_id])
+    row = HpAIDbRepository.fetch_one(cnx=cnx,
+                                     statement_name=SCOPED_STATEMENTS[statement_name],
+                                     params=[property_id, user_id])
+    if row is not None:
+        remember_verified_property(user_id, property_id)
+    return row
+
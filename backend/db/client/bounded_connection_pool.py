@@ -0,0 +1,574 @@
+import sys
+import time
+import logging
+import threading
+import traceback
+import collections
+from mysql.connector.errors import PoolError, OperationalError, InterfaceError
+from common.helpers.latency_histogram import LatencyHistogram
+
+# CR_SERVER_GONE_ERROR, CR_SERVER_LOST and CR_SERVER_LOST_EXTENDED: the socket died under the statement
+CONNECTION_LOST_ERRNOS = frozenset((2006, 2013, 2055))
+READ_ONLY_KEYWORDS = frozenset(('SELECT', 'SHOW', 'DESCRIBE', 'DESC', 'EXPLAIN'))
+
+
+def is_connection_lost_error(error):
+    """
+    Whether an exception means the physical connection is unusable, as opposed to a problem with the statement
+    :param error: The exception raised by the MySQL driver
+    :return: python bool
+    """
+    if not isinstance(error, (OperationalError, InterfaceError)):
+        return False
+    # 'MySQL Connection not available' is raised without an errno
+    return error.errno in CONNECTION_LOST_ERRNOS or error.errno in (None, -1)
+
+
+def is_read_only_statement(operation):
+    """
+    Whether a statement can be replayed on a fresh connection without side effects
+    :param operation: python str, the SQL statement
+    :return: python bool
+    """
+    if not isinstance(operation, str):
+        return False
+    words = operation.lstrip(' \t\r\n(').split(None, 1)
+    if not words or words[0].upper() not in READ_ONLY_KEYWORDS:
+        return False
+    return 'FOR UPDATE' not in operation.upper()
+
+
+class PooledConnectionEntry:
+    def __init__(self, connection, is_overflow):
+        """
+        Book-keeping for a single physical connection owned by the BoundedConnectionPool
+        :param connection: The underlying MySQL connection
+        :param is_overflow: python bool, True when the connection was opened beyond pool_size
+        """
+        self.connection = connection
+        self.is_overflow = is_overflow
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+        self.leased_at = None
+        self.lease_thread_id = None
+        self.lease_stack = None
+        self.leak_reported = False
+        self.has_written = False
+        # Server-side prepared statements belong to the MySQL session, so the handles live with the connection
+        self.prepared_cursors = collections.OrderedDict()
+
+    def mark_leased(self, capture_stack):
+        self.leased_at = time.monotonic()
+        self.lease_thread_id = threading.get_ident()
+        # Drop the pool's own frames so the stack ends at the service that asked for the connection
+        self.lease_stack = ''.join(traceback.format_stack(limit=18)[:-2]) if capture_stack else None
+        self.leak_reported = False
+        self.has_written = False
+
+    def replace_connection(self, connection):
+        self.connection = connection
+        self.prepared_cursors.clear()
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+
+
+class PooledCursor:
+    def __init__(self, pool, entry, cursor_args, cursor_kwargs):
+        """
+        Cursor wrapper that replays a read-only statement once on a fresh connection when the socket was lost
+        :param pool: The BoundedConnectionPool that leased the connection
+        :param entry: The PooledConnectionEntry the cursor belongs to
+        :param cursor_args: python tuple, positional arguments used to open the cursor
+        :param cursor_kwargs: python dict, keyword arguments used to open the cursor
+        """
+        self._pool = pool
+        self._entry = entry
+        self._cursor_args = cursor_args
+        self._cursor_kwargs = cursor_kwargs
+        self._cursor = entry.connection.cursor(*cursor_args, **cursor_kwargs)
+
+    def __getattr__(self, item):
+        if item.startswith('__') or item in ('_pool', '_entry', '_cursor', '_cursor_args', '_cursor_kwargs'):
+            raise AttributeError(item)
+        return getattr(self._cursor, item)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, operation, *args, **kwargs):
+        read_only = is_read_only_statement(operation)
+        if not read_only:
+            self._entry.has_written = True
+        try:
+            return self._cursor.execute(operation, *args, **kwargs)
+        except Exception as e:
+            # Replaying after a write would silently drop the uncommitted work, so only clean reads are retried
+            if not read_only or self._entry.has_written or not is_connection_lost_error(e):
+                raise
+            self._pool.reconnect(self._entry, reason=str(e))
+            self._cursor = self._entry.connection.cursor(*self._cursor_args, **self._cursor_kwargs)
+            return self._cursor.execute(operation, *args, **kwargs)
+
+    def executemany(self, operation, *args, **kwargs):
+        self._entry.has_written = True
+        return self._cursor.executemany(operation, *args, **kwargs)
+
+    def callproc(self, *args, **kwargs):
+        self._entry.has_written = True
+        return self._cursor.callproc(*args, **kwargs)
+
+
+class PooledConnection:
+    def __init__(self, pool, entry):
+        """
+        The object handed to services by get_connection; close() returns the connection to the pool
+        :param pool: The BoundedConnectionPool that leased the connection
+        :param entry: The PooledConnectionEntry being leased
+        """
+        self._pool = pool
+        self._entry = entry
+        self._closed = False
+
+    def __getattr__(self, item):
+        if item.startswith('__') or item in ('_pool', '_entry', '_closed'):
+            raise AttributeError(item)
+        if self._closed:
+            raise PoolError('The connection has already been returned to the pool')
+        return getattr(self._entry.connection, item)
+
+    def cursor(self, *args, **kwargs):
+        if self._closed:
+            raise PoolError('The connection has already been returned to the pool')
+        return PooledCursor(self._pool, self._entry, args, kwargs)
+
+    def prepared_cursor(self, statement_name):
+        """
+        Returns the cursor holding the prepared handle of a statement on this physical connection, so the
+        statement is parsed once per connection instead of once per request. The cursor stays open after use
+        :param statement_name: python str, the constant name in sql_statements.py
+        :return: PooledCursor or None when the pool does not cache prepared statements
+        """
+        if self._closed:
+            raise PoolError('The connection has already been returned to the pool')
+        return self._pool.prepared_cursor(self._entry, statement_name)
+
+    def discard_prepared_cursor(self, statement_name):
+        """
+        Drops a cached prepared cursor, e.g. after it raised mid-fetch and may still hold unread rows
+        :param statement_name: python str, the constant name in sql_statements.py
+        """
+        self._pool.discard_prepared_cursor(self._entry, statement_name)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._pool.release(self._entry)
+
+    def __del__(self):
+        # A lease that is garbage collected without close() is a leak; queue it for the pool to reclaim
+        if not self.__dict__.get('_closed', True):
+            self._closed = True
+            self._pool.reclaim(self._entry)
+
+
+class BoundedConnectionPool:
+    def __init__(self, pool_name, connection_factory, pool_size=5, max_overflow=0, acquire_timeout=5.0,
+                 leak_detection_threshold=0.0, housekeeping_interval=5.0, max_idle_time=0.0, max_lifetime=0.0,
+                 validation_window=0.5, prepared_statement_cache_size=0):
+        """
+        Connection pool with a fixed core size, a bounded overflow and a FIFO queue of waiting threads
+        :param pool_name: python str, the name surfaced in logs and metrics
+        :param connection_factory: callable returning a new MySQL connection
+        :param pool_size: python int, the number of connections kept open between requests
+        :param max_overflow: python int, the extra connections that may be opened during bursts
+        :param acquire_timeout: python float, the number of seconds a caller waits before giving up
+        :param leak_detection_threshold: python float, seconds a lease may be held before it is logged, 0 disables
+        :param housekeeping_interval: python float, seconds between background housekeeping passes
+        :param max_idle_time: python float, seconds a connection may sit idle before it is replaced, 0 disables
+        :param max_lifetime: python float, seconds after which a connection is replaced regardless of use, 0 disables
+        :param validation_window: python float, a connection used more recently than this is lent without a ping
+        :param prepared_statement_cache_size: python int, prepared statements kept per connection, 0 disables
+        """
+        self.pool_name = pool_name
+        self.connection_factory = connection_factory
+        self.pool_size = int(pool_size)
+        self.max_overflow = int(max_overflow)
+        self.acquire_timeout = float(acquire_timeout)
+        self.leak_detection_threshold = float(leak_detection_threshold or 0)
+        self.housekeeping_interval = float(housekeeping_interval)
+        self.max_idle_time = float(max_idle_time or 0)
+        self.max_lifetime = float(max_lifetime or 0)
+        self.validation_window = float(validation_window)
+        self.prepared_statement_cache_size = int(prepared_statement_cache_size or 0)
+        self._lock = threading.Lock()
+        self._idle = collections.deque()
+        self._waiters = collections.deque()
+        self._leased_entries = set()
+        self._abandoned = collections.deque()
+        self._leased = 0
+        self._opened = 0
+        self._overflow_in_use = 0
+        self._acquisitions = 0
+        self._timeouts = 0
+        self._leaked = 0
+        self._reclaimed = 0
+        self._evicted = 0
+        self._failed_validations = 0
+        self._reconnects = 0
+        self._prepared_hits = 0
+        self._prepared_misses = 0
+        self._acquire_latency = LatencyHistogram()
+        self._housekeeping_stop = threading.Event()
+        self._housekeeping_thread = None
+
+    @property
+    def capacity(self):
+        return self.pool_size + self.max_overflow
+
+    def warm_up(self):
+        """
+        Opens pool_size connections up front so a misconfigured database fails at server startup
+        """
+        entries = [PooledConnectionEntry(self.connection_factory(), is_overflow=False)
+                   for _ in range(self.pool_size)]
+        with self._lock:
+            self._opened += len(entries)
+            self._idle.extend(entries)
+
+    def get_connection(self, timeout=None):
+        """
+        Leases a connection, blocking in FIFO order while the pool and its overflow are exhausted
+        :param timeout: python float or None, overrides the configured acquire_timeout
+        :return: PooledConnection
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        started = time.monotonic()
+        self.reclaim_abandoned()
+        self._reserve_slot(timeout)
+        try:
+            entry = self._checkout_entry()
+        except Exception:
+            self._release_slot()
+            raise
+        entry.mark_leased(capture_stack=self.leak_detection_threshold > 0)
+        with self._lock:
+            self._leased_entries.add(entry)
+        self._acquire_latency.record((time.monotonic() - started) * 1000)
+        return PooledConnection(self, entry)
+
+    def release(self, entry):
+        """
+        Returns a leased connection, closing it instead when it came from the overflow
+        :param entry: The PooledConnectionEntry being returned
+        """
+        keep = not entry.is_overflow
+        if keep:
+            try:
+                if entry.connection.in_transaction:
+                    entry.connection.rollback()
+            except Exception as e:
+                logging.warning('Discarding a pooled connection that could not be reset',
+                                extra={'information': {'pool': self.pool_name, 'error': str(e)}})
+                keep = False
+        with self._lock:
+            self._leased_entries.discard(entry)
+            if entry.is_overflow:
+                self._overflow_in_use -= 1
+            if keep:
+                entry.last_used_at = time.monotonic()
+                self._idle.append(entry)
+            else:
+                self._opened -= 1
+        if not keep:
+            self._close_quietly(entry)
+        self._release_slot()
+
+    def reclaim(self, entry):
+        """
+        Queues the entry of a lease that was garbage collected without being closed. Deliberately lock-free
+        because it runs from __del__, which may fire while this thread already holds the pool lock
+        :param entry: The PooledConnectionEntry that was abandoned
+        """
+        self._abandoned.append(entry)
+
+    def reclaim_abandoned(self):
+        """
+        Returns abandoned leases to the pool and counts them as leaked
+        """
+        while self._abandoned:
+            try:
+                entry = self._abandoned.popleft()
+            except IndexError:
+                return
+            with self._lock:
+                self._reclaimed += 1
+                if not entry.leak_reported:
+                    self._leaked += 1
+            logging.error('A pooled connection was garbage collected without being closed',
+                          extra={'information': {'pool': self.pool_name,
+                                                 'heldSeconds': round(time.monotonic() - entry.leased_at, 3),
+                                                 'leaseStack': entry.lease_stack}})
+            self.release(entry)
+
+    def reconnect(self, entry, reason):
+        """
+        Swaps the dead physical connection of a leased entry for a new one
+        :param entry: The PooledConnectionEntry whose connection was lost
+        :param reason: python str, the driver error that triggered the reconnect
+        """
+        logging.warning('Reconnecting a pooled connection that was lost mid-statement',
+                        extra={'information': {'pool': self.pool_name, 'error': reason}})
+        # The handles prepared on the lost session are closed with it rather than left to the garbage collector
+        for cursor in entry.prepared_cursors.values():
+            self._close_cursor_quietly(cursor)
+        self._close_quietly(entry)
+        entry.replace_connection(self.connection_factory())
+        with self._lock:
+            self._reconnects += 1
+
+    def prepared_cursor(self, entry, statement_name):
+        """
+        Looks up, or opens, the prepared cursor of a statement on a leased connection. The least recently used
+        statement is closed once the cache is full, keeping the server's prepared statement count bounded
+        :param entry: The PooledConnectionEntry currently leased by the caller
+        :param statement_name: python str, the constant name in sql_statements.py
+        :return: PooledCursor or None when prepared statements are disabled
+        """
+        if self.prepared_statement_cache_size <= 0:
+            return None
+        # Only the lease holder touches its entry, so the cache itself needs no locking
+        cursors = entry.prepared_cursors
+        cursor = cursors.get(statement_name)
+        if cursor is not None:
+            cursors.move_to_end(statement_name)
+            with self._lock:
+                self._prepared_hits += 1
+            return cursor
+        cursor = PooledCursor(self, entry, (), {'prepared': True})
+        cursors[statement_name] = cursor
+        with self._lock:
+            self._prepared_misses += 1
+        if len(cursors) > self.prepared_statement_cache_size:
+            _, evicted = cursors.popitem(last=False)
+            self._close_cursor_quietly(evicted)
+        return cursor
+
+    def discard_prepared_cursor(self, entry, statement_name):
+        """
+        Closes and forgets the prepared cursor of a statement on a leased connection
+        :param entry: The PooledConnectionEntry currently leased by the caller
+        :param statement_name: python str, the constant name in sql_statements.py
+        """
+        cursor = entry.prepared_cursors.pop(statement_name, None)
+        if cursor is not None:
+            self._close_cursor_quietly(cursor)
+
+    def evict_stale_connections(self):
+        """
+        Closes idle connections past max_idle_time or max_lifetime and reopens the core connections, so the
+        request path does not pay for the reconnect after a quiet period
+        """
+        now = time.monotonic()
+        with self._lock:
+            stale = [entry for entry in self._idle if self._is_expired(entry, now)]
+            for entry in stale:
+                self._idle.remove(entry)
+            self._opened -= len(stale)
+            self._evicted += len(stale)
+        for entry in stale:
+            self._close_quietly(entry)
+        while True:
+            with self._lock:
+                if self._opened >= self.pool_size:
+                    return
+                self._opened += 1
+            try:
+                entry = PooledConnectionEntry(self.connection_factory(), is_overflow=False)
+            except Exception as e:
+                with self._lock:
+                    self._opened -= 1
+                logging.warning('An issue occurred replenishing the connection pool',
+                                extra={'information': {'pool': self.pool_name, 'error': str(e)}})
+                return
+            with self._lock:
+                self._idle.appendleft(entry)
+
+    def detect_leaks(self):
+        """
+        Logs the acquiring stack, and where the holder currently is, for leases held past the threshold
+        """
+        if self.leak_detection_threshold <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            suspects = [entry for entry in self._leased_entries
+                        if not entry.leak_reported and now - entry.leased_at > self.leak_detection_threshold]
+            for entry in suspects:
+                entry.leak_reported = True
+                self._leaked += 1
+        if not suspects:
+            return
+        frames = sys._current_frames()
+        for entry in suspects:
+            holder_frame = frames.get(entry.lease_thread_id)
+            logging.warning('A pooled connection has been held longer than the leak detection threshold',
+                            extra={'information': {
+                                'pool': self.pool_name,
+                                'heldSeconds': round(now - entry.leased_at, 3),
+                                'thresholdSeconds': self.leak_detection_threshold,
+                                'leaseStack': entry.lease_stack,
+                                'holderStack': ''.join(traceback.format_stack(holder_frame)) if holder_frame else None
+                            }})
+
+    def run_housekeeping(self):
+        """
+        A single housekeeping pass, invoked periodically by the background thread
+        """
+        self.reclaim_abandoned()
+        self.detect_leaks()
+        self.evict_stale_connections()
+
+    def start_housekeeping(self):
+        """
+        Starts the daemon thread that performs housekeeping every housekeeping_interval seconds
+        """
+        if self._housekeeping_thread and self._housekeeping_thread.is_alive():
+            return
+        self._housekeeping_stop.clear()
+        self._housekeeping_thread = threading.Thread(target=self._housekeeping_loop,
+                                                     name=f'{self.pool_name}-housekeeping',
+                                                     daemon=True)
+        self._housekeeping_thread.start()
+
+    def stop_housekeeping(self):
+        self._housekeeping_stop.set()
+        if self._housekeeping_thread:
+            self._housekeeping_thread.join(timeout=self.housekeeping_interval)
+
+    def stats(self):
+        """
+        Snapshot of the pool gauges for the metrics route
+        :return: python dict
+        """
+        with self._lock:
+            gauges = {
+                'poolName': self.pool_name,
+                'poolSize': self.pool_size,
+                'maxOverflow': self.max_overflow,
+                'inUse': self._leased,
+                'idle': len(self._idle),
+                'opened': self._opened,
+                'overflowInUse': self._overflow_in_use,
+                'waiters': len(self._waiters),
+                'acquisitions': self._acquisitions,
+                'acquireTimeouts': self._timeouts,
+                'leakedConnections': self._leaked,
+                'reclaimedConnections': self._reclaimed,
+                'evictedConnections': self._evicted,
+                'failedValidations': self._failed_validations,
+                'reconnects': self._reconnects,
+                'preparedStatementCacheHits': self._prepared_hits,
+                'preparedStatementCacheMisses': self._prepared_misses
+            }
+        gauges['acquireLatency'] = self._acquire_latency.snapshot()
+        return gauges
+
+    def _reserve_slot(self, timeout):
+        with self._lock:
+            if not self._waiters and self._leased < self.capacity:
+                self._leased += 1
+                self._acquisitions += 1
+                return
+            waiter = threading.Event()
+            self._waiters.append(waiter)
+        if waiter.wait(timeout):
+            return
+        with self._lock:
+            # A releasing thread may have handed us the slot between the timeout and taking the lock
+            if waiter.is_set():
+                return
+            self._waiters.remove(waiter)
+            self._timeouts += 1
+        raise PoolError(f'Timed out after {timeout}s waiting for a connection from {self.pool_name}')
+
+    def _release_slot(self):
+        with self._lock:
+            if self._waiters:
+                # Hand the slot straight to the longest waiting thread so late arrivals cannot barge in
+                self._acquisitions += 1
+                self._waiters.popleft().set()
+            else:
+                self._leased -= 1
+
+    def _checkout_entry(self):
+        while True:
+            with self._lock:
+                entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                return self._open_entry()
+            if self._is_usable(entry):
+                return entry
+            with self._lock:
+                self._opened -= 1
+                self._evicted += 1
+            self._close_quietly(entry)
+
+    def _open_entry(self):
+        with self._lock:
+            is_overflow = self._opened >= self.pool_size
+            self._opened += 1
+            if is_overflow:
+                self._overflow_in_use += 1
+        try:
+            return PooledConnectionEntry(self.connection_factory(), is_overflow=is_overflow)
+        except Exception:
+            with self._lock:
+                self._opened -= 1
+                if is_overflow:
+                    self._overflow_in_use -= 1
+            raise
+
+    def _is_usable(self, entry):
+        now = time.monotonic()
+        if self._is_expired(entry, now):
+            return False
+        if now - entry.last_used_at <= self.validation_window:
+            return True
+        try:
+            entry.connection.ping(reconnect=False, attempts=1, delay=0)
+            return True
+        except Exception as e:
+            logging.warning('Discarding a pooled connection that failed validation',
+                            extra={'information': {'pool': self.pool_name, 'error': str(e)}})
+            with self._lock:
+                self._failed_validations += 1
+            return False
+
+    def _is_expired(self, entry, now):
+        if self.max_idle_time and now - entry.last_used_at > self.max_idle_time:
+            return True
+        return bool(self.max_lifetime) and now - entry.created_at > self.max_lifetime
+
+    def _housekeeping_loop(self):
+        while not self._housekeeping_stop.wait(self.housekeeping_interval):
+            try:
+                self.run_housekeeping()
+            except Exception as e:
+                logging.error('An issue occurred during connection pool housekeeping',
+                              exc_info=True,
+                              extra={'information': {'pool': self.pool_name, 'error': str(e)}})
+
+    @staticmethod
+    def _close_cursor_quietly(cursor):
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _close_quietly(entry):
+        try:
+            entry.connection.close()
+        except Exception:
+            pass
@@ -0,0 +1,152 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
+from backend.db.client.connection_lease import acquire_connection, connection_lease
+
+RECENT_JOBS_LIMIT = 20
+MAX_FILE_NAME_LENGTH = 255
+
+# The bulk_upload_jobs table of V007__bulk_upload_jobs.sql and V008__bulk_upload_job_heartbeats.sql in the SQLite
+# dialect
+CREATE_SQLITE_BULK_UPLOAD_JOBS_TABLE = """CREATE TABLE IF NOT EXISTS home_pulse_ai.bulk_upload_jobs (
+    job_id CHAR(36) NOT NULL PRIMARY KEY,
+    user_id INT NOT NULL,
+    status VARCHAR(16) NOT NULL,
+    file_name VARCHAR(255),
+    rows_written INT NOT NULL DEFAULT 0,
+    chunks_written INT NOT NULL DEFAULT 0,
+    rows_per_second DECIMAL(12, 1) NOT NULL DEFAULT 0,
+    errors TEXT,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at DATETIME NULL,
+    finished_at DATETIME NULL,
+    owner_id CHAR(36) NULL,
+    heartbeat_at DATETIME NULL
+);"""
+
+
+def utc_now():
+    """
+    Heartbeats are written and compared by the application in naive UTC, so every server instance and the SQLite
+    stand-in agree on them whatever the session time zone
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class BulkUploadJobStore:
+    def __init__(self, hp_ai_db_connection_pool):
+        """
+        The bulk_upload_jobs table the job workers write their progress to and the job status routes read. Every
+        call leases its own primary connection and commits at once, so progress is visible while the import's own
+        transaction is still open
+        :param hp_ai_db_connection_pool: HpAIDbConnectionPool
+        """
+        self.pool = hp_ai_db_connection_pool.pool
+
+    def create_job(self, job_id, user_id, file_name, owner_id):
+        """
+        :param owner_id: python str, the id of the server instance that will run the job
+        """
+        self.execute('INSERT_BULK_UPLOAD_JOB', [job_id, user_id, (file_name or '')[:MAX_FILE_NAME_LENGTH] or None,
+                                                owner_id, utc_now()])
+
+    def mark_running(self, job_id):
+        """
+        :return: python bool, False when the job is no longer queued, e.g. it was failed as interrupted
+        """
+        return self.execute('UPDATE_BULK_UPLOAD_JOB_STARTED', [utc_now(), job_id]) > 0
+
+    def record_progress(self, job_id, progress):
+        """
+        Writes the counts of a running job and refreshes its heartbeat
+        :param progress: BulkImportProgress
+        """
+        self.execute('UPDATE_BULK_UPLOAD_JOB_PROGRESS',
+                     [progress.rows_written, progress.chunks_written, round(progress.rows_per_second(), 1),
+                      utc_now(), job_id])
+
+    def finish_job(self, job_id, status, progress):
+        """
+        :param status: python str, succeeded or failed
+        :param progress: BulkImportProgress, the final counts and the errors of a failed job
+        :return: python bool, False when the job had already finished, e.g. it was failed as interrupted
+        """
+        return self.execute('UPDATE_BULK_UPLOAD_JOB_FINISHED',
+                            [status, progress.rows_written, progress.chunks_written,
+                             round(progress.rows_per_second(), 1), json.dumps(progress.errors), job_id]) > 0
+
+    def record_heartbeats(self, owner_id):
+        """
+        Refreshes the heartbeat of every queued or running job of a server instance
+        :param owner_id: python str, the id of the server instance
+        """
+        self.execute('UPDATE_BULK_UPLOAD_JOB_HEARTBEATS', [utc_now(), owner_id])
+
+    def fail_interrupted_jobs(self, errors, stale_after_seconds):
+        """
+        Fails the queued or running jobs whose server instance stopped refreshing their heartbeat
+        :param errors: python list of error dicts stored on each of them
+        :param stale_after_seconds: python float, how old a heartbeat may be before its job counts as interrupted
+        :return: python int, the jobs failed
+        """
+        return self.execute('UPDATE_INTERRUPTED_BULK_UPLOAD_JOBS',
+                            [json.dumps(errors), utc_now() - timedelta(seconds=stale_after_seconds)])
+
+    def fetch_job(self, job_id, user_id):
+        """
+        :return: The job row, or None when the user has no job with this id
+        """
+        rows = self.fetch_all('SELECT_BULK_UPLOAD_JOB_BY_ID_FOR_USER', [job_id, user_id])
+        return rows[0] if rows else None
+
+    def fetch_recent_jobs(self, user_id, limit=RECENT_JOBS_LIMIT):
+        """
+        :return: python list of the user's job rows, newest first
+        """
+        return self.fetch_all('SELECT_BULK_UPLOAD_JOBS_BY_USER_ID', [user_id, limit])
+
+    def execute(self, statement_name, params):
+        with connection_lease(acquire_connection(self.pool)) as cnx:
+            return HpAIDbRepository.execute(cnx=cnx, statement_name=statement_name, params=params,
+                                            commit=True).rowcount
+
+    def fetch_all(self, statement_name, params):
+        with connection_lease(acquire_connection(self.pool)) as cnx:
+            return HpAIDbRepository.fetch_all(cnx=cnx, statement_name=statement_name, params=params)
+
+
+class SqliteBulkUploadJobStore(BulkUploadJobStore):
+    def __init__(self, path=':memory:'):
+        """
+        A local stand-in for the MySQL job table, for tests and running the job subsystem without a database
+        server. The file is attached as the home_pulse_ai schema, so the statements of sql_statements.py run
+        unchanged apart from their placeholders
+        :param path: python str, the SQLite database file, or :memory:
+        """
+        self.pool = None
+        self._lock = threading.Lock()
+        self._cnx = sqlite3.connect(':memory:', check_same_thread=False)
+        self._cnx.execute('ATTACH DATABASE ? AS home_pulse_ai', (path,))
+        self._cnx.execute(CREATE_SQLITE_BULK_UPLOAD_JOBS_TABLE)
+        self._cnx.commit()
+
+    def execute(self, statement_name, params):
+        with self._lock:
+            cursor = self._cnx.execute(self.sqlite_statement(statement_name), self.sqlite_params(params))
+            self._cnx.commit()
+            return cursor.rowcount
+
+    def fetch_all(self, statement_name, params):
+        with self._lock:
+            return self._cnx.execute(self.sqlite_statement(statement_name), self.sqlite_params(params)).fetchall()
+
+    @staticmethod
+    def sqlite_statement(statement_name):
+        return HpAIDbRepository.resolve_statement(statement_name).replace('%s', '?')
+
+    @staticmethod
+    def sqlite_params(params):
+        # Stored as the text CURRENT_TIMESTAMP writes, so heartbeats compare in time order
+        return [value.isoformat(' ', 'seconds') if isinstance(value, datetime) else value for value in params]
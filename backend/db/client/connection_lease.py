@@ -0,0 +1,61 @@
+import logging
+from contextlib import contextmanager
+from mysql.connector.errors import PoolError
+from common.logging.error.error import Error
+from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR, DATABASE_UNAVAILABLE
+
+
+def acquire_connection(pool):
+    """
+    Leases a connection from the pool, translating pool failures into the service error types
+    :param pool: The BoundedConnectionPool owned by HpAIDbConnectionPool
+    :return: A pooled MySQL connection
+    """
+    try:
+        cnx = pool.get_connection()
+        return cnx
+    except PoolError as e:
+        logging.error('Timed out waiting for a connection from the pool',
+                      exc_info=True,
+                      extra={'information': {'error': str(e)}})
+        raise Error(DATABASE_UNAVAILABLE)
+    except Exception as e:
+        logging.error('An issue occurred acquiring a connection to the pool',
+                      exc_info=True,
+                      extra={'information': {'error': str(e)}})
+        raise Error(INTERNAL_SERVICE_ERROR)
+
+
+def acquire_read_only_connection(hp_ai_db_connection_pool, user_id=None):
+    """
+    Leases a connection for a call that only reads, from the replica when one is configured. Falls back to the
+    primary when the replica cannot lend a connection
+    :param hp_ai_db_connection_pool: The HpAIDbConnectionPool owning the primary and replica pools
+    :param user_id: python int or None, the user reading, used to honour the read-your-writes window
+    :return: A pooled MySQL connection
+    """
+    pool = hp_ai_db_connection_pool.read_pool(user_id)
+    if pool is not hp_ai_db_connection_pool.pool:
+        try:
+            return pool.get_connection()
+        except Exception as e:
+            logging.warning('Falling back to the primary after failing to lease a replica connection',
+                            extra={'information': {'error': str(e)}})
+    return acquire_connection(hp_ai_db_connection_pool.pool)
+
+
+@contextmanager
+def connection_lease(cnx):
+    """
+    Scopes a leased connection so it is handed back to the pool on every exit path, including errors
+    :param cnx: The connection returned by acquire_connection
+    :return: The same connection, for use inside the with block
+    """
+    try:
+        yield cnx
+    finally:
+        try:
+            cnx.close()
+        except Exception as e:
+            logging.warning('An issue occurred returning a connection to the pool',
+                            extra={'information': {'error': str(e)}})
@@ -1,38 +1,117 @@
 import logging
+from functools import partial
+import mysql.connector
 from common.logging.error.error import Error
-from mysql.connector.pooling import MySQLConnectionPool
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
 from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR
+from backend.db.client.bounded_connection_pool import BoundedConnectionPool
+from backend.db.client.recent_write_tracker import RecentWriteTracker
 
 
 class HpAIDbConnectionPool:
-    def __init__(self, host, port, user, password, db):
+    def __init__(self, host, port, user, password, db, pool_size=5, max_overflow=0, acquire_timeout=5.0,
+                 leak_detection_threshold=0.0, max_idle_time=0.0, max_lifetime=0.0, replica_host=None,
+                 replica_pool_size=None, read_your_writes_window=5.0, prepared_statements=False,
+                 prepared_statement_cache_size=32):
         self.host = host
         self.port = port
         self.user = user
         self.password = password
         self.db = db
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.acquire_timeout = acquire_timeout
+        self.leak_detection_threshold = leak_detection_threshold
+        self.max_idle_time = max_idle_time
+        self.max_lifetime = max_lifetime
+        self.replica_host = replica_host
+        self.replica_pool_size = replica_pool_size or pool_size
+        # Opt-in: statements run by name through HpAIDbRepository reuse a prepared handle per connection
+        self.prepared_statement_cache_size = int(prepared_statement_cache_size or 0) if prepared_statements else 0
+        self.recent_writes = RecentWriteTracker(window_seconds=read_your_writes_window)
         self.pool = self.start_hp_ai_db_pool()
+        self.replica_pool = self.start_hp_ai_db_replica_pool()
 
     def start_hp_ai_db_pool(self):
         """
-        Creates a MySQLConnectionPool instance at server startup
-        :return: MySQLConnectionPool instance
+        Creates a BoundedConnectionPool instance at server startup
+        :return: BoundedConnectionPool instance
         """
         logging.info(START_OF_METHOD)
         try:
-            db_config = {
-                'database': self.db,
-                'port': self.port,
-                'host': self.host,
-                'user': self.user,
-                'password': self.password
-            }
-            pool = MySQLConnectionPool(pool_name='hp_ai_db_pool',
-                                       **db_config)
+            pool = self._create_pool(pool_name='hp_ai_db_pool', host=self.host, pool_size=self.pool_size)
+            logging.info(END_OF_METHOD)
             return pool
         except Exception as e:
             logging.error('An issue occurred establishing a connection pool to the database',
                           extra={'information': {'error': str(e)}},
                           exc_info=True)
             raise Error(INTERNAL_SERVICE_ERROR)
+
+    def start_hp_ai_db_replica_pool(self):
+        """
+        Creates the read replica pool when a replica host is configured. The replica is optional, so a failure
+        here leaves every read on the primary instead of stopping the server
+        :return: BoundedConnectionPool instance or None
+        """
+        if not self.replica_host:
+            return None
+        logging.info(START_OF_METHOD)
+        try:
+            pool = self._create_pool(pool_name='hp_ai_db_replica_pool', host=self.replica_host,
+                                     pool_size=self.replica_pool_size)
+            logging.info(END_OF_METHOD)
+            return pool
+        except Exception as e:
+            logging.error('An issue occurred establishing a connection pool to the read replica',
+                          extra={'information': {'error': str(e)}},
+                          exc_info=True)
+            return None
+
+    def read_pool(self, user_id=None):
+        """
+        Picks the pool for a read-only call, keeping a user on the primary right after their own write
+        :param user_id: python int or None, the internal id of the user reading
+        :return: BoundedConnectionPool instance
+        """
+        if self.replica_pool is None or self.recent_writes.has_recent_write(user_id):
+            return self.pool
+        return self.replica_pool
+
+    def record_write(self, user_id):
+        """
+        Pins the user's reads to the primary for the read-your-writes window
+        :param user_id: python int, the internal id of the user that wrote
+        """
+        self.recent_writes.record_write(user_id)
+
+    def pool_stats(self):
+        """
+        Returns the live gauges of the connection pool
+        :return: python dict
+        """
+        stats = self.pool.stats()
+        if self.replica_pool is not None:
+            stats['replica'] = self.replica_pool.stats()
+        return stats
+
+    def _create_pool(self, pool_name, host, pool_size):
+        db_config = {
+            'database': self.db,
+            'port': self.port,
+            'host': host,
+            'user': self.user,
+            'password': self.password
+        }
+        pool = BoundedConnectionPool(pool_name=pool_name,
+                                     connection_factory=partial(mysql.connector.connect, **db_config),
+                                     pool_size=pool_size,
+                                     max_overflow=self.max_overflow,
+                                     acquire_timeout=self.acquire_timeout,
+                                     leak_detection_threshold=self.leak_detection_threshold,
+                                     max_idle_time=self.max_idle_time,
+                                     max_lifetime=self.max_lifetime,
+                                     prepared_statement_cache_size=self.prepared_statement_cache_size)
+        pool.warm_up()
+        pool.start_housekeeping()
+        return pool
@@ -0,0 +1,261 @@
+import time
+import logging
+import collections
+from contextlib import contextmanager
+from common.logging.error.error import Error
+from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR
+from backend.db.model.query import sql_statements
+from backend.db.client.statement_metrics import statement_metrics
+from backend.db.client.bounded_connection_pool import PooledConnection
+from backend.db.client.connection_lease import acquire_connection, acquire_read_only_connection, connection_lease
+
+STATEMENTS = {name: value for name, value in vars(sql_statements).items()
+              if name.isupper() and isinstance(value, str)}
+
+ExecutionResult = collections.namedtuple('ExecutionResult', ['rowcount', 'lastrowid'])
+STREAM_BATCH_SIZE = 500
+
+
+class HpAIDbRepository:
+    _row_types = {}
+
+    def __init__(self, hp_ai_db_connection_pool):
+        """
+        Runs the statements in sql_statements.py by name, so timing, row counts and error handling live in one place
+        :param hp_ai_db_connection_pool: The HpAIDbConnectionPool owning the primary and replica pools
+        """
+        self.hp_ai_db_connection_pool = hp_ai_db_connection_pool
+
+    @contextmanager
+    def connection(self, read_only=False, user_id=None):
+        """
+        Leases a connection for the duration of the with block
+        :param read_only: python bool, True to allow the call to be served by the read replica
+        :param user_id: python int or None, the user the call is made for
+        :return: A pooled MySQL connection
+        """
+        if read_only:
+            cnx = acquire_read_only_connection(self.hp_ai_db_connection_pool, user_id)
+        else:
+            cnx = acquire_connection(self.hp_ai_db_connection_pool.pool)
+        with connection_lease(cnx) as leased:
+            yield leased
+
+    @classmethod
+    def fetch_all(cls, cnx, statement_name, params=None, sql=None):
+        """
+        Runs a SELECT and returns every row
+        :param cnx: A pooled MySQL connection
+        :param statement_name: python str, the constant name in sql_statements.py
+        :param params: python list or tuple, the values bound to the statement
+        :param sql: python str, optional text to run instead, for statements extended with dynamic filters
+        :return: python list of named tuples, one field per selected column
+        """
+        return cls._run(cnx, statement_name, params, sql, fetch='all')
+
+    @classmethod
+    def fetch_one(cls, cnx, statement_name, params=None, sql=None):
+        """
+        Runs a SELECT and returns the first row
+        :return: python named tuple or None
+        """
+        return cls._run(cnx, statement_name, params, sql, fetch='one')
+
+    @classmethod
+    def execute(cls, cnx, statement_name, params=None, sql=None, commit=False):
+        """
+        Runs an INSERT, UPDATE or DELETE
+        :param commit: python bool, True to commit the connection after the statement
+        :return: ExecutionResult with the affected row count and the generated id
+        """
+        return cls._run(cnx, statement_name, params, sql, fetch=None, commit=commit)
+
+    @classmethod
+    def execute_many(cls, cnx, statement_name, seq_params, sql=None, commit=False):
+        """
+        Runs a statement once per parameter set in a single round trip where the driver allows it
+        :param seq_params: python list of lists or tuples
+        :return: ExecutionResult with the affected row count and the generated id
+        """
+        return cls._run(cnx, statement_name, seq_params, sql, fetch=None, commit=commit, many=True)
+
+    @classmethod
+    def stream(cls, cnx, statement_name, params=None, sql=None, transform=None, batch_size=STREAM_BATCH_SIZE,
+               release=False):
+        """
+        Runs a SELECT on an unbuffered cursor and hands its rows out batch by batch as the server sends them, so
+        no more than one batch is held in memory however many rows the statement returns. The statement runs
+        before this returns, so failures to start it raise here rather than midway through a response
+        :param transform: python callable applied to every batch, e.g. a RowFormatter's format_rows
+        :param batch_size: python int, the rows fetched per round of the iteration
+        :param release: python bool, True to hand cnx back to the pool once the stream is closed. The connection
+        stays with the caller when this raises
+        :return: RowStream, iterate it for the batches and close it when done
+        """
+        operation = sql if sql is not None else cls.resolve_statement(statement_name)
+        started = time.perf_counter()
+        try:
+            cursor = cnx.cursor(buffered=False)
+        except Exception as e:
+            cls._record_failure(statement_name, started, e)
+        try:
+            cursor.execute(operation, params)
+        except Exception as e:
+            RowStream.close_cursor(cursor)
+            cls._record_failure(statement_name, started, e)
+        return RowStream(cnx, cursor, statement_name, started, transform, batch_size, release)
+
+    @staticmethod
+    def _record_failure(statement_name, started, error):
+        logging.error('An issue occurred executing a statement against the database',
+                      exc_info=True,
+                      extra={'information': {'statement': statement_name, 'error': str(error)}})
+        statement_metrics.record(statement_name, (time.perf_counter() - started) * 1000, 0, True)
+        raise Error(INTERNAL_SERVICE_ERROR)
+
+    @classmethod
+    def _run(cls, cnx, statement_name, params, sql, fetch, commit=False, many=False):
+        operation = sql if sql is not None else cls.resolve_statement(statement_name)
+        started = time.perf_counter()
+        row_count = 0
+        failed = False
+        cursor = None
+        # Only the unchanged constants are prepared; dynamically extended text would fill the cache with variants
+        prepared = sql is None and not many and isinstance(cnx, PooledConnection)
+        try:
+            cursor = cnx.prepared_cursor(statement_name) if prepared else None
+            if cursor is None:
+                prepared = False
+                cursor = cnx.cursor()
+            if many:
+                cursor.executemany(operation, params)
+            else:
+                cursor.execute(operation, params)
+            if fetch == 'all':
+                result = cls.to_typed_rows(statement_name, cursor.description, cursor.fetchall())
+                row_count = len(result)
+            elif fetch == 'one':
+                # A cached prepared cursor is not closed, so its remaining rows are drained here instead
+                row = next(iter(cursor.fetchall()), None) if prepared else cursor.fetchone()
+                typed = cls.to_typed_rows(statement_name, cursor.description, [row]) if row is not None else []
+                result = typed[0] if typed else None
+                row_count = len(typed)
+            else:
+                if commit:
+                    cnx.commit()
+                result = ExecutionResult(rowcount=cursor.rowcount, lastrowid=cursor.lastrowid)
+                row_count = result.rowcount if isinstance(result.rowcount, int) else 0
+            return result
+        except Exception as e:
+            failed = True
+            if prepared:
+                cnx.discard_prepared_cursor(statement_name)
+            logging.error('An issue occurred executing a statement against the database',
+                          exc_info=True,
+                          extra={'information': {'statement': statement_name, 'error': str(e)}})
+            raise Error(INTERNAL_SERVICE_ERROR)
+        finally:
+            if cursor is not None and not prepared:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+            statement_metrics.record(statement_name, (time.perf_counter() - started) * 1000, row_count, failed)
+
+    @staticmethod
+    def resolve_statement(statement_name):
+        """
+        Looks up the SQL text of a statement constant
+        :param statement_name: python str, the constant name in sql_statements.py
+        :return: python str
+        """
+        try:
+            return STATEMENTS[statement_name]
+        except KeyError:
+            raise ValueError(f'{statement_name} is not a statement in sql_statements.py')
+
+    @classmethod
+    def to_typed_rows(cls, statement_name, description, rows):
+        """
+        Wraps driver rows in a named tuple per statement and column list, built once and cached
+        :param statement_name: python str, the constant name in sql_statements.py
+        :param description: The cursor description of the result
+        :param rows: python list of tuples
+        :return: python list of named tuples, or the rows unchanged when they do not match the description
+        """
+        columns = tuple(column[0] for column in description or ())
+        if not columns or not rows or len(rows[0]) != len(columns):
+            return rows
+        row_type = cls._row_types.get((statement_name, columns))
+        if row_type is None:
+            type_name = ''.join(part.capitalize() for part in statement_name.split('_')) + 'Row'
+            row_type = collections.namedtuple(type_name, columns, rename=True)
+            cls._row_types[(statement_name, columns)] = row_type
+        return [row_type._make(row) for row in rows]
+
+
+class RowStream:
+    def __init__(self, cnx, cursor, statement_name, started, transform, batch_size, release):
+        """
+        The rows of an executed statement, read from its unbuffered cursor one batch at a time. Closing the stream
+        before the last row discards the rest of the result, so the connection is left usable for the next lease
+        """
+        self.cnx = cnx
+        self.cursor = cursor
+        self.statement_name = statement_name
+        self.started = started
+        self.transform = transform
+        self.batch_size = batch_size
+        self.release = release
+        self.row_count = 0
+        self.exhausted = False
+        self.failed = False
+        self.closed = False
+
+    def __iter__(self):
+        try:
+            while not self.closed:
+                rows = self.cursor.fetchmany(self.batch_size)
+                if not rows:
+                    self.exhausted = True
+                    return
+                self.row_count += len(rows)
+                rows = HpAIDbRepository.to_typed_rows(self.statement_name, self.cursor.description, rows)
+                yield self.transform(rows) if self.transform else rows
+        except Exception as e:
+            self.failed = True
+            logging.error('An issue occurred streaming the rows of a statement',
+                          exc_info=True,
+                          extra={'information': {'statement': self.statement_name, 'rows': self.row_count,
+                                                 'error': str(e)}})
+            raise Error(INTERNAL_SERVICE_ERROR)
+        finally:
+            self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if not self.exhausted and not self.failed:
+            try:
+                # Unread rows of an unbuffered result block every later statement on the connection
+                self.cnx.consume_results()
+            except Exception as e:
+                logging.warning('An issue occurred discarding the unread rows of a stream',
+                                extra={'information': {'statement': self.statement_name, 'error': str(e)}})
+        self.close_cursor(self.cursor)
+        statement_metrics.record(self.statement_name, (time.perf_counter() - self.started) * 1000, self.row_count,
+                                 self.failed)
+        if self.release:
+            try:
+                self.cnx.close()
+            except Exception as e:
+                logging.warning('An issue occurred returning a connection to the pool',
+                                extra={'information': {'error': str(e)}})
+
+    @staticmethod
+    def close_cursor(cursor):
+        try:
+            cursor.close()
+        except Exception:
+            pass
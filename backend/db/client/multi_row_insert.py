@@ -0,0 +1,64 @@
+import re
+import logging
+import functools
+from common.logging.error.error import Error
+from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
+
+MULTI_ROW_INSERT_BATCH_SIZE = 500
+_VALUES_CLAUSE = re.compile(r'^(?P<head>.*\bVALUES\s*)(?P<row>\(.*\))\s*;?\s*$', re.IGNORECASE | re.DOTALL)
+
+
+@functools.lru_cache(maxsize=64)
+def multi_row_sql(statement_name, row_count):
+    """
+    Repeats the VALUES row of a single row INSERT constant, so one statement writes row_count rows
+    :param statement_name: python str, an INSERT ... VALUES (%s, ...) constant in sql_statements.py
+    :param row_count: python int, how many rows the statement inserts
+    :return: python str
+    """
+    match = _VALUES_CLAUSE.match(HpAIDbRepository.resolve_statement(statement_name))
+    if match is None:
+        raise ValueError(f'{statement_name} is not a single row INSERT ... VALUES statement')
+    return f'{match.group("head")}{", ".join([match.group("row")] * row_count)};'
+
+
+def insert_rows_returning_ids(cnx, statement_name, rows, batch_size=MULTI_ROW_INSERT_BATCH_SIZE):
+    """
+    Inserts rows with one multi row INSERT per batch inside the caller's transaction, and recovers the auto
+    increment id of every row without a round trip per row. InnoDB gives the rows of a multi row INSERT with a
+    known row count one consecutive block of ids in every innodb_autoinc_lock_mode, spaced by
+    auto_increment_increment, and LAST_INSERT_ID() is the first of them. The caller commits
+    :param cnx: A pooled MySQL connection
+    :param statement_name: python str, a single row INSERT ... VALUES constant of a table with an auto increment key
+    :param rows: python sequence of parameter tuples, one per row
+    :param batch_size: python int, the most rows written by one statement, bounding the packet size
+    :return: python list of the new ids, in row order
+    """
+    ids = []
+    increment = None
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        result = HpAIDbRepository.execute(
+            cnx=cnx,
+            statement_name=statement_name,
+            params=[value for row in batch for value in row],
+            sql=multi_row_sql(statement_name, len(batch)))
+        if result.rowcount != len(batch) or not result.lastrowid:
+            logging.error('A multi row insert did not report an id for every row',
+                          extra={'information': {'statement': statement_name, 'rows': len(batch),
+                                                 'rowcount': result.rowcount}})
+            raise Error(INTERNAL_SERVICE_ERROR)
+        if increment is None and len(batch) > 1:
+            increment = auto_increment_increment(cnx)
+        ids.extend(result.lastrowid + offset * (increment or 1) for offset in range(len(batch)))
+    return ids
+
+
+def auto_increment_increment(cnx):
+    """
+    The spacing between consecutive auto increment ids of the session, 1 unless the server interleaves writers
+    :return: python int
+    """
+    row = HpAIDbRepository.fetch_one(cnx=cnx, statement_name='SELECT_AUTO_INCREMENT_INCREMENT')
+    return int(row[0]) if row is not None else 1
@@ -0,0 +1,150 @@
+import time
+import threading
+import collections
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
+
+DEFAULT_MAX_USERS = 5000
+DEFAULT_TTL_SECONDS = 300.0
+# A miss reloads the user's ids at most this often, so probing for ids the user does not own stays cheap
+MIN_RELOAD_SECONDS = 1.0
+
+
+class OwnershipEntry:
+    __slots__ = ('property_ids', 'unit_ids', 'loaded_at')
+
+    def __init__(self, property_ids, unit_ids, loaded_at):
+        self.property_ids = property_ids
+        self.unit_ids = unit_ids
+        self.loaded_at = loaded_at
+
+
+class OwnershipIndex:
+    def __init__(self, max_users=DEFAULT_MAX_USERS, ttl_seconds=DEFAULT_TTL_SECONDS):
+        """
+        The property and unit ids each recently active user owns, so authorization checks are a set lookup instead
+        of a query. Entries are loaded on first use, expire after ttl_seconds and the least recently used users are
+        dropped past max_users. The creation services invalidate a user's entry when they add properties
+        :param max_users: python int, how many users' ids are kept
+        :param ttl_seconds: python float, how long a loaded entry is trusted, 0 disables the index
+        """
+        self.max_users = int(max_users)
+        self.ttl_seconds = float(ttl_seconds or 0)
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        # Bumped by every invalidation, so a load that raced one is not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+    def configure(self, max_users, ttl_seconds):
+        """
+        Applies the ownership index bounds from the home_pulse_ai_db config at server startup
+        :param max_users: python int or None, None keeps the default
+        :param ttl_seconds: python float or None, None or 0 disables the index
+        """
+        self.max_users = int(max_users or DEFAULT_MAX_USERS)
+        self.ttl_seconds = float(ttl_seconds or 0)
+        self.clear()
+
+    def owns_property(self, cnx, user_id, property_id):
+        """
+        Whether the user owns the property, loading the user's ids through cnx when they are not indexed
+        :param cnx: A pooled MySQL connection, or None to answer from memory only
+        :param user_id: The internal id of the user
+        :param property_id: The internal id of the property
+        :return: python bool
+        """
+        return self._owns(cnx, user_id, property_id, 'property_ids')
+
+    def owns_unit(self, cnx, user_id, unit_id):
+        """
+        Whether the unit belongs to one of the user's properties
+        :return: python bool
+        """
+        return self._owns(cnx, user_id, unit_id, 'unit_ids')
+
+    def invalidate(self, user_id):
+        """
+        Drops the user's entry, so the next check reads their properties and units again
+        :param user_id: The internal id of the user whose properties changed
+        """
+        user_key = as_id(user_id)
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(user_key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'users': len(self._entries),
+                'maxUsers': self.max_users,
+                'ttlSeconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'loads': self.loads
+            }
+
+    def _owns(self, cnx, user_id, item_id, kind):
+        user_key, item_key = as_id(user_id), as_id(item_id)
+        if user_key is None or item_key is None or self.ttl_seconds <= 0:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_key)
+            if entry is not None and now - entry.loaded_at >= self.ttl_seconds:
+                del self._entries[user_key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(user_key)
+                if item_key in getattr(entry, kind):
+                    self.hits += 1
+                    return True
+            self.misses += 1
+        # A miss on a fresh entry may be a property another worker created since the load, so it is read again
+        if cnx is None or (entry is not None and now - entry.loaded_at < MIN_RELOAD_SECONDS):
+            return False
+        return item_key in getattr(self._load(cnx, user_key), kind)
+
+    def _load(self, cnx, user_key):
+        with self._lock:
+            generation = self._generation
+        property_rows = HpAIDbRepository.fetch_all(
+            cnx=cnx,
+            statement_name='SELECT_ADDRESSES_BY_USER_ID',
+            params=[user_key])
+        unit_rows = HpAIDbRepository.fetch_all(
+            cnx=cnx,
+            statement_name='SELECT_UNIT_IDS_BY_USER_ID',
+            params=[user_key])
+        entry = OwnershipEntry(property_ids=frozenset(int(row[0]) for row in property_rows),
+                               unit_ids=frozenset(int(row[0]) for row in unit_rows),
+                               loaded_at=time.monotonic())
+        with self._lock:
+            self.loads += 1
+            if generation == self._generation:
+                self._entries[user_key] = entry
+                self._entries.move_to_end(user_key)
+                while len(self._entries) > self.max_users:
+                    self._entries.popitem(last=False)
+        return entry
+
+
+def as_id(value):
+    """
+    Normalizes ids that arrive as route strings or database integers
+    :return: python int, or None when the value is not an id
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# Disabled until the server configures it, like the slow query log of statement_metrics
+ownership_index = OwnershipIndex(ttl_seconds=0)
@@ -0,0 +1,56 @@
+import time
+import threading
+
+
+class RecentWriteTracker:
+    def __init__(self, window_seconds=5.0):
+        """
+        Remembers which users wrote to the primary recently, so their reads can skip the lagging replica
+        :param window_seconds: python float, how long after a write a user's reads stay on the primary
+        """
+        self.window_seconds = float(window_seconds or 0)
+        self._lock = threading.Lock()
+        self._expires_at = {}
+
+    def record_write(self, user_id):
+        """
+        Starts, or extends, the read-your-writes window for a user
+        :param user_id: python int, the internal id of the user that wrote
+        """
+        if user_id is None or self.window_seconds <= 0:
+            return
+        user_id = self._key(user_id)
+        now = time.monotonic()
+        with self._lock:
+            self._expires_at[user_id] = now + self.window_seconds
+            if len(self._expires_at) > 1024:
+                self._expires_at = {key: expiry for key, expiry in self._expires_at.items() if expiry > now}
+
+    def has_recent_write(self, user_id):
+        """
+        Whether the user wrote inside the window
+        :param user_id: python int or None, the internal id of the user reading
+        :return: python bool
+        """
+        if user_id is None:
+            return False
+        user_id = self._key(user_id)
+        with self._lock:
+            expiry = self._expires_at.get(user_id)
+            if expiry is None:
+                return False
+            if expiry > time.monotonic():
+                return True
+            del self._expires_at[user_id]
+            return False
+
+    @staticmethod
+    def _key(user_id):
+        """
+        Routes pass the user id from the path as a str while writes are recorded with the int from the token,
+        so both are keyed by the int
+        """
+        try:
+            return int(user_id)
+        except (TypeError, ValueError):
+            return user_id
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def optional(convert):
+    """
+    Wraps a converter so NULL columns stay None
+    :param convert: python callable applied to every non NULL value
+    :return: python callable
+    """
+    def convert_unless_null(value):
+        return None if value is None else convert(value)
+    return convert_unless_null
+
+
+def datetime_or_tbd(value):
+    """
+    Renders a replacement date the way the frontend expects it, 'TBD' when the column is empty
+    :param value: python datetime, date or None
+    :return: python str
+    """
+    if not value:
+        return 'TBD'
+    # isoformat writes the same text as DATETIME_FORMAT for naive datetimes at a fraction of the cost
+    if type(value) is datetime and value.tzinfo is None:
+        return value.isoformat(' ', 'seconds')
+    return value.strftime(DATETIME_FORMAT)
+
+
+class RowFormatter:
+    def __init__(self, columns):
+        """
+        Turns the tuple rows of one statement into response dicts. The column plan is worked out once, when the
+        formatter is built, so formatting a result set is a single comprehension over (key, index, converter)
+        tuples with no per-field lookups beyond the converters themselves
+        :param columns: python sequence of (key, index, converter) tuples. The index is the column position in
+        the row, the converter is a callable, an optional() wrapped callable or None to copy the value as is.
+        Several keys may read one index
+        """
+        self.keys = tuple(key for key, _, _ in columns)
+        self._plan = tuple((key, int(index), convert) for key, index, convert in columns)
+
+    def format_row(self, row):
+        """
+        :param row: python tuple, one row of the statement
+        :return: python dict
+        """
+        return {key: row[index] if convert is None else convert(row[index]) for key, index, convert in self._plan}
+
+    def format_rows(self, rows):
+        """
+        :param rows: python sequence of tuples, the rows of the statement
+        :return: python list of dicts, in row order
+        """
+        if not rows:
+            return []
+        plan = self._plan
+        return [{key: row[index] if convert is None else convert(row[index]) for key, index, convert in plan}
+                for row in rows]
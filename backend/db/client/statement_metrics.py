@@ -0,0 +1,112 @@
+import logging
+import threading
+from common.helpers.latency_histogram import LatencyHistogram
+
+SLOW_QUERY_FLAG = 'Slow Query'
+
+
+class StatementMetrics:
+    def __init__(self, statement_name):
+        """
+        Running totals for a single named statement
+        :param statement_name: python str, the constant name in sql_statements.py
+        """
+        self.statement_name = statement_name
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.slow_calls = 0
+        self.total_ms = 0.0
+        self.latency = LatencyHistogram()
+
+    def snapshot(self):
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'rows': self.rows,
+            'avgRows': round(self.rows / self.calls, 2) if self.calls else 0.0,
+            'slowCalls': self.slow_calls,
+            'totalMs': round(self.total_ms, 3),
+            'latency': self.latency.snapshot()
+        }
+
+
+class StatementMetricsRegistry:
+    def __init__(self, slow_query_threshold_ms=0.0):
+        """
+        The process-wide profile of latency and row counts for every statement run through HpAIDbRepository
+        :param slow_query_threshold_ms: python float, executions slower than this are logged, 0 disables the log
+        """
+        self.slow_query_threshold_ms = float(slow_query_threshold_ms or 0)
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def configure(self, slow_query_threshold_ms):
+        """
+        Applies the slow query threshold from the home_pulse_ai_db config at server startup
+        :param slow_query_threshold_ms: python float or None, None or 0 disables the slow query log
+        """
+        self.slow_query_threshold_ms = float(slow_query_threshold_ms or 0)
+
+    def record(self, statement_name, elapsed_ms, row_count, failed=False):
+        """
+        Adds a single execution of a statement, logging it when it crossed the slow query threshold
+        :param statement_name: python str, the constant name in sql_statements.py
+        :param elapsed_ms: python float, the time spent executing and fetching
+        :param row_count: python int, the rows returned or affected
+        :param failed: python bool, True when the statement raised
+        """
+        is_slow = 0 < self.slow_query_threshold_ms <= elapsed_ms
+        with self._lock:
+            metrics = self._metrics.get(statement_name)
+            if metrics is None:
+                metrics = self._metrics[statement_name] = StatementMetrics(statement_name)
+            metrics.calls += 1
+            metrics.rows += max(row_count or 0, 0)
+            metrics.total_ms += elapsed_ms
+            if failed:
+                metrics.errors += 1
+            if is_slow:
+                metrics.slow_calls += 1
+        metrics.latency.record(elapsed_ms)
+        if is_slow:
+            # The bound values are left out on purpose, they carry emails and password hashes
+            logging.warning('A statement exceeded the slow query threshold',
+                            extra={'flag': SLOW_QUERY_FLAG,
+                                   'timing': {'statement': statement_name,
+                                              'elapsedMs': round(elapsed_ms, 3),
+                                              'rows': row_count,
+                                              'failed': failed,
+                                              'thresholdMs': self.slow_query_threshold_ms}})
+
+    def snapshot(self):
+        """
+        Snapshot of every statement seen so far
+        :return: python dict keyed by statement name
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {entry.statement_name: entry.snapshot() for entry in metrics}
+
+    def profile(self):
+        """
+        The statements ordered by the total database time they account for, for the metrics route
+        :return: python dict
+        """
+        statements = [dict(statement=name, **metrics) for name, metrics in self.snapshot().items()]
+        statements.sort(key=lambda entry: entry['totalMs'], reverse=True)
+        total_ms = sum(entry['totalMs'] for entry in statements)
+        for entry in statements:
+            entry['shareOfTotal'] = round(entry['totalMs'] / total_ms, 4) if total_ms else 0.0
+        return {
+            'slowQueryThresholdMs': self.slow_query_threshold_ms,
+            'totalMs': round(total_ms, 3),
+            'statements': statements
+        }
+
+    def reset(self):
+        with self._lock:
+            self._metrics = {}
+
+
+statement_metrics = StatementMetricsRegistry()
@@ -0,0 +1,94 @@
+import time
+import threading
+import collections
+
+DEFAULT_MAX_USERS = 5000
+DEFAULT_TTL_SECONDS = 60.0
+
+
+class UserResponseCache:
+    def __init__(self, max_users=DEFAULT_MAX_USERS, ttl_seconds=DEFAULT_TTL_SECONDS):
+        """
+        Computed responses kept per user, so repeated reads of an aggregate skip the database until the user's data
+        changes. Every response of a user is dropped together when one of their writes invalidates them, entries
+        expire after ttl_seconds and the least recently used users are dropped past max_users
+        :param max_users: python int, how many users' responses are kept
+        :param ttl_seconds: python float, how long a response is served, 0 disables the cache
+        """
+        self.max_users = int(max_users)
+        self.ttl_seconds = float(ttl_seconds or 0)
+        self._lock = threading.Lock()
+        self._users = collections.OrderedDict()
+        # Bumped by every invalidation, so a response computed before a write is not stored after it
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, max_users, ttl_seconds):
+        """
+        Applies the cache bounds from the home_pulse_ai_db config at server startup
+        :param max_users: python int or None, None keeps the default
+        :param ttl_seconds: python float or None, None or 0 disables the cache
+        """
+        self.max_users = int(max_users or DEFAULT_MAX_USERS)
+        self.ttl_seconds = float(ttl_seconds or 0)
+        self.clear()
+
+    def get_or_compute(self, user_id, key, compute):
+        """
+        Returns the cached response of the user for key, or computes and stores it
+        :param user_id: The internal id of the user the response belongs to
+        :param key: python hashable, the parameters the response depends on
+        :param compute: python callable without arguments that builds the response
+        :return: The response. Cached responses are shared between requests and must not be modified
+        """
+        if self.ttl_seconds <= 0:
+            return compute()
+        user_key = str(user_id)
+        now = time.monotonic()
+        with self._lock:
+            responses = self._users.get(user_key)
+            cached = responses.get(key) if responses is not None else None
+            if cached is not None and now - cached[1] < self.ttl_seconds:
+                self._users.move_to_end(user_key)
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+            generation = self._generation
+        response = compute()
+        with self._lock:
+            if generation == self._generation:
+                self._users.setdefault(user_key, {})[key] = (response, time.monotonic())
+                self._users.move_to_end(user_key)
+                while len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+        return response
+
+    def invalidate(self, user_id=None):
+        """
+        Drops the cached responses of a user after a write to their data
+        :param user_id: The internal id of the user, None drops every user's responses when the owner is unknown
+        """
+        with self._lock:
+            self._generation += 1
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(str(user_id), None)
+
+    def clear(self):
+        self.invalidate()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'users': len(self._users),
+                'maxUsers': self.max_users,
+                'ttlSeconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+# Disabled until the server configures it, like the ownership index
+tenant_analytics_cache = UserResponseCache(ttl_seconds=0)
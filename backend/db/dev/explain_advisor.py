@@ -0,0 +1,293 @@
+import os
+import re
+import hashlib
+import logging
+import argparse
+import collections
+from datetime import date
+import mysql.connector
+from backend.db.model.query import sql_statements
+from backend.db.dev.synthetic_data import SyntheticDataLoader
+
+SCHEMA = 'home_pulse_ai'
+PRIMARY_KEYS = {'units': 'unit_id'}
+FULL_SCAN_ROW_THRESHOLD = 100
+MAX_INDEX_NAME_LENGTH = 64
+
+# The services extend these statements at runtime, so the shapes that actually reach MySQL are explained instead
+STATEMENT_VARIANTS = {
+    'FETCH_PROPERTY_NOTES': (
+        sql_statements.FETCH_PROPERTY_NOTES + ' ORDER BY created_at DESC;',
+        sql_statements.FETCH_PROPERTY_NOTES + ' AND entity_type = %s AND entity_id = %s ORDER BY created_at DESC;'
+    )
+}
+
+SAMPLE_VALUES = {
+    'email': 'user1@homepulse.dev',
+    'stripe_customer_id': 'cus_0000000001',
+    'subscription_id': 'sub_0000000001',
+    'token': 'token-000000000001',
+    'appliance_type': 'Stove',
+    'structure_type': 'Roof',
+    'entity_type': 'property',
+    'status': 'active'
+}
+
+SQL_KEYWORDS = frozenset(('WHERE', 'JOIN', 'ON', 'SET', 'ORDER', 'GROUP', 'LIMIT', 'UNION', 'INNER', 'LEFT',
+                          'RIGHT', 'AS', 'AND', 'VALUES', 'USING'))
+TABLE_REFERENCE = re.compile(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+(?:\w+\.)?(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+SET_CLAUSE = re.compile(r'\bSET\b.*?(?=\bWHERE\b|$)', re.IGNORECASE | re.DOTALL)
+JOIN_PREDICATE = re.compile(r'\b(\w+)\.(\w+)\s*=\s*(\w+)\.(\w+)')
+CONSTANT_PREDICATE = re.compile(r'(?:\b(\w+)\.)?\b(\w+)\s*(?:=\s*%s|\s+IN\s*\(\s*(?:SELECT|%s))', re.IGNORECASE)
+RANGE_PREDICATE = re.compile(r'(?:\b(\w+)\.)?\b(\w+)\s*(?:<=|>=|<|>|\s+BETWEEN\s|\s+IS\s+NOT\s+NULL)',
+                             re.IGNORECASE)
+ORDER_BY = re.compile(r'\bORDER\s+BY\s+(.+?)(?:\bLIMIT\b|;|$)', re.IGNORECASE | re.DOTALL)
+PLACEHOLDER_COLUMN = re.compile(r'(\w+)\s*(?:=|<=|>=|<|>|\bIN\s*\(|\bLIKE)\s*$', re.IGNORECASE)
+
+IndexRecommendation = collections.namedtuple('IndexRecommendation', ['table', 'columns', 'statement_name'])
+PlanFinding = collections.namedtuple('PlanFinding', ['table', 'issue', 'rows'])
+
+
+def named_statements():
+    """
+    Every statement in sql_statements.py, with the runtime variants substituted for the base text
+    :return: python list of (statement_name, sql) tuples
+    """
+    statements = []
+    for name, sql in vars(sql_statements).items():
+        if not name.isupper() or not isinstance(sql, str) or not sql.strip():
+            continue
+        for variant in STATEMENT_VARIANTS.get(name, (sql,)):
+            statements.append((name, variant))
+    return statements
+
+
+def table_aliases(sql):
+    """
+    Maps every alias, and every table name, referenced by a statement to its table
+    :param sql: python str, the statement text
+    :return: python list of (position, alias, table) tuples in the order they appear
+    """
+    references = []
+    for match in TABLE_REFERENCE.finditer(sql):
+        table, alias = match.group(1), match.group(2)
+        references.append((match.start(), table, table))
+        if alias and alias.upper() not in SQL_KEYWORDS:
+            references.append((match.start(), alias, table))
+    return references
+
+
+def _resolve_table(references, alias, position):
+    if alias:
+        for _, reference_alias, table in references:
+            if reference_alias == alias:
+                return table
+        return None
+    # Unqualified columns belong to the closest FROM, JOIN or UPDATE before them
+    preceding = [table for reference_position, _, table in references if reference_position < position]
+    return preceding[-1] if preceding else None
+
+
+def recommend_indexes(statement_name, sql):
+    """
+    Derives the index every table in a statement needs, ordered equality columns first, then the sort or range
+    column, so the lookup neither scans the table nor sorts the result
+    :param statement_name: python str, the constant name in sql_statements.py
+    :param sql: python str, the statement text
+    :return: python list of IndexRecommendation
+    """
+    if sql.lstrip().upper().startswith('INSERT'):
+        return []
+    references = table_aliases(sql)
+    # SET col=%s assigns rather than filters, so it is blanked out without shifting positions
+    predicates = SET_CLAUSE.sub(lambda match: ' ' * len(match.group(0)), sql)
+    constant = collections.defaultdict(list)
+    joined = collections.defaultdict(list)
+    ranged = collections.defaultdict(list)
+    ordered = collections.defaultdict(list)
+    for match in JOIN_PREDICATE.finditer(predicates):
+        for alias, column in ((match.group(1), match.group(2)), (match.group(3), match.group(4))):
+            table = _resolve_table(references, alias, match.start())
+            if table:
+                joined[table].append(column)
+    for match in CONSTANT_PREDICATE.finditer(predicates):
+        table = _resolve_table(references, match.group(1), match.start())
+        if table and match.group(2).upper() not in SQL_KEYWORDS:
+            constant[table].append(match.group(2))
+    for match in RANGE_PREDICATE.finditer(predicates):
+        table = _resolve_table(references, match.group(1), match.start())
+        if table and match.group(2).upper() not in SQL_KEYWORDS:
+            ranged[table].append(match.group(2))
+    order_by = ORDER_BY.search(predicates)
+    # ORDER BY over a UNION sorts the combined result, which no single table index can provide
+    if order_by and not re.search(r'\bUNION\b', sql, re.IGNORECASE):
+        for term in order_by.group(1).split(','):
+            words = term.strip().split()
+            if not words:
+                continue
+            alias, _, column = words[0].rpartition('.')
+            table = _resolve_table(references, alias or None, order_by.start())
+            if table:
+                ordered[table].append(column)
+
+    recommendations = []
+    for table in dict.fromkeys(table for _, _, table in references):
+        primary_key = PRIMARY_KEYS.get(table, 'id')
+        if primary_key in constant[table]:
+            continue
+        leading = [column for column in constant[table] + joined[table] if column != primary_key]
+        trailing = ordered[table] or ranged[table][:1]
+        columns = tuple(dict.fromkeys(leading + [column for column in trailing if column != primary_key]))
+        if columns and (leading or ranged[table]):
+            recommendations.append(IndexRecommendation(table, columns, statement_name))
+    return recommendations
+
+
+def sample_params(sql):
+    """
+    Builds representative bind values, picking each from the column the placeholder is compared with
+    :param sql: python str, the statement text
+    :return: python list
+    """
+    params = []
+    for match in re.finditer(r'%s', sql):
+        column = PLACEHOLDER_COLUMN.search(sql[:match.start()])
+        column = column.group(1).lower() if column else ''
+        if column in SAMPLE_VALUES:
+            params.append(SAMPLE_VALUES[column])
+        elif column.endswith(('_date', '_at', '_end', '_start')):
+            params.append(date.today())
+        elif column.endswith('_name') or column.startswith('appliance_'):
+            params.append('Sample')
+        else:
+            params.append(1)
+    return params
+
+
+def analyze_plan(sql, plan_rows, full_scan_row_threshold=FULL_SCAN_ROW_THRESHOLD):
+    """
+    Flags the plan steps that read a whole table or index, or sort through a temporary file
+    :param sql: python str, the statement the plan belongs to
+    :param plan_rows: python list of dicts, the rows of EXPLAIN read through a dictionary cursor
+    :param full_scan_row_threshold: python int, scans of fewer estimated rows are ignored
+    :return: python list of PlanFinding
+    """
+    aliases = {alias: table for _, alias, table in table_aliases(sql)}
+    findings = []
+    for row in plan_rows:
+        table = aliases.get(row.get('table'), row.get('table'))
+        estimated_rows = int(row.get('rows') or 0)
+        extra = row.get('Extra') or ''
+        if row.get('type') == 'ALL' and estimated_rows >= full_scan_row_threshold:
+            findings.append(PlanFinding(table, 'full table scan', estimated_rows))
+        elif row.get('type') == 'index' and estimated_rows >= full_scan_row_threshold:
+            findings.append(PlanFinding(table, 'full index scan', estimated_rows))
+        if 'Using filesort' in extra:
+            findings.append(PlanFinding(table, 'filesort', estimated_rows))
+        if 'Using temporary' in extra:
+            findings.append(PlanFinding(table, 'temporary table', estimated_rows))
+    return findings
+
+
+def explain(cnx, sql):
+    """
+    Runs EXPLAIN for a statement with sample bind values
+    :return: python list of dicts
+    """
+    cursor = cnx.cursor(dictionary=True)
+    try:
+        cursor.execute('EXPLAIN ' + sql.strip().rstrip(';'), sample_params(sql))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def index_name(table, columns):
+    name = f'idx_{table}_' + '_'.join(columns)
+    if len(name) <= MAX_INDEX_NAME_LENGTH:
+        return name
+    digest = hashlib.sha1(name.encode()).hexdigest()[:8]
+    return f'{name[:MAX_INDEX_NAME_LENGTH - 9]}_{digest}'
+
+
+def render_migration(recommendations):
+    """
+    Turns the recommendations into CREATE INDEX DDL, dropping any index that is a left prefix of another one
+    on the same table since the longer index serves both lookups
+    :param recommendations: python list of IndexRecommendation
+    :return: python str
+    """
+    statements_by_index = collections.defaultdict(set)
+    for recommendation in recommendations:
+        statements_by_index[(recommendation.table, recommendation.columns)].add(recommendation.statement_name)
+    kept = {}
+    for table, columns in sorted(statements_by_index, key=lambda index: (index[0], -len(index[1]), index[1])):
+        covering = next((other for other in kept if other[0] == table and other[1][:len(columns)] == columns), None)
+        if covering:
+            kept[covering] |= statements_by_index[(table, columns)]
+        else:
+            kept[(table, columns)] = set(statements_by_index[(table, columns)])
+    lines = ['-- Generated by backend/db/dev/explain_advisor.py', '']
+    for (table, columns), statement_names in sorted(kept.items()):
+        lines.append(f'-- Serves {", ".join(sorted(statement_names))}')
+        lines.append(f'CREATE INDEX {index_name(table, columns)} ON {SCHEMA}.{table} ({", ".join(columns)});')
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def advise(cnx=None, full_scan_row_threshold=FULL_SCAN_ROW_THRESHOLD):
+    """
+    Explains every statement and recommends indexes for the tables that were scanned or sorted. Without a
+    connection every candidate index is returned, which is what an empty, index-free schema would report
+    :param cnx: A MySQL connection to the local development server, or None to skip EXPLAIN
+    :param full_scan_row_threshold: python int, scans of fewer estimated rows are ignored
+    :return: python list of (statement_name, findings, recommendations) tuples
+    """
+    report = []
+    for statement_name, sql in named_statements():
+        candidates = recommend_indexes(statement_name, sql)
+        if cnx is None:
+            report.append((statement_name, [], candidates))
+            continue
+        findings = analyze_plan(sql, explain(cnx, sql), full_scan_row_threshold)
+        flagged = {finding.table for finding in findings}
+        report.append((statement_name, findings, [candidate for candidate in candidates if candidate.table in flagged]))
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Explains every statement in sql_statements.py and recommends indexes')
+    parser.add_argument('--load-synthetic-data', action='store_true')
+    parser.add_argument('--offline', action='store_true', help='recommend from the statement text without EXPLAIN')
+    parser.add_argument('--write-migration', help='path of the migration file to write the recommended DDL to')
+    parser.add_argument('--full-scan-row-threshold', type=int, default=FULL_SCAN_ROW_THRESHOLD)
+    arguments = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    connection = None
+    if not arguments.offline:
+        # The tool creates tables and bulk loads rows, so it only ever runs against a local server
+        if os.getenv('ENV') != 'local':
+            raise SystemExit('explain_advisor only runs with ENV=local')
+        connection = mysql.connector.connect(host=os.getenv('MYSQL_HOST'), port=os.getenv('MYSQL_PORT'),
+                                             user=os.getenv('MYSQL_USER'), password=os.getenv('MYSQL_PASS'),
+                                             database=os.getenv('MYSQL_DB'))
+        if arguments.load_synthetic_data:
+            SyntheticDataLoader(connection).load()
+
+    advice = advise(connection, arguments.full_scan_row_threshold)
+    all_recommendations = []
+    for name, plan_findings, statement_recommendations in advice:
+        all_recommendations.extend(statement_recommendations)
+        for finding in plan_findings:
+            print(f'{name}: {finding.issue} on {finding.table} (~{finding.rows} rows)')
+        for recommendation in statement_recommendations:
+            print(f'{name}: index {recommendation.table} ({", ".join(recommendation.columns)})')
+    migration = render_migration(all_recommendations)
+    if arguments.write_migration:
+        with open(arguments.write_migration, 'w') as migration_file:
+            migration_file.write(migration)
+    else:
+        print(migration)
+    if connection is not None:
+        connection.close()
@@ -0,0 +1,142 @@
+import os
+import random
+import logging
+from datetime import date, timedelta
+from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
+from backend.db.migrations.migration_runner import split_statements
+
+SCHEMA_FILE_PATH = os.path.join(os.path.dirname(__file__), 'synthetic_schema.sql')
+APPLIANCE_TYPES = ('Refrigerator', 'Dishwasher', 'Stove', 'Washer', 'Dryer', 'Water Heater', 'HVAC', 'Microwave')
+STRUCTURE_TYPES = ('Roof', 'Foundation', 'Siding', 'Windows', 'Driveway', 'Deck')
+NOTE_ENTITY_TYPES = ('property', 'appliance', 'structure', 'unit')
+BATCH_SIZE = 5000
+
+
+class SyntheticDataLoader:
+    def __init__(self, cnx, users=1000, properties_per_user=10, multifamily_ratio=0.3, units_per_building=4,
+                 seed=7):
+        """
+        Fills a local home_pulse_ai database with realistic volumes so EXPLAIN reports the plans production sees
+        :param cnx: A MySQL connection to the local development server
+        :param users: python int, the number of customers to create
+        :param properties_per_user: python int, the properties owned by every customer
+        :param multifamily_ratio: python float, the share of properties that are split into units
+        :param units_per_building: python int, the units of every multifamily property
+        :param seed: python int, keeps the generated data identical between runs
+        """
+        self.cnx = cnx
+        self.users = users
+        self.properties_per_user = properties_per_user
+        self.multifamily_ratio = multifamily_ratio
+        self.units_per_building = units_per_building
+        self.random = random.Random(seed)
+
+    def create_schema(self):
+        """
+        Creates the development tables, leaving existing ones untouched
+        """
+        with open(SCHEMA_FILE_PATH) as schema_file:
+            statements = split_statements(schema_file.read())
+        cursor = self.cnx.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    def load(self):
+        """
+        Creates the schema and inserts the synthetic rows, then refreshes the optimizer statistics
+        """
+        logging.info(START_OF_METHOD)
+        self.create_schema()
+        companies = [(f'Company {i}', 1) for i in range(1, self.users // 50 + 2)]
+        self._insert('INSERT INTO home_pulse_ai.companies (name, is_active) VALUES (%s, %s)', companies)
+        self._insert('''INSERT INTO home_pulse_ai.users (email, hashed_password, first_name, last_name,
+            stripe_customer_id, is_paid, company_id) VALUES (%s, %s, %s, %s, %s, %s, %s)''',
+                     [(f'user{i}@homepulse.dev', 'x' * 60, f'First{i}', f'Last{i}', f'cus_{i:010d}', i % 4 != 0,
+                       i % len(companies) + 1) for i in range(1, self.users + 1)])
+        self._insert('''INSERT INTO home_pulse_ai.subscriptions (user_id, status, subscription_id, period_start,
+            period_end) VALUES (%s, %s, %s, NOW(), NOW() + INTERVAL 1 MONTH)''',
+                     [(i, 'active', f'sub_{i:010d}') for i in range(1, self.users + 1)])
+        self._insert('''INSERT INTO home_pulse_ai.invitations (company_id, email, token, status, expires_at)
+            VALUES (%s, %s, %s, %s, NOW() + INTERVAL 7 DAY)''',
+                     [(i % len(companies) + 1, f'invitee{i}@homepulse.dev', f'token-{i:012d}', 'pending')
+                      for i in range(1, self.users + 1)])
+        self._insert('INSERT INTO home_pulse_ai.appliance_information (appliance_type, appliance_price) '
+                     'VALUES (%s, %s)', [(name, 500 + 100 * i) for i, name in enumerate(APPLIANCE_TYPES)])
+
+        property_count = self.users * self.properties_per_user
+        self._insert('''INSERT INTO home_pulse_ai.properties (user_id, street, city, state, zip, age, address)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)''',
+                     [(1 + (i - 1) // self.properties_per_user, f'{i} Main St', 'Springfield', 'IL', '62701',
+                       self.random.randint(1, 90), f'{i} Main St, Springfield, IL 62701')
+                      for i in range(1, property_count + 1)])
+        multifamily = [i for i in range(1, property_count + 1) if self.random.random() < self.multifamily_ratio]
+        self._insert('INSERT INTO home_pulse_ai.units (property_id, unit_number) VALUES (%s, %s)',
+                     [(property_id, f'{n + 1:03d}') for property_id in multifamily
+                      for n in range(self.units_per_building)])
+        self._insert_components(property_count)
+        self._insert('''INSERT INTO home_pulse_ai.tenants (property_id, first_name, last_name, contract_start_date,
+            contract_end_date, monthly_rent, phone_number) VALUES (%s, %s, %s, %s, %s, %s, %s)''',
+                     [(i, 'Tenant', f'{i}', date(2025, 1, 1), date(2026, 1, 1), 1500, '555-0100')
+                      for i in range(1, property_count + 1)])
+        self._insert('INSERT INTO home_pulse_ai.property_images (user_id, property_id, s3_key) VALUES (%s, %s, %s)',
+                     [(1 + (i - 1) // self.properties_per_user, i, f'properties/{i}/front.jpg')
+                      for i in range(1, property_count + 1)])
+        self._insert('''INSERT INTO home_pulse_ai.property_notes (property_id, user_id, entity_type, entity_id,
+            file_path) VALUES (%s, %s, %s, %s, %s)''',
+                     [(i, 1 + (i - 1) // self.properties_per_user, self.random.choice(NOTE_ENTITY_TYPES),
+                       self.random.randint(1, 10), f'notes/{i}/{n}.txt')
+                      for i in range(1, property_count + 1) for n in range(3)])
+        self._analyze_tables()
+        logging.info(END_OF_METHOD)
+
+    def _insert_components(self, property_count):
+        today = date.today()
+        unit_ids = {}
+        cursor = self.cnx.cursor()
+        try:
+            cursor.execute('SELECT unit_id, property_id FROM home_pulse_ai.units')
+            for unit_id, property_id in cursor.fetchall():
+                unit_ids.setdefault(property_id, []).append(unit_id)
+        finally:
+            cursor.close()
+        appliances = []
+        for property_id in range(1, property_count + 1):
+            for unit_id in unit_ids.get(property_id, [None]):
+                for appliance_type in self.random.sample(APPLIANCE_TYPES, 5):
+                    appliances.append((property_id, unit_id, appliance_type, 'Brand', 'Model',
+                                       self.random.randint(0, 20), self.random.randint(300, 9000),
+                                       today + timedelta(days=self.random.randint(-60, 3650))))
+        self._insert('''INSERT INTO home_pulse_ai.appliances (property_id, unit_id, appliance_type, appliance_brand,
+            appliance_model, age_in_years, estimated_replacement_cost, forecasted_replacement_date)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)''', appliances)
+        self._insert('''INSERT INTO home_pulse_ai.structures (property_id, structure_type, age_in_years,
+            estimated_replacement_cost, forecasted_replacement_date) VALUES (%s, %s, %s, %s, %s)''',
+                     [(property_id, structure_type, self.random.randint(0, 60), self.random.randint(2000, 40000),
+                       today + timedelta(days=self.random.randint(-60, 7300)))
+                      for property_id in range(1, property_count + 1)
+                      for structure_type in self.random.sample(STRUCTURE_TYPES, 4)])
+
+    def _insert(self, statement, rows):
+        cursor = self.cnx.cursor()
+        try:
+            for start in range(0, len(rows), BATCH_SIZE):
+                cursor.executemany(statement, rows[start:start + BATCH_SIZE])
+            self.cnx.commit()
+        finally:
+            cursor.close()
+        logging.info('Loaded synthetic rows', extra={'information': {'statement': statement.split('(')[0].strip(),
+                                                                     'rows': len(rows)}})
+
+    def _analyze_tables(self):
+        cursor = self.cnx.cursor()
+        try:
+            cursor.execute('SHOW TABLES FROM home_pulse_ai')
+            tables = [row[0] for row in cursor.fetchall()]
+            for table in tables:
+                cursor.execute(f'ANALYZE TABLE home_pulse_ai.{table}')
+                cursor.fetchall()
+        finally:
+            cursor.close()
@@ -0,0 +1,125 @@
+-- Development-only copy of the home_pulse_ai tables, reconstructed from the columns used in sql_statements.py.
+-- Only primary keys are declared here; secondary indexes are owned by backend/db/migrations.
+CREATE DATABASE IF NOT EXISTS home_pulse_ai;
+
+CREATE TABLE IF NOT EXISTS home_pulse_ai.companies (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    is_active TINYINT(1) NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS home_pulse_ai.users (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    email VARCHAR(255) NOT NULL,
+    hashed_password VARCHAR(255) NOT NULL,
+    first_name VARCHAR(100),
+    last_name VARCHAR(100),
+    stripe_customer_id VARCHAR(64),
+    is_paid TINYINT(1) NOT NULL DEFAULT 0,
+    company_id INT,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS home_pulse_ai.invitations (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    company_id INT NOT NULL,
+    email VARCHAR(255) NOT NULL,
+    token VARCHAR(128) NOT NULL,
+    status VARCHAR(32) NOT NULL,
+    expires_at DATETIME NOT NULL,
+    accepted_at DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS home_pulse_ai.subscriptions (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    status VARCHAR(32) NOT NULL,
+    subscription_id VARCHAR(64),
+    period_start DATETIME,
+    period_end DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS home_pulse_ai.properties (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    street VARCHAR(255),
+    city VARCHAR(100),
+    state VARCHAR(32),
+    zip VARCHAR(16),
+    age INT,
+    address VARCHAR(512),
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS home_pulse_ai.units (
+    unit_id INT AUTO_INCREMENT PRIMARY KEY,
+    property_id INT NOT NULL,
+    unit_number VARCHAR(32),
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS home_pulse_ai.appliances (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    property_id INT NOT NULL,
+    unit_id INT,
+    appliance_type VARCHAR(100) NOT NULL,
+    appliance_brand VARCHAR(100),
+    appliance_model VARCHAR(100),
+    age_in_years INT,
+    estimated_replacement_cost DECIMAL(10, 2),
+    forecasted_replacement_date DATE
+);
+
+CREATE TABLE IF NOT EXISTS home_pulse_ai.structures (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    property_id INT NOT NULL,
+    structure_type VARCHAR(100) NOT NULL,
+    age_in_years INT,
+    estimated_replacement_cost DECIMAL(10, 2),
+    forecasted_replacement_date DATE
+);
+
+CREATE TABLE IF NOT EXISTS home_pulse_ai.tenants (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    property_id INT NOT NULL,
+    first_name VARCHAR(100),
+    last_name VARCHAR(100),
+    contract_start_date DATE,
+    contract_end_date DATE,
+    monthly_rent DECIMAL(10, 2),
+    phone_number VARCHAR(32)
+);
+
+CREATE TABLE IF NOT EXISTS home_pulse_ai.appliance_information (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    appliance_type VARCHAR(100) NOT NULL,
+    appliance_price DECIMAL(10, 2)
+);
+
+CREATE TABLE IF NOT EXISTS home_pulse_ai.property_images (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    property_id INT NOT NULL,
+    s3_key VARCHAR(512) NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS home_pulse_ai.property_notes (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    property_id INT NOT NULL,
+    user_id INT NOT NULL,
+    entity_type VARCHAR(32) NOT NULL,
+    entity_id INT,
+    file_path VARCHAR(512) NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS home_pulse_ai.home_bot_training_information (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    brand VARCHAR(100),
+    model VARCHAR(100),
+    category VARCHAR(100),
+    avg_lifespan_years INT
+);
@@ -0,0 +1,52 @@
+-- Generated by backend/db/dev/explain_advisor.py
+
+-- Serves UPDATE_APPLIANCE_INFORMATION
+CREATE INDEX idx_appliance_information_appliance_type ON home_pulse_ai.appliance_information (appliance_type);
+
+-- Serves SELECT_APPLIANCES_BY_PROPERTY_ID, UPDATE_APPLIANCE_INFORMATION_BULK, UPDATE_FORECASTED_REPLACEMENT_DATE
+CREATE INDEX idx_appliances_property_id_appliance_type ON home_pulse_ai.appliances (property_id, appliance_type);
+
+-- Serves SELECT_PROPERTY_INFORMATION_BY_USER_FOR_MANAGEMENT_TAB
+CREATE INDEX idx_appliances_property_id_forecasted_replacement_date ON home_pulse_ai.appliances (property_id, forecasted_replacement_date);
+
+-- Serves GET_APPLIANCES_BY_UNIT_ID
+CREATE INDEX idx_appliances_unit_id_appliance_type ON home_pulse_ai.appliances (unit_id, appliance_type);
+
+-- Serves UPDATE_INVITATION_INFORMATION
+CREATE INDEX idx_invitations_email ON home_pulse_ai.invitations (email);
+
+-- Serves SELECT_INVITATION_INFORMATION
+CREATE INDEX idx_invitations_token ON home_pulse_ai.invitations (token);
+
+-- Serves SELECT_ADDRESSES_BY_USER_ID, SELECT_PROPERTIES_BY_USER_ID, SELECT_PROPERTY_INFORMATION_BY_USER_FOR_MANAGEMENT_TAB, VERIFY_UNIT_OWNERSHIP
+CREATE INDEX idx_properties_user_id ON home_pulse_ai.properties (user_id);
+
+-- Serves SELECT_PROPERTY_IMAGE_URL
+CREATE INDEX idx_property_images_user_id_property_id ON home_pulse_ai.property_images (user_id, property_id);
+
+-- Serves FETCH_PROPERTY_NOTES
+CREATE INDEX idx_property_notes_property_id_user_id_created_at ON home_pulse_ai.property_notes (property_id, user_id, created_at);
+
+-- Serves FETCH_PROPERTY_NOTES
+CREATE INDEX idx_property_notes_property_id_user_id_entity_type_enti_61c1cb99 ON home_pulse_ai.property_notes (property_id, user_id, entity_type, entity_id, created_at);
+
+-- Serves SELECT_PROPERTY_INFORMATION_BY_USER_FOR_MANAGEMENT_TAB, SELECT_STRUCTURES_BY_PROPERTY_ID
+CREATE INDEX idx_structures_property_id_forecasted_replacement_date ON home_pulse_ai.structures (property_id, forecasted_replacement_date);
+
+-- Serves UPDATE_STRUCTURE_INFORMATION_BULK
+CREATE INDEX idx_structures_property_id_structure_type ON home_pulse_ai.structures (property_id, structure_type);
+
+-- Serves SELECT_SUBSCRIPTION_INFORMATION, SELECT_SUBSCRIPTION_STATUS, UPDATE_SUBSCRIPTION_STATUS, UPDATE_SUBSCRIPTION_STATUS_FOR_DELETION, UPDATE_SUBSCRIPTION_TABLE_UPON_PAYMENT_COMPLETION
+CREATE INDEX idx_subscriptions_user_id ON home_pulse_ai.subscriptions (user_id);
+
+-- Serves SELECT_TENANT_INFORMATION_BY_PROPERTY_ID
+CREATE INDEX idx_tenants_property_id ON home_pulse_ai.tenants (property_id);
+
+-- Serves GET_UNITS_BY_PROPERTY_ID, SELECT_PROPERTIES_BY_USER_ID, SELECT_PROPERTY_BY_PROPERTY_ID
+CREATE INDEX idx_units_property_id_unit_number ON home_pulse_ai.units (property_id, unit_number);
+
+-- Serves SELECT_CUSTOMER_FOR_AUTHENTICATION, SELECT_CUSTOMER_FROM_USER_TABLE
+CREATE INDEX idx_users_email ON home_pulse_ai.users (email);
+
+-- Serves SELECT_USER_ID_BY_STRIPE_CUSTOMER
+CREATE INDEX idx_users_stripe_customer_id ON home_pulse_ai.users (stripe_customer_id);
@@ -0,0 +1,39 @@
+-- Widens the V001 lookup indexes into covering indexes, so the dashboard reads are answered from the index
+-- without a primary key lookup per row. Each table is altered once, online, to rebuild it a single time.
+
+-- SELECT_ADDRESSES_BY_USER_ID reads id and address; id is carried by every InnoDB secondary index
+ALTER TABLE home_pulse_ai.properties
+    DROP INDEX idx_properties_user_id,
+    ADD INDEX idx_properties_user_id_address (user_id, address),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+-- SELECT_PROPERTY_INFORMATION_BY_USER_FOR_MANAGEMENT_TAB reads every selected component column from the index
+ALTER TABLE home_pulse_ai.appliances
+    DROP INDEX idx_appliances_property_id_forecasted_replacement_date,
+    ADD INDEX idx_appliances_due_covering
+        (property_id, forecasted_replacement_date, appliance_type, age_in_years, estimated_replacement_cost),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE home_pulse_ai.structures
+    DROP INDEX idx_structures_property_id_forecasted_replacement_date,
+    ADD INDEX idx_structures_due_covering
+        (property_id, forecasted_replacement_date, structure_type, age_in_years, estimated_replacement_cost),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+-- GET_UNITS_BY_PROPERTY_ID and the is_multifamily EXISTS probe of the property statements
+ALTER TABLE home_pulse_ai.units
+    DROP INDEX idx_units_property_id_unit_number,
+    ADD INDEX idx_units_property_covering (property_id, unit_number, created_at, updated_at),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+-- SELECT_PROPERTY_IMAGE_URL
+ALTER TABLE home_pulse_ai.property_images
+    DROP INDEX idx_property_images_user_id_property_id,
+    ADD INDEX idx_property_images_covering (user_id, property_id, s3_key),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+-- SELECT_SUBSCRIPTION_STATUS and SELECT_SUBSCRIPTION_INFORMATION
+ALTER TABLE home_pulse_ai.subscriptions
+    DROP INDEX idx_subscriptions_user_id,
+    ADD INDEX idx_subscriptions_covering (user_id, status, period_end, subscription_id),
+    ALGORITHM=INPLACE, LOCK=NONE;
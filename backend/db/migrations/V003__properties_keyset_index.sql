@@ -0,0 +1,6 @@
+-- SELECT_PROPERTIES_PAGE_BY_USER_ID seeks to (user_id, id > cursor) and reads the page in id order. V002 replaced
+-- the (user_id) index, whose implicit primary key suffix gave that order, with (user_id, address), so the page
+-- would be sorted again. Keeping id next to user_id lets the LIMIT stop after one page of index entries.
+ALTER TABLE home_pulse_ai.properties
+    ADD INDEX idx_properties_user_id_id (user_id, id),
+    ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,7 @@
+-- SELECT_TENANT_ANALYTICS_BY_PROPERTY and SELECT_TENANT_LEASES_ENDING_BY_USER_ID filter each property's tenants on
+-- the lease dates and sum the rent. Widening the V001 (property_id) index with those columns answers both from the
+-- index, the leases ending read seeks straight to the contract_end_date range of each property
+ALTER TABLE home_pulse_ai.tenants
+    DROP INDEX idx_tenants_property_id,
+    ADD INDEX idx_tenants_property_lease_covering (property_id, contract_end_date, contract_start_date, monthly_rent),
+    ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,11 @@
+-- The responses of property creation requests sent with an Idempotency-Key header. The row is written in the
+-- creation transaction, so a retry either finds the committed response or, when the first attempt rolled back,
+-- creates the properties itself. A concurrent retry waits on the primary key lock of the first attempt.
+CREATE TABLE IF NOT EXISTS home_pulse_ai.property_creation_idempotency_keys (
+    user_id INT NOT NULL,
+    idempotency_key VARCHAR(128) NOT NULL,
+    request_hash CHAR(64) NOT NULL,
+    response JSON,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, idempotency_key)
+);
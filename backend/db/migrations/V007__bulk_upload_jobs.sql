@@ -0,0 +1,19 @@
+-- Bulk CSV uploads run as background jobs, the upload route answers with a job id and the job status routes read
+-- the progress, row errors and throughput the worker writes here. Jobs run in the server process, so jobs left
+-- queued or running by a restart are failed when the job service starts
+CREATE TABLE IF NOT EXISTS home_pulse_ai.bulk_upload_jobs (
+    job_id CHAR(36) NOT NULL,
+    user_id INT NOT NULL,
+    status VARCHAR(16) NOT NULL,
+    file_name VARCHAR(255),
+    rows_written INT NOT NULL DEFAULT 0,
+    chunks_written INT NOT NULL DEFAULT 0,
+    rows_per_second DECIMAL(12, 1) NOT NULL DEFAULT 0,
+    errors JSON,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at DATETIME NULL,
+    finished_at DATETIME NULL,
+    PRIMARY KEY (job_id),
+    INDEX idx_bulk_upload_jobs_user_created (user_id, created_at),
+    INDEX idx_bulk_upload_jobs_status (status)
+);
@@ -0,0 +1,7 @@
+-- Each job records the server instance running it and a heartbeat that instance refreshes while the job is queued
+-- or running. A starting instance only fails the jobs whose heartbeat went stale, not the jobs another live
+-- instance is still importing. Heartbeats are written in UTC by the application. The startup sweep finds the few
+-- queued or running jobs through idx_bulk_upload_jobs_status
+ALTER TABLE home_pulse_ai.bulk_upload_jobs
+    ADD COLUMN owner_id CHAR(36) NULL,
+    ADD COLUMN heartbeat_at DATETIME NULL;
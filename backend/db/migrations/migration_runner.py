@@ -0,0 +1,158 @@
+import os
+import re
+import time
+import hashlib
+import logging
+import argparse
+import collections
+import mysql.connector
+from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATION_FILE_PATTERN = re.compile(r'^V(\d+)__(\w+)\.sql$')
+
+CREATE_SCHEMA_MIGRATIONS_TABLE = """CREATE TABLE IF NOT EXISTS home_pulse_ai.schema_migrations (
+    version INT PRIMARY KEY,
+    description VARCHAR(255) NOT NULL,
+    checksum CHAR(64) NOT NULL,
+    execution_ms INT NOT NULL,
+    applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);"""
+
+SELECT_APPLIED_MIGRATIONS = """SELECT version, checksum FROM home_pulse_ai.schema_migrations ORDER BY version;"""
+
+INSERT_APPLIED_MIGRATION = """INSERT INTO home_pulse_ai.schema_migrations
+(version, description, checksum, execution_ms) VALUES (%s, %s, %s, %s);"""
+
+Migration = collections.namedtuple('Migration', ['version', 'description', 'path', 'checksum'])
+
+
+class MigrationError(Exception):
+    pass
+
+
+def discover_migrations(migrations_dir=MIGRATIONS_DIR):
+    """
+    Lists the V<version>__<description>.sql files in version order
+    :param migrations_dir: python str, the directory holding the migration files
+    :return: python list of Migration
+    """
+    migrations = []
+    for file_name in os.listdir(migrations_dir):
+        match = MIGRATION_FILE_PATTERN.match(file_name)
+        if not match:
+            continue
+        path = os.path.join(migrations_dir, file_name)
+        with open(path, 'rb') as migration_file:
+            checksum = hashlib.sha256(migration_file.read()).hexdigest()
+        migrations.append(Migration(int(match.group(1)), match.group(2).replace('_', ' '), path, checksum))
+    migrations.sort(key=lambda migration: migration.version)
+    versions = [migration.version for migration in migrations]
+    if len(versions) != len(set(versions)):
+        raise MigrationError(f'Duplicate migration versions in {migrations_dir}')
+    return migrations
+
+
+def split_statements(script):
+    """
+    Splits a migration script into statements, dropping -- comment lines
+    :param script: python str, the content of a migration file
+    :return: python list of str
+    """
+    body = '\n'.join(line for line in script.splitlines() if not line.lstrip().startswith('--'))
+    return [statement.strip() for statement in body.split(';') if statement.strip()]
+
+
+class MigrationRunner:
+    def __init__(self, cnx, migrations_dir=MIGRATIONS_DIR):
+        """
+        Applies the versioned migrations in order and records them in home_pulse_ai.schema_migrations
+        :param cnx: A MySQL connection with DDL privileges on home_pulse_ai
+        :param migrations_dir: python str, the directory holding the migration files
+        """
+        self.cnx = cnx
+        self.migrations_dir = migrations_dir
+
+    def applied_versions(self):
+        """
+        Reads the applied versions, failing when an applied file was edited afterwards
+        :return: python set of int
+        """
+        cursor = self.cnx.cursor()
+        try:
+            cursor.execute(CREATE_SCHEMA_MIGRATIONS_TABLE)
+            cursor.execute(SELECT_APPLIED_MIGRATIONS)
+            applied = dict(cursor.fetchall())
+        finally:
+            cursor.close()
+        for migration in discover_migrations(self.migrations_dir):
+            if migration.version in applied and applied[migration.version] != migration.checksum:
+                raise MigrationError(f'V{migration.version} was modified after it was applied; '
+                                     f'add a new migration instead')
+        return set(applied)
+
+    def pending(self, target=None):
+        """
+        The migrations that have not been applied yet, up to and including the target version
+        :param target: python int or None, the last version to include
+        :return: python list of Migration
+        """
+        applied = self.applied_versions()
+        return [migration for migration in discover_migrations(self.migrations_dir)
+                if migration.version not in applied and (target is None or migration.version <= target)]
+
+    def migrate(self, target=None):
+        """
+        Applies the pending migrations one file at a time. MySQL commits DDL implicitly, so a failure leaves the
+        earlier files applied and recorded, and stops before recording the failing one
+        :param target: python int or None, the last version to apply
+        :return: python list of the applied Migration
+        """
+        logging.info(START_OF_METHOD)
+        applied = []
+        for migration in self.pending(target):
+            with open(migration.path) as migration_file:
+                statements = split_statements(migration_file.read())
+            started = time.perf_counter()
+            cursor = self.cnx.cursor()
+            try:
+                for statement in statements:
+                    cursor.execute(statement)
+                execution_ms = int((time.perf_counter() - started) * 1000)
+                cursor.execute(INSERT_APPLIED_MIGRATION,
+                               [migration.version, migration.description, migration.checksum, execution_ms])
+                self.cnx.commit()
+            except Exception as e:
+                logging.error('An issue occurred applying a migration',
+                              exc_info=True,
+                              extra={'information': {'version': migration.version, 'error': str(e)}})
+                raise MigrationError(f'V{migration.version} failed: {e}')
+            finally:
+                cursor.close()
+            logging.info('Applied migration', extra={'information': {'version': migration.version,
+                                                                     'description': migration.description,
+                                                                     'executionMs': execution_ms}})
+            applied.append(migration)
+        logging.info(END_OF_METHOD)
+        return applied
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Applies the versioned home_pulse_ai migrations')
+    parser.add_argument('command', choices=('status', 'migrate'))
+    parser.add_argument('--target', type=int, help='the last version to apply')
+    arguments = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    connection = mysql.connector.connect(host=os.getenv('MYSQL_HOST'), port=os.getenv('MYSQL_PORT'),
+                                         user=os.getenv('MYSQL_USER'), password=os.getenv('MYSQL_PASS'),
+                                         database=os.getenv('MYSQL_DB'))
+    runner = MigrationRunner(connection)
+    try:
+        if arguments.command == 'status':
+            for pending_migration in runner.pending(arguments.target):
+                print(f'pending V{pending_migration.version:03d} {pending_migration.description}')
+        else:
+            for applied_migration in runner.migrate(arguments.target):
+                print(f'applied V{applied_migration.version:03d} {applied_migration.description}')
+    finally:
+        connection.close()
@@ -0,0 +1,46 @@
+import time
+
+
+class BulkImportProgress:
+    def __init__(self):
+        """
+        How far a streaming CSV import has got. The bulk insertion service updates it after every chunk it writes
+        and hands it to the caller's progress callback, and records the rows an import failed on
+        """
+        self.rows_written = 0
+        self.chunks_written = 0
+        self.errors = []
+        self.started_at = time.monotonic()
+
+    def record_chunk(self, row_count):
+        """
+        Counts a chunk written inside the import's transaction
+        :param row_count: python int, the CSV rows the chunk held
+        """
+        self.rows_written += row_count
+        self.chunks_written += 1
+
+    def record_error(self, message, first_row=None, last_row=None):
+        """
+        Records why the import failed and which rows of the file it failed on
+        :param message: python str, the reason shown to the user
+        :param first_row: python int or None, the first data row of the file involved, 1 for the row after the
+        header, None when the failure is not tied to rows
+        :param last_row: python int or None, the last data row involved, None when it is not known
+        """
+        self.errors.append({'firstRow': first_row, 'lastRow': last_row, 'message': message})
+
+    def elapsed_seconds(self):
+        return time.monotonic() - self.started_at
+
+    def rows_per_second(self):
+        elapsed = self.elapsed_seconds()
+        return self.rows_written / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self):
+        return {
+            'rowsWritten': self.rows_written,
+            'chunksWritten': self.chunks_written,
+            'elapsedSeconds': round(self.elapsed_seconds(), 3),
+            'rowsPerSecond': round(self.rows_per_second(), 1)
+        }
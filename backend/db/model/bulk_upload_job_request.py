@@ -0,0 +1,24 @@
+import uuid
+import logging
+from common.logging.error.error import Error
+from common.logging.log_utils import START_OF_METHOD
+from common.logging.error.error_messages import INVALID_REQUEST
+
+
+class BulkUploadJobRequest:
+    def __init__(self, job_id):
+        self._validate_bulk_upload_job_request(job_id)
+        self.job_id = str(uuid.UUID(job_id))
+
+    @staticmethod
+    def _validate_bulk_upload_job_request(job_id):
+        """
+        Validates the job id of the bulk upload job status route
+        :param job_id: python str, the id the upload route answered with
+        """
+        logging.info(START_OF_METHOD)
+        try:
+            uuid.UUID(job_id)
+        except (TypeError, ValueError, AttributeError):
+            logging.error('The bulk upload job id needs to be a UUID')
+            raise Error(INVALID_REQUEST)
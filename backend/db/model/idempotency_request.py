@@ -0,0 +1,27 @@
+import re
+import logging
+import hashlib
+from common.logging.error.error import Error
+from common.logging.log_utils import START_OF_METHOD
+from common.logging.error.error_messages import INVALID_REQUEST
+
+IDEMPOTENCY_KEY_PATTERN = re.compile(r'^[A-Za-z0-9_.:-]{1,128}$')
+
+
+class IdempotencyRequest:
+    def __init__(self, idempotency_key, body):
+        self._validate_idempotency_request(idempotency_key)
+        self.key = idempotency_key
+        # A retry has to send the same body, a reused key with another body is a client error rather than a replay
+        self.request_hash = hashlib.sha256(body or b'').hexdigest() if idempotency_key is not None else None
+
+    @staticmethod
+    def _validate_idempotency_request(idempotency_key):
+        """
+        Validates the optional Idempotency-Key header of a write route
+        :param idempotency_key: python str or None, the header value
+        """
+        logging.info(START_OF_METHOD)
+        if idempotency_key is not None and not IDEMPOTENCY_KEY_PATTERN.match(idempotency_key):
+            logging.error('The Idempotency-Key header needs to be 1 to 128 letters, digits or _.:- characters')
+            raise Error(INVALID_REQUEST)
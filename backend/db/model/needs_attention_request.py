@@ -0,0 +1,30 @@
+import logging
+from common.logging.error.error import Error
+from common.logging.log_utils import START_OF_METHOD
+from common.logging.error.error_messages import INVALID_REQUEST
+
+DEFAULT_HORIZON_MONTHS = 3
+MAX_HORIZON_MONTHS = 60
+
+
+class NeedsAttentionRequest:
+    def __init__(self, args):
+        self._validate_needs_attention_request(args)
+        self.horizon_months = int(args.get('horizonMonths', DEFAULT_HORIZON_MONTHS))
+        self.include_details = args.get('details', 'false').lower() == 'true'
+
+    @staticmethod
+    def _validate_needs_attention_request(args):
+        """
+        Validates the query string of the needs attention route
+        :param args: The query string arguments, with optional horizonMonths and details
+        """
+        logging.info(START_OF_METHOD)
+        horizon_months = args.get('horizonMonths')
+        if horizon_months is not None and (not horizon_months.isdecimal()
+                                           or not 1 <= int(horizon_months) <= MAX_HORIZON_MONTHS):
+            logging.error(f'The horizonMonths parameter needs to be between 1 and {MAX_HORIZON_MONTHS}')
+            raise Error(INVALID_REQUEST)
+        if args.get('details', 'false').lower() not in ('true', 'false'):
+            logging.error('The details parameter needs to be true or false')
+            raise Error(INVALID_REQUEST)
@@ -2,16 +2,16 @@ import logging
 from common.logging.error.error import Error
 from common.logging.log_utils import START_OF_METHOD
 from common.logging.error.error_messages import INVALID_REQUEST
-import io
 
 
 class PropertyCreationBulkRequest:
     def __init__(self, files):
         self.validate_bulk_property_creation_request(files)
         self.csv_file = files.get('file')
-        self.raw_bytes = self.csv_file.read()
-        self.text = self.raw_bytes.decode('utf-8')
-        self.content = io.StringIO(self.text)
+        self.file_name = self.csv_file.filename
+        # The upload is parsed straight from its stream chunk by chunk, werkzeug spools large files to disk, so the
+        # whole file is never held in memory as bytes, text and a DataFrame at once
+        self.content = self.csv_file.stream
 
     @staticmethod
     def validate_bulk_property_creation_request(files):
@@ -0,0 +1,41 @@
+import logging
+from common.logging.error.error import Error
+from common.logging.log_utils import START_OF_METHOD
+from common.logging.error.error_messages import INVALID_REQUEST
+
+DETAIL_FIELDS = ('property', 'appliances', 'structures', 'tenants', 'units', 'image', 'notes')
+
+
+class PropertyDetailRequest:
+    def __init__(self, property_id, args):
+        self._validate_property_detail_request(property_id, args)
+        self.property_id = int(property_id)
+        fields = args.get('fields')
+        if fields:
+            requested = {field.strip() for field in fields.split(',') if field.strip()}
+            self.fields = tuple(field for field in DETAIL_FIELDS if field in requested)
+        else:
+            self.fields = DETAIL_FIELDS
+
+    @staticmethod
+    def _validate_property_detail_request(property_id, args):
+        """
+        Validates the request to the property detail route
+        :param property_id: The property id from the route
+        :param args: The query string arguments, with an optional comma separated fields list
+        """
+        logging.info(START_OF_METHOD)
+        if not str(property_id).isdecimal():
+            logging.error('The property id needs to be numeric')
+            raise Error(INVALID_REQUEST)
+        fields = args.get('fields')
+        if fields is None:
+            return
+        requested = [field.strip() for field in fields.split(',') if field.strip()]
+        if not requested:
+            logging.error('The fields parameter needs at least one field')
+            raise Error(INVALID_REQUEST)
+        unknown = [field for field in requested if field not in DETAIL_FIELDS]
+        if unknown:
+            logging.error('Unknown fields were requested', extra={'information': {'fields': unknown}})
+            raise Error(INVALID_REQUEST)
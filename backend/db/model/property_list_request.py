@@ -0,0 +1,47 @@
+import logging
+from common.logging.error.error import Error
+from common.logging.log_utils import START_OF_METHOD
+from common.logging.error.error_messages import INVALID_REQUEST
+
+PROPERTY_FIELDS = ('id', 'user_id', 'postal_code', 'age', 'address', 'created_at', 'isMultifamily')
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+class PropertyListRequest:
+    def __init__(self, args):
+        self._validate_property_list_request(args)
+        # Paging is opt-in: without limit or after every property is returned, as before paging existed
+        self.paged = 'limit' in args or 'after' in args
+        # Larger pages are served at the cap rather than rejected, the cursor leads to the rest
+        self.limit = min(int(args.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE) if self.paged else None
+        self.after = int(args.get('after', 0))
+        fields = args.get('fields')
+        if fields:
+            requested = {field.strip() for field in fields.split(',') if field.strip()}
+            self.fields = tuple(field for field in PROPERTY_FIELDS if field in requested)
+        else:
+            self.fields = PROPERTY_FIELDS
+
+    @staticmethod
+    def _validate_property_list_request(args):
+        """
+        Validates the query string of the property list route
+        :param args: The query string arguments, with optional limit, after and fields
+        """
+        logging.info(START_OF_METHOD)
+        for name in ('limit', 'after'):
+            if name in args and not str(args[name]).isdecimal():
+                logging.error(f'The {name} parameter needs to be a non-negative integer')
+                raise Error(INVALID_REQUEST)
+        if 'limit' in args and int(args['limit']) == 0:
+            logging.error('The limit parameter needs to be at least 1')
+            raise Error(INVALID_REQUEST)
+        fields = args.get('fields')
+        if fields is None:
+            return
+        requested = [field.strip() for field in fields.split(',') if field.strip()]
+        unknown = [field for field in requested if field not in PROPERTY_FIELDS]
+        if not requested or unknown:
+            logging.error('Unknown or no fields were requested', extra={'information': {'fields': unknown}})
+            raise Error(INVALID_REQUEST)
@@ -15,10 +15,59 @@ INSERT_PROPERTY_STRUCTURES_INTO_STRUCTURES_TABLE = """INSERT INTO home_pulse_ai.
 INSERT_UNITS_INTO_UNITS_TABLE = """INSERT INTO home_pulse_ai.units
 (property_id, unit_number) VALUES (%s, %s);"""
 
+SELECT_AUTO_INCREMENT_INCREMENT = """SELECT @@SESSION.auto_increment_increment;"""
+
+SAVEPOINT_PROPERTY_CREATION = """SAVEPOINT property_creation;"""
+
+RELEASE_SAVEPOINT_PROPERTY_CREATION = """RELEASE SAVEPOINT property_creation;"""
+
+ROLLBACK_TO_SAVEPOINT_PROPERTY_CREATION = """ROLLBACK TO SAVEPOINT property_creation;"""
+
+DELETE_EXPIRED_PROPERTY_CREATION_IDEMPOTENCY_KEY = """DELETE FROM home_pulse_ai.property_creation_idempotency_keys
+WHERE user_id = %s
+  AND idempotency_key = %s
+  AND created_at < NOW() - INTERVAL 1 DAY;"""
+
+INSERT_PROPERTY_CREATION_IDEMPOTENCY_KEY = """INSERT IGNORE INTO home_pulse_ai.property_creation_idempotency_keys
+(user_id, idempotency_key, request_hash) VALUES (%s, %s, %s);"""
+
+SELECT_PROPERTY_CREATION_IDEMPOTENCY_KEY = """SELECT request_hash, response
+FROM home_pulse_ai.property_creation_idempotency_keys
+WHERE user_id = %s
+  AND idempotency_key = %s;"""
+
+UPDATE_PROPERTY_CREATION_IDEMPOTENCY_KEY_RESPONSE = """UPDATE home_pulse_ai.property_creation_idempotency_keys
+SET response = %s
+WHERE user_id = %s
+  AND idempotency_key = %s;"""
+
 SELECT_CUSTOMER_FOR_AUTHENTICATION = """SELECT id, email, hashed_password, first_name, last_name, company_id 
 FROM home_pulse_ai.users WHERE email=%s;"""
 
-SELECT_PROPERTIES_BY_USER_ID = """SELECT
+SELECT_PROPERTIES_PAGE_BY_USER_ID = """SELECT
+    p.id,
+    p.user_id,
+    p.age,
+    p.street,
+    p.city,
+    p.state,
+    p.zip,
+    p.address,
+    p.created_at,
+    COUNT(u.unit_id) > 0 AS is_multifamily
+FROM (SELECT id, user_id, age, street, city, state, zip, address, created_at
+      FROM home_pulse_ai.properties
+      WHERE user_id = %s
+        AND id > %s
+      ORDER BY id
+      LIMIT %s) AS p
+LEFT JOIN home_pulse_ai.units u
+  ON u.property_id = p.id
+ AND u.unit_number IS NOT NULL
+GROUP BY p.id, p.user_id, p.age, p.street, p.city, p.state, p.zip, p.address, p.created_at
+ORDER BY p.id;"""
+
+SELECT_PROPERTIES_STREAM_BY_USER_ID = """SELECT
     p.id,
     p.user_id,
     p.age,
@@ -28,9 +77,15 @@ SELECT_PROPERTIES_BY_USER_ID = """SELECT
     p.zip,
     p.address,
     p.created_at,
-    CASE WHEN EXISTS (SELECT 1 FROM home_pulse_ai.units u WHERE u.property_id = p.id AND u.unit_number IS NOT NULL) THEN 1 ELSE 0 END as is_multifamily
+    COUNT(u.unit_id) > 0 AS is_multifamily
 FROM home_pulse_ai.properties p
-WHERE p.user_id = %s;"""
+LEFT JOIN home_pulse_ai.units u
+  ON u.property_id = p.id
+ AND u.unit_number IS NOT NULL
+WHERE p.user_id = %s
+  AND p.id > %s
+GROUP BY p.id
+ORDER BY p.id;"""
 
 SELECT_ADDRESSES_BY_USER_ID = """SELECT id, address FROM home_pulse_ai.properties WHERE user_id=%s;"""
 
@@ -56,6 +111,71 @@ SELECT_APPLIANCES_BY_PROPERTY_ID = """SELECT * FROM home_pulse_ai.appliances WHE
 
 SELECT_STRUCTURES_BY_PROPERTY_ID = """SELECT * FROM home_pulse_ai.structures WHERE property_id=%s;"""
 
+SELECT_PROPERTY_BY_PROPERTY_ID_FOR_USER = """SELECT
+    p.id,
+    p.user_id,
+    p.age,
+    p.street,
+    p.city,
+    p.state,
+    p.zip,
+    p.address,
+    p.created_at,
+    CASE WHEN EXISTS (
+        SELECT 1 FROM home_pulse_ai.units u
+        WHERE u.property_id = p.id
+        AND u.unit_number IS NOT NULL
+    ) THEN 1 ELSE 0 END as is_multifamily
+FROM home_pulse_ai.properties p
+WHERE p.id = %s
+  AND p.user_id = %s;"""
+
+SELECT_APPLIANCES_BY_PROPERTY_ID_FOR_USER = """SELECT a.*
+FROM home_pulse_ai.appliances a
+JOIN home_pulse_ai.properties p ON p.id = a.property_id
+WHERE a.property_id = %s
+  AND p.user_id = %s;"""
+
+SELECT_STRUCTURES_BY_PROPERTY_ID_FOR_USER = """SELECT s.*
+FROM home_pulse_ai.structures s
+JOIN home_pulse_ai.properties p ON p.id = s.property_id
+WHERE s.property_id = %s
+  AND p.user_id = %s;"""
+
+SELECT_COMPONENTS_BY_USER_ID = """SELECT 'APPLIANCE' AS component_kind,
+       a.id,
+       a.property_id,
+       a.unit_id,
+       a.appliance_type AS component_type,
+       a.appliance_brand,
+       a.appliance_model,
+       a.age_in_years,
+       a.estimated_replacement_cost,
+       a.forecasted_replacement_date
+FROM home_pulse_ai.properties AS p
+JOIN home_pulse_ai.appliances AS a
+  ON a.property_id = p.id
+WHERE p.user_id = %s
+
+UNION ALL
+
+SELECT 'STRUCTURE' AS component_kind,
+       s.id,
+       s.property_id,
+       NULL,
+       s.structure_type,
+       NULL,
+       NULL,
+       s.age_in_years,
+       s.estimated_replacement_cost,
+       s.forecasted_replacement_date
+FROM home_pulse_ai.properties AS p
+JOIN home_pulse_ai.structures AS s
+  ON s.property_id = p.id
+WHERE p.user_id = %s
+
+ORDER BY property_id, component_kind, id;"""
+
 UPDATE_FIRST_AND_LAST_OF_CUSTOMER = """UPDATE home_pulse_ai.users SET first_name=%s, last_name=%s WHERE id=%s;"""
 
 SELECT_CUSTOMER_FIRST_AND_LAST = """SELECT first_name, last_name, email FROM home_pulse_ai.users WHERE id=%s;"""
@@ -69,6 +189,40 @@ FROM home_pulse_ai.users WHERE id=%s;"""
 
 SELECT_TENANT_INFORMATION_BY_PROPERTY_ID = """SELECT * FROM home_pulse_ai.tenants WHERE property_id=%s;"""
 
+SELECT_TENANT_INFORMATION_BY_PROPERTY_ID_FOR_USER = """SELECT t.*
+FROM home_pulse_ai.tenants t
+JOIN home_pulse_ai.properties p ON p.id = t.property_id
+WHERE t.property_id = %s
+  AND p.user_id = %s;"""
+
+SELECT_TENANT_ANALYTICS_BY_PROPERTY = """SELECT p.id, p.address,
+       GREATEST(COALESCE(u.unit_count, 0), 1) AS unit_count,
+       COALESCE(t.active_leases, 0) AS active_leases,
+       COALESCE(t.monthly_rent, 0) AS monthly_rent
+FROM home_pulse_ai.properties p
+LEFT JOIN (SELECT units.property_id, COUNT(*) AS unit_count
+           FROM home_pulse_ai.units units
+           JOIN home_pulse_ai.properties owner ON owner.id = units.property_id
+           WHERE owner.user_id = %s
+           GROUP BY units.property_id) u ON u.property_id = p.id
+LEFT JOIN (SELECT tenants.property_id, COUNT(*) AS active_leases, SUM(tenants.monthly_rent) AS monthly_rent
+           FROM home_pulse_ai.tenants tenants
+           JOIN home_pulse_ai.properties owner ON owner.id = tenants.property_id
+           WHERE owner.user_id = %s
+             AND tenants.contract_start_date <= CURDATE()
+             AND (tenants.contract_end_date IS NULL OR tenants.contract_end_date >= CURDATE())
+           GROUP BY tenants.property_id) t ON t.property_id = p.id
+WHERE p.user_id = %s
+ORDER BY p.id;"""
+
+SELECT_TENANT_LEASES_ENDING_BY_USER_ID = """SELECT t.id, t.property_id, p.address, t.first_name, t.last_name,
+       t.contract_end_date, t.monthly_rent, DATEDIFF(t.contract_end_date, CURDATE()) AS days_remaining
+FROM home_pulse_ai.tenants t
+JOIN home_pulse_ai.properties p ON p.id = t.property_id
+WHERE p.user_id = %s
+  AND t.contract_end_date BETWEEN CURDATE() AND CURDATE() + INTERVAL %s DAY
+ORDER BY t.contract_end_date, t.id;"""
+
 INSERT_TENANT_INFORMATION_INTO_TENANTS_TABLE = """INSERT INTO home_pulse_ai.tenants (property_id, first_name, 
 last_name, contract_start_date, contract_end_date, monthly_rent, phone_number) VALUES (%s, %s, %s, %s, %s, %s, %s);"""
 
@@ -157,6 +311,65 @@ WHERE sp.forecasted_replacement_date <= CURDATE() + INTERVAL 3 MONTH
 
 ORDER BY property_id;"""
 
+SELECT_COMPONENTS_DUE_BY_USER_ID = """SELECT component_id,
+       property_id,
+       component_name,
+       age_in_years,
+       estimated_replacement_cost,
+       forecasted_replacement_date,
+       property_address,
+       DATEDIFF(CURDATE(), forecasted_replacement_date) AS days_difference
+FROM home_pulse_ai.component_due_index
+WHERE user_id = %s
+  AND forecasted_replacement_date <= CURDATE() + INTERVAL %s MONTH
+ORDER BY forecasted_replacement_date;"""
+
+SELECT_COMPONENTS_DUE_TOTALS_BY_PROPERTY = """SELECT property_id,
+       MAX(property_address),
+       COUNT(*),
+       COALESCE(SUM(estimated_replacement_cost), 0),
+       SUM(DATEDIFF(CURDATE(), forecasted_replacement_date) >= 0),
+       COALESCE(SUM(CASE WHEN DATEDIFF(CURDATE(), forecasted_replacement_date) >= 0
+                         THEN estimated_replacement_cost END), 0)
+FROM home_pulse_ai.component_due_index
+WHERE user_id = %s
+  AND forecasted_replacement_date <= CURDATE() + INTERVAL %s MONTH
+GROUP BY property_id
+ORDER BY property_id;"""
+
+SELECT_COMPONENTS_DUE_TOTALS_BY_MONTH = """SELECT EXTRACT(YEAR_MONTH FROM forecasted_replacement_date) AS due_month,
+       COUNT(*),
+       COALESCE(SUM(estimated_replacement_cost), 0),
+       SUM(DATEDIFF(CURDATE(), forecasted_replacement_date) >= 0),
+       COALESCE(SUM(CASE WHEN DATEDIFF(CURDATE(), forecasted_replacement_date) >= 0
+                         THEN estimated_replacement_cost END), 0)
+FROM home_pulse_ai.component_due_index
+WHERE user_id = %s
+  AND forecasted_replacement_date <= CURDATE() + INTERVAL %s MONTH
+GROUP BY due_month
+ORDER BY due_month;"""
+
+DELETE_COMPONENT_DUE_INDEX_BY_PROPERTY_ID = """DELETE FROM home_pulse_ai.component_due_index WHERE property_id = %s;"""
+
+INSERT_COMPONENT_DUE_INDEX_BY_PROPERTY_ID = """INSERT INTO home_pulse_ai.component_due_index (user_id,
+    forecasted_replacement_date, component_kind, component_id, property_id, component_name, age_in_years,
+    estimated_replacement_cost, property_address)
+SELECT p.user_id, a.forecasted_replacement_date, 'APPLIANCE', a.id, a.property_id, a.appliance_type, a.age_in_years,
+       a.estimated_replacement_cost, p.address
+FROM home_pulse_ai.properties AS p
+JOIN home_pulse_ai.appliances AS a
+  ON a.property_id = p.id
+WHERE p.id = %s
+  AND a.forecasted_replacement_date IS NOT NULL
+UNION ALL
+SELECT p.user_id, s.forecasted_replacement_date, 'STRUCTURE', s.id, s.property_id, s.structure_type, s.age_in_years,
+       s.estimated_replacement_cost, p.address
+FROM home_pulse_ai.properties AS p
+JOIN home_pulse_ai.structures AS s
+  ON s.property_id = p.id
+WHERE p.id = %s
+  AND s.forecasted_replacement_date IS NOT NULL;"""
+
 GET_UNITS_BY_PROPERTY_ID = """SELECT unit_id, unit_number, property_id, created_at, updated_at
 FROM home_pulse_ai.units
 WHERE property_id = %s
@@ -168,6 +381,27 @@ FROM home_pulse_ai.appliances
 WHERE unit_id = %s
 ORDER BY appliance_type ASC;"""
 
+GET_UNITS_BY_PROPERTY_ID_FOR_USER = """SELECT u.unit_id, u.unit_number, u.property_id, u.created_at, u.updated_at
+FROM home_pulse_ai.units u
+JOIN home_pulse_ai.properties p ON p.id = u.property_id
+WHERE u.property_id = %s
+  AND p.user_id = %s
+ORDER BY u.unit_number ASC;"""
+
+SELECT_UNIT_IDS_BY_USER_ID = """SELECT u.unit_id
+FROM home_pulse_ai.units u
+JOIN home_pulse_ai.properties p ON p.id = u.property_id
+WHERE p.user_id = %s;"""
+
+GET_APPLIANCES_BY_UNIT_ID_FOR_USER = """SELECT a.id, a.property_id, a.unit_id, a.appliance_type, a.appliance_brand,
+a.appliance_model, a.age_in_years, a.estimated_replacement_cost, a.forecasted_replacement_date
+FROM home_pulse_ai.appliances a
+JOIN home_pulse_ai.units u ON u.unit_id = a.unit_id
+JOIN home_pulse_ai.properties p ON p.id = u.property_id
+WHERE a.unit_id = %s
+  AND p.user_id = %s
+ORDER BY a.appliance_type ASC;"""
+
 VERIFY_UNIT_OWNERSHIP = """SELECT u.unit_id
 FROM home_pulse_ai.units u
 JOIN home_pulse_ai.properties p ON u.property_id = p.id
@@ -179,3 +413,40 @@ INSERT_PROPERTY_NOTE = """INSERT INTO home_pulse_ai.property_notes
 FETCH_PROPERTY_NOTES = """SELECT id, property_id, user_id, entity_type, entity_id, file_path, created_at, updated_at
 FROM home_pulse_ai.property_notes
 WHERE property_id = %s AND user_id = %s"""
+
+INSERT_BULK_UPLOAD_JOB = """INSERT INTO home_pulse_ai.bulk_upload_jobs
+(job_id, user_id, status, file_name, owner_id, heartbeat_at) VALUES (%s, %s, 'queued', %s, %s, %s);"""
+
+UPDATE_BULK_UPLOAD_JOB_STARTED = """UPDATE home_pulse_ai.bulk_upload_jobs
+SET status = 'running', started_at = CURRENT_TIMESTAMP, heartbeat_at = %s
+WHERE job_id = %s AND status = 'queued';"""
+
+UPDATE_BULK_UPLOAD_JOB_PROGRESS = """UPDATE home_pulse_ai.bulk_upload_jobs
+SET rows_written = %s, chunks_written = %s, rows_per_second = %s, heartbeat_at = %s
+WHERE job_id = %s AND status = 'running';"""
+
+UPDATE_BULK_UPLOAD_JOB_FINISHED = """UPDATE home_pulse_ai.bulk_upload_jobs
+SET status = %s, rows_written = %s, chunks_written = %s, rows_per_second = %s, errors = %s,
+finished_at = CURRENT_TIMESTAMP
+WHERE job_id = %s AND status IN ('queued', 'running');"""
+
+UPDATE_BULK_UPLOAD_JOB_HEARTBEATS = """UPDATE home_pulse_ai.bulk_upload_jobs
+SET heartbeat_at = %s
+WHERE owner_id = %s AND status IN ('queued', 'running');"""
+
+UPDATE_INTERRUPTED_BULK_UPLOAD_JOBS = """UPDATE home_pulse_ai.bulk_upload_jobs
+SET status = 'failed', errors = %s, finished_at = CURRENT_TIMESTAMP
+WHERE status IN ('queued', 'running')
+  AND (heartbeat_at IS NULL OR heartbeat_at < %s);"""
+
+SELECT_BULK_UPLOAD_JOB_BY_ID_FOR_USER = """SELECT job_id, status, file_name, rows_written, chunks_written, rows_per_second, errors,
+created_at, started_at, finished_at
+FROM home_pulse_ai.bulk_upload_jobs
+WHERE job_id = %s AND user_id = %s;"""
+
+SELECT_BULK_UPLOAD_JOBS_BY_USER_ID = """SELECT job_id, status, file_name, rows_written, chunks_written, rows_per_second, errors,
+created_at, started_at, finished_at
+FROM home_pulse_ai.bulk_upload_jobs
+WHERE user_id = %s
+ORDER BY created_at DESC, job_id DESC
+LIMIT %s;"""
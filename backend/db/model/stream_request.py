@@ -0,0 +1,28 @@
+import logging
+from common.logging.error.error import Error
+from common.logging.log_utils import START_OF_METHOD
+from common.logging.error.error_messages import INVALID_REQUEST
+from common.helpers.json_stream_helpers import NDJSON_MIMETYPE
+
+STREAM_FORMATS = ('json', 'ndjson')
+
+
+class StreamRequest:
+    def __init__(self, args, accept=None):
+        self._validate_stream_request(args)
+        stream = args.get('stream')
+        if stream is None and accept and NDJSON_MIMETYPE in accept:
+            stream = 'ndjson'
+        # None keeps the buffered response of the route
+        self.response_format = stream
+
+    @staticmethod
+    def _validate_stream_request(args):
+        """
+        Validates the stream parameter of the list routes
+        :param args: The query string arguments, with an optional stream of json or ndjson
+        """
+        logging.info(START_OF_METHOD)
+        if args.get('stream', STREAM_FORMATS[0]) not in STREAM_FORMATS:
+            logging.error(f'The stream parameter needs to be one of {", ".join(STREAM_FORMATS)}')
+            raise Error(INVALID_REQUEST)
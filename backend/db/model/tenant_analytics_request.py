@@ -0,0 +1,25 @@
+import logging
+from common.logging.error.error import Error
+from common.logging.log_utils import START_OF_METHOD
+from common.logging.error.error_messages import INVALID_REQUEST
+
+DEFAULT_LEASE_WINDOW_DAYS = 60
+MAX_LEASE_WINDOW_DAYS = 365
+
+
+class TenantAnalyticsRequest:
+    def __init__(self, args):
+        self._validate_tenant_analytics_request(args)
+        self.days = int(args.get('days', DEFAULT_LEASE_WINDOW_DAYS))
+
+    @staticmethod
+    def _validate_tenant_analytics_request(args):
+        """
+        Validates the query string of the tenant analytics route
+        :param args: The query string arguments, with an optional days window for the leases ending
+        """
+        logging.info(START_OF_METHOD)
+        days = args.get('days')
+        if days is not None and (not days.isdecimal() or not 0 <= int(days) <= MAX_LEASE_WINDOW_DAYS):
+            logging.error(f'The days parameter needs to be between 0 and {MAX_LEASE_WINDOW_DAYS}')
+            raise Error(INVALID_REQUEST)
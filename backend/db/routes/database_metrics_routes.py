@@ -0,0 +1,47 @@
+import mdc
+import uuid
+import logging
+from backend.security.csrf import csrf
+from backend.app.container import Container
+from flask import jsonify, request, Blueprint
+from dependency_injector.wiring import inject, Provide
+from common.decorators.token_required import token_required
+from common.decorators.operator_required import operator_required
+from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
+from backend.db.client.statement_metrics import statement_metrics
+from backend.db.client.ownership_index import ownership_index
+
+database_metrics_routes_blueprint = Blueprint('database_metrics_routes_blueprint', __name__)
+
+
+@database_metrics_routes_blueprint.route('/api/metrics/db-pool', methods=['GET'])
+@mdc.with_mdc(domain='home-pulse', subdomain='/api/metrics')
+@csrf.exempt
+@token_required
+@operator_required
+@inject
+def fetch_database_pool_metrics(ctx,
+                                home_pulse_db_connection_pool=
+                                Provide[Container.home_pulse_db_connection_pool],
+                                async_home_pulse_db_connection_pool=
+                                Provide[Container.async_home_pulse_db_connection_pool]):
+    ctx.correlationId = request.headers.get('correlation-id', uuid.uuid4().__str__())
+    logging.info(START_OF_METHOD)
+    response = home_pulse_db_connection_pool.pool_stats()
+    response['async'] = async_home_pulse_db_connection_pool.stats()
+    response['ownershipIndex'] = ownership_index.stats()
+    logging.info(END_OF_METHOD)
+    return jsonify(response)
+
+
+@database_metrics_routes_blueprint.route('/api/metrics/db-statements', methods=['GET'])
+@mdc.with_mdc(domain='home-pulse', subdomain='/api/metrics')
+@csrf.exempt
+@token_required
+@operator_required
+def fetch_database_statement_metrics(ctx):
+    ctx.correlationId = request.headers.get('correlation-id', uuid.uuid4().__str__())
+    logging.info(START_OF_METHOD)
+    response = statement_metrics.profile()
+    logging.info(END_OF_METHOD)
+    return jsonify(response)
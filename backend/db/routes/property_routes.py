@@ -7,14 +7,22 @@ from flask import jsonify, request, Blueprint
 from dependency_injector.wiring import inject, Provide
 from common.decorators.token_required import token_required
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
+from common.helpers.json_stream_helpers import streamed_json_response
 from backend.db.model.tenant_creation_request import TenantCreationRequest
 from backend.db.model.property_creation_bulk_request import PropertyCreationBulkRequest
+from backend.db.model.bulk_upload_job_request import BulkUploadJobRequest
 from backend.db.model.update_forecasted_date_request import UpdateForecastedDateRequest
 from backend.db.model.property_image_insertion_request import PropertyImageInsertionRequest
 from backend.db.model.update_tenant_information_request import UpdateTenantInformationRequest
 from backend.db.model.update_appliance_information_request import UpdateApplianceInformationRequest
 from backend.db.model.update_structure_information_request import UpdateStructureInformationRequest
 from backend.db.model.property_note_insertion_request import PropertyNoteInsertionRequest
+from backend.db.model.property_detail_request import PropertyDetailRequest
+from backend.db.model.property_list_request import PropertyListRequest
+from backend.db.model.needs_attention_request import NeedsAttentionRequest
+from backend.db.model.tenant_analytics_request import TenantAnalyticsRequest
+from backend.db.model.stream_request import StreamRequest
+from backend.db.model.idempotency_request import IdempotencyRequest
 
 property_routes_blueprint = Blueprint('property_routes_blueprint', __name__)
 
@@ -33,7 +41,9 @@ def insert_property_information_into_table(ctx,
     request_json = request.get_json()
     property_creation_requests = property_creation_insertion_service.construct_property_creation_requests(user_id,
                                                                                                           request_json)
-    response = property_creation_insertion_service.insert_properties_into_db(user_id, property_creation_requests)
+    idempotency_request = IdempotencyRequest(request.headers.get('Idempotency-Key'), request.get_data())
+    response = property_creation_insertion_service.insert_properties_into_db(user_id, property_creation_requests,
+                                                                             idempotency_request=idempotency_request)
     return jsonify(response)
 
 
@@ -43,14 +53,48 @@ def insert_property_information_into_table(ctx,
 @token_required
 @inject
 def bulk_upload_property_information_from_csv(ctx,
-                                              property_creation_bulk_insertion_service=
-                                              Provide[Container.property_creation_bulk_insertion_service]):
+                                              bulk_upload_job_service=
+                                              Provide[Container.bulk_upload_job_service]):
     ctx.correlationId = request.headers.get('correlation-id', uuid.uuid4().__str__())
     logging.info(START_OF_METHOD)
     user_id = request.user_id
     property_creation_bulk_request = PropertyCreationBulkRequest(request.files)
-    response = property_creation_bulk_insertion_service.bulk_upload_properties_into_db(property_creation_bulk_request,
-                                                                                       user_id)
+    # The import runs on a background worker, the job status route reports its progress
+    response = bulk_upload_job_service.submit_bulk_upload(property_creation_bulk_request, user_id)
+    logging.info(END_OF_METHOD)
+    return jsonify(response), 202
+
+
+@property_routes_blueprint.route('/v1/properties/csv-bulk-upload/jobs', methods=['GET'])
+@mdc.with_mdc(domain='home-pulse', subdomain='/v1/properties')
+@csrf.exempt
+@token_required
+@inject
+def fetch_bulk_upload_jobs(ctx,
+                           bulk_upload_job_service=
+                           Provide[Container.bulk_upload_job_service]):
+    ctx.correlationId = request.headers.get('correlation-id', uuid.uuid4().__str__())
+    logging.info(START_OF_METHOD)
+    user_id = request.user_id
+    response = bulk_upload_job_service.fetch_recent_jobs(user_id)
+    logging.info(END_OF_METHOD)
+    return jsonify(response)
+
+
+@property_routes_blueprint.route('/v1/properties/csv-bulk-upload/jobs/<job_id>', methods=['GET'])
+@mdc.with_mdc(domain='home-pulse', subdomain='/v1/properties')
+@csrf.exempt
+@token_required
+@inject
+def fetch_bulk_upload_job(ctx,
+                          job_id,
+                          bulk_upload_job_service=
+                          Provide[Container.bulk_upload_job_service]):
+    ctx.correlationId = request.headers.get('correlation-id', uuid.uuid4().__str__())
+    logging.info(START_OF_METHOD)
+    user_id = request.user_id
+    bulk_upload_job_request = BulkUploadJobRequest(job_id)
+    response = bulk_upload_job_service.fetch_job(bulk_upload_job_request.job_id, user_id)
     logging.info(END_OF_METHOD)
     return jsonify(response)
 
@@ -66,7 +110,60 @@ def fetch_property_information_for_property_details(ctx,
     logging.info(START_OF_METHOD)
     ctx.correlationId = request.headers.get('correlation-id', uuid.uuid4().__str__())
     user_id = request.user_id
-    response = property_retrieval_service.fetch_property_information(user_id=user_id, retrieval_type='ALL')
+    # Without limit or after every property is returned in one body; with either, one page is returned and the
+    # next page is named in X-Next-Cursor
+    property_list_request = PropertyListRequest(request.args)
+    stream_request = StreamRequest(request.args, request.headers.get('Accept'))
+    if stream_request.response_format:
+        # Streams every property after the cursor, the page size and X-Next-Cursor only apply to the paged body
+        properties = property_retrieval_service.stream_properties(user_id=user_id,
+                                                                  after=property_list_request.after,
+                                                                  fields=property_list_request.fields)
+        logging.info(END_OF_METHOD)
+        return streamed_json_response(properties, stream_request.response_format)
+    properties, next_cursor = property_retrieval_service.fetch_property_page(user_id=user_id,
+                                                                             after=property_list_request.after,
+                                                                             limit=property_list_request.limit,
+                                                                             fields=property_list_request.fields)
+    response = jsonify(properties)
+    if next_cursor is not None:
+        response.headers['X-Next-Cursor'] = str(next_cursor)
+    logging.info(END_OF_METHOD)
+    return response
+
+
+@property_routes_blueprint.route('/v1/properties/portfolio', methods=['GET'])
+@mdc.with_mdc(domain='home-pulse', subdomain='/v1/properties')
+@csrf.exempt
+@token_required
+@inject
+def fetch_portfolio_components_for_property_overview(ctx,
+                                                     property_retrieval_service=
+                                                     Provide[Container.property_retrieval_service]):
+    logging.info(START_OF_METHOD)
+    ctx.correlationId = request.headers.get('correlation-id', uuid.uuid4().__str__())
+    user_id = request.user_id
+    stream_request = StreamRequest(request.args, request.headers.get('Accept'))
+    components = property_retrieval_service.stream_portfolio_components(user_id=user_id)
+    logging.info(END_OF_METHOD)
+    # Always streamed, the default JSON array carries the same body the buffered route returned
+    return streamed_json_response(components, stream_request.response_format or 'json')
+
+
+@property_routes_blueprint.route('/v1/properties/tenant-analytics', methods=['GET'])
+@mdc.with_mdc(domain='home-pulse', subdomain='/v1/properties')
+@csrf.exempt
+@token_required
+@inject
+def fetch_tenant_analytics_for_portfolio(ctx,
+                                         tenant_information_retrieval_service=
+                                         Provide[Container.tenant_information_retrieval_service]):
+    logging.info(START_OF_METHOD)
+    ctx.correlationId = request.headers.get('correlation-id', uuid.uuid4().__str__())
+    user_id = request.user_id
+    tenant_analytics_request = TenantAnalyticsRequest(request.args)
+    response = tenant_information_retrieval_service.fetch_tenant_analytics(user_id=user_id,
+                                                                           days=tenant_analytics_request.days)
     logging.info(END_OF_METHOD)
     return jsonify(response)
 
@@ -82,7 +179,30 @@ def fetch_single_property_for_property_details(ctx,
                                                Provide[Container.property_retrieval_service]):
     logging.info(START_OF_METHOD)
     ctx.correlationId = request.headers.get('correlation-id', uuid.uuid4().__str__())
-    response = property_retrieval_service.fetch_property_information(property_id=property_id, retrieval_type='SINGLE')
+    user_id = request.user_id
+    response = property_retrieval_service.fetch_property_information(user_id=user_id,
+                                                                     property_id=property_id,
+                                                                     retrieval_type='SINGLE')
+    logging.info(END_OF_METHOD)
+    return jsonify(response)
+
+
+@property_routes_blueprint.route('/v1/properties/<property_id>/details', methods=['GET'])
+@mdc.with_mdc(domain='home-pulse', subdomain='/v1/properties')
+@csrf.exempt
+@token_required
+@inject
+def fetch_property_details(ctx,
+                           property_id,
+                           property_detail_retrieval_service=
+                           Provide[Container.property_detail_retrieval_service]):
+    logging.info(START_OF_METHOD)
+    ctx.correlationId = request.headers.get('correlation-id', uuid.uuid4().__str__())
+    user_id = request.user_id
+    property_detail_request = PropertyDetailRequest(property_id, request.args)
+    response = property_detail_retrieval_service.fetch_property_details(user_id=user_id,
+                                                                        property_id=property_detail_request.property_id,
+                                                                        fields=property_detail_request.fields)
     logging.info(END_OF_METHOD)
     return jsonify(response)
 
@@ -98,7 +218,9 @@ def fetch_appliance_information_for_property_details(ctx,
                                                      Provide[Container.property_retrieval_service]):
     logging.info(START_OF_METHOD)
     ctx.correlationId = request.headers.get('correlation-id', uuid.uuid4().__str__())
-    response = property_retrieval_service.fetch_property_information(property_id=property_id,
+    user_id = request.user_id
+    response = property_retrieval_service.fetch_property_information(user_id=user_id,
+                                                                     property_id=property_id,
                                                                      retrieval_type='APPLIANCES')
     logging.info(END_OF_METHOD)
     return jsonify(response)
@@ -115,7 +237,9 @@ def fetch_structures_information_for_property_details(ctx,
                                                       Provide[Container.property_retrieval_service]):
     logging.info(START_OF_METHOD)
     ctx.correlationId = request.headers.get('correlation-id', uuid.uuid4().__str__())
-    response = property_retrieval_service.fetch_property_information(property_id=property_id,
+    user_id = request.user_id
+    response = property_retrieval_service.fetch_property_information(user_id=user_id,
+                                                                     property_id=property_id,
                                                                      retrieval_type='STRUCTURES')
     logging.info(END_OF_METHOD)
     return jsonify(response)
@@ -132,7 +256,9 @@ def fetch_tenant_information_for_dashboard(ctx,
                                            Provide[Container.tenant_information_retrieval_service]):
     logging.info(START_OF_METHOD)
     ctx.correlationId = request.headers.get('correlation-id', uuid.uuid4().__str__())
-    response = tenant_information_retrieval_service.fetch_tenant_information(property_id=property_id)
+    user_id = request.user_id
+    response = tenant_information_retrieval_service.fetch_tenant_information(property_id=property_id,
+                                                                             user_id=user_id)
     logging.info(END_OF_METHOD)
     return jsonify(response)
 
@@ -203,7 +329,8 @@ def update_tenant_information_for_dashboard(ctx,
     logging.info(START_OF_METHOD)
     ctx.correlationId = request.headers.get('correlation-id', uuid.uuid4().__str__())
     update_tenant_information_request = UpdateTenantInformationRequest(tenant_id, property_id, request.get_json())
-    response = tenant_information_update_service.update_tenant_information(update_tenant_information_request)
+    response = tenant_information_update_service.update_tenant_information(update_tenant_information_request,
+                                                                           user_id=request.user_id)
     logging.info(END_OF_METHOD)
     return jsonify(response)
 
@@ -235,7 +362,19 @@ def fetch_information_for_urgent_properties(ctx,
                                             Provide[Container.property_needs_attention_retrieval_service]):
     logging.info(START_OF_METHOD)
     ctx.correlationId = request.headers.get('correlation-id', uuid.uuid4().__str__())
-    response = property_needs_attention_retrieval_service.fetch_properties_that_need_attention(user_id)
+    needs_attention_request = NeedsAttentionRequest(request.args)
+    stream_request = StreamRequest(request.args, request.headers.get('Accept'))
+    if stream_request.response_format:
+        response, management_items = property_needs_attention_retrieval_service.stream_properties_that_need_attention(
+            user_id,
+            horizon_months=needs_attention_request.horizon_months)
+        logging.info(END_OF_METHOD)
+        return streamed_json_response(management_items, stream_request.response_format, head=response,
+                                      list_key='managementItems')
+    response = property_needs_attention_retrieval_service.fetch_properties_that_need_attention(
+        user_id,
+        horizon_months=needs_attention_request.horizon_months,
+        include_details=needs_attention_request.include_details)
     logging.info(END_OF_METHOD)
     return jsonify(response)
 
@@ -252,7 +391,8 @@ def insert_tenant_information_into_tenant_table(ctx,
     logging.info(START_OF_METHOD)
     ctx.correlationId = request.headers.get('correlation-id', uuid.uuid4().__str__())
     tenant_creation_request = TenantCreationRequest(property_id, request.get_json())
-    response = tenant_information_insertion_service.insert_tenant_information(tenant_creation_request)
+    response = tenant_information_insertion_service.insert_tenant_information(tenant_creation_request,
+                                                                              user_id=request.user_id)
     logging.info(END_OF_METHOD)
     return jsonify(response)
 
@@ -365,6 +505,15 @@ def fetch_property_notes(ctx,
     user_id = request.user_id
     entity_type = request.args.get('entityType')
     entity_id = request.args.get('entityId')
+    stream_request = StreamRequest(request.args, request.headers.get('Accept'))
+    if stream_request.response_format:
+        notes = property_note_retrieval_service.stream_property_notes_with_content(
+            property_id=property_id,
+            user_id=user_id,
+            entity_type=entity_type,
+            entity_id=entity_id)
+        logging.info(END_OF_METHOD)
+        return streamed_json_response(notes, stream_request.response_format, head={}, list_key='notes')
     response = property_note_retrieval_service.fetch_property_notes_with_content(
         property_id=property_id,
         user_id=user_id,
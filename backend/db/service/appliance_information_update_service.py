@@ -1,9 +1,9 @@
 import logging
-from common.logging.error.error import Error
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
-from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR
 import datetime
-from backend.db.model.query.sql_statements import UPDATE_APPLIANCE_INFORMATION_BULK
+from backend.db.client.connection_lease import acquire_connection, connection_lease
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
+from backend.db.service.component_due_index_maintenance_service import ComponentDueIndexMaintenanceService
 
 
 class ApplianceInformationUpdateService:
@@ -17,11 +17,11 @@ class ApplianceInformationUpdateService:
         :return: python dict, the response
         """
         logging.info(START_OF_METHOD)
-        cnx = self.obtain_connection()
-        put_record_status = self.execute_update_statement_for_appliance_table(
-            cnx=cnx,
-            property_id=update_appliance_information_request.property_id,
-            appliance_updates=update_appliance_information_request.appliance_updates)
+        with connection_lease(self.obtain_connection()) as cnx:
+            put_record_status = self.execute_update_statement_for_appliance_table(
+                cnx=cnx,
+                property_id=update_appliance_information_request.property_id,
+                appliance_updates=update_appliance_information_request.appliance_updates)
         response = {'putRecordStatus': put_record_status}
         logging.info(END_OF_METHOD)
         return response
@@ -41,10 +41,11 @@ class ApplianceInformationUpdateService:
             update_execute_many_data = cls.construct_execute_many_data_object(
                 property_id=property_id,
                 appliance_updates=appliance_updates)
-            cursor = cnx.cursor()
-            cursor.executemany(UPDATE_APPLIANCE_INFORMATION_BULK, update_execute_many_data)
-            cnx.commit()
-            cursor.close()
+            HpAIDbRepository.execute_many(
+                cnx=cnx,
+                statement_name='UPDATE_APPLIANCE_INFORMATION_BULK',
+                seq_params=update_execute_many_data)
+            ComponentDueIndexMaintenanceService.refresh_component_due_index(cnx=cnx, property_ids=[property_id])
             logging.info(END_OF_METHOD)
             return put_record_status
         except Exception as e:
@@ -80,11 +81,4 @@ class ApplianceInformationUpdateService:
         return items
 
     def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        return acquire_connection(self.pool)
@@ -0,0 +1,276 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import logging
+import tempfile
+import threading
+import collections
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.datastructures import FileStorage
+from common.logging.error.error import Error
+from common.logging.error.error_messages import (INTERNAL_SERVICE_ERROR, BULK_UPLOAD_JOB_NOT_FOUND,
+                                                 TOO_MANY_BULK_UPLOAD_JOBS)
+from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
+from backend.db.model.bulk_import_progress import BulkImportProgress
+from backend.db.model.property_creation_bulk_request import PropertyCreationBulkRequest
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_ACTIVE_JOBS_PER_USER = 2
+# Progress is written to the job table at most this often, the final counts are written when the job finishes
+PROGRESS_WRITE_INTERVAL_SECONDS = 1.0
+# Every instance refreshes the heartbeat of its queued and running jobs this often, a job whose heartbeat is older
+# than STALE_JOB_SECONDS belongs to an instance that stopped and is failed by the next instance to start
+HEARTBEAT_INTERVAL_SECONDS = 15.0
+STALE_JOB_SECONDS = 120.0
+SPOOL_COPY_BUFFER_BYTES = 1024 * 1024
+INTERRUPTED_JOB_MESSAGE = 'The server restarted before the upload finished. Please upload the file again.'
+
+
+class BulkUploadJobService:
+    def __init__(self, hp_ai_db_connection_pool, property_creation_bulk_insertion_service, bulk_upload_job_store,
+                 workers=None, max_active_jobs_per_user=None, spool_directory=None):
+        """
+        Runs bulk CSV uploads on background worker threads, so the upload route answers with a job id at once
+        instead of holding a server thread for the whole import. Jobs run in this process, which keeps their
+        heartbeat fresh while they are queued or running; create_app fails the jobs of instances that stopped
+        :param hp_ai_db_connection_pool: HpAIDbConnectionPool, told about the user's write when a job commits
+        :param property_creation_bulk_insertion_service: PropertyCreationBulkInsertionService, runs the import
+        :param bulk_upload_job_store: BulkUploadJobStore, where the job status is kept
+        :param workers: python int or None, how many uploads are imported at once
+        :param max_active_jobs_per_user: python int or None, how many queued or running uploads a user may have
+        :param spool_directory: python str or None, where uploads wait for a worker, None for the system default
+        """
+        self.hp_ai_db_connection_pool = hp_ai_db_connection_pool
+        self.bulk_insertion_service = property_creation_bulk_insertion_service
+        self.job_store = bulk_upload_job_store
+        self.max_active_jobs_per_user = int(max_active_jobs_per_user or DEFAULT_MAX_ACTIVE_JOBS_PER_USER)
+        self.spool_directory = spool_directory or None
+        self.executor = ThreadPoolExecutor(max_workers=int(workers or DEFAULT_WORKERS),
+                                           thread_name_prefix='bulk_upload_job')
+        self.instance_id = str(uuid.uuid4())
+        self._lock = threading.Lock()
+        self._active_jobs = collections.Counter()
+        self._stopped = threading.Event()
+        self._heartbeat = threading.Thread(target=self.record_heartbeats, name='bulk_upload_job_heartbeat',
+                                           daemon=True)
+        self._heartbeat.start()
+
+    def submit_bulk_upload(self, bulk_insertion_request, user_id):
+        """
+        Queues the upload for a worker. The file is copied to a spool file first, the request's stream is closed
+        once the route returns
+        :param bulk_insertion_request: PropertyCreationBulkRequest
+        :param user_id: The ID of the user uploading properties
+        :return: python dict, the response for the route
+        """
+        logging.info(START_OF_METHOD)
+        self.reserve_job_slot(user_id)
+        job_id = str(uuid.uuid4())
+        spool_path = None
+        try:
+            spool_path = self.spool_upload(bulk_insertion_request.content)
+            self.job_store.create_job(job_id, user_id, bulk_insertion_request.file_name, self.instance_id)
+            self.executor.submit(self.run_job, job_id, user_id, spool_path, bulk_insertion_request.file_name)
+        except Exception as e:
+            self.release_job_slot(user_id)
+            self.remove_spool_file(spool_path)
+            if isinstance(e, Error):
+                raise
+            logging.error('There was an issue queueing the bulk upload',
+                          exc_info=True,
+                          extra={'information': {'error': str(e)}})
+            raise Error(INTERNAL_SERVICE_ERROR)
+        logging.info(END_OF_METHOD)
+        return {'jobId': job_id, 'status': 'queued'}
+
+    def run_job(self, job_id, user_id, spool_path, file_name):
+        """
+        Imports a spooled upload on a worker thread, recording its progress and outcome in the job table
+        """
+        progress = BulkImportProgress()
+        status = 'failed'
+        try:
+            if not self.job_store.mark_running(job_id):
+                logging.warning('The bulk upload job was no longer queued when a worker picked it up',
+                                extra={'information': {'jobId': job_id}})
+                return
+            with open(spool_path, 'rb') as content:
+                bulk_insertion_request = PropertyCreationBulkRequest(
+                    {'file': FileStorage(stream=content, filename=file_name)})
+                self.bulk_insertion_service.bulk_upload_properties_into_db(
+                    bulk_insertion_request, user_id, progress=progress,
+                    progress_callback=self.progress_writer(job_id))
+            # Keeps the user's next reads on the primary, the upload route's own write was recorded long ago
+            self.hp_ai_db_connection_pool.record_write(user_id)
+            status = 'succeeded'
+        except Error as e:
+            if not progress.errors:
+                progress.record_error(e.message)
+        except Exception as e:
+            logging.error('There was an issue running the bulk upload job',
+                          exc_info=True,
+                          extra={'information': {'jobId': job_id, 'error': str(e)}})
+            if not progress.errors:
+                progress.record_error(INTERNAL_SERVICE_ERROR.message)
+        finally:
+            self.remove_spool_file(spool_path)
+            self.release_job_slot(user_id)
+        try:
+            if not self.job_store.finish_job(job_id, status, progress):
+                logging.warning('The bulk upload job had already been failed as interrupted, its outcome is not kept',
+                                extra={'information': {'jobId': job_id, 'status': status}})
+                return
+            logging.info('Finished a bulk upload job',
+                         extra={'information': {'jobId': job_id, 'status': status, **progress.as_dict()}})
+        except Exception as e:
+            logging.error('There was an issue recording the outcome of the bulk upload job',
+                          exc_info=True,
+                          extra={'information': {'jobId': job_id, 'status': status, 'error': str(e)}})
+
+    def progress_writer(self, job_id):
+        """
+        A progress callback that writes the job's counts to the job table, at most every
+        PROGRESS_WRITE_INTERVAL_SECONDS. A failed write is logged and does not stop the import
+        :return: python callable taking a BulkImportProgress
+        """
+        last_write = [0.0]
+
+        def write_progress(progress):
+            now = time.monotonic()
+            if now - last_write[0] < PROGRESS_WRITE_INTERVAL_SECONDS:
+                return
+            last_write[0] = now
+            try:
+                self.job_store.record_progress(job_id, progress)
+            except Exception as e:
+                logging.warning('There was an issue recording the progress of the bulk upload job',
+                                extra={'information': {'jobId': job_id, 'error': str(e)}})
+        return write_progress
+
+    def fetch_job(self, job_id, user_id):
+        """
+        Reads the status of one of the user's upload jobs
+        :param job_id: python str, the id the upload route answered with
+        :param user_id: The ID of the user
+        :return: python dict, the response for the route
+        """
+        logging.info(START_OF_METHOD)
+        row = self.job_store.fetch_job(job_id, user_id)
+        if row is None:
+            raise Error(BULK_UPLOAD_JOB_NOT_FOUND)
+        logging.info(END_OF_METHOD)
+        return self.format_job(row)
+
+    def fetch_recent_jobs(self, user_id):
+        """
+        Reads the user's most recent upload jobs, newest first
+        :return: python dict, the response for the route
+        """
+        logging.info(START_OF_METHOD)
+        jobs = [self.format_job(row) for row in self.job_store.fetch_recent_jobs(user_id)]
+        logging.info(END_OF_METHOD)
+        return {'jobs': jobs}
+
+    def fail_interrupted_jobs(self, stale_after_seconds=STALE_JOB_SECONDS):
+        """
+        Fails the queued or running jobs whose instance stopped refreshing their heartbeat, called once by
+        create_app when the server starts. Jobs of other live instances keep a fresh heartbeat and are left alone
+        :param stale_after_seconds: python float, how old a heartbeat may be before its job counts as interrupted
+        :return: python int, the jobs failed
+        """
+        try:
+            failed = self.job_store.fail_interrupted_jobs([{'firstRow': None, 'lastRow': None,
+                                                            'message': INTERRUPTED_JOB_MESSAGE}],
+                                                          stale_after_seconds)
+            if failed:
+                logging.warning(f'Failed {failed} bulk upload jobs interrupted by a restart')
+            return failed
+        except Exception as e:
+            logging.error('There was an issue failing the interrupted bulk upload jobs',
+                          exc_info=True,
+                          extra={'information': {'error': str(e)}})
+            return 0
+
+    def record_heartbeats(self):
+        """
+        Runs on the heartbeat thread, refreshing the heartbeat of this instance's jobs while it has any
+        """
+        while not self._stopped.wait(HEARTBEAT_INTERVAL_SECONDS):
+            with self._lock:
+                has_jobs = bool(self._active_jobs)
+            if not has_jobs:
+                continue
+            try:
+                self.job_store.record_heartbeats(self.instance_id)
+            except Exception as e:
+                logging.warning('There was an issue recording the heartbeat of the bulk upload jobs',
+                                extra={'information': {'error': str(e)}})
+
+    def shutdown(self, wait=True):
+        """
+        Stops the heartbeat and the workers, waiting for the running jobs when wait is True
+        """
+        self.executor.shutdown(wait=wait)
+        self._stopped.set()
+
+    def reserve_job_slot(self, user_id):
+        with self._lock:
+            if self._active_jobs[user_id] >= self.max_active_jobs_per_user:
+                logging.error('The user has too many bulk uploads in progress',
+                              extra={'information': {'activeJobs': self._active_jobs[user_id]}})
+                raise Error(TOO_MANY_BULK_UPLOAD_JOBS)
+            self._active_jobs[user_id] += 1
+
+    def release_job_slot(self, user_id):
+        with self._lock:
+            self._active_jobs[user_id] -= 1
+            if self._active_jobs[user_id] <= 0:
+                del self._active_jobs[user_id]
+
+    def spool_upload(self, content):
+        """
+        Copies the upload to a file that outlives the request
+        :param content: The binary stream of the upload
+        :return: python str, the path of the spool file
+        """
+        spool_file = tempfile.NamedTemporaryFile(prefix='bulk_upload_', suffix='.csv', dir=self.spool_directory,
+                                                 delete=False)
+        try:
+            with spool_file:
+                shutil.copyfileobj(content, spool_file, SPOOL_COPY_BUFFER_BYTES)
+        except Exception:
+            self.remove_spool_file(spool_file.name)
+            raise
+        return spool_file.name
+
+    @staticmethod
+    def remove_spool_file(spool_path):
+        if spool_path is None:
+            return
+        try:
+            os.remove(spool_path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def format_job(row):
+        """
+        Formats a bulk_upload_jobs row for the job status routes. rowsWritten counts the rows written inside the
+        import's transaction, they are only saved once the status is succeeded
+        :param row: python tuple, as selected by SELECT_BULK_UPLOAD_JOB_BY_ID_FOR_USER
+        :return: python dict
+        """
+        return {
+            'jobId': row[0],
+            'status': row[1],
+            'fileName': row[2],
+            'rowsWritten': int(row[3]),
+            'chunksWritten': int(row[4]),
+            'rowsPerSecond': float(row[5]),
+            'errors': json.loads(row[6]) if row[6] else [],
+            'createdAt': str(row[7]) if row[7] is not None else None,
+            'startedAt': str(row[8]) if row[8] is not None else None,
+            'finishedAt': str(row[9]) if row[9] is not None else None
+        }
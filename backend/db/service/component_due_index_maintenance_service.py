@@ -0,0 +1,34 @@
+import logging
+from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
+
+
+class ComponentDueIndexMaintenanceService:
+
+    @staticmethod
+    def refresh_component_due_index(cnx, property_ids, commit=True):
+        """
+        Rebuilds the component_due_index rows of the given properties from their appliances and structures. Callers
+        run it on the connection that wrote the components, before committing, so the index changes with them
+        :param cnx: The MySQLConnectionPool connection
+        :param property_ids: python iterable, the internal ids of the properties whose components were written
+        :param commit: python bool, True to commit the connection once the rows are rebuilt
+        """
+        logging.info(START_OF_METHOD)
+        seq_params = [(property_id,) for property_id in dict.fromkeys(property_ids)]
+        if not seq_params:
+            # Callers commit their own writes through this call, so the commit is kept without properties
+            if commit:
+                cnx.commit()
+            logging.info(END_OF_METHOD)
+            return
+        HpAIDbRepository.execute_many(
+            cnx=cnx,
+            statement_name='DELETE_COMPONENT_DUE_INDEX_BY_PROPERTY_ID',
+            seq_params=seq_params)
+        HpAIDbRepository.execute_many(
+            cnx=cnx,
+            statement_name='INSERT_COMPONENT_DUE_INDEX_BY_PROPERTY_ID',
+            seq_params=[(property_id, property_id) for (property_id,) in seq_params],
+            commit=commit)
+        logging.info(END_OF_METHOD)
@@ -9,11 +9,8 @@ from common.logging.error.error_messages import (INVALID_PASSWORD,
                                                  USER_NOT_FOUND,
                                                  INTERNAL_SERVICE_ERROR,
                                                  INVALID_CUSTOMER)
-from backend.db.model.query.sql_statements import (SELECT_CUSTOMER_FOR_AUTHENTICATION,
-                                                   SELECT_CUSTOMER_EMAIL_FIRST_AND_LAST,
-                                                   SELECT_IS_PAID_STATUS_FOR_CUSTOMER,
-                                                   SELECT_COMPANY_STATUS,
-                                                   SELECT_SUBSCRIPTION_STATUS)
+from backend.db.client.connection_lease import acquire_connection, connection_lease
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
 
 bcrypt = Bcrypt()
 
@@ -31,19 +28,18 @@ class CustomerAuthenticationService:
         :return:
         """
         logging.info(START_OF_METHOD)
-        cnx = self.obtain_connection()
-        user_results = self.fetch_user_email_and_password_for_authentication(
-            cnx=cnx,
-            email=email)
-        formatted_user_results = self.format_user_information_results(
-            user_results=user_results)
-        self._validate_customer(cnx=cnx,
-                                user_id=formatted_user_results['user_id'],
-                                company_id=formatted_user_results['company_id'])
+        with connection_lease(self.obtain_connection()) as cnx:
+            user_results = self.fetch_user_email_and_password_for_authentication(
+                cnx=cnx,
+                email=email)
+            formatted_user_results = self.format_user_information_results(
+                user_results=user_results)
+            self._validate_customer(cnx=cnx,
+                                    user_id=formatted_user_results['user_id'],
+                                    company_id=formatted_user_results['company_id'])
         valid_jwt_token = self.generate_valid_jwt_token(
             password=password,
             formatted_user_results=formatted_user_results)
-        cnx.close()
         response = {"token": valid_jwt_token,
                     "user": {"id": formatted_user_results['user_id'],
                              "email": formatted_user_results['user_email']}}
@@ -59,14 +55,13 @@ class CustomerAuthenticationService:
         logging.info(START_OF_METHOD)
         session = stripe.checkout.Session.retrieve(session_id)
         user_id = session.metadata.get("userId")
-        cnx = self.obtain_connection()
-        is_paid_status_information = self.fetch_is_paid_status_for_customer(
-            cnx=cnx,
-            user_id=user_id)
+        with connection_lease(self.obtain_connection()) as cnx:
+            is_paid_status_information = self.fetch_is_paid_status_for_customer(
+                cnx=cnx,
+                user_id=user_id)
         response = self.format_response_for_post_login(
             user_id=user_id,
             is_paid_status_information=is_paid_status_information)
-        cnx.close()
         logging.info(END_OF_METHOD)
         return response
 
@@ -79,18 +74,12 @@ class CustomerAuthenticationService:
         :return: python list
         """
         logging.info(START_OF_METHOD)
-        try:
-            cursor = cnx.cursor()
-            cursor.execute(SELECT_CUSTOMER_FOR_AUTHENTICATION, [email])
-            user_results = cursor.fetchall()
-            cursor.close()
-            logging.info(END_OF_METHOD)
-            return user_results
-        except Exception as e:
-            logging.error('An issue occurred retrieving customer info for authentication',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        user_results = HpAIDbRepository.fetch_all(
+            cnx=cnx,
+            statement_name='SELECT_CUSTOMER_FOR_AUTHENTICATION',
+            params=[email])
+        logging.info(END_OF_METHOD)
+        return user_results
 
     def generate_valid_jwt_token_after_payment(self, cnx, user_id):
         """
@@ -126,18 +115,12 @@ class CustomerAuthenticationService:
         :return: python dict
         """
         logging.info(START_OF_METHOD)
-        try:
-            cursor = cnx.cursor()
-            cursor.execute(SELECT_CUSTOMER_EMAIL_FIRST_AND_LAST, [user_id])
-            user_results = cursor.fetchall()
-            cursor.close()
-            logging.info(END_OF_METHOD)
-            return user_results
-        except Exception as e:
-            logging.error('An issue occurred retrieving customer info for authentication',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        user_results = HpAIDbRepository.fetch_all(
+            cnx=cnx,
+            statement_name='SELECT_CUSTOMER_EMAIL_FIRST_AND_LAST',
+            params=[user_id])
+        logging.info(END_OF_METHOD)
+        return user_results
 
     @staticmethod
     def format_user_information_results(user_results):
@@ -169,10 +152,10 @@ class CustomerAuthenticationService:
         :return:
         """
         logging.info(START_OF_METHOD)
-        cursor = cnx.cursor()
-        cursor.execute(SELECT_IS_PAID_STATUS_FOR_CUSTOMER, [user_id])
-        table = cursor.fetchall()
-        cursor.close()
+        table = HpAIDbRepository.fetch_all(
+            cnx=cnx,
+            statement_name='SELECT_IS_PAID_STATUS_FOR_CUSTOMER',
+            params=[user_id])
         if table:
             is_paid_status_information = {
                 'is_paid': table[0][0],
@@ -195,10 +178,11 @@ class CustomerAuthenticationService:
         """
         logging.info(START_OF_METHOD)
         try:
-            cursor = cnx.cursor()
             if company_id:
-                cursor.execute(SELECT_COMPANY_STATUS, [company_id])
-                table = cursor.fetchall()
+                table = HpAIDbRepository.fetch_all(
+                    cnx=cnx,
+                    statement_name='SELECT_COMPANY_STATUS',
+                    params=[company_id])
                 if not table:
                     logging.error('The company associated with this customer could not be found')
                     raise Error(INVALID_CUSTOMER)
@@ -207,8 +191,10 @@ class CustomerAuthenticationService:
                     logging.error('The company associated with this customer is invalid')
                     raise Error(INVALID_CUSTOMER)
             else:
-                cursor.execute(SELECT_SUBSCRIPTION_STATUS, [user_id])
-                table = cursor.fetchall()
+                table = HpAIDbRepository.fetch_all(
+                    cnx=cnx,
+                    statement_name='SELECT_SUBSCRIPTION_STATUS',
+                    params=[user_id])
                 if not table:
                     logging.error('The subscription status of this user could not be found')
                     raise Error(INVALID_CUSTOMER)
@@ -217,7 +203,6 @@ class CustomerAuthenticationService:
                 if status != 'active' or period_end < datetime.datetime.now():
                     logging.error('The customer is either expired or inactive')
                     raise Error(INVALID_CUSTOMER)
-            cursor.close()
         except Exception as e:
             logging.error('An error occurred attempting to validate the customer',
                           exc_info=True,
@@ -225,14 +210,7 @@ class CustomerAuthenticationService:
             raise Error(INTERNAL_SERVICE_ERROR)
 
     def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        return acquire_connection(self.pool)
 
     def generate_valid_jwt_token(self, password, formatted_user_results):
         """
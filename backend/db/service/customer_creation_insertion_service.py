@@ -7,12 +7,8 @@ from common.logging.error.error import Error
 from dateutil.relativedelta import relativedelta
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
 from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR, INVALID_INVITATION
-from backend.db.model.query.sql_statements import (INSERT_SUBSCRIPTION_INFORMATION,
-                                                   UPDATE_INVITATION_INFORMATION,
-                                                   SELECT_COMPANY_STATUS,
-                                                   INSERT_CUSTOMER_INTO_USER_TABLE,
-                                                   SELECT_CUSTOMER_FROM_USER_TABLE,
-                                                   SELECT_INVITATION_INFORMATION)
+from backend.db.client.connection_lease import acquire_connection, connection_lease
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
 
 bcrypt = Bcrypt()
 
@@ -29,43 +25,42 @@ class CustomerCreationInsertionService:
         :return: python dict
         """
         logging.info(START_OF_METHOD)
-        cnx = self.obtain_connection()
-        hashed_password = self.perform_password_hash(
-            password=customer_creation_request.password)
-        if customer_creation_request.token:
-            invitation_information = self.fetch_invitation_information(
-                cnx=cnx,
-                email=customer_creation_request.email,
-                token=customer_creation_request.token)
-            company_id = invitation_information['company_id']
-            insert_record_status = self.execute_insertion_statement_for_user_table(
-                cnx=cnx,
-                email=customer_creation_request.email,
-                hashed_password=hashed_password,
-                company_id=company_id)
-            put_record_status = self.execute_update_statement_for_invitation_table(
-                cnx=cnx,
-                email=customer_creation_request.email)
-            table_response = self.fetch_user_for_table_response(
-                cnx=cnx,
-                email=customer_creation_request.email)
-            stripe_checkout_session_response = {'url': 'licensed_user'}
-            insert_subscription_status = 201
-        else:
-            insert_record_status = self.execute_insertion_statement_for_user_table(
-                cnx=cnx,
-                email=customer_creation_request.email,
-                hashed_password=hashed_password)
-            table_response = self.fetch_user_for_table_response(
-                cnx=cnx,
-                email=customer_creation_request.email)
-            insert_subscription_status = self.execute_insertion_statement_for_subscription_table(
-                cnx=cnx,
-                table_response=table_response)
-            put_record_status = 201
-            stripe_checkout_session_response = self.format_stripe_checkout_session_request(
-                table_response=table_response)
-        cnx.close()
+        with connection_lease(self.obtain_connection()) as cnx:
+            hashed_password = self.perform_password_hash(
+                password=customer_creation_request.password)
+            if customer_creation_request.token:
+                invitation_information = self.fetch_invitation_information(
+                    cnx=cnx,
+                    email=customer_creation_request.email,
+                    token=customer_creation_request.token)
+                company_id = invitation_information['company_id']
+                insert_record_status = self.execute_insertion_statement_for_user_table(
+                    cnx=cnx,
+                    email=customer_creation_request.email,
+                    hashed_password=hashed_password,
+                    company_id=company_id)
+                put_record_status = self.execute_update_statement_for_invitation_table(
+                    cnx=cnx,
+                    email=customer_creation_request.email)
+                table_response = self.fetch_user_for_table_response(
+                    cnx=cnx,
+                    email=customer_creation_request.email)
+                stripe_checkout_session_response = {'url': 'licensed_user'}
+                insert_subscription_status = 201
+            else:
+                insert_record_status = self.execute_insertion_statement_for_user_table(
+                    cnx=cnx,
+                    email=customer_creation_request.email,
+                    hashed_password=hashed_password)
+                table_response = self.fetch_user_for_table_response(
+                    cnx=cnx,
+                    email=customer_creation_request.email)
+                insert_subscription_status = self.execute_insertion_statement_for_subscription_table(
+                    cnx=cnx,
+                    table_response=table_response)
+                put_record_status = 201
+                stripe_checkout_session_response = self.format_stripe_checkout_session_request(
+                    table_response=table_response)
         response = self.format_customer_creation_insertion_response(
             table_response=table_response,
             stripe_checkout_session_response=stripe_checkout_session_response)
@@ -92,10 +87,11 @@ class CustomerCreationInsertionService:
                 cnx=cnx,
                 company_id=company_id)
         try:
-            cursor = cnx.cursor()
-            cursor.execute(INSERT_CUSTOMER_INTO_USER_TABLE, [email, hashed_password, 'abc123', 0, company_id])
-            cnx.commit()
-            cursor.close()
+            HpAIDbRepository.execute(
+                cnx=cnx,
+                statement_name='INSERT_CUSTOMER_INTO_USER_TABLE',
+                params=[email, hashed_password, 'abc123', 0, company_id],
+                commit=True)
         except Exception as e:
             logging.error('An error occurred inserting a customer into the user table',
                           extra={'information': {'error': str(e)}},
@@ -118,10 +114,11 @@ class CustomerCreationInsertionService:
         end_date = datetime.strftime(datetime.now(tz=ZoneInfo('America/Chicago')) + relativedelta(months=1),
                                      '%Y-%m-%d %H:%M:%S')
         try:
-            cursor = cnx.cursor()
-            cursor.execute(INSERT_SUBSCRIPTION_INFORMATION, [user_id, 'past_due', end_date])
-            cnx.commit()
-            cursor.close()
+            HpAIDbRepository.execute(
+                cnx=cnx,
+                statement_name='INSERT_SUBSCRIPTION_INFORMATION',
+                params=[user_id, 'past_due', end_date],
+                commit=True)
             logging.info(END_OF_METHOD)
             return insert_subscription_status
         except Exception as e:
@@ -142,9 +139,11 @@ class CustomerCreationInsertionService:
         put_record_status = 200
         try:
             current_time = datetime.strftime(datetime.now(tz=ZoneInfo('America/Chicago')), '%Y-%m-%d %H:%M:%S')
-            cursor = cnx.cursor()
-            cursor.execute(UPDATE_INVITATION_INFORMATION, [current_time, email])
-            cnx.commit()
+            HpAIDbRepository.execute(
+                cnx=cnx,
+                statement_name='UPDATE_INVITATION_INFORMATION',
+                params=[current_time, email],
+                commit=True)
             logging.info(END_OF_METHOD)
             return put_record_status
         except Exception as e:
@@ -164,10 +163,10 @@ class CustomerCreationInsertionService:
         """
         logging.info(START_OF_METHOD)
         try:
-            cursor = cnx.cursor()
-            cursor.execute(SELECT_INVITATION_INFORMATION, [token])
-            table = cursor.fetchall()
-            cursor.close()
+            table = HpAIDbRepository.fetch_all(
+                cnx=cnx,
+                statement_name='SELECT_INVITATION_INFORMATION',
+                params=[token])
             invitation_information = cls.format_invitation_table_response(
                 email=email,
                 table=table)
@@ -218,10 +217,10 @@ class CustomerCreationInsertionService:
         """
         logging.info(START_OF_METHOD)
         try:
-            cursor = cnx.cursor()
-            cursor.execute(SELECT_COMPANY_STATUS, [company_id])
-            table = cursor.fetchall()
-            cursor.close()
+            table = HpAIDbRepository.fetch_all(
+                cnx=cnx,
+                statement_name='SELECT_COMPANY_STATUS',
+                params=[company_id])
             if not table:
                 logging.error('The company_id assigned to this customer no longer has an active license')
                 raise Error(INVALID_INVITATION)
@@ -243,9 +242,10 @@ class CustomerCreationInsertionService:
         """
         logging.info(START_OF_METHOD)
         try:
-            cursor = cnx.cursor()
-            cursor.execute(SELECT_CUSTOMER_FROM_USER_TABLE, [email])
-            table = cursor.fetchall()
+            table = HpAIDbRepository.fetch_all(
+                cnx=cnx,
+                statement_name='SELECT_CUSTOMER_FROM_USER_TABLE',
+                params=[email])
             response = {
                 'id': table[0][0],
                 'email': table[0][1],
@@ -256,7 +256,6 @@ class CustomerCreationInsertionService:
                 'firstName': table[0][6],
                 'lastName': table[0][7]
             }
-            cursor.close()
             logging.info(END_OF_METHOD)
             return response
         except Exception as e:
@@ -295,14 +294,7 @@ class CustomerCreationInsertionService:
         return response
 
     def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        return acquire_connection(self.pool)
 
     def format_stripe_checkout_session_request(self, table_response):
         """
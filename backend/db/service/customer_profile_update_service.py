@@ -4,7 +4,8 @@ from common.logging.error.error import Error
 import datetime
 import jwt
 from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR
-from backend.db.model.query.sql_statements import UPDATE_FIRST_AND_LAST_OF_CUSTOMER, SELECT_CUSTOMER_FIRST_AND_LAST
+from backend.db.client.connection_lease import acquire_connection, connection_lease
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
 
 
 class CustomerProfileUpdateService:
@@ -21,20 +22,19 @@ class CustomerProfileUpdateService:
         :return: python dict
         """
         logging.info(START_OF_METHOD)
-        cnx = self.obtain_connection()
-        put_record_status = self.execute_update_statement_for_profile_names(
-            cnx=cnx,
-            user_id=user_id,
-            first_name=first_name,
-            last_name=last_name)
-        response = self.fetch_updated_profile_for_response(
-            cnx=cnx,
-            user_id=user_id,
-            put_record_status=put_record_status)
+        with connection_lease(self.obtain_connection()) as cnx:
+            put_record_status = self.execute_update_statement_for_profile_names(
+                cnx=cnx,
+                user_id=user_id,
+                first_name=first_name,
+                last_name=last_name)
+            response = self.fetch_updated_profile_for_response(
+                cnx=cnx,
+                user_id=user_id,
+                put_record_status=put_record_status)
         refreshed_token = self.generate_refreshed_profile_jwt_token(
             secret_key=self.secret_key,
             response=response)
-        cnx.close()
         logging.info(END_OF_METHOD)
         return refreshed_token
 
@@ -49,18 +49,13 @@ class CustomerProfileUpdateService:
         """
         logging.info(START_OF_METHOD)
         put_record_status = 200
-        try:
-            cursor = cnx.cursor()
-            cursor.execute(UPDATE_FIRST_AND_LAST_OF_CUSTOMER, [first_name, last_name, user_id])
-            cnx.commit()
-            cursor.close()
-            logging.info(END_OF_METHOD)
-            return put_record_status
-        except Exception as e:
-            logging.error('An issue occurred updating the first and last name of a customer in our system',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        HpAIDbRepository.execute(
+            cnx=cnx,
+            statement_name='UPDATE_FIRST_AND_LAST_OF_CUSTOMER',
+            params=[first_name, last_name, user_id],
+            commit=True)
+        logging.info(END_OF_METHOD)
+        return put_record_status
 
     @staticmethod
     def fetch_updated_profile_for_response(cnx, user_id, put_record_status):
@@ -72,10 +67,11 @@ class CustomerProfileUpdateService:
         :return:
         """
         logging.info(START_OF_METHOD)
+        result = HpAIDbRepository.fetch_all(
+            cnx=cnx,
+            statement_name='SELECT_CUSTOMER_FIRST_AND_LAST',
+            params=[user_id])
         try:
-            cursor = cnx.cursor()
-            cursor.execute(SELECT_CUSTOMER_FIRST_AND_LAST, [user_id])
-            result = cursor.fetchall()
             response = {
                 'firstName': result[0][0],
                 'lastName': result[0][1],
@@ -112,11 +108,4 @@ class CustomerProfileUpdateService:
         return {"token": refreshed_jwt_token}
 
     def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        return acquire_connection(self.pool)
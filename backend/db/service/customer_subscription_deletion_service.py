@@ -1,8 +1,9 @@
 import logging
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
 from common.logging.error.error import Error
-from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR, DELETION_ISSUE
-from backend.db.model.query.sql_statements import SELECT_STRIPE_CUSTOMER_ID
+from common.logging.error.error_messages import DELETION_ISSUE
+from backend.db.client.connection_lease import acquire_connection, connection_lease
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
 
 
 class CustomerSubscriptionDeletionService:
@@ -17,10 +18,10 @@ class CustomerSubscriptionDeletionService:
         :return:
         """
         logging.info(START_OF_METHOD)
-        cnx = self.obtain_connection()
-        stripe_customer_id = self.fetch_stripe_customer_id_for_deletion(
-            cnx=cnx,
-            user_id=user_id)
+        with connection_lease(self.obtain_connection()) as cnx:
+            stripe_customer_id = self.fetch_stripe_customer_id_for_deletion(
+                cnx=cnx,
+                user_id=user_id)
         deletion_status = self.stripe_deletion_service.delete_subscription_for_customer(
             stripe_customer_id=stripe_customer_id)
         response = {'deletionStatus': deletion_status}
@@ -37,9 +38,10 @@ class CustomerSubscriptionDeletionService:
         """
         logging.info(START_OF_METHOD)
         try:
-            cursor = cnx.cursor()
-            cursor.execute(SELECT_STRIPE_CUSTOMER_ID, [user_id])
-            table = cursor.fetchall()
+            table = HpAIDbRepository.fetch_all(
+                cnx=cnx,
+                statement_name='SELECT_STRIPE_CUSTOMER_ID',
+                params=[user_id])
             stripe_customer_id = table[0][0]
             logging.info(END_OF_METHOD)
             return stripe_customer_id
@@ -50,11 +52,4 @@ class CustomerSubscriptionDeletionService:
             raise Error(DELETION_ISSUE)
 
     def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        return acquire_connection(self.pool)
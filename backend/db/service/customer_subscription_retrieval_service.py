@@ -2,7 +2,8 @@ import logging
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
 from common.logging.error.error import Error
 from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR, INVALID_CUSTOMER
-from backend.db.model.query.sql_statements import SELECT_SUBSCRIPTION_INFORMATION
+from backend.db.client.connection_lease import acquire_connection, connection_lease
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
 
 
 class CustomerSubscriptionRetrievalService:
@@ -16,13 +17,12 @@ class CustomerSubscriptionRetrievalService:
         :return: python dict, the response for the route
         """
         logging.info(START_OF_METHOD)
-        cnx = self.obtain_connection()
-        table = self.execute_retrieve_statement_for_subscription(
-            cnx=cnx,
-            user_id=user_id)
+        with connection_lease(self.obtain_connection()) as cnx:
+            table = self.execute_retrieve_statement_for_subscription(
+                cnx=cnx,
+                user_id=user_id)
         response = self.format_subscription_table_response(
             table=table)
-        cnx.close()
         logging.info(END_OF_METHOD)
         return response
 
@@ -37,9 +37,10 @@ class CustomerSubscriptionRetrievalService:
         """
         logging.info(START_OF_METHOD)
         try:
-            cursor = cnx.cursor()
-            cursor.execute(SELECT_SUBSCRIPTION_INFORMATION, [user_id])
-            table = cursor.fetchall()
+            table = HpAIDbRepository.fetch_all(
+                cnx=cnx,
+                statement_name='SELECT_SUBSCRIPTION_INFORMATION',
+                params=[user_id])
             if not table:
                 logging.error('No subscription information available for this customer')
                 raise Error(INVALID_CUSTOMER)
@@ -67,11 +68,4 @@ class CustomerSubscriptionRetrievalService:
         return response
 
     def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
\ No newline at end of file
+        return acquire_connection(self.pool)
\ No newline at end of file
@@ -1,8 +1,9 @@
 import logging
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
 from common.logging.error.error import Error
-from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR
-from backend.db.model.query.sql_statements import UPDATE_FORECASTED_REPLACEMENT_DATE
+from backend.db.client.connection_lease import acquire_connection, connection_lease
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
+from backend.db.service.component_due_index_maintenance_service import ComponentDueIndexMaintenanceService
 
 
 class ForecastedReplacementDateUpdateService:
@@ -18,12 +19,12 @@ class ForecastedReplacementDateUpdateService:
         :return: python dict, response
         """
         logging.info(START_OF_METHOD)
-        cnx = self.obtain_connection()
-        put_record_status = self.execute_forecasted_date_update_statement(
-            cnx=cnx,
-            property_id=property_id,
-            appliance_type=appliance_type,
-            forecasted_replacement_date=forecasted_replacement_date)
+        with connection_lease(self.obtain_connection()) as cnx:
+            put_record_status = self.execute_forecasted_date_update_statement(
+                cnx=cnx,
+                property_id=property_id,
+                appliance_type=appliance_type,
+                forecasted_replacement_date=forecasted_replacement_date)
         response = {'putRecordStatus': put_record_status}
         logging.info(END_OF_METHOD)
         return response
@@ -41,26 +42,16 @@ class ForecastedReplacementDateUpdateService:
         logging.info(START_OF_METHOD)
         put_record_status = 200
         try:
-            cursor = cnx.cursor()
-            cursor.execute(UPDATE_FORECASTED_REPLACEMENT_DATE, 
-                           [forecasted_replacement_date, property_id, appliance_type])
-            cnx.commit()
-            cursor.close()
+            HpAIDbRepository.execute(
+                cnx=cnx,
+                statement_name='UPDATE_FORECASTED_REPLACEMENT_DATE',
+                params=[forecasted_replacement_date, property_id, appliance_type])
+            ComponentDueIndexMaintenanceService.refresh_component_due_index(cnx=cnx, property_ids=[property_id])
             logging.info(END_OF_METHOD)
             return put_record_status
-        except Exception as e:
-            logging.error('An issue occurred updating the forecasted replacement date',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
+        except Error:
             return 500
 
 
     def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
\ No newline at end of file
+        return acquire_connection(self.pool)
\ No newline at end of file
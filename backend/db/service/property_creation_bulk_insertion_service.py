@@ -1,70 +1,167 @@
 import logging
+import numpy as np
 import pandas as pd
 from common.logging.error.error import Error
-from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR, INVALID_REQUEST, INVALID_BULK_CSV_FILE
+from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR, INVALID_BULK_CSV_FILE
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
-from backend.db.model.query.sql_statements import (
-    INSERT_CUSTOMER_PROPERTY_INTO_PROPERTY_TABLE,
-    INSERT_UNITS_INTO_UNITS_TABLE,
-    INSERT_PROPERTY_APPLIANCES_INTO_APPLIANCE_TABLE,
-    INSERT_PROPERTY_STRUCTURES_INTO_STRUCTURES_TABLE
-)
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
+from backend.db.client.multi_row_insert import insert_rows_returning_ids
+from backend.db.client.connection_lease import acquire_connection, connection_lease
+from backend.db.model.bulk_import_progress import BulkImportProgress
+from backend.db.service.component_due_index_maintenance_service import ComponentDueIndexMaintenanceService
+from backend.db.client.ownership_index import ownership_index
+from backend.db.client.user_response_cache import tenant_analytics_cache
+
+# Rows parsed, validated and written per step of a bulk upload, which bounds the memory an upload holds
+BULK_UPLOAD_CHUNK_ROWS = 1000
+TEXT_COLUMN_TYPES = {'postal_code': str, 'unit_number': str}
+PROPERTY_COLUMNS = ['street', 'city', 'state', 'postal_code', 'property_age', 'unit_number']
+
+
+def coerce_column(column, coerce_value, missing=None):
+    """
+    Coerces a whole column by coercing each of its distinct values once and gathering the results back through the
+    factorized codes, so the work is per distinct value rather than per cell. Ages, brands and models repeat across
+    a portfolio, so a chunk of thousands of rows holds a few dozen distinct values per column
+    :param column: pandas Series
+    :param coerce_value: python callable applied to each distinct non blank value
+    :param missing: the value of blank cells
+    :return: numpy object array of python values
+    """
+    codes, uniques = pd.factorize(column)
+    coerced = np.array([coerce_value(value) for value in uniques.tolist()] + [missing], dtype=object)
+    # Blank cells have the code -1, which reads the trailing missing value
+    return coerced[codes]
+
+
+def to_text(value):
+    return str(value)
+
+
+def to_stripped_text(value):
+    return str(value).strip()
+
+
+def to_optional_text(value):
+    return str(value).strip() or None
+
+
+def to_optional_int(value):
+    if str(value).strip() == '':
+        return None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+# How the wide component columns of the CSV file become appliance and structure rows. A component of a given type
+# is uploaded when every one of its required fields is filled in, the fields read the {type}_{suffix} columns
+COMPONENT_SCHEMA = {
+    'appliances': {
+        'type_key': 'appliance_type',
+        'types': ['stove', 'washer', 'air_conditioner', 'water_heater', 'dryer', 'dishwasher', 'refrigerator'],
+        'fields': [('appliance_brand', 'brand', to_optional_text),
+                   ('appliance_model', 'model', to_optional_text),
+                   ('age_in_years', 'age', to_optional_int)],
+        'required': ['appliance_brand', 'age_in_years']
+    },
+    'structures': {
+        'type_key': 'structure_type',
+        'types': ['roof', 'driveway', 'furnace', 'deck'],
+        'fields': [('age_in_years', 'age', to_optional_int)],
+        'required': ['age_in_years']
+    }
+}
+REQUIRED_COLUMNS = PROPERTY_COLUMNS + [f'{component_type}_{suffix}'
+                                       for schema in COMPONENT_SCHEMA.values()
+                                       for component_type in schema['types']
+                                       for _, suffix, _ in schema['fields']]
+
+
+def melt_components(bulk_properties_df, schema):
+    """
+    Melts the wide {type}_{suffix} columns of one COMPONENT_SCHEMA entry into one long row per CSV row and type,
+    keeping the rows whose required fields are filled in
+    :param bulk_properties_df: pandas DataFrame, a chunk of the CSV file
+    :param schema: python dict, an entry of COMPONENT_SCHEMA
+    :return: python list with a list of component dicts for every CSV row, in schema type order
+    """
+    row_count, types = len(bulk_properties_df), schema['types']
+    # Stacking the type columns side by side and reading them row major is the melt, row by row in type order
+    values = {key: np.column_stack([coerce_column(bulk_properties_df[f'{component_type}_{suffix}'], coerce_value)
+                                    for component_type in types]).ravel()
+              for key, suffix, coerce_value in schema['fields']}
+    uploaded = np.logical_and.reduce([np.not_equal(values[key], None) for key in schema['required']])
+    rows = np.repeat(np.arange(row_count), len(types))[uploaded]
+    keys = [schema['type_key']] + list(values)
+    columns = [np.tile(np.array(types, dtype=object), row_count)[uploaded]] + [column[uploaded]
+                                                                                for column in values.values()]
+
+    components = [[] for _ in range(row_count)]
+    for row, *fields in zip(rows.tolist(), *columns):
+        components[row].append(dict(zip(keys, fields)))
+    return components
 
 
 class PropertyCreationBulkInsertionService:
-    def __init__(self, hp_ai_db_connection_pool):
+    def __init__(self, hp_ai_db_connection_pool, chunk_rows=BULK_UPLOAD_CHUNK_ROWS):
         self.pool = hp_ai_db_connection_pool.pool
+        self.chunk_rows = chunk_rows
 
-    def bulk_upload_properties_into_db(self, bulk_insertion_request, user_id):
+    def bulk_upload_properties_into_db(self, bulk_insertion_request, user_id, progress=None, progress_callback=None):
         """
-        Uploads the contents of the CSV file into our database
+        Uploads the contents of the CSV file into our database, streaming it chunk by chunk so memory stays flat
+        however many rows the file holds. Every chunk is written inside one transaction, so the upload is still all
+        or nothing
         :param bulk_insertion_request: The model object responsible for storing our data
         :param user_id: The ID of the user uploading properties
+        :param progress: BulkImportProgress or None, the progress to update, the rows a failure involved are
+        recorded on it before the error is raised
+        :param progress_callback: python callable or None, called with the BulkImportProgress after every chunk
         :return: python dict, the response for the route
         """
         logging.info(START_OF_METHOD)
-        cnx = self.obtain_connection()
-        bulk_properties_df = self.validate_contents_of_csv_file(
-            content=bulk_insertion_request.content)
-        data_to_upload = self.parse_csv_file_for_upload(
-            bulk_properties_df=bulk_properties_df,
-            user_id=user_id
-        )
-        insert_record_status = self.execute_bulk_properties_insertion(
-            cnx=cnx,
-            data_to_upload=data_to_upload)
-        response = {'insertRecordStatus': insert_record_status}
+        progress = progress if progress is not None else BulkImportProgress()
+        csv_chunks = self.validate_contents_of_csv_file(content=bulk_insertion_request.content,
+                                                        chunk_rows=self.chunk_rows)
+        data_chunks = (self.parse_csv_file_for_upload(bulk_properties_df=chunk_df, user_id=user_id)
+                       for chunk_df in csv_chunks)
+        with connection_lease(self.obtain_connection()) as cnx:
+            self.execute_bulk_properties_insertion(
+                cnx=cnx,
+                data_chunks=data_chunks,
+                progress=progress,
+                progress_callback=progress_callback)
+        ownership_index.invalidate(user_id)
+        tenant_analytics_cache.invalidate(user_id)
+        response = {'insertRecordStatus': 200, 'rowsImported': progress.rows_written}
         logging.info(END_OF_METHOD)
         return response
 
-    @staticmethod
-    def validate_contents_of_csv_file(content):
+    @classmethod
+    def validate_contents_of_csv_file(cls, content, chunk_rows=BULK_UPLOAD_CHUNK_ROWS):
         """
-        Parses the contents of the file to ensure the user uploaded the correct information
-        :param content: The content of the CSV file
+        Opens the CSV file as a stream of DataFrame chunks and checks the user uploaded the correct information. The
+        header and the first chunk are read here, so a file with the wrong columns is rejected before any connection
+        is leased; a row that fails to parse further down raises while its chunk is read
+        :param content: The content of the CSV file, a binary or text stream
+        :param chunk_rows: python int, the rows parsed into each DataFrame
+        :return: python iterator of DataFrames of at most chunk_rows rows
         """
         logging.info(START_OF_METHOD)
         try:
-            bulk_properties_df = pd.read_csv(content)
-            required_columns = [
-                'street', 'city', 'state', 'postal_code', 'property_age', 'unit_number',
-                'stove_brand', 'stove_model', 'stove_age',
-                'washer_brand', 'washer_model', 'washer_age',
-                'air_conditioner_brand', 'air_conditioner_model', 'air_conditioner_age',
-                'water_heater_brand', 'water_heater_model', 'water_heater_age',
-                'dryer_brand', 'dryer_model', 'dryer_age',
-                'dishwasher_brand', 'dishwasher_model', 'dishwasher_age',
-                'refrigerator_brand', 'refrigerator_model', 'refrigerator_age',
-                'roof_age', 'driveway_age', 'furnace_age', 'deck_age'
-            ]
-
-            missing_columns = [col for col in required_columns if col not in bulk_properties_df.columns]
+            # The text columns are typed up front, so every chunk reads them the same way whichever values it holds
+            reader = pd.read_csv(content, chunksize=chunk_rows, encoding='utf-8', dtype=TEXT_COLUMN_TYPES)
+            first_chunk = next(reader)
+            missing_columns = [col for col in REQUIRED_COLUMNS if col not in first_chunk.columns]
             if missing_columns:
                 logging.error(f'CSV file is missing required columns: {missing_columns}')
+                reader.close()
                 raise Error(INVALID_BULK_CSV_FILE)
 
             logging.info(END_OF_METHOD)
-            return bulk_properties_df
+            return cls.read_remaining_chunks(reader, first_chunk)
         except Error:
             raise
         except Exception as e:
@@ -73,238 +170,147 @@ class PropertyCreationBulkInsertionService:
                           extra={'information': {'error': str(e)}})
             raise Error(INVALID_BULK_CSV_FILE)
 
+    @staticmethod
+    def read_remaining_chunks(reader, first_chunk):
+        """
+        Yields the already validated first chunk, then parses the rest of the file one chunk at a time
+        :param reader: pandas TextFileReader positioned after the first chunk
+        :param first_chunk: pandas DataFrame
+        """
+        with reader:
+            yield first_chunk
+            try:
+                for chunk_df in reader:
+                    yield chunk_df
+            except Exception as e:
+                logging.error('There was an issue parsing the CSV file',
+                              exc_info=True,
+                              extra={'information': {'error': str(e)}})
+                raise Error(INVALID_BULK_CSV_FILE)
+
     @staticmethod
     def parse_csv_file_for_upload(bulk_properties_df, user_id):
         """
-        Parses the dataframe generated from the CSV file to upload to the database
+        Parses the dataframe generated from the CSV file to upload to the database. Every column is coerced in one
+        pass and the wide appliance and structure columns are melted into one long row per component, as laid out
+        in COMPONENT_SCHEMA, instead of building each row field by field
         :param bulk_properties_df: The bulk property file
         :param user_id: The ID of the user uploading properties
         :return: python list of dicts containing property, unit, appliance, and structure data
         """
         logging.info(START_OF_METHOD)
-        data_to_upload = []
-
-        for row in bulk_properties_df.itertuples(index=False):
-            def safe_int(value):
-                if pd.isna(value) or value == '' or str(value).strip() == '':
-                    return None
-                try:
-                    return int(value)
-                except (ValueError, TypeError):
-                    return None
-
-            property_data = {
-                'user_id': user_id,
-                'street': str(row.street).strip(),
-                'city': str(row.city).strip(),
-                'state': str(row.state).strip(),
-                'postal_code': str(row.postal_code).strip(),
-                'property_age': safe_int(row.property_age),
-                'unit_number': str(row.unit_number),
-                'address': f"{row.street}, {row.city}, {row.state}"
-            }
-
-            appliances = []
-            def safe_str(value):
-                if pd.isna(value) or value == '' or str(value).strip() == '':
-                    return None
-                return str(value).strip()
-
-            stove_age = safe_int(row.stove_age)
-            stove_brand = safe_str(row.stove_brand)
-            stove_model = safe_str(row.stove_model)
-            if stove_age is not None and stove_brand is not None:
-                appliances.append({
-                    'appliance_type': 'stove',
-                    'appliance_brand': stove_brand,
-                    'appliance_model': stove_model,
-                    'age_in_years': stove_age
-                })
-
-            washer_age = safe_int(row.washer_age)
-            washer_brand = safe_str(row.washer_brand)
-            washer_model = safe_str(row.washer_model)
-            if washer_age is not None and washer_brand is not None:
-                appliances.append({
-                    'appliance_type': 'washer',
-                    'appliance_brand': washer_brand,
-                    'appliance_model': washer_model,
-                    'age_in_years': washer_age
-                })
-
-            air_conditioner_age = safe_int(row.air_conditioner_age)
-            air_conditioner_brand = safe_str(row.air_conditioner_brand)
-            air_conditioner_model = safe_str(row.air_conditioner_model)
-            if air_conditioner_age is not None and air_conditioner_brand is not None:
-                appliances.append({
-                    'appliance_type': 'air_conditioner',
-                    'appliance_brand': air_conditioner_brand,
-                    'appliance_model': air_conditioner_model,
-                    'age_in_years': air_conditioner_age
-                })
-
-            water_heater_age = safe_int(row.water_heater_age)
-            water_heater_brand = safe_str(row.water_heater_brand)
-            water_heater_model = safe_str(row.water_heater_model)
-            if water_heater_age is not None and water_heater_brand is not None:
-                appliances.append({
-                    'appliance_type': 'water_heater',
-                    'appliance_brand': water_heater_brand,
-                    'appliance_model': water_heater_model,
-                    'age_in_years': water_heater_age
-                })
-
-            dryer_age = safe_int(row.dryer_age)
-            dryer_brand = safe_str(row.dryer_brand)
-            dryer_model = safe_str(row.dryer_model)
-            if dryer_age is not None and dryer_brand is not None:
-                appliances.append({
-                    'appliance_type': 'dryer',
-                    'appliance_brand': dryer_brand,
-                    'appliance_model': dryer_model,
-                    'age_in_years': dryer_age
-                })
-
-            dishwasher_age = safe_int(row.dishwasher_age)
-            dishwasher_brand = safe_str(row.dishwasher_brand)
-            dishwasher_model = safe_str(row.dishwasher_model)
-            if dishwasher_age is not None and dishwasher_brand is not None:
-                appliances.append({
-                    'appliance_type': 'dishwasher',
-                    'appliance_brand': dishwasher_brand,
-                    'appliance_model': dishwasher_model,
-                    'age_in_years': dishwasher_age
-                })
-
-            refrigerator_age = safe_int(row.refrigerator_age)
-            refrigerator_brand = safe_str(row.refrigerator_brand)
-            refrigerator_model = safe_str(row.refrigerator_model)
-            if refrigerator_age is not None and refrigerator_brand is not None:
-                appliances.append({
-                    'appliance_type': 'refrigerator',
-                    'appliance_brand': refrigerator_brand,
-                    'appliance_model': refrigerator_model,
-                    'age_in_years': refrigerator_age
-                })
-
-            structures = []
-            roof_age = safe_int(row.roof_age)
-            if roof_age is not None:
-                structures.append({
-                    'structure_type': 'roof',
-                    'age_in_years': roof_age
-                })
-
-            driveway_age = safe_int(row.driveway_age)
-            if driveway_age is not None:
-                structures.append({
-                    'structure_type': 'driveway',
-                    'age_in_years': driveway_age
-                })
-
-            furnace_age = safe_int(row.furnace_age)
-            if furnace_age is not None:
-                structures.append({
-                    'structure_type': 'furnace',
-                    'age_in_years': furnace_age
-                })
-
-            deck_age = safe_int(row.deck_age)
-            if deck_age is not None:
-                structures.append({
-                    'structure_type': 'deck',
-                    'age_in_years': deck_age
-                })
-
-            data_to_upload.append({
-                'property': property_data,
-                'appliances': appliances,
-                'structures': structures
-            })
-
+        street, city, state = (coerce_column(bulk_properties_df[column], to_text, missing='nan')
+                               for column in ('street', 'city', 'state'))
+        properties = [{'user_id': user_id,
+                       'street': street_text.strip(),
+                       'city': city_text.strip(),
+                       'state': state_text.strip(),
+                       'postal_code': postal_code,
+                       'property_age': property_age,
+                       'unit_number': unit_number,
+                       'address': address}
+                      for street_text, city_text, state_text, postal_code, property_age, unit_number, address in zip(
+                          street, city, state,
+                          coerce_column(bulk_properties_df['postal_code'], to_stripped_text, missing='nan'),
+                          coerce_column(bulk_properties_df['property_age'], to_optional_int),
+                          coerce_column(bulk_properties_df['unit_number'], to_text, missing='nan'),
+                          street + ', ' + city + ', ' + state)]
+        components = {name: melt_components(bulk_properties_df, schema)
+                      for name, schema in COMPONENT_SCHEMA.items()}
+
+        data_to_upload = [{'property': property_data,
+                           'appliances': appliances,
+                           'structures': structures}
+                          for property_data, appliances, structures
+                          in zip(properties, components['appliances'], components['structures'])]
         logging.info(END_OF_METHOD)
         return data_to_upload
 
-    @staticmethod
-    def execute_bulk_properties_insertion(cnx, data_to_upload):
+    @classmethod
+    def execute_bulk_properties_insertion(cls, cnx, data_chunks, progress=None, progress_callback=None):
         """
-        Uploads the file to our appliances and structures database
+        Writes the parsed chunks to our property, unit, appliance and structure tables in one transaction, with
+        multi row INSERTs per chunk instead of a round trip per row
         :param cnx: The MySQLConnectionPool
-        :param data_to_upload: The data to upload to the route
-        :return: python int
+        :param data_chunks: python iterable of lists of dicts, as returned by parse_csv_file_for_upload
+        :param progress: BulkImportProgress or None, the progress to update
+        :param progress_callback: python callable or None, called with the BulkImportProgress after every chunk
+        :return: BulkImportProgress
         """
         logging.info(START_OF_METHOD)
-        insert_record_status = 200
+        progress = progress if progress is not None else BulkImportProgress()
+        # The chunk being written, empty while the next one is parsed, so a failure can name the rows it involved
+        data_to_upload = []
         try:
-            cursor = cnx.cursor()
-            for item in data_to_upload:
-                property_data = item['property']
-                appliances = item['appliances']
-                structures = item['structures']
-
-                property_params = (
-                    property_data['user_id'],
-                    property_data['street'],
-                    property_data['city'],
-                    property_data['state'],
-                    property_data['postal_code'],
-                    property_data['property_age'],
-                    property_data['address']
-                )
-                cursor.execute(INSERT_CUSTOMER_PROPERTY_INTO_PROPERTY_TABLE, property_params)
-                property_id = cursor.lastrowid
-
-                unit_number = property_data['unit_number']
-                unit_id = None
-
-                if unit_number != str(-1):
-                    unit_params = (property_id, unit_number)
-                    cursor.execute(INSERT_UNITS_INTO_UNITS_TABLE, unit_params)
-                    unit_id = cursor.lastrowid
-
-                for appliance in appliances:
-                    appliance_params = (
-                        property_id,
-                        unit_id,
-                        appliance['appliance_type'],
-                        appliance['appliance_brand'],
-                        appliance['appliance_model'],
-                        appliance['age_in_years'],
-                        None
-                    )
-                    cursor.execute(INSERT_PROPERTY_APPLIANCES_INTO_APPLIANCE_TABLE, appliance_params)
-
-                for structure in structures:
-                    structure_params = (
-                        property_id,
-                        structure['structure_type'],
-                        structure['age_in_years']
-                    )
-                    cursor.execute(INSERT_PROPERTY_STRUCTURES_INTO_STRUCTURES_TABLE, structure_params)
-
+            for data_to_upload in data_chunks:
+                property_ids = cls.insert_chunk(cnx=cnx, data_to_upload=data_to_upload)
+                ComponentDueIndexMaintenanceService.refresh_component_due_index(cnx=cnx, property_ids=property_ids,
+                                                                                commit=False)
+                progress.record_chunk(len(data_to_upload))
+                data_to_upload = []
+                logging.info('Wrote a chunk of the bulk upload', extra={'information': progress.as_dict()})
+                if progress_callback is not None:
+                    progress_callback(progress)
             cnx.commit()
-            logging.info(f'Successfully inserted {len(data_to_upload)} properties with related data')
+            logging.info(f'Successfully inserted {progress.rows_written} properties with related data')
             logging.info(END_OF_METHOD)
-            return insert_record_status
+            return progress
 
         except Exception as e:
             if cnx:
                 cnx.rollback()
+            error = e if isinstance(e, Error) else Error(INTERNAL_SERVICE_ERROR)
+            first_row = progress.rows_written + 1
+            progress.record_error(error.message, first_row,
+                                  first_row + len(data_to_upload) - 1 if data_to_upload else None)
+            if isinstance(e, Error):
+                raise
             logging.error('There was an issue bulk uploading to the table',
                           exc_info=True,
                           extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+            raise error
 
-        finally:
-            if cursor:
-                cursor.close()
+    @staticmethod
+    def insert_chunk(cnx, data_to_upload):
+        """
+        Inserts one chunk of properties with their units, appliances and structures, without committing
+        :param cnx: The MySQLConnectionPool
+        :param data_to_upload: python list of dicts, as returned by parse_csv_file_for_upload
+        :return: python list of the new property ids, in row order
+        """
+        if not data_to_upload:
+            return []
+        property_ids = insert_rows_returning_ids(
+            cnx, 'INSERT_CUSTOMER_PROPERTY_INTO_PROPERTY_TABLE',
+            [(item['property']['user_id'], item['property']['street'], item['property']['city'],
+              item['property']['state'], item['property']['postal_code'], item['property']['property_age'],
+              item['property']['address']) for item in data_to_upload])
+
+        multifamily_rows = [index for index, item in enumerate(data_to_upload)
+                            if item['property']['unit_number'] != str(-1)]
+        unit_ids = insert_rows_returning_ids(
+            cnx, 'INSERT_UNITS_INTO_UNITS_TABLE',
+            [(property_ids[index], data_to_upload[index]['property']['unit_number']) for index in multifamily_rows])
+        unit_id_by_row = dict(zip(multifamily_rows, unit_ids))
+
+        appliance_params = [(property_id, unit_id_by_row.get(index), appliance['appliance_type'],
+                             appliance['appliance_brand'], appliance['appliance_model'], appliance['age_in_years'],
+                             None)
+                            for index, (property_id, item) in enumerate(zip(property_ids, data_to_upload))
+                            for appliance in item['appliances']]
+        if appliance_params:
+            HpAIDbRepository.execute_many(cnx=cnx,
+                                          statement_name='INSERT_PROPERTY_APPLIANCES_INTO_APPLIANCE_TABLE',
+                                          seq_params=appliance_params)
+
+        structure_params = [(property_id, structure['structure_type'], structure['age_in_years'])
+                            for property_id, item in zip(property_ids, data_to_upload)
+                            for structure in item['structures']]
+        if structure_params:
+            HpAIDbRepository.execute_many(cnx=cnx,
+                                          statement_name='INSERT_PROPERTY_STRUCTURES_INTO_STRUCTURES_TABLE',
+                                          seq_params=structure_params)
+        return property_ids
 
     def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        return acquire_connection(self.pool)
@@ -1,69 +1,213 @@
+import json
 import logging
+import collections
 from common.logging.error.error import Error
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
-from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR
+from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR, IDEMPOTENCY_KEY_CONFLICT
 from backend.db.model.property_creation_request import PropertyCreationRequest
-from backend.db.model.query.sql_statements import (INSERT_CUSTOMER_PROPERTY_INTO_PROPERTY_TABLE,
-                                                   INSERT_PROPERTY_STRUCTURES_INTO_STRUCTURES_TABLE,
-                                                   INSERT_PROPERTY_APPLIANCES_INTO_APPLIANCE_TABLE,
-                                                   INSERT_UNITS_INTO_UNITS_TABLE,
-                                                   SELECT_APPLIANCE_INFORMATION_FOR_REPLACEMENT_COST)
+from backend.db.client.connection_lease import acquire_connection, connection_lease
+from backend.db.client.multi_row_insert import insert_rows_returning_ids
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
+from backend.db.service.component_due_index_maintenance_service import ComponentDueIndexMaintenanceService
+from backend.db.client.ownership_index import ownership_index
+from backend.db.client.user_response_cache import tenant_analytics_cache
+
+# The failed step is None when every step succeeded
+CreationResult = collections.namedtuple('CreationResult', ['failed_step', 'properties', 'appliance_data',
+                                                           'structure_data'])
 
 
 class PropertyCreationInsertionService:
     def __init__(self, hp_ai_db_connection_pool):
         self.pool = hp_ai_db_connection_pool.pool
 
-    def insert_properties_into_db(self, user_id, property_creation_requests):
+    def insert_properties_into_db(self, user_id, property_creation_requests, idempotency_request=None):
         """
         Wrapper method to insert property, units, appliances, and structures into their respective tables
+        The request is all or nothing: every step writes in one transaction, committed once with the component index.
+        When a step fails the transaction is rolled back and the properties are replayed one at a time under a
+        savepoint, so the response names every property that fails instead of the client retrying blindly
         :param user_id: The internal id of a user inserting items into their table
         :param property_creation_requests: python list, a list of PropertyCreationRequest objects
+        :param idempotency_request: IdempotencyRequest or None. A retry with the same key returns the committed
+        response without writing again
         :return: python dict
         """
         logging.info(START_OF_METHOD)
-        cnx = self.obtain_connection()
+        with connection_lease(self.obtain_connection()) as cnx:
+            stored_response = self.claim_idempotency_key(cnx=cnx,
+                                                         user_id=user_id,
+                                                         idempotency_request=idempotency_request)
+            if stored_response is not None:
+                logging.info(END_OF_METHOD, extra={'information': {'idempotentReplay': True}})
+                return stored_response
+
+            appliance_replacement_cost = self.execute_retrieval_statement_for_replacement_cost(
+                cnx=cnx)
+
+            result = self.execute_creation_steps(
+                cnx=cnx,
+                user_id=user_id,
+                property_creation_requests=property_creation_requests,
+                appliance_replacement_cost=appliance_replacement_cost)
+
+            if result.failed_step is None:
+                response = self.format_property_creation_response(
+                    insert_property_record_status=200,
+                    insert_appliance_record_status=200,
+                    insert_structures_record_status=200,
+                    insert_units_status=200,
+                    property_data=result.properties,
+                    appliance_data=result.appliance_data,
+                    structure_data=result.structure_data)
+                self.store_idempotent_response(cnx=cnx,
+                                               user_id=user_id,
+                                               idempotency_request=idempotency_request,
+                                               response=response)
+                # Index the new components for the management tab and commit every step at once
+                ComponentDueIndexMaintenanceService.refresh_component_due_index(cnx=cnx,
+                                                                                property_ids=result.properties.keys())
+            else:
+                cnx.rollback()
+                failed_properties = self.locate_failed_properties(
+                    cnx=cnx,
+                    user_id=user_id,
+                    property_creation_requests=property_creation_requests,
+                    appliance_replacement_cost=appliance_replacement_cost)
+                cnx.rollback()
+                response = self.format_property_creation_response(
+                    insert_property_record_status=500,
+                    insert_appliance_record_status=500,
+                    insert_structures_record_status=500,
+                    insert_units_status=500,
+                    property_data={},
+                    appliance_data=[],
+                    structure_data=[],
+                    failed_properties=failed_properties)
+        ownership_index.invalidate(user_id)
+        tenant_analytics_cache.invalidate(user_id)
+        logging.info(END_OF_METHOD)
+        return response
 
-        # Step 1: Insert properties
-        insert_property_record_status, properties = self.execute_insertion_statement_for_properties_table(
+    def execute_creation_steps(self, cnx, user_id, property_creation_requests, appliance_replacement_cost):
+        """
+        Writes properties, then their units, appliances and structures without committing, stopping at the first
+        step that fails
+        :param cnx: The MySQLConnectionPool connection
+        :param user_id: The internal id of a user inserting items into their table
+        :param property_creation_requests: python list, a list of PropertyCreationRequest objects
+        :param appliance_replacement_cost: python dict of appliance prices
+        :return: CreationResult
+        """
+        properties, appliance_data, structure_data = {}, [], []
+        status, properties = self.execute_insertion_statement_for_properties_table(
             cnx=cnx,
             user_id=user_id,
             property_creation_requests=property_creation_requests)
+        if status != 200:
+            return CreationResult('properties', properties, appliance_data, structure_data)
 
-        # Step 2: Insert units for multifamily properties and get unit_id mappings
-        insert_units_status, unit_id_mappings = self.execute_insertion_statement_for_units_table(
+        # Units for multifamily properties, their ids are needed by the unit level appliances
+        status, unit_id_mappings = self.execute_insertion_statement_for_units_table(
             cnx=cnx,
             properties=properties)
+        if status != 200:
+            return CreationResult('units', properties, appliance_data, structure_data)
 
-        # Step 3: Get appliance replacement costs
-        appliance_replacement_cost = self.execute_retrieval_statement_for_replacement_cost(
-            cnx=cnx)
-
-        # Step 4: Insert appliances (handles both property-level and unit-level)
-        insert_appliance_record_status, appliance_data = self.execute_insertion_statement_for_appliances_table(
+        # Appliances (handles both property-level and unit-level)
+        status, appliance_data = self.execute_insertion_statement_for_appliances_table(
             cnx=cnx,
             properties=properties,
             unit_id_mappings=unit_id_mappings,
             appliance_replacement_cost=appliance_replacement_cost)
+        if status != 200:
+            return CreationResult('appliances', properties, appliance_data, structure_data)
 
-        # Step 5: Insert structures (always property-level, unit_id = NULL)
-        insert_structures_record_status, structure_data = self.execute_insertion_statement_for_structures_table(
+        # Structures (always property-level, unit_id = NULL)
+        status, structure_data = self.execute_insertion_statement_for_structures_table(
             cnx=cnx,
             properties=properties)
+        return CreationResult('structures' if status != 200 else None, properties, appliance_data, structure_data)
 
-        # Step 6: Format response
-        response = self.format_property_creation_response(
-            insert_property_record_status=insert_property_record_status,
-            insert_appliance_record_status=insert_appliance_record_status,
-            insert_structures_record_status=insert_structures_record_status,
-            insert_units_status=insert_units_status,
-            property_data=properties,
-            appliance_data=appliance_data,
-            structure_data=structure_data)
-
-        cnx.close()
+    def locate_failed_properties(self, cnx, user_id, property_creation_requests, appliance_replacement_cost):
+        """
+        Replays a rolled back request one property at a time, each under a savepoint, to find the properties that
+        fail. A failed property is rolled back to its savepoint and the replay goes on, so properties that only
+        conflict with an earlier one of the same request are found too. The caller rolls the replay back
+        :param cnx: The MySQLConnectionPool connection
+        :param user_id: The internal id of a user inserting items into their table
+        :param property_creation_requests: python list, a list of PropertyCreationRequest objects
+        :param appliance_replacement_cost: python dict of appliance prices
+        :return: python list of dicts with the index, address and failed step of each failing property
+        """
+        logging.info(START_OF_METHOD)
+        failed_properties = []
+        try:
+            for index, property_creation_request in enumerate(property_creation_requests):
+                HpAIDbRepository.execute(cnx=cnx, statement_name='SAVEPOINT_PROPERTY_CREATION')
+                result = self.execute_creation_steps(
+                    cnx=cnx,
+                    user_id=user_id,
+                    property_creation_requests=[property_creation_request],
+                    appliance_replacement_cost=appliance_replacement_cost)
+                if result.failed_step is None:
+                    HpAIDbRepository.execute(cnx=cnx, statement_name='RELEASE_SAVEPOINT_PROPERTY_CREATION')
+                    continue
+                failed_properties.append({
+                    'index': index,
+                    'address': getattr(property_creation_request, 'home_address', None),
+                    'failedStep': result.failed_step
+                })
+                HpAIDbRepository.execute(cnx=cnx, statement_name='ROLLBACK_TO_SAVEPOINT_PROPERTY_CREATION')
+        except Error:
+            # A deadlock or lost connection ends the transaction with its savepoints, the failures found so far
+            # are still reported
+            logging.warning('The property creation replay stopped early',
+                            extra={'information': {'failedProperties': len(failed_properties)}})
         logging.info(END_OF_METHOD)
-        return response
+        return failed_properties
+
+    @staticmethod
+    def claim_idempotency_key(cnx, user_id, idempotency_request):
+        """
+        Claims the idempotency key inside the creation transaction, or returns the response committed under it.
+        A retry racing the first attempt waits on the key's row lock until that attempt commits or rolls back
+        :param cnx: The MySQLConnectionPool connection
+        :param user_id: The internal id of a user inserting items into their table
+        :param idempotency_request: IdempotencyRequest or None
+        :return: python dict, the stored response, or None when the request has to be executed
+        """
+        if idempotency_request is None or idempotency_request.key is None:
+            return None
+        params = [user_id, idempotency_request.key]
+        HpAIDbRepository.execute(cnx=cnx,
+                                 statement_name='DELETE_EXPIRED_PROPERTY_CREATION_IDEMPOTENCY_KEY',
+                                 params=params)
+        claimed = HpAIDbRepository.execute(cnx=cnx,
+                                           statement_name='INSERT_PROPERTY_CREATION_IDEMPOTENCY_KEY',
+                                           params=params + [idempotency_request.request_hash])
+        if claimed.rowcount == 1:
+            return None
+        stored = HpAIDbRepository.fetch_one(cnx=cnx,
+                                            statement_name='SELECT_PROPERTY_CREATION_IDEMPOTENCY_KEY',
+                                            params=params)
+        cnx.rollback()
+        if stored is None or stored[0] != idempotency_request.request_hash or stored[1] is None:
+            logging.error('The Idempotency-Key was used for another request',
+                          extra={'information': {'idempotencyKey': idempotency_request.key}})
+            raise Error(IDEMPOTENCY_KEY_CONFLICT)
+        return json.loads(stored[1])
+
+    @staticmethod
+    def store_idempotent_response(cnx, user_id, idempotency_request, response):
+        """
+        Saves the response under the claimed idempotency key, committed with the properties it describes
+        """
+        if idempotency_request is None or idempotency_request.key is None:
+            return
+        HpAIDbRepository.execute(cnx=cnx,
+                                 statement_name='UPDATE_PROPERTY_CREATION_IDEMPOTENCY_KEY_RESPONSE',
+                                 params=[json.dumps(response), user_id, idempotency_request.key])
 
     @staticmethod
     def execute_retrieval_statement_for_replacement_cost(cnx):
@@ -74,10 +218,8 @@ class PropertyCreationInsertionService:
         """
         logging.info(START_OF_METHOD)
         try:
-            cursor = cnx.cursor()
-            cursor.execute(SELECT_APPLIANCE_INFORMATION_FOR_REPLACEMENT_COST)
-            table = cursor.fetchall()
-            cursor.close()
+            table = HpAIDbRepository.fetch_all(cnx=cnx,
+                                               statement_name='SELECT_APPLIANCE_INFORMATION_FOR_REPLACEMENT_COST')
             appliance_replacement_cost = {}
             for i in range(len(table)):
                 appliance_replacement_cost[table[i][0]] = float(table[i][1])
@@ -92,39 +234,35 @@ class PropertyCreationInsertionService:
     @staticmethod
     def execute_insertion_statement_for_properties_table(cnx, user_id, property_creation_requests):
         """
-        Performs the actual insertion of a property into the property table
+        Inserts the properties with multi row INSERTs and recovers their ids, without committing
         :param cnx: The MySQLConnectionPool connection
         :param user_id
         :param property_creation_requests:
-        :return:
+        :return: tuple (status_code, dict of property_id -> PropertyCreationRequest)
         """
         logging.info(START_OF_METHOD)
         insert_property_record_status = 200
         properties = {}
         try:
-            cursor = cnx.cursor()
-            for i in range(len(property_creation_requests)):
-                property_data = (user_id, property_creation_requests[i].street, property_creation_requests[i].city,
-                                 property_creation_requests[i].state, property_creation_requests[i].zip,
-                                 property_creation_requests[i].home_age, property_creation_requests[i].home_address)
-                cursor.execute(INSERT_CUSTOMER_PROPERTY_INTO_PROPERTY_TABLE, property_data)
-                cnx.commit()
-                property_id = cursor.lastrowid
-                properties[property_id] = property_creation_requests[i]
-            cursor.close()
+            property_data = [(user_id, request.street, request.city, request.state, request.zip, request.home_age,
+                              request.home_address) for request in property_creation_requests]
+            property_ids = insert_rows_returning_ids(cnx=cnx,
+                                                     statement_name='INSERT_CUSTOMER_PROPERTY_INTO_PROPERTY_TABLE',
+                                                     rows=property_data)
+            properties = dict(zip(property_ids, property_creation_requests))
         except Exception as e:
             logging.error('An issue occurred inserting a property into the property table',
                           exc_info=True,
                           extra={'information': {'error': str(e)}})
             insert_property_record_status = 500
-            cnx.rollback()
         logging.info(END_OF_METHOD)
         return insert_property_record_status, properties
 
     @classmethod
     def execute_insertion_statement_for_units_table(cls, cnx, properties):
         """
-        Inserts units into the units table for multifamily properties
+        Inserts units into the units table for multifamily properties, every unit of the request in multi row
+        INSERTs without committing
         Returns a mapping of (property_id, unit_number) -> unit_id
         :param cnx: The MySQLConnectionPool connection
         :param properties: dict of property_id -> PropertyCreationRequest
@@ -135,29 +273,21 @@ class PropertyCreationInsertionService:
         unit_id_mappings = {}  # {(property_id, unit_number): unit_id}
 
         try:
-            cursor = cnx.cursor()
-
-            for property_id, property in properties.items():
-                # Only process multifamily properties
-                if not property.is_multifamily or not property.units:
-                    continue
-
-                for unit in property.units:
-                    unit_data = (property_id, unit.unit_number)
-                    cursor.execute(INSERT_UNITS_INTO_UNITS_TABLE, unit_data)
-                    cnx.commit()
-                    unit_id = cursor.lastrowid
-
-                    # Store mapping
-                    unit_id_mappings[(property_id, unit.unit_number)] = unit_id
-
-            cursor.close()
+            # Only process multifamily properties
+            unit_data = [(property_id, unit.unit_number)
+                         for property_id, property in properties.items()
+                         if property.is_multifamily and property.units
+                         for unit in property.units]
+            if unit_data:
+                unit_ids = insert_rows_returning_ids(cnx=cnx,
+                                                     statement_name='INSERT_UNITS_INTO_UNITS_TABLE',
+                                                     rows=unit_data)
+                unit_id_mappings = dict(zip(unit_data, unit_ids))
         except Exception as e:
             logging.error('An issue occurred inserting units into the units table',
                           exc_info=True,
                           extra={'information': {'error': str(e)}})
             insert_units_status = 500
-            cnx.rollback()
 
         logging.info(END_OF_METHOD)
         return insert_units_status, unit_id_mappings
@@ -180,16 +310,15 @@ class PropertyCreationInsertionService:
             unit_id_mappings=unit_id_mappings,
             appliance_replacement_cost=appliance_replacement_cost)
         try:
-            cursor = cnx.cursor()
-            cursor.executemany(INSERT_PROPERTY_APPLIANCES_INTO_APPLIANCE_TABLE, appliance_data)
-            cnx.commit()
-            cursor.close()
+            if appliance_data:
+                HpAIDbRepository.execute_many(cnx=cnx,
+                                              statement_name='INSERT_PROPERTY_APPLIANCES_INTO_APPLIANCE_TABLE',
+                                              seq_params=appliance_data)
         except Exception as e:
             logging.error('An issue occurred inserting items into the appliance table',
                           exc_info=True,
                           extra={'information': {'error': str(e)}})
             insert_appliances_status = 500
-            cnx.rollback()
         logging.info(END_OF_METHOD)
         return insert_appliances_status, appliance_data
 
@@ -205,16 +334,15 @@ class PropertyCreationInsertionService:
         insert_structures_status = 200
         structures_data = cls.format_structures_for_table_insertion(properties=properties)
         try:
-            cursor = cnx.cursor()
-            cursor.executemany(INSERT_PROPERTY_STRUCTURES_INTO_STRUCTURES_TABLE, structures_data)
-            cursor.close()
-            cnx.commit()
+            if structures_data:
+                HpAIDbRepository.execute_many(cnx=cnx,
+                                              statement_name='INSERT_PROPERTY_STRUCTURES_INTO_STRUCTURES_TABLE',
+                                              seq_params=structures_data)
         except Exception as e:
             logging.error('An issue occurred inserting items into the structures table',
                           exc_info=True,
                           extra={'information': {'error': str(e)}})
             insert_structures_status = 500
-            cnx.rollback()
         logging.info(END_OF_METHOD)
         return insert_structures_status, structures_data
 
@@ -225,7 +353,8 @@ class PropertyCreationInsertionService:
                                           insert_units_status,
                                           property_data,
                                           appliance_data,
-                                          structure_data):
+                                          structure_data,
+                                          failed_properties=None):
         """
         Formats the response for the /customers/properties route
         :param insert_property_record_status: python int, status of inserting record into properties table
@@ -235,6 +364,7 @@ class PropertyCreationInsertionService:
         :param property_data: python dict, response of what was inserted into the properties table
         :param appliance_data: python list, response of what was inserted into the appliance table
         :param structure_data: python list, response of what was inserted into the structures table
+        :param failed_properties: python list, the properties that failed when the request was rolled back
         :return: python dict
         """
         logging.info(START_OF_METHOD)
@@ -269,20 +399,14 @@ class PropertyCreationInsertionService:
             'applianceStructuresStatus': insert_structures_record_status,
             'unitsRecordStatus': insert_units_status,
             'appliancesTableResponse': appliances,
-            'structuresTableResponse': structures
+            'structuresTableResponse': structures,
+            'failedProperties': failed_properties or []
         }
         logging.info(END_OF_METHOD)
         return response
 
     def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        return acquire_connection(self.pool)
 
     @staticmethod
     def format_appliances_for_table_insertion(properties, unit_id_mappings, appliance_replacement_cost):
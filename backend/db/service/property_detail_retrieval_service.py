@@ -0,0 +1,98 @@
+import logging
+from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
+from backend.db.client.authorization_scope import fetch_one_for_user
+from backend.db.client.connection_lease import acquire_read_only_connection, connection_lease
+from backend.db.service.unit_retrieval_service import UnitRetrievalService
+from backend.db.service.property_retrieval_service import PropertyRetrievalService
+from backend.db.service.property_note_retrieval_service import PropertyNoteRetrievalService
+from backend.db.service.property_image_retrieval_service import PropertyImageRetrievalService
+from backend.db.service.tenant_information_retrieval_service import TenantInformationRetrievalService
+
+
+class PropertyDetailRetrievalService:
+    def __init__(self, hp_ai_db_connection_pool, property_image_retrieval_service, property_note_retrieval_service):
+        self.hp_ai_db_connection_pool = hp_ai_db_connection_pool
+        self.property_image_retrieval_service = property_image_retrieval_service
+        self.property_note_retrieval_service = property_note_retrieval_service
+
+    def fetch_property_details(self, user_id, property_id, fields):
+        """
+        Reads everything the property page shows on a single leased connection, in place of the separate property,
+        appliance, structure, tenant, unit, image and note routes
+        :param user_id: python int, The internal id of the user making the request
+        :param property_id: python int, The internal id of a property
+        :param fields: python tuple, the DETAIL_FIELDS to include in the response
+        :return: python dict keyed by field, empty when the property does not belong to the user
+        """
+        logging.info(START_OF_METHOD)
+        with connection_lease(self.obtain_connection(user_id=user_id)) as cnx:
+            # Proves ownership for the request, so the reads that follow skip the join on properties.user_id
+            property_row = fetch_one_for_user(cnx, 'SELECT_PROPERTY_BY_PROPERTY_ID', property_id, user_id)
+            if not property_row:
+                logging.warning('Property not found or does not belong to the user',
+                                extra={'information': {'propertyId': property_id, 'userId': user_id}})
+                return {}
+            results = self.execute_detail_statements(cnx, user_id, property_id, fields)
+
+        response = {}
+        if 'property' in fields:
+            response['property'] = PropertyRetrievalService.format_property_results([property_row], 'SINGLE')
+        if 'appliances' in fields:
+            response['appliances'] = PropertyRetrievalService.format_property_results(results['appliances'],
+                                                                                      'APPLIANCES')
+        if 'structures' in fields:
+            response['structures'] = PropertyRetrievalService.format_property_results(results['structures'],
+                                                                                      'STRUCTURES')
+        if 'tenants' in fields:
+            response['tenants'] = TenantInformationRetrievalService.format_tenant_information_results(
+                results['tenants'])
+        if 'units' in fields:
+            response['units'] = UnitRetrievalService.format_unit_results(results['units'])
+        if 'image' in fields:
+            image_key = results['image']
+            response['image'] = {
+                'signedURL': self.property_image_retrieval_service.sign_image_url(image_key) if image_key else None
+            }
+        if 'notes' in fields:
+            response['notes'] = self.property_note_retrieval_service.attach_note_contents(results['notes'])
+        logging.info(END_OF_METHOD)
+        return response
+
+    @staticmethod
+    def execute_detail_statements(cnx, user_id, property_id, fields):
+        """
+        Runs the statement behind each requested field back to back on the same connection
+        :param cnx: MySQLConnectionPool connection
+        :return: python dict of field to the rows read for it
+        """
+        logging.info(START_OF_METHOD)
+        results = {}
+        for retrieval_type in ('APPLIANCES', 'STRUCTURES'):
+            if retrieval_type.lower() in fields:
+                results[retrieval_type.lower()] = PropertyRetrievalService.execute_retrieval_statement(
+                    cnx=cnx,
+                    user_id=user_id,
+                    property_id=property_id,
+                    retrieval_type=retrieval_type)
+        if 'tenants' in fields:
+            results['tenants'] = TenantInformationRetrievalService.execute_tenant_retrieval_statement(
+                cnx=cnx,
+                property_id=property_id,
+                user_id=user_id)
+        if 'units' in fields:
+            results['units'] = UnitRetrievalService.execute_retrieval_statement(cnx, property_id, user_id)
+        if 'image' in fields:
+            results['image'] = PropertyImageRetrievalService.retrieve_property_image_key(
+                cnx=cnx,
+                user_id=user_id,
+                property_id=property_id)
+        if 'notes' in fields:
+            results['notes'] = PropertyNoteRetrievalService.retrieve_property_note_records(
+                cnx=cnx,
+                property_id=property_id,
+                user_id=user_id)
+        logging.info(END_OF_METHOD)
+        return results
+
+    def obtain_connection(self, user_id=None):
+        return acquire_read_only_connection(self.hp_ai_db_connection_pool, user_id)
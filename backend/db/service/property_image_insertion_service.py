@@ -1,8 +1,9 @@
 import logging
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
 from common.logging.error.error import Error
-from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR, AWS_CONNECTION_ISSUE
-from backend.db.model.query.sql_statements import INSERT_PROPERTY_IMAGE_URL
+from common.logging.error.error_messages import AWS_CONNECTION_ISSUE
+from backend.db.client.connection_lease import acquire_connection, connection_lease
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
 
 
 class PropertyImageInsertionService:
@@ -20,19 +21,18 @@ class PropertyImageInsertionService:
         :return: python dict
         """
         logging.info(START_OF_METHOD)
-        cnx = self.obtain_connection()
         image_key = self._construct_s3_image_key(
             user_id=user_id,
             property_id=property_id,
             file_name=file_name)
         signed_put_url = self.sign_put_image_url(
             image_key=image_key)
-        put_record_status = self.insert_property_image_url(
-            cnx=cnx,
-            user_id=user_id,
-            property_id=property_id,
-            image_key=image_key)
-        cnx.close()
+        with connection_lease(self.obtain_connection()) as cnx:
+            put_record_status = self.insert_property_image_url(
+                cnx=cnx,
+                user_id=user_id,
+                property_id=property_id,
+                image_key=image_key)
         response = {
             'imageUrl': signed_put_url,
             'imageKey': image_key,
@@ -76,18 +76,13 @@ class PropertyImageInsertionService:
         """
         logging.info(START_OF_METHOD)
         put_record_status = 200
-        try:
-            cursor = cnx.cursor()
-            cursor.execute(INSERT_PROPERTY_IMAGE_URL, [user_id, property_id, image_key])
-            cnx.commit()
-            cursor.close()
-            logging.info(END_OF_METHOD)
-            return put_record_status
-        except Exception as e:
-            logging.error('There was an issue uploading the image url to the table',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        HpAIDbRepository.execute(
+            cnx=cnx,
+            statement_name='INSERT_PROPERTY_IMAGE_URL',
+            params=[user_id, property_id, image_key],
+            commit=True)
+        logging.info(END_OF_METHOD)
+        return put_record_status
 
     @staticmethod
     def _construct_s3_image_key(user_id, property_id, file_name):
@@ -95,11 +90,4 @@ class PropertyImageInsertionService:
         return image_key
 
     def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
\ No newline at end of file
+        return acquire_connection(self.pool)
\ No newline at end of file
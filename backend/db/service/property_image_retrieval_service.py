@@ -1,8 +1,9 @@
 import logging
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
-from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR, AWS_CONNECTION_ISSUE
+from common.logging.error.error_messages import AWS_CONNECTION_ISSUE
 from common.logging.error.error import Error
-from backend.db.model.query.sql_statements import SELECT_PROPERTY_IMAGE_URL
+from backend.db.client.connection_lease import acquire_connection, connection_lease
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
 
 
 class PropertyImageRetrievalService:
@@ -19,12 +20,11 @@ class PropertyImageRetrievalService:
         :return:
         """
         logging.info(START_OF_METHOD)
-        cnx = self.obtain_connection()
-        image_key = self.retrieve_property_image_key(
-            cnx=cnx,
-            user_id=user_id,
-            property_id=property_id)
-        cnx.close()
+        with connection_lease(self.obtain_connection()) as cnx:
+            image_key = self.retrieve_property_image_key(
+                cnx=cnx,
+                user_id=user_id,
+                property_id=property_id)
         if image_key:
             signed_url = self.sign_image_url(
                 image_key=image_key)
@@ -64,26 +64,13 @@ class PropertyImageRetrievalService:
         :return: python str, the URL to sign
         """
         logging.info(START_OF_METHOD)
-        try:
-            cursor = cnx.cursor()
-            cursor.execute(SELECT_PROPERTY_IMAGE_URL, [user_id, property_id])
-            result = cursor.fetchall()
-            image_url = result[0][0] if result else None
-            cursor.close()
-            logging.info(END_OF_METHOD)
-            return image_url
-        except Exception as e:
-            logging.error('An issue occurred retrieving the property image URL from the database',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        result = HpAIDbRepository.fetch_all(
+            cnx=cnx,
+            statement_name='SELECT_PROPERTY_IMAGE_URL',
+            params=[user_id, property_id])
+        image_url = result[0][0] if result else None
+        logging.info(END_OF_METHOD)
+        return image_url
 
     def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        return acquire_connection(self.pool)
@@ -1,126 +1,154 @@
 import logging
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
-from common.logging.error.error import Error
-from datetime import datetime, date
-from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR
-from backend.db.model.query.sql_statements import SELECT_PROPERTY_INFORMATION_BY_USER_FOR_MANAGEMENT_TAB
+from backend.db.client.connection_lease import acquire_read_only_connection, connection_lease
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
+from backend.db.client.row_formatter import RowFormatter, optional
+from backend.db.model.needs_attention_request import DEFAULT_HORIZON_MONTHS
+
+MANAGEMENT_ITEM_FORMATTER = RowFormatter([
+    ('id', 0, None),
+    ('property_id', 1, None),
+    ('name', 2, None),
+    ('age', 3, None),
+    ('cost', 4, optional(float)),
+    ('forecasted_replacement_date', 5, None),
+    ('property_address', 6, None),
+    ('days_difference', 7, int),
+    ('status', 7, lambda days_difference: 'overdue' if days_difference >= 0 else 'coming_due')
+])
 
 
 class PropertyNeedsAttentionRetrievalService:
     def __init__(self, hp_ai_db_connection_pool):
-        self.pool = hp_ai_db_connection_pool.pool
+        self.hp_ai_db_connection_pool = hp_ai_db_connection_pool
 
-    def fetch_properties_that_need_attention(self, user_id):
+    def fetch_properties_that_need_attention(self, user_id, horizon_months=DEFAULT_HORIZON_MONTHS,
+                                             include_details=False):
         """
         Wrapper function that queries for properties that need attention based upon appliance/structure replacement date
         :param user_id: The internal identifier of a user in our system
+        :param horizon_months: python int, how many months ahead a component counts as coming due
+        :param include_details: python bool, True to add one managementItems entry per component
         :return: python dict, the response
         """
         logging.info(START_OF_METHOD)
-        cnx = self.obtain_connection()
-        result = self.execute_retrieve_outdated_components_statement(
-            cnx=cnx,
-            user_id=user_id)
-        response = self.format_outdated_components_response(result)
-        cnx.close()
+        params = [user_id, horizon_months]
+        with connection_lease(self.obtain_connection(user_id=user_id)) as cnx:
+            property_totals = HpAIDbRepository.fetch_all(
+                cnx=cnx,
+                statement_name='SELECT_COMPONENTS_DUE_TOTALS_BY_PROPERTY',
+                params=params)
+            month_totals = HpAIDbRepository.fetch_all(
+                cnx=cnx,
+                statement_name='SELECT_COMPONENTS_DUE_TOTALS_BY_MONTH',
+                params=params)
+            result = self.execute_retrieve_outdated_components_statement(
+                cnx=cnx,
+                user_id=user_id,
+                horizon_months=horizon_months) if include_details else None
+        response = self.format_component_totals_response(property_totals, month_totals, horizon_months)
+        if include_details:
+            response['managementItems'] = self.format_outdated_components_response(result)
         logging.info(END_OF_METHOD)
         return response
 
+    def stream_properties_that_need_attention(self, user_id, horizon_months=DEFAULT_HORIZON_MONTHS):
+        """
+        Reads the totals, then streams the managementItems from an unbuffered cursor on the same connection
+        :param user_id: The internal identifier of a user in our system
+        :param horizon_months: python int, how many months ahead a component counts as coming due
+        :return: python tuple of the totals response and a RowStream of lists of managementItems entries, which
+        hands the connection back when closed
+        """
+        logging.info(START_OF_METHOD)
+        params = [user_id, horizon_months]
+        cnx = self.obtain_connection(user_id=user_id)
+        try:
+            property_totals = HpAIDbRepository.fetch_all(
+                cnx=cnx,
+                statement_name='SELECT_COMPONENTS_DUE_TOTALS_BY_PROPERTY',
+                params=params)
+            month_totals = HpAIDbRepository.fetch_all(
+                cnx=cnx,
+                statement_name='SELECT_COMPONENTS_DUE_TOTALS_BY_MONTH',
+                params=params)
+            stream = HpAIDbRepository.stream(
+                cnx=cnx,
+                statement_name='SELECT_COMPONENTS_DUE_BY_USER_ID',
+                params=params,
+                transform=MANAGEMENT_ITEM_FORMATTER.format_rows,
+                release=True)
+        except Exception:
+            cnx.close()
+            raise
+        response = self.format_component_totals_response(property_totals, month_totals, horizon_months)
+        logging.info(END_OF_METHOD)
+        return response, stream
+
     @staticmethod
-    def execute_retrieve_outdated_components_statement(cnx, user_id):
+    def execute_retrieve_outdated_components_statement(cnx, user_id, horizon_months=DEFAULT_HORIZON_MONTHS):
         """
-        Executes the SELECT statement to retrieve all properties associated with a user for parsing
+        Reads the user's components coming due from component_due_index, a single range scan of its primary key
         :param cnx: The MySQLConnectionPool connection
         :param user_id: The internal identifier of a user in our system
+        :param horizon_months: python int, how many months ahead a component counts as coming due
         :return: python list
         """
         logging.info(START_OF_METHOD)
-        try:
-            cursor = cnx.cursor()
-            cursor.execute(SELECT_PROPERTY_INFORMATION_BY_USER_FOR_MANAGEMENT_TAB, [user_id, user_id])
-            result = cursor.fetchall()
-            cursor.close()
-            logging.info(END_OF_METHOD)
-            return result
-        except Exception as e:
-            logging.error('There was an issue retrieving out-of-date components for the management tabe',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        result = HpAIDbRepository.fetch_all(
+            cnx=cnx,
+            statement_name='SELECT_COMPONENTS_DUE_BY_USER_ID',
+            params=[user_id, horizon_months])
+        logging.info(END_OF_METHOD)
+        return result
 
-    @classmethod
-    def format_outdated_components_response(cls, result):
+    @staticmethod
+    def format_component_totals_response(property_totals, month_totals, horizon_months):
         """
-        Formats the result for the frontend dashboard page
-        :param result: The items returned from the appliances and structures table
-        :return: python dict, the response of the route
+        Formats the per property and per month totals aggregated by the database
+        :param property_totals: The SELECT_COMPONENTS_DUE_TOTALS_BY_PROPERTY rows
+        :param month_totals: The SELECT_COMPONENTS_DUE_TOTALS_BY_MONTH rows
+        :param horizon_months: python int, the horizon the totals cover
+        :return: python dict
         """
         logging.info(START_OF_METHOD)
-        response = {'properties': [],
-                    'managementItems': [],
-                    'components': []}
-        property_addresses = set()
-        if not result:
-            return response
-        for i in range(len(result)):
-            component_id = result[i][0]
-            property_id = result[i][1]
-            component_name = result[i][2]
-            component_age = result[i][3]
-            component_cost = float(result[i][4])
-            forecasted_replacement_date = result[i][5]
-            property_address = result[i][6]
-            status = 'coming_due'
-            days_difference = cls.compute_days_difference(forecasted_replacement_date=forecasted_replacement_date)
-            if days_difference >= 0:
-                status = 'overdue'
-            item = {
-                'id': component_id,
-                'name': component_name,
-                'status': status,
-                'property_id': property_id,
-                'property_address': property_address,
-                'forecasted_replacement_date': forecasted_replacement_date,
-                'days_difference': days_difference
-            }
-            component = {
-                'id': component_id,
-                'name': component_name,
-                'age': component_age,
-                'forecasted_replacement_date': forecasted_replacement_date,
-                'cost': component_cost
+
+        def totals(count, total_cost, overdue_count, overdue_cost):
+            return {
+                'count': int(count),
+                'totalCost': float(total_cost),
+                'overdueCount': int(overdue_count),
+                'overdueCost': float(overdue_cost),
+                'comingDueCount': int(count) - int(overdue_count),
+                'comingDueCost': float(total_cost) - float(overdue_cost)
             }
-            response['managementItems'].append(item)
-            response['components'].append(component)
-            if property_address not in property_addresses:
-                response['properties'].append({
-                    'id': property_id,
-                    'address': property_address
-                })
-                property_addresses.add(property_address)
+
+        by_property = [dict(propertyId=row[0], address=row[1], **totals(*row[2:6])) for row in property_totals]
+        by_month = [dict(month=f'{int(row[0]) // 100:04d}-{int(row[0]) % 100:02d}', **totals(*row[1:5]))
+                    for row in month_totals]
+        # The property rows partition the components, so the portfolio totals are their sums
+        summary = totals(*(sum(row[index] for row in property_totals) for index in range(2, 6)))
+        response = {
+            'horizonMonths': horizon_months,
+            'summary': summary,
+            'properties': [{'id': entry['propertyId'], 'address': entry['address']} for entry in by_property],
+            'byProperty': by_property,
+            'byMonth': by_month
+        }
         logging.info(END_OF_METHOD)
         return response
 
     @staticmethod
-    def compute_days_difference(forecasted_replacement_date):
+    def format_outdated_components_response(result):
         """
-        Computes the difference between the current date and the forecasted date
-        :param forecasted_replacement_date: The forecasted replacement date of the component
-        :return: python int
+        Formats the components coming due for the frontend dashboard page
+        :param result: The items returned from the component_due_index table
+        :return: python list of dicts
         """
         logging.info(START_OF_METHOD)
-        today = date.today()
-        dt_date = forecasted_replacement_date.date()
-        diff_days = (today - dt_date).days
+        management_items = MANAGEMENT_ITEM_FORMATTER.format_rows(result)
         logging.info(END_OF_METHOD)
-        return diff_days
+        return management_items
 
-    def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+    def obtain_connection(self, user_id=None):
+        return acquire_read_only_connection(self.hp_ai_db_connection_pool, user_id)
@@ -1,8 +1,9 @@
 import logging
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
 from common.logging.error.error import Error
-from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR, AWS_CONNECTION_ISSUE
-from backend.db.model.query.sql_statements import INSERT_PROPERTY_NOTE
+from common.logging.error.error_messages import AWS_CONNECTION_ISSUE
+from backend.db.client.connection_lease import acquire_connection, connection_lease
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
 
 
 class PropertyNoteInsertionService:
@@ -22,21 +23,20 @@ class PropertyNoteInsertionService:
         :return: python dict
         """
         logging.info(START_OF_METHOD)
-        cnx = self.obtain_connection()
         note_key = self._construct_s3_note_key(
             user_id=user_id,
             property_id=property_id,
             file_name=file_name)
         signed_put_url = self.sign_put_note_url(
             note_key=note_key)
-        put_record_status = self.insert_property_note_url(
-            cnx=cnx,
-            user_id=user_id,
-            property_id=property_id,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            note_key=note_key)
-        cnx.close()
+        with connection_lease(self.obtain_connection()) as cnx:
+            put_record_status = self.insert_property_note_url(
+                cnx=cnx,
+                user_id=user_id,
+                property_id=property_id,
+                entity_type=entity_type,
+                entity_id=entity_id,
+                note_key=note_key)
         response = {
             'noteUrl': signed_put_url,
             'noteKey': note_key,
@@ -82,18 +82,13 @@ class PropertyNoteInsertionService:
         """
         logging.info(START_OF_METHOD)
         put_record_status = 200
-        try:
-            cursor = cnx.cursor()
-            cursor.execute(INSERT_PROPERTY_NOTE, [user_id, property_id, entity_type, entity_id, note_key])
-            cnx.commit()
-            cursor.close()
-            logging.info(END_OF_METHOD)
-            return put_record_status
-        except Exception as e:
-            logging.error('There was an issue uploading the note url to the table',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        HpAIDbRepository.execute(
+            cnx=cnx,
+            statement_name='INSERT_PROPERTY_NOTE',
+            params=[user_id, property_id, entity_type, entity_id, note_key],
+            commit=True)
+        logging.info(END_OF_METHOD)
+        return put_record_status
 
     @staticmethod
     def _construct_s3_note_key(user_id, property_id, file_name):
@@ -101,11 +96,4 @@ class PropertyNoteInsertionService:
         return note_key
 
     def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        return acquire_connection(self.pool)
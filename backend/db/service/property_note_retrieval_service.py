@@ -1,15 +1,24 @@
+import asyncio
 import logging
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
-from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR, AWS_CONNECTION_ISSUE
+from common.logging.error.error_messages import AWS_CONNECTION_ISSUE
 from common.logging.error.error import Error
 from backend.db.model.query.sql_statements import FETCH_PROPERTY_NOTES
+from backend.db.client.connection_lease import acquire_read_only_connection, connection_lease
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
+from backend.db.client.async_hp_ai_db_connection_pool import run_blocking
+
+MAX_CONCURRENT_S3_READS = 8
+# The longest a request waits for the S3 reads of its notes
+NOTE_CONTENT_TIMEOUT_SECONDS = 30.0
 
 
 class PropertyNoteRetrievalService:
-    def __init__(self, hp_ai_connection_pool, s3_client, bucket_name):
-        self.pool = hp_ai_connection_pool.pool
+    def __init__(self, hp_ai_connection_pool, s3_client, bucket_name, async_hp_ai_db_connection_pool=None):
+        self.hp_ai_db_connection_pool = hp_ai_connection_pool
         self.s3_client = s3_client.client
         self.bucket_name = bucket_name
+        self.async_hp_ai_db_connection_pool = async_hp_ai_db_connection_pool
 
     def fetch_property_notes_with_content(self, property_id, user_id, entity_type=None, entity_id=None):
         """
@@ -21,37 +30,90 @@ class PropertyNoteRetrievalService:
         :return: python list of dicts
         """
         logging.info(START_OF_METHOD)
-        cnx = self.obtain_connection()
-        note_records = self.retrieve_property_note_records(
-            cnx=cnx,
-            property_id=property_id,
-            user_id=user_id,
-            entity_type=entity_type,
-            entity_id=entity_id)
-        cnx.close()
+        # The records are read on the read-only lease, so they follow the replica routing and the user's
+        # read-your-writes window; only the S3 reads run on the async pool's loop
+        with connection_lease(self.obtain_connection(user_id=user_id)) as cnx:
+            note_records = self.retrieve_property_note_records(
+                cnx=cnx,
+                property_id=property_id,
+                user_id=user_id,
+                entity_type=entity_type,
+                entity_id=entity_id)
+        notes_with_content = self.attach_note_contents(note_records)
+        logging.info(END_OF_METHOD)
+        return {'notes': notes_with_content}
+
+    def stream_property_notes_with_content(self, property_id, user_id, entity_type=None, entity_id=None):
+        """
+        Reads the note records, then fetches and yields the S3 content of one note at a time while the response is
+        written, so the contents of a large property are never all held at once. The records are small and read
+        up front, the connection is not held across the S3 reads
+        :return: python generator of single note lists
+        """
+        logging.info(START_OF_METHOD)
+        with connection_lease(self.obtain_connection(user_id=user_id)) as cnx:
+            note_records = self.retrieve_property_note_records(
+                cnx=cnx,
+                property_id=property_id,
+                user_id=user_id,
+                entity_type=entity_type,
+                entity_id=entity_id)
+        logging.info(END_OF_METHOD)
+        return ([self.format_note(record, self.fetch_note_content_from_s3(file_path=record[5]))]
+                for record in note_records)
 
+    def attach_note_contents(self, note_records):
+        """
+        Fetches the S3 content of note records already read from the database, concurrently when the async pool is
+        configured
+        :param note_records: python list of FETCH_PROPERTY_NOTES rows
+        :return: python list of dicts
+        """
+        if self.async_hp_ai_db_connection_pool is not None:
+            return self.async_hp_ai_db_connection_pool.run(self.attach_note_contents_async(note_records),
+                                                           timeout=NOTE_CONTENT_TIMEOUT_SECONDS)
         notes_with_content = []
         for record in note_records:
-            note_id, prop_id, usr_id, ent_type, ent_id, file_path, created_at, updated_at = record
-
             # Fetch the note content from S3
-            note_content = self.fetch_note_content_from_s3(file_path=file_path)
-
-            note_dict = {
-                'id': note_id,
-                'propertyId': prop_id,
-                'userId': usr_id,
-                'entityType': ent_type,
-                'entityId': ent_id,
-                'filePath': file_path,
-                'content': note_content,
-                'createdAt': created_at.isoformat() if created_at else None,
-                'updatedAt': updated_at.isoformat() if updated_at else None
-            }
-            notes_with_content.append(note_dict)
+            note_content = self.fetch_note_content_from_s3(file_path=record[5])
+            notes_with_content.append(self.format_note(record, note_content))
+        return notes_with_content
 
-        logging.info(END_OF_METHOD)
-        return {'notes': notes_with_content}
+    async def attach_note_contents_async(self, note_records):
+        """
+        Keeps up to MAX_CONCURRENT_S3_READS reads of the note contents in flight at once
+        :param note_records: python list of FETCH_PROPERTY_NOTES rows
+        :return: python list of dicts
+        """
+        s3_reads = asyncio.Semaphore(MAX_CONCURRENT_S3_READS)
+
+        async def fetch_note_content(file_path):
+            async with s3_reads:
+                return await run_blocking(self.fetch_note_content_from_s3, file_path=file_path)
+
+        contents = await asyncio.gather(*(fetch_note_content(record[5]) for record in note_records))
+        return [self.format_note(record, content) for record, content in zip(note_records, contents)]
+
+    @staticmethod
+    def format_note(record, note_content):
+        """
+        Shapes a property_notes row and its S3 content for the response
+        :param record: python tuple, a FETCH_PROPERTY_NOTES row
+        :param note_content: python str or None, the note body
+        :return: python dict
+        """
+        note_id, prop_id, usr_id, ent_type, ent_id, file_path, created_at, updated_at = record
+        return {
+            'id': note_id,
+            'propertyId': prop_id,
+            'userId': usr_id,
+            'entityType': ent_type,
+            'entityId': ent_id,
+            'filePath': file_path,
+            'content': note_content,
+            'createdAt': created_at.isoformat() if created_at else None,
+            'updatedAt': updated_at.isoformat() if updated_at else None
+        }
 
     def fetch_note_content_from_s3(self, file_path):
         """
@@ -89,40 +151,36 @@ class PropertyNoteRetrievalService:
         :return: python list of tuples
         """
         logging.info(START_OF_METHOD)
-        try:
-            cursor = cnx.cursor()
-
-            # Build dynamic query based on filters
-            query = FETCH_PROPERTY_NOTES
-            params = [property_id, user_id]
+        query, params = PropertyNoteRetrievalService.build_property_note_query(property_id, user_id, entity_type,
+                                                                               entity_id)
+        results = HpAIDbRepository.fetch_all(
+            cnx=cnx,
+            statement_name='FETCH_PROPERTY_NOTES',
+            params=params,
+            sql=query)
+        logging.info(END_OF_METHOD)
+        return results
 
-            if entity_type is not None:
-                query += " AND entity_type = %s"
-                params.append(entity_type)
+    @staticmethod
+    def build_property_note_query(property_id, user_id, entity_type=None, entity_id=None):
+        """
+        Extends FETCH_PROPERTY_NOTES with the optional filters
+        :return: python tuple of the statement text and its parameters
+        """
+        # Build dynamic query based on filters
+        query = FETCH_PROPERTY_NOTES
+        params = [property_id, user_id]
 
-            if entity_id is not None:
-                query += " AND entity_id = %s"
-                params.append(entity_id)
+        if entity_type is not None:
+            query += " AND entity_type = %s"
+            params.append(entity_type)
 
-            query += " ORDER BY created_at DESC;"
+        if entity_id is not None:
+            query += " AND entity_id = %s"
+            params.append(entity_id)
 
-            cursor.execute(query, params)
-            results = cursor.fetchall()
-            cursor.close()
-            logging.info(END_OF_METHOD)
-            return results
-        except Exception as e:
-            logging.error('An issue occurred retrieving property note records from the database',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        query += " ORDER BY created_at DESC;"
+        return query, params
 
-    def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+    def obtain_connection(self, user_id=None):
+        return acquire_read_only_connection(self.hp_ai_db_connection_pool, user_id)
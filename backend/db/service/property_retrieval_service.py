@@ -1,16 +1,82 @@
 import logging
+import itertools
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
 from common.logging.error.error import Error
-from datetime import datetime
 from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR
-from backend.db.model.query.sql_statements import (SELECT_PROPERTY_BY_PROPERTY_ID, SELECT_APPLIANCES_BY_PROPERTY_ID,
-                                                   SELECT_PROPERTIES_BY_USER_ID, SELECT_STRUCTURES_BY_PROPERTY_ID,
-                                                   SELECT_ADDRESSES_BY_USER_ID)
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
+from backend.db.client.authorization_scope import SCOPED_STATEMENTS, fetch_all_for_user
+from backend.db.client.row_formatter import RowFormatter, datetime_or_tbd
+from backend.db.client.connection_lease import acquire_read_only_connection, connection_lease
+
+RETRIEVAL_STATEMENTS = {
+    'ALL': ('SELECT_PROPERTIES_STREAM_BY_USER_ID', ('user_id', 'after')),
+    'SINGLE': ('SELECT_PROPERTY_BY_PROPERTY_ID', ('property_id',)),
+    'APPLIANCES': ('SELECT_APPLIANCES_BY_PROPERTY_ID', ('property_id',)),
+    'STRUCTURES': ('SELECT_STRUCTURES_BY_PROPERTY_ID', ('property_id',)),
+    'ADDRESSES': ('SELECT_ADDRESSES_BY_USER_ID', ('user_id',))
+}
+
+# Where each field of a property list entry is read from in a SELECT_PROPERTIES_PAGE_BY_USER_ID or
+# SELECT_PROPERTIES_STREAM_BY_USER_ID row
+PROPERTY_FIELD_COLUMNS = {
+    'id': (0, int),
+    'user_id': (1, int),
+    'postal_code': (6, None),
+    'age': (2, int),
+    'address': (7, None),
+    'created_at': (8, None),
+    'isMultifamily': (9, bool)
+}
+
+PROPERTY_FORMATTER = RowFormatter([(field, index, convert)
+                                   for field, (index, convert) in PROPERTY_FIELD_COLUMNS.items()])
+APPLIANCE_FORMATTER = RowFormatter([
+    ('id', 0, None),
+    ('property_id', 1, None),
+    ('unit_id', 8, None),
+    ('appliance_type', 2, None),
+    ('applianceBrand', 3, None),
+    ('applianceModel', 4, None),
+    ('age_in_years', 5, None),
+    ('estimated_replacement_cost', 6, None),
+    ('forecasted_replacement_date', 7, datetime_or_tbd)
+])
+STRUCTURE_FORMATTER = RowFormatter([
+    ('id', 0, None),
+    ('property_id', 1, None),
+    ('structure_type', 2, None),
+    ('age_in_years', 3, None),
+    ('estimated_replacement_cost', 4, None),
+    ('forecasted_replacement_date', 5, datetime_or_tbd)
+])
+ADDRESS_FORMATTER = RowFormatter([('address', 1, None), ('property_id', 0, None)])
+# SELECT_COMPONENTS_BY_USER_ID rows lead with the component kind and id ahead of the property id
+PORTFOLIO_APPLIANCE_FORMATTER = RowFormatter([
+    ('id', 1, None),
+    ('property_id', 2, None),
+    ('unit_id', 3, None),
+    ('appliance_type', 4, None),
+    ('applianceBrand', 5, None),
+    ('applianceModel', 6, None),
+    ('age_in_years', 7, None),
+    ('estimated_replacement_cost', 8, None),
+    ('forecasted_replacement_date', 9, datetime_or_tbd)
+])
+PORTFOLIO_STRUCTURE_FORMATTER = RowFormatter([
+    ('id', 1, None),
+    ('property_id', 2, None),
+    ('structure_type', 4, None),
+    ('age_in_years', 7, None),
+    ('estimated_replacement_cost', 8, None),
+    ('forecasted_replacement_date', 9, datetime_or_tbd)
+])
+# One formatter per distinct field projection of the property list
+_property_page_formatters = {}
 
 
 class PropertyRetrievalService:
     def __init__(self, hp_ai_db_connection_pool):
-        self.pool = hp_ai_db_connection_pool.pool
+        self.hp_ai_db_connection_pool = hp_ai_db_connection_pool
 
     def fetch_property_information(self, user_id=None, property_id=None, retrieval_type='ALL'):
         """
@@ -21,19 +87,115 @@ class PropertyRetrievalService:
         :return:
         """
         logging.info(START_OF_METHOD)
-        cnx = self.obtain_connection()
-        results = self.execute_retrieval_statement(
-            cnx=cnx,
-            user_id=user_id,
-            property_id=property_id,
-            retrieval_type=retrieval_type)
+        with connection_lease(self.obtain_connection(user_id=user_id)) as cnx:
+            results = self.execute_retrieval_statement(
+                cnx=cnx,
+                user_id=user_id,
+                property_id=property_id,
+                retrieval_type=retrieval_type)
         formatted_results = self.format_property_results(
             results=results,
             retrieval_type=retrieval_type)
-        cnx.close()
         logging.info(END_OF_METHOD)
         return formatted_results
 
+    def fetch_property_page(self, user_id, after, limit, fields):
+        """
+        Retrieves one page of a user's properties in id order, starting after the cursor
+        :param user_id: python int, The internal id of a customer
+        :param after: python int, the last property id of the previous page, 0 for the first page
+        :param limit: python int or None, the page size, None for every property after the cursor in one query
+        :param fields: python tuple, the PROPERTY_FIELD_COLUMNS to include in every entry
+        :return: python tuple of the page and the cursor of the next page, None on the last page
+        """
+        logging.info(START_OF_METHOD)
+        with connection_lease(self.obtain_connection(user_id=user_id)) as cnx:
+            if limit is None:
+                results = HpAIDbRepository.fetch_all(
+                    cnx=cnx,
+                    statement_name='SELECT_PROPERTIES_STREAM_BY_USER_ID',
+                    params=[user_id, after])
+            else:
+                # One row past the page tells whether another page follows without a COUNT
+                results = HpAIDbRepository.fetch_all(
+                    cnx=cnx,
+                    statement_name='SELECT_PROPERTIES_PAGE_BY_USER_ID',
+                    params=[user_id, after, limit + 1])
+        page = results[:limit]
+        next_cursor = int(page[-1][0]) if limit is not None and len(results) > limit else None
+        formatted_results = self.format_property_page(page, fields)
+        logging.info(END_OF_METHOD)
+        return formatted_results, next_cursor
+
+    def stream_properties(self, user_id, after, fields):
+        """
+        Streams every property of a user after the cursor in id order, straight from an unbuffered cursor, for
+        accounts too large to page through comfortably
+        :param user_id: python int, The internal id of a customer
+        :param after: python int, the last property id already read, 0 to start from the first
+        :param fields: python tuple, the PROPERTY_FIELD_COLUMNS to include in every entry
+        :return: RowStream of lists of dicts, which hands the connection back when closed
+        """
+        logging.info(START_OF_METHOD)
+        formatter = self.property_page_formatter(fields)
+        cnx = self.obtain_connection(user_id=user_id)
+        try:
+            stream = HpAIDbRepository.stream(
+                cnx=cnx,
+                statement_name='SELECT_PROPERTIES_STREAM_BY_USER_ID',
+                params=[user_id, after],
+                transform=formatter.format_rows,
+                release=True)
+        except Exception:
+            cnx.close()
+            raise
+        logging.info(END_OF_METHOD)
+        return stream
+
+    def stream_portfolio_components(self, user_id):
+        """
+        Streams the appliances and structures of every property of a user, one entry per property, straight from an
+        unbuffered cursor instead of reading the whole portfolio before the first entry is sent
+        :param user_id: python int, The internal id of a customer
+        :return: PortfolioStream of lists of dicts, which hands the connection back when closed
+        """
+        logging.info(START_OF_METHOD)
+        cnx = self.obtain_connection(user_id=user_id)
+        try:
+            stream = HpAIDbRepository.stream(
+                cnx=cnx,
+                statement_name='SELECT_COMPONENTS_BY_USER_ID',
+                params=[user_id, user_id],
+                release=True)
+        except Exception:
+            cnx.close()
+            raise
+        logging.info(END_OF_METHOD)
+        return PortfolioStream(stream)
+
+    @staticmethod
+    def property_page_formatter(fields):
+        """
+        :param fields: python iterable, the PROPERTY_FIELD_COLUMNS of a property list entry
+        :return: RowFormatter, built once per distinct projection
+        """
+        fields = tuple(fields)
+        formatter = _property_page_formatters.get(fields)
+        if formatter is None:
+            formatter = RowFormatter([(field,) + PROPERTY_FIELD_COLUMNS[field] for field in fields])
+            _property_page_formatters[fields] = formatter
+        return formatter
+
+    @staticmethod
+    def format_property_page(results, fields):
+        """
+        Builds the list entries with only the requested fields
+        :param results: The results from the database
+        :param fields: python tuple, the PROPERTY_FIELD_COLUMNS to include
+        :return: python list of dicts
+        """
+        return PropertyRetrievalService.property_page_formatter(fields).format_rows(results)
+
     @staticmethod
     def execute_retrieval_statement(cnx, user_id, property_id, retrieval_type):
         """
@@ -45,27 +207,24 @@ class PropertyRetrievalService:
         :return: python list
         """
         logging.info(START_OF_METHOD)
-        try:
-            cursor = cnx.cursor()
-            if retrieval_type == 'ALL':
-                cursor.execute(SELECT_PROPERTIES_BY_USER_ID, [user_id])
-            elif retrieval_type == 'SINGLE':
-                cursor.execute(SELECT_PROPERTY_BY_PROPERTY_ID, [property_id])
-            elif retrieval_type == 'APPLIANCES':
-                cursor.execute(SELECT_APPLIANCES_BY_PROPERTY_ID, [property_id])
-            elif retrieval_type == 'STRUCTURES':
-                cursor.execute(SELECT_STRUCTURES_BY_PROPERTY_ID, [property_id])
-            elif retrieval_type == 'ADDRESSES':
-                cursor.execute(SELECT_ADDRESSES_BY_USER_ID, [user_id])
-            result = cursor.fetchall()
-            cursor.close()
+        if retrieval_type not in RETRIEVAL_STATEMENTS:
+            logging.error('An unsupported retrieval type was requested',
+                          extra={'information': {'retrievalType': retrieval_type}})
+            raise Error(INTERNAL_SERVICE_ERROR)
+        statement_name, keys = RETRIEVAL_STATEMENTS[retrieval_type]
+        if statement_name in SCOPED_STATEMENTS:
+            # Property keyed reads only return the rows of a property the user owns
+            result = fetch_all_for_user(cnx, statement_name, property_id, user_id)
             logging.info(END_OF_METHOD)
             return result
-        except Exception as e:
-            logging.error('An issue occurred fetching properties from the database',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        # The full list reads the keyset statement from its start, so it shares the grouped multifamily join
+        values = {'user_id': user_id, 'property_id': property_id, 'after': 0}
+        result = HpAIDbRepository.fetch_all(
+            cnx=cnx,
+            statement_name=statement_name,
+            params=[values[key] for key in keys])
+        logging.info(END_OF_METHOD)
+        return result
 
     @staticmethod
     def format_property_results(results, retrieval_type):
@@ -80,105 +239,64 @@ class PropertyRetrievalService:
         if not results:
             return formatted_results
         if retrieval_type == 'ALL':
-            for i in range(len(results)):
-                property_id = int(results[i][0])
-                user_id = int(results[i][1])
-                age = int(results[i][2])
-                postal_code = results[i][6]
-                address = results[i][7]
-                created_at = results[i][8]
-                is_multifamily = bool(results[i][9])
-                data = {
-                    'id': property_id,
-                    'user_id': user_id,
-                    'postal_code': postal_code,
-                    'age': age,
-                    'address': address,
-                    'created_at': created_at,
-                    'isMultifamily': is_multifamily
-                }
-                formatted_results.append(data)
+            formatted_results = PROPERTY_FORMATTER.format_rows(results)
         elif retrieval_type == 'SINGLE':
-            property_id = int(results[0][0])
-            user_id = int(results[0][1])
-            age = int(results[0][2])
-            postal_code = results[0][6]
-            address = results[0][7]
-            created_at = results[0][8]
-            is_multifamily = bool(results[0][9])
-            formatted_results = {
-                'id': property_id,
-                'user_id': user_id,
-                'postal_code': postal_code,
-                'age': age,
-                'address': address,
-                'created_at': created_at,
-                'isMultifamily': is_multifamily
-            }
+            formatted_results = PROPERTY_FORMATTER.format_row(results[0])
         elif retrieval_type == 'APPLIANCES':
-            for i in range(len(results)):
-                appliance_id = results[i][0]
-                property_id = results[i][1]
-                appliance_type = results[i][2]
-                appliance_brand = results[i][3]
-                appliance_model = results[i][4]
-                age_in_years = results[i][5]
-                estimated_replacement_cost = results[i][6]
-                if results[i][7]:
-                    forecasted_replacement_date = datetime.strftime(results[i][7], '%Y-%m-%d %H:%M:%S')
-                else:
-                    forecasted_replacement_date = 'TBD'
-                unit_id = results[i][8] if results[i][8] is not None else None
-                data = {
-                    'id': appliance_id,
-                    'property_id': property_id,
-                    'unit_id': unit_id,
-                    'appliance_type': appliance_type,
-                    'applianceBrand': appliance_brand,
-                    'applianceModel': appliance_model,
-                    'age_in_years': age_in_years,
-                    'estimated_replacement_cost': estimated_replacement_cost,
-                    'forecasted_replacement_date': forecasted_replacement_date
-                }
-                formatted_results.append(data)
+            formatted_results = APPLIANCE_FORMATTER.format_rows(results)
         elif retrieval_type == 'STRUCTURES':
-            for i in range(len(results)):
-                structures_id = results[i][0]
-                property_id = results[i][1]
-                structure_type = results[i][2]
-                age_in_years = results[i][3]
-                estimated_replacement_cost = results[i][4]
-                if results[i][5]:
-                    forecasted_replacement_date = datetime.strftime(results[i][5], '%Y-%m-%d %H:%M:%S')
-                else:
-                    forecasted_replacement_date = 'TBD'
-                data = {
-                    'id': structures_id,
-                    'property_id': property_id,
-                    'structure_type': structure_type,
-                    'age_in_years': age_in_years,
-                    'estimated_replacement_cost': estimated_replacement_cost,
-                    'forecasted_replacement_date': forecasted_replacement_date
-                }
-                formatted_results.append(data)
+            formatted_results = STRUCTURE_FORMATTER.format_rows(results)
         elif retrieval_type == 'ADDRESSES':
-            for i in range(len(results)):
-                property_id = results[i][0]
-                address = results[i][1]
-                data = {
-                    'address': address,
-                    'property_id': property_id
-                }
-                formatted_results.append(data)
+            formatted_results = ADDRESS_FORMATTER.format_rows(results)
         logging.info(END_OF_METHOD)
         return formatted_results
 
-    def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+    @staticmethod
+    def group_components_by_property(results):
+        """
+        Folds the SELECT_COMPONENTS_BY_USER_ID rows, which arrive ordered by property, into one entry per property
+        in a single pass, so no property's components are held apart from the rows being read
+        :param results: The results from the database
+        :return: python generator of dicts with the appliances and structures of one property
+        """
+        for property_id, rows in itertools.groupby(results, key=lambda row: row[2]):
+            appliances, structures = [], []
+            for row in rows:
+                (appliances if row[0] == 'APPLIANCE' else structures).append(row)
+            grouped = {
+                'property_id': property_id,
+                'appliances': PORTFOLIO_APPLIANCE_FORMATTER.format_rows(appliances),
+                'structures': PORTFOLIO_STRUCTURE_FORMATTER.format_rows(structures)
+            }
+            yield grouped
+
+    def obtain_connection(self, user_id=None):
+        return acquire_read_only_connection(self.hp_ai_db_connection_pool, user_id)
+
+
+class PortfolioStream:
+    def __init__(self, rows):
+        """
+        The entries of a streamed SELECT_COMPONENTS_BY_USER_ID result. The rows are ordered by property, so every
+        property but the last of a batch is complete; the last is carried into the next batch, since its rows may
+        continue there
+        :param rows: RowStream of the unformatted component rows
+        """
+        self.rows = rows
+
+    def __iter__(self):
+        carried = []
+        for batch in self.rows:
+            batch = carried + batch
+            last_property_id = batch[-1][2]
+            split = len(batch)
+            while split and batch[split - 1][2] == last_property_id:
+                split -= 1
+            carried = batch[split:]
+            if split:
+                yield list(PropertyRetrievalService.group_components_by_property(batch[:split]))
+        if carried:
+            yield list(PropertyRetrievalService.group_components_by_property(carried))
+
+    def close(self):
+        self.rows.close()
@@ -1,9 +1,9 @@
 import logging
 import datetime
-from common.logging.error.error import Error
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
-from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR
-from backend.db.model.query.sql_statements import UPDATE_STRUCTURE_INFORMATION_BULK
+from backend.db.client.connection_lease import acquire_connection, connection_lease
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
+from backend.db.service.component_due_index_maintenance_service import ComponentDueIndexMaintenanceService
 
 
 class StructureInformationUpdateService:
@@ -17,11 +17,11 @@ class StructureInformationUpdateService:
         :return: python dict, the response
         """
         logging.info(START_OF_METHOD)
-        cnx = self.obtain_connection()
-        put_record_status = self.execute_update_statement_for_structures_table(
-            cnx=cnx,
-            property_id=structures_information_request.property_id,
-            structure_updates=structures_information_request.structure_updates)
+        with connection_lease(self.obtain_connection()) as cnx:
+            put_record_status = self.execute_update_statement_for_structures_table(
+                cnx=cnx,
+                property_id=structures_information_request.property_id,
+                structure_updates=structures_information_request.structure_updates)
         response = {'putRecordStatus': put_record_status}
         logging.info(END_OF_METHOD)
         return response
@@ -41,10 +41,11 @@ class StructureInformationUpdateService:
             update_execute_many_data = cls.construct_execute_many_structure_object(
                 property_id=property_id,
                 structures_updates=structure_updates)
-            cursor = cnx.cursor()
-            cursor.executemany(UPDATE_STRUCTURE_INFORMATION_BULK, update_execute_many_data)
-            cnx.commit()
-            cursor.close()
+            HpAIDbRepository.execute_many(
+                cnx=cnx,
+                statement_name='UPDATE_STRUCTURE_INFORMATION_BULK',
+                seq_params=update_execute_many_data)
+            ComponentDueIndexMaintenanceService.refresh_component_due_index(cnx=cnx, property_ids=[property_id])
             logging.info(END_OF_METHOD)
             return put_record_status
         except Exception as e:
@@ -75,11 +76,4 @@ class StructureInformationUpdateService:
         return items
 
     def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
\ No newline at end of file
+        return acquire_connection(self.pool)
\ No newline at end of file
@@ -1,8 +1,8 @@
 import logging
-from common.logging.error.error import Error
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
-from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR
-from backend.db.model.query.sql_statements import INSERT_TENANT_INFORMATION_INTO_TENANTS_TABLE
+from backend.db.client.connection_lease import acquire_connection, connection_lease
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
+from backend.db.client.user_response_cache import tenant_analytics_cache
 
 
 class TenantInformationInsertionService:
@@ -10,23 +10,24 @@ class TenantInformationInsertionService:
         self.pool = hp_ai_db_connection_pool.pool
         self.tenant_information_retrieval_service = tenant_information_retrieval_service
 
-    def insert_tenant_information(self, tenant_creation_request):
+    def insert_tenant_information(self, tenant_creation_request, user_id=None):
         """
         Fetches the information about a tenant from a tenant table
         :param tenant_creation_request: The TenantCreationRequest model object
+        :param user_id: The internal id of the property owner, whose tenant analytics are recomputed
         :return: python dict, the response for the route
         """
         logging.info(START_OF_METHOD)
-        cnx = self.obtain_connection()
-        insert_record_status = self.execute_tenant_insertion_statement(
-            cnx=cnx,
-            tenant_creation_request=tenant_creation_request)
-        insert_record_results = self.tenant_information_retrieval_service.execute_tenant_retrieval_statement(
-            cnx=cnx,
-            property_id=tenant_creation_request.property_id)
+        with connection_lease(self.obtain_connection()) as cnx:
+            insert_record_status = self.execute_tenant_insertion_statement(
+                cnx=cnx,
+                tenant_creation_request=tenant_creation_request)
+            insert_record_results = self.tenant_information_retrieval_service.execute_tenant_retrieval_statement(
+                cnx=cnx,
+                property_id=tenant_creation_request.property_id)
+        tenant_analytics_cache.invalidate(user_id)
         formatted_results = self.tenant_information_retrieval_service.format_tenant_information_results(
             results=insert_record_results)
-        cnx.close()
         logging.info(END_OF_METHOD,
                      extra={'information': {'insertRecordStatus': insert_record_status}})
         return formatted_results
@@ -40,31 +41,19 @@ class TenantInformationInsertionService:
         :return: python dict
         """
         logging.info(START_OF_METHOD)
-        try:
-            cursor = cnx.cursor()
-            cursor.execute(INSERT_TENANT_INFORMATION_INTO_TENANTS_TABLE, [tenant_creation_request.property_id,
-                                                                          tenant_creation_request.first_name,
-                                                                          tenant_creation_request.last_name,
-                                                                          tenant_creation_request.contract_start_date,
-                                                                          tenant_creation_request.contract_end_date,
-                                                                          tenant_creation_request.current_rent,
-                                                                          tenant_creation_request.phone_number])
-            cnx.commit()
-            cursor.close()
-            logging.info(END_OF_METHOD)
-            return 200
-        except Exception as e:
-            logging.error('There was an issue retrieving information from the tenants table',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        HpAIDbRepository.execute(
+            cnx=cnx,
+            statement_name='INSERT_TENANT_INFORMATION_INTO_TENANTS_TABLE',
+            params=[tenant_creation_request.property_id,
+                    tenant_creation_request.first_name,
+                    tenant_creation_request.last_name,
+                    tenant_creation_request.contract_start_date,
+                    tenant_creation_request.contract_end_date,
+                    tenant_creation_request.current_rent,
+                    tenant_creation_request.phone_number],
+            commit=True)
+        logging.info(END_OF_METHOD)
+        return 200
 
     def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        return acquire_connection(self.pool)
@@ -1,54 +1,137 @@
 import logging
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
-from common.logging.error.error import Error
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
-from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR
-from backend.db.model.query.sql_statements import SELECT_TENANT_INFORMATION_BY_PROPERTY_ID
+from backend.db.client.connection_lease import acquire_read_only_connection, connection_lease
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
+from backend.db.client.authorization_scope import fetch_all_for_user
+from backend.db.client.user_response_cache import tenant_analytics_cache
+from backend.db.model.tenant_analytics_request import DEFAULT_LEASE_WINDOW_DAYS
 
 
 class TenantInformationRetrievalService:
     def __init__(self, hp_ai_db_connection_pool):
-        self.pool = hp_ai_db_connection_pool.pool
+        self.hp_ai_db_connection_pool = hp_ai_db_connection_pool
 
-    def fetch_tenant_information(self, property_id):
+    def fetch_tenant_information(self, property_id, user_id=None):
         """
         Fetches the information about a tenant from a tenant table
         :param property_id: The ID of a property
+        :param user_id: The internal id of the user reading, only their properties' tenants are returned
         :return:
         """
         logging.info(START_OF_METHOD)
-        cnx = self.obtain_connection()
-        results = self.execute_tenant_retrieval_statement(
-            cnx=cnx,
-            property_id=property_id)
+        with connection_lease(self.obtain_connection(user_id=user_id)) as cnx:
+            results = self.execute_tenant_retrieval_statement(
+                cnx=cnx,
+                property_id=property_id,
+                user_id=user_id)
         formatted_results = self.format_tenant_information_results(
             results=results)
-        cnx.close()
         logging.info(END_OF_METHOD)
         return formatted_results
 
+    def fetch_tenant_analytics(self, user_id, days=DEFAULT_LEASE_WINDOW_DAYS):
+        """
+        Portfolio level rent roll, occupancy and leases ending, aggregated by the database in two grouped reads.
+        Responses are cached per user until a tenant of theirs is added or updated
+        :param user_id: The internal id of the user
+        :param days: python int, how many days ahead a lease counts as ending
+        :return: python dict
+        """
+        logging.info(START_OF_METHOD)
+        response = tenant_analytics_cache.get_or_compute(user_id, ('analytics', days),
+                                                         lambda: self.compute_tenant_analytics(user_id, days))
+        logging.info(END_OF_METHOD)
+        return response
+
+    def compute_tenant_analytics(self, user_id, days):
+        """
+        Reads the per property totals and the leases ending on one read only connection
+        :param user_id: The internal id of the user
+        :param days: python int, how many days ahead a lease counts as ending
+        :return: python dict
+        """
+        with connection_lease(self.obtain_connection(user_id=user_id)) as cnx:
+            property_totals = HpAIDbRepository.fetch_all(
+                cnx=cnx,
+                statement_name='SELECT_TENANT_ANALYTICS_BY_PROPERTY',
+                params=[user_id, user_id, user_id])
+            leases_ending = HpAIDbRepository.fetch_all(
+                cnx=cnx,
+                statement_name='SELECT_TENANT_LEASES_ENDING_BY_USER_ID',
+                params=[user_id, days])
+        return self.format_tenant_analytics_response(property_totals, leases_ending, days)
+
     @staticmethod
-    def execute_tenant_retrieval_statement(cnx, property_id):
+    def format_tenant_analytics_response(property_totals, leases_ending, days):
+        """
+        Formats the totals aggregated by the database
+        :param property_totals: The SELECT_TENANT_ANALYTICS_BY_PROPERTY rows
+        :param leases_ending: The SELECT_TENANT_LEASES_ENDING_BY_USER_ID rows
+        :param days: python int, the window the leases ending cover
+        :return: python dict
+        """
+        logging.info(START_OF_METHOD)
+
+        def occupancy(units, active_leases, monthly_rent):
+            # A unit holds one lease, so overlapping leases of a renewal do not count twice
+            occupied = min(int(active_leases), int(units))
+            return {
+                'units': int(units),
+                'occupiedUnits': occupied,
+                'vacantUnits': int(units) - occupied,
+                'occupancyRate': round(occupied / int(units), 4) if units else 0.0,
+                'monthlyRent': float(monthly_rent)
+            }
+
+        by_property = [dict(propertyId=row[0], address=row[1], **occupancy(*row[2:5])) for row in property_totals]
+        summary = occupancy(sum(entry['units'] for entry in by_property),
+                            sum(entry['occupiedUnits'] for entry in by_property),
+                            sum(entry['monthlyRent'] for entry in by_property))
+        leases = [{
+            'id': row[0],
+            'propertyId': row[1],
+            'address': row[2],
+            'firstName': row[3],
+            'lastName': row[4],
+            'contractEndDate': datetime.strftime(row[5], '%Y-%m-%d'),
+            'monthlyRent': float(row[6] or 0),
+            'daysRemaining': int(row[7])
+        } for row in leases_ending]
+        summary.update(properties=len(by_property),
+                       leasesEndingCount=len(leases),
+                       leasesEndingRent=sum(lease['monthlyRent'] for lease in leases))
+        response = {
+            'days': days,
+            'summary': summary,
+            'byProperty': by_property,
+            'leasesEnding': leases
+        }
+        logging.info(END_OF_METHOD)
+        return response
+
+    @staticmethod
+    def execute_tenant_retrieval_statement(cnx, property_id, user_id=None):
         """
         Retrieves the information for a tenant of a property
         :param cnx: The connection pool object
         :param property_id: The ID of a property
+        :param user_id: The internal id of the user reading, scopes the read to their properties. None for callers
+        that already proved ownership in the same transaction
         :return: python dict
         """
         logging.info(START_OF_METHOD)
-        try:
-            cursor = cnx.cursor()
-            cursor.execute(SELECT_TENANT_INFORMATION_BY_PROPERTY_ID, [property_id])
-            result = cursor.fetchall()
-            cursor.close()
+        if user_id is not None:
+            result = fetch_all_for_user(cnx, 'SELECT_TENANT_INFORMATION_BY_PROPERTY_ID', property_id, user_id)
             logging.info(END_OF_METHOD)
             return result
-        except Exception as e:
-            logging.error('There was an issue retrieving information from the tenants table',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        result = HpAIDbRepository.fetch_all(
+            cnx=cnx,
+            statement_name='SELECT_TENANT_INFORMATION_BY_PROPERTY_ID',
+            params=[property_id])
+        logging.info(END_OF_METHOD)
+        return result
 
     @staticmethod
     def format_tenant_information_results(results):
@@ -88,12 +171,5 @@ class TenantInformationRetrievalService:
         logging.info(END_OF_METHOD)
         return formatted_results
 
-    def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+    def obtain_connection(self, user_id=None):
+        return acquire_read_only_connection(self.hp_ai_db_connection_pool, user_id)
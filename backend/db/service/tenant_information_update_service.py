@@ -2,29 +2,33 @@ import logging
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
 from common.logging.error.error import Error
 from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR
+from backend.db.client.connection_lease import acquire_connection, connection_lease
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
+from backend.db.client.user_response_cache import tenant_analytics_cache
 
 
 class TenantInformationUpdateService:
     def __init__(self, hp_ai_db_connection_pool):
         self.pool = hp_ai_db_connection_pool.pool
 
-    def update_tenant_information(self, update_tenant_information_request):
+    def update_tenant_information(self, update_tenant_information_request, user_id=None):
         """
         Updates the information for a property in our database
         :param update_tenant_information_request:
+        :param user_id: The internal id of the property owner, whose tenant analytics are recomputed
         :return:
         """
         logging.info(START_OF_METHOD)
-        cnx = self.obtain_connection()
         dynamic_update_statement, values = self._construct_dynamic_tenant_information_update_statement(
             update_tenant_information_request=update_tenant_information_request)
-        put_record_status = self.execute_tenant_information_update_statement(
-            cnx=cnx,
-            dynamic_update_statement=dynamic_update_statement,
-            values=values)
+        with connection_lease(self.obtain_connection()) as cnx:
+            put_record_status = self.execute_tenant_information_update_statement(
+                cnx=cnx,
+                dynamic_update_statement=dynamic_update_statement,
+                values=values)
+        tenant_analytics_cache.invalidate(user_id)
         response = self.format_update_tenant_information_response(
             put_record_status=put_record_status)
-        cnx.close()
         logging.info(END_OF_METHOD)
         return response
 
@@ -40,16 +44,15 @@ class TenantInformationUpdateService:
         logging.info(START_OF_METHOD)
         put_record_status = 200
         try:
-            cursor = cnx.cursor()
-            cursor.execute(dynamic_update_statement, values)
-            cnx.commit()
-            cursor.close()
+            HpAIDbRepository.execute(
+                cnx=cnx,
+                statement_name='UPDATE_TENANT_INFORMATION',
+                params=values,
+                sql=dynamic_update_statement,
+                commit=True)
             logging.info(END_OF_METHOD)
             return put_record_status
-        except Exception as e:
-            logging.error('An error occurred updating the tenant information in the tenants table',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
+        except Error:
             put_record_status = 500
             return put_record_status
 
@@ -96,11 +99,4 @@ class TenantInformationUpdateService:
         return response
 
     def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
\ No newline at end of file
+        return acquire_connection(self.pool)
\ No newline at end of file
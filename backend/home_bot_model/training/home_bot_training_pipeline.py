@@ -3,12 +3,11 @@ import faiss
 import pickle
 import logging
 import pandas as pd
-from common.logging.error.error import Error
 from sentence_transformers import SentenceTransformer
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
-from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR
 from backend.db.client.hp_ai_db_connection_pool import HpAIDbConnectionPool
 from backend.db.model.query.sql_statements import SELECT_HOME_BOT_EMBEDDING_INFORMATION
+from backend.db.client.connection_lease import acquire_connection, connection_lease
 
 
 class HomeBotTrainingPipeline:
@@ -21,9 +20,8 @@ class HomeBotTrainingPipeline:
         :return:
         """
         logging.info(START_OF_METHOD)
-        cnx = self.obtain_connection()
-        df = pd.read_sql(SELECT_HOME_BOT_EMBEDDING_INFORMATION, cnx)
-        cnx.close()
+        with connection_lease(self.obtain_connection()) as cnx:
+            df = pd.read_sql(SELECT_HOME_BOT_EMBEDDING_INFORMATION, cnx)
 
         model = SentenceTransformer('all-MiniLM-L6-v2')
 
@@ -44,14 +42,7 @@ class HomeBotTrainingPipeline:
         logging.info(END_OF_METHOD)
 
     def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        return acquire_connection(self.pool)
 
 
 if __name__ == "__main__":
@@ -3,8 +3,8 @@ import logging
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
 from common.logging.error.error import Error
 from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR
-from backend.db.model.query.sql_statements import (UPDATE_SUBSCRIPTION_STATUS_FOR_DELETION,
-                                                   SELECT_USER_ID_BY_STRIPE_CUSTOMER)
+from backend.db.client.connection_lease import acquire_connection, connection_lease
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
 
 
 class DeletePaymentStatusService:
@@ -38,14 +38,13 @@ class DeletePaymentStatusService:
         event_type = event['type']
         if event_type == 'customer.subscription.deleted':
             stripe_customer_id = event['data']['object']['customer']
-            cnx = self.obtain_connection()
-            user_id = self.fetch_user_id_given_stripe_customer(
-                cnx=cnx,
-                stripe_customer_id=stripe_customer_id)
-            put_record_status = self.update_subscription_status_for_customer(
-                cnx=cnx,
-                user_id=user_id)
-            cnx.close()
+            with connection_lease(self.obtain_connection()) as cnx:
+                user_id = self.fetch_user_id_given_stripe_customer(
+                    cnx=cnx,
+                    stripe_customer_id=stripe_customer_id)
+                put_record_status = self.update_subscription_status_for_customer(
+                    cnx=cnx,
+                    user_id=user_id)
             response = {'putRecordStatus': put_record_status}
             logging.info(END_OF_METHOD)
             return response
@@ -62,12 +61,12 @@ class DeletePaymentStatusService:
         :return: python string
         """
         logging.info(START_OF_METHOD)
+        table = HpAIDbRepository.fetch_all(
+            cnx=cnx,
+            statement_name='SELECT_USER_ID_BY_STRIPE_CUSTOMER',
+            params=[stripe_customer_id])
         try:
-            cursor = cnx.cursor()
-            cursor.execute(SELECT_USER_ID_BY_STRIPE_CUSTOMER, [stripe_customer_id])
-            table = cursor.fetchall()
             user_id = int(table[0][0])
-            cursor.close()
             logging.info(END_OF_METHOD)
             return user_id
         except Exception as e:
@@ -87,16 +86,14 @@ class DeletePaymentStatusService:
         logging.info(START_OF_METHOD)
         put_record_status = 200
         try:
-            cursor = cnx.cursor()
-            cursor.execute(UPDATE_SUBSCRIPTION_STATUS_FOR_DELETION, [user_id])
-            cnx.commit()
-            cursor.close()
+            HpAIDbRepository.execute(
+                cnx=cnx,
+                statement_name='UPDATE_SUBSCRIPTION_STATUS_FOR_DELETION',
+                params=[user_id],
+                commit=True)
             logging.info(END_OF_METHOD)
             return put_record_status
-        except Exception as e:
-            logging.error('There was an issue updating the customer subscription in our table',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
+        except Error:
             return 500
 
     @staticmethod
@@ -122,11 +119,4 @@ class DeletePaymentStatusService:
             raise Error(INTERNAL_SERVICE_ERROR)
 
     def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        return acquire_connection(self.pool)
@@ -3,8 +3,8 @@ import logging
 from common.logging.error.error import Error
 from common.logging.log_utils import START_OF_METHOD, END_OF_METHOD
 from common.logging.error.error_messages import INTERNAL_SERVICE_ERROR
-from backend.db.model.query.sql_statements import (UPDATE_IS_PAID_STATUS_OF_CUSTOMER,
-                                                   UPDATE_SUBSCRIPTION_TABLE_UPON_PAYMENT_COMPLETION)
+from backend.db.client.connection_lease import acquire_connection, connection_lease
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
 
 
 class UpdatePaymentStatusService:
@@ -42,19 +42,18 @@ class UpdatePaymentStatusService:
             stripe_customer_id = session.get("customer")
             subscription_id = session.get("subscription")
             user_id = session.metadata.get("userId")
-            cnx = self.obtain_connection()
-            put_record_status = self.execute_update_statement_for_customer(
-                cnx=cnx,
-                user_id=user_id,
-                stripe_customer_id=stripe_customer_id)
-            put_subscription_status = self.execute_update_statement_for_subscriptions_table(
-                cnx=cnx,
-                user_id=user_id,
-                subscription_id=subscription_id)
-            valid_jwt_token, email = self.customer_authentication_service.generate_valid_jwt_token_after_payment(
-                cnx=cnx,
-                user_id=user_id)
-            cnx.close()
+            with connection_lease(self.obtain_connection()) as cnx:
+                put_record_status = self.execute_update_statement_for_customer(
+                    cnx=cnx,
+                    user_id=user_id,
+                    stripe_customer_id=stripe_customer_id)
+                put_subscription_status = self.execute_update_statement_for_subscriptions_table(
+                    cnx=cnx,
+                    user_id=user_id,
+                    subscription_id=subscription_id)
+                valid_jwt_token, email = self.customer_authentication_service.generate_valid_jwt_token_after_payment(
+                    cnx=cnx,
+                    user_id=user_id)
             response = {"token": valid_jwt_token,
                         "user": {"id": user_id,
                                  "email": email},
@@ -77,19 +76,14 @@ class UpdatePaymentStatusService:
         :return: python int
         """
         logging.info(START_OF_METHOD)
-        try:
-            cursor = cnx.cursor()
-            cursor.execute(UPDATE_IS_PAID_STATUS_OF_CUSTOMER, [stripe_customer_id, user_id])
-            cnx.commit()
-            cursor.close()
-            put_record_status = 200
-            logging.info(END_OF_METHOD)
-            return put_record_status
-        except Exception as e:
-            logging.error('An issue occurred updating the paid status in our database. Please try again.',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        HpAIDbRepository.execute(
+            cnx=cnx,
+            statement_name='UPDATE_IS_PAID_STATUS_OF_CUSTOMER',
+            params=[stripe_customer_id, user_id],
+            commit=True)
+        put_record_status = 200
+        logging.info(END_OF_METHOD)
+        return put_record_status
 
     @staticmethod
     def execute_update_statement_for_subscriptions_table(cnx, user_id, subscription_id):
@@ -101,17 +95,14 @@ class UpdatePaymentStatusService:
         :return: python int
         """
         logging.info(START_OF_METHOD)
-        try:
-            cursor = cnx.cursor()
-            cursor.execute(UPDATE_SUBSCRIPTION_TABLE_UPON_PAYMENT_COMPLETION, [subscription_id, user_id])
-            cnx.commit()
-            cursor.close()
-            put_record_status = 200
-            logging.info(END_OF_METHOD)
-            return put_record_status
-        except Exception as e:
-            logging.error('An issue occurred updating the subscriptions table')
-            raise Error(INTERNAL_SERVICE_ERROR)
+        HpAIDbRepository.execute(
+            cnx=cnx,
+            statement_name='UPDATE_SUBSCRIPTION_TABLE_UPON_PAYMENT_COMPLETION',
+            params=[subscription_id, user_id],
+            commit=True)
+        put_record_status = 200
+        logging.info(END_OF_METHOD)
+        return put_record_status
 
     @staticmethod
     def validate_and_construct_event(payload, sig_header, webhook_secret):
@@ -136,11 +127,4 @@ class UpdatePaymentStatusService:
             raise Error(INTERNAL_SERVICE_ERROR)
 
     def obtain_connection(self):
-        try:
-            cnx = self.pool.get_connection()
-            return cnx
-        except Exception as e:
-            logging.error('An issue occurred acquiring a connection to the pool',
-                          exc_info=True,
-                          extra={'information': {'error': str(e)}})
-            raise Error(INTERNAL_SERVICE_ERROR)
+        return acquire_connection(self.pool)
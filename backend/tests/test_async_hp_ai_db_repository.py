@@ -0,0 +1,184 @@
+import time
+import asyncio
+import threading
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, AsyncMock, patch
+from common.logging.error.error import Error
+from common.logging.error.error_messages import SERVICE_TIMEOUT
+from backend.db.client.statement_metrics import statement_metrics
+from backend.db.client.async_hp_ai_db_repository import AsyncHpAIDbRepository
+from backend.db.client.async_hp_ai_db_connection_pool import AsyncHpAIDbConnectionPool
+from backend.db.service.property_note_retrieval_service import PropertyNoteRetrievalService
+
+
+def mock_async_connection(rows=(), description=(('id',),)):
+    cnx = MagicMock()
+    cnx.in_transaction = False
+    cnx.ping = AsyncMock()
+    cnx.close = AsyncMock()
+    cnx.commit = AsyncMock()
+    cnx.rollback = AsyncMock()
+    cursor = MagicMock()
+    cursor.execute = AsyncMock()
+    cursor.close = AsyncMock()
+    cursor.fetchall = AsyncMock(return_value=list(rows))
+    cursor.description = description
+    cursor.rowcount = 1
+    cursor.lastrowid = 7
+    cnx.cursor = AsyncMock(return_value=cursor)
+    return cnx, cursor
+
+
+class TestAsyncHpAIDbConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.cnx, self.cursor = mock_async_connection()
+        self.connect = patch('mysql.connector.aio.connect', new=AsyncMock(return_value=self.cnx)).start()
+        self.pool = AsyncHpAIDbConnectionPool('localhost', 3306, 'user', 'password', 'home_pulse_ai', pool_size=2,
+                                              acquire_timeout=0.2)
+
+    def tearDown(self):
+        self.pool.close()
+        patch.stopall()
+
+    def test_warm_up_opens_one_connection(self):
+        self.assertEqual(self.connect.await_count, 1)
+        self.assertEqual(self.pool.stats()['idle'], 1)
+
+    def test_connection_is_reused(self):
+        async def lease_twice():
+            async with self.pool.connection() as first:
+                pass
+            async with self.pool.connection() as second:
+                pass
+            return first, second
+
+        first, second = self.pool.run(lease_twice())
+        self.assertIs(first, second)
+        self.assertEqual(self.connect.await_count, 1)
+        self.assertEqual(self.pool.stats()['acquisitions'], 2)
+
+    def test_uncommitted_work_is_rolled_back_on_checkin(self):
+        self.cnx.in_transaction = True
+
+        async def lease():
+            async with self.pool.connection():
+                pass
+
+        self.pool.run(lease())
+        self.cnx.rollback.assert_awaited_once()
+
+    def test_acquire_times_out_when_exhausted(self):
+        async def hold_and_wait():
+            async with self.pool.connection():
+                async with self.pool.connection():
+                    async with self.pool.connection():
+                        pass
+
+        with self.assertRaises(Error):
+            self.pool.run(hold_and_wait())
+        self.assertEqual(self.pool.stats()['acquireTimeouts'], 1)
+        self.assertEqual(self.pool.stats()['inUse'], 0)
+
+
+class TestAsyncHpAIDbRepository(unittest.TestCase):
+
+    def setUp(self):
+        statement_metrics.reset()
+
+    def test_fetch_all_returns_typed_rows_and_records_metrics(self):
+        cnx, cursor = mock_async_connection(rows=[(1,), (2,)])
+
+        rows = asyncio.run(AsyncHpAIDbRepository.fetch_all(cnx, 'FETCH_PROPERTY_NOTES', [1, 2]))
+
+        self.assertEqual([row.id for row in rows], [1, 2])
+        cursor.close.assert_awaited_once()
+        self.assertEqual(statement_metrics.snapshot()['FETCH_PROPERTY_NOTES']['calls'], 1)
+
+    def test_fetch_one_drains_the_result(self):
+        cnx, cursor = mock_async_connection(rows=[(1,), (2,)])
+
+        row = asyncio.run(AsyncHpAIDbRepository.fetch_one(cnx, 'FETCH_PROPERTY_NOTES', [1, 2]))
+
+        self.assertEqual(row.id, 1)
+        cursor.fetchall.assert_awaited_once()
+
+    def test_execute_commits(self):
+        cnx, _ = mock_async_connection()
+
+        result = asyncio.run(AsyncHpAIDbRepository.execute(cnx, 'FETCH_PROPERTY_NOTES', [1], commit=True))
+
+        self.assertEqual(result.lastrowid, 7)
+        cnx.commit.assert_awaited_once()
+
+    def test_failure_raises_error_and_closes_cursor(self):
+        cnx, cursor = mock_async_connection()
+        cursor.execute.side_effect = Exception('boom')
+
+        with self.assertRaises(Error):
+            asyncio.run(AsyncHpAIDbRepository.fetch_all(cnx, 'FETCH_PROPERTY_NOTES', [1, 2]))
+        cursor.close.assert_awaited_once()
+        self.assertEqual(statement_metrics.snapshot()['FETCH_PROPERTY_NOTES']['errors'], 1)
+
+
+class TestPropertyNoteRetrievalServiceAsync(unittest.TestCase):
+
+    def setUp(self):
+        created_at = datetime(2024, 1, 15, 10, 30, 0)
+        self.rows = [(note_id, 456, 123, 'property', None, f'notes/note{note_id}.txt', created_at, None)
+                     for note_id in range(1, 5)]
+        cnx, _ = mock_async_connection()
+        patch('mysql.connector.aio.connect', new=AsyncMock(return_value=cnx)).start()
+        self.async_pool = AsyncHpAIDbConnectionPool('localhost', 3306, 'user', 'password', 'home_pulse_ai')
+        self.mock_pool = MagicMock()
+        self.mock_pool.read_pool.return_value.get_connection.return_value.cursor.return_value.fetchall.return_value \
+            = self.rows
+        self.s3_client = MagicMock()
+        self.service = PropertyNoteRetrievalService(self.mock_pool, self.s3_client, 'test-bucket', self.async_pool)
+
+    def tearDown(self):
+        self.async_pool.close()
+        patch.stopall()
+
+    def test_s3_reads_overlap(self):
+        def slow_get_object(**kwargs):
+            time.sleep(0.2)
+            body = MagicMock()
+            body.read.return_value = kwargs['Key'].encode('utf-8')
+            return {'Body': body}
+
+        self.s3_client.client.get_object.side_effect = slow_get_object
+
+        started = time.monotonic()
+        response = self.service.fetch_property_notes_with_content(property_id=456, user_id=123)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual([note['content'] for note in response['notes']],
+                         [f'notes/note{note_id}.txt' for note_id in range(1, 5)])
+        self.assertEqual(response['notes'][0]['createdAt'], '2024-01-15T10:30:00')
+        self.assertLess(elapsed, 0.6)
+
+    def test_note_records_follow_the_read_routing(self):
+        """Test that the records are read from the pool read_pool picks for the user, not the async primary"""
+        self.s3_client.client.get_object.return_value = {'Body': MagicMock(**{'read.return_value': b'note'})}
+
+        self.service.fetch_property_notes_with_content(property_id=456, user_id=123)
+
+        self.mock_pool.read_pool.assert_called_once_with(123)
+
+    def test_stuck_s3_reads_time_out(self):
+        """Test that the request gives up on S3 reads that do not return instead of blocking forever"""
+        release = threading.Event()
+        self.addCleanup(release.set)
+        self.s3_client.client.get_object.side_effect = lambda **kwargs: release.wait(5)
+
+        with patch('backend.db.service.property_note_retrieval_service.NOTE_CONTENT_TIMEOUT_SECONDS', 0.1):
+            with self.assertRaises(Error) as context:
+                self.service.fetch_property_notes_with_content(property_id=456, user_id=123)
+
+        self.assertEqual(context.exception.code, SERVICE_TIMEOUT.code)
+
+
+if __name__ == '__main__':
+    unittest.main()
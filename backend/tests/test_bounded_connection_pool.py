@@ -0,0 +1,446 @@
+import gc
+import time
+import threading
+import unittest
+from unittest.mock import MagicMock
+from mysql.connector.errors import PoolError, OperationalError, ProgrammingError
+from backend.db.client.bounded_connection_pool import BoundedConnectionPool, is_read_only_statement
+
+
+class TestBoundedConnectionPool(unittest.TestCase):
+    """Test cases for BoundedConnectionPool"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.connections = []
+
+        def connection_factory():
+            connection = MagicMock()
+            connection.in_transaction = False
+            self.connections.append(connection)
+            return connection
+
+        self.connection_factory = connection_factory
+
+    def create_pool(self, pool_size=2, max_overflow=0, acquire_timeout=0.2, leak_detection_threshold=0.0,
+                    **kwargs):
+        return BoundedConnectionPool(pool_name='test_pool',
+                                     connection_factory=self.connection_factory,
+                                     pool_size=pool_size,
+                                     max_overflow=max_overflow,
+                                     acquire_timeout=acquire_timeout,
+                                     leak_detection_threshold=leak_detection_threshold,
+                                     **kwargs)
+
+
+class TestAcquireAndRelease(TestBoundedConnectionPool):
+    """Tests for get_connection and close"""
+
+    def test_warm_up_opens_pool_size_connections(self):
+        """Test that warm_up opens the core connections and leaves them idle"""
+        pool = self.create_pool(pool_size=3)
+        pool.warm_up()
+
+        stats = pool.stats()
+        self.assertEqual(len(self.connections), 3)
+        self.assertEqual(stats['idle'], 3)
+        self.assertEqual(stats['inUse'], 0)
+
+    def test_closed_connection_is_reused(self):
+        """Test that closing a leased connection returns the same physical connection to the pool"""
+        pool = self.create_pool()
+
+        first = pool.get_connection()
+        first.close()
+        second = pool.get_connection()
+
+        self.assertEqual(len(self.connections), 1)
+        second.cursor()
+        self.connections[0].cursor.assert_called_once()
+
+    def test_double_close_is_ignored(self):
+        """Test that closing a lease twice does not release the slot twice"""
+        pool = self.create_pool(pool_size=1)
+
+        cnx = pool.get_connection()
+        cnx.close()
+        cnx.close()
+
+        self.assertEqual(pool.stats()['inUse'], 0)
+        self.assertEqual(pool.stats()['idle'], 1)
+
+    def test_use_after_close_raises(self):
+        """Test that a returned lease can no longer reach the physical connection"""
+        pool = self.create_pool()
+        cnx = pool.get_connection()
+        cnx.close()
+
+        with self.assertRaises(PoolError):
+            cnx.cursor()
+
+    def test_open_transaction_is_rolled_back_on_release(self):
+        """Test that uncommitted work does not leak into the next lease"""
+        pool = self.create_pool()
+        cnx = pool.get_connection()
+        self.connections[0].in_transaction = True
+
+        cnx.close()
+
+        self.connections[0].rollback.assert_called_once()
+
+    def test_broken_connection_is_discarded_on_release(self):
+        """Test that a connection that fails to reset is closed instead of pooled"""
+        pool = self.create_pool()
+        cnx = pool.get_connection()
+        self.connections[0].in_transaction = True
+        self.connections[0].rollback.side_effect = Exception('MySQL server has gone away')
+
+        cnx.close()
+
+        self.connections[0].close.assert_called_once()
+        self.assertEqual(pool.stats()['opened'], 0)
+        self.assertEqual(pool.stats()['idle'], 0)
+
+
+class TestOverflow(TestBoundedConnectionPool):
+    """Tests for the max_overflow behaviour"""
+
+    def test_overflow_connection_is_closed_on_release(self):
+        """Test that connections beyond pool_size are closed when returned"""
+        pool = self.create_pool(pool_size=1, max_overflow=1)
+
+        core = pool.get_connection()
+        overflow = pool.get_connection()
+        self.assertEqual(pool.stats()['overflowInUse'], 1)
+
+        overflow.close()
+        core.close()
+
+        self.connections[1].close.assert_called_once()
+        self.connections[0].close.assert_not_called()
+        stats = pool.stats()
+        self.assertEqual(stats['opened'], 1)
+        self.assertEqual(stats['overflowInUse'], 0)
+
+    def test_acquire_times_out_when_capacity_exhausted(self):
+        """Test that callers give up with a PoolError once the timeout elapses"""
+        pool = self.create_pool(pool_size=1, max_overflow=1, acquire_timeout=0.05)
+        held = [pool.get_connection(), pool.get_connection()]
+
+        with self.assertRaises(PoolError):
+            pool.get_connection()
+
+        stats = pool.stats()
+        self.assertEqual(stats['acquireTimeouts'], 1)
+        self.assertEqual(stats['waiters'], 0)
+        self.assertEqual(len(held), 2)
+
+    def test_factory_failure_releases_slot(self):
+        """Test that a failed connect does not permanently consume capacity"""
+        pool = BoundedConnectionPool(pool_name='test_pool',
+                                     connection_factory=MagicMock(side_effect=Exception('refused')),
+                                     pool_size=1)
+
+        with self.assertRaises(Exception):
+            pool.get_connection()
+
+        stats = pool.stats()
+        self.assertEqual(stats['inUse'], 0)
+        self.assertEqual(stats['opened'], 0)
+
+
+class TestWaitQueue(TestBoundedConnectionPool):
+    """Tests for the blocking, FIFO wait queue"""
+
+    def test_waiter_receives_released_connection(self):
+        """Test that a blocked caller is woken when a connection is returned"""
+        pool = self.create_pool(pool_size=1, acquire_timeout=2)
+        held = pool.get_connection()
+        results = []
+
+        def borrower():
+            results.append(pool.get_connection())
+
+        thread = threading.Thread(target=borrower)
+        thread.start()
+        while pool.stats()['waiters'] == 0:
+            time.sleep(0.001)
+        held.close()
+        thread.join(timeout=2)
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(pool.stats()['inUse'], 1)
+
+    def test_waiters_are_served_in_arrival_order(self):
+        """Test FIFO fairness between queued callers"""
+        pool = self.create_pool(pool_size=1, acquire_timeout=2)
+        held = pool.get_connection()
+        order = []
+
+        def borrower(name):
+            cnx = pool.get_connection()
+            order.append(name)
+            cnx.close()
+
+        threads = []
+        for name in ('first', 'second', 'third'):
+            thread = threading.Thread(target=borrower, args=(name,))
+            thread.start()
+            threads.append(thread)
+            while pool.stats()['waiters'] < len(threads):
+                time.sleep(0.001)
+        held.close()
+        for thread in threads:
+            thread.join(timeout=2)
+
+        self.assertEqual(order, ['first', 'second', 'third'])
+
+
+class TestLeakDetection(TestBoundedConnectionPool):
+    """Tests for leak detection and reclaiming abandoned leases"""
+
+    def test_lease_held_past_threshold_is_reported_once(self):
+        """Test that a long held lease is logged with its acquiring stack and counted a single time"""
+        pool = self.create_pool(leak_detection_threshold=0.01)
+        cnx = pool.get_connection()
+        time.sleep(0.02)
+
+        with self.assertLogs(level='WARNING') as logs:
+            pool.detect_leaks()
+        pool.detect_leaks()
+
+        self.assertEqual(pool.stats()['leakedConnections'], 1)
+        self.assertIn('test_lease_held_past_threshold_is_reported_once',
+                      logs.records[0].information['leaseStack'])
+        cnx.close()
+
+    def test_detection_is_disabled_by_default(self):
+        """Test that no stack is captured and nothing is reported without a threshold"""
+        pool = self.create_pool()
+        cnx = pool.get_connection()
+
+        pool.detect_leaks()
+
+        self.assertEqual(pool.stats()['leakedConnections'], 0)
+        cnx.close()
+
+    def test_garbage_collected_lease_is_reclaimed(self):
+        """Test that a lease dropped without close() is returned to the pool on the next pass"""
+        pool = self.create_pool(pool_size=1)
+        cnx = pool.get_connection()
+        del cnx
+        gc.collect()
+
+        with self.assertLogs(level='ERROR'):
+            pool.run_housekeeping()
+
+        stats = pool.stats()
+        self.assertEqual(stats['inUse'], 0)
+        self.assertEqual(stats['idle'], 1)
+        self.assertEqual(stats['leakedConnections'], 1)
+        self.assertEqual(stats['reclaimedConnections'], 1)
+
+
+class TestHealthChecks(TestBoundedConnectionPool):
+    """Tests for validation on borrow and background replacement of stale connections"""
+
+    def test_recently_used_connection_is_not_pinged(self):
+        """Test that a connection inside the validation window is lent without a round trip"""
+        pool = self.create_pool()
+        pool.get_connection().close()
+        pool.get_connection().close()
+
+        self.connections[0].ping.assert_not_called()
+
+    def test_dead_connection_is_replaced_on_borrow(self):
+        """Test that a connection failing its ping is closed and a fresh one is lent instead"""
+        pool = self.create_pool(validation_window=0)
+        pool.get_connection().close()
+        self.connections[0].ping.side_effect = OperationalError('MySQL server has gone away', errno=2006)
+
+        cnx = pool.get_connection()
+        cnx.cursor()
+
+        self.connections[0].close.assert_called_once()
+        self.connections[1].cursor.assert_called_once()
+        stats = pool.stats()
+        self.assertEqual(stats['failedValidations'], 1)
+        self.assertEqual(stats['opened'], 1)
+
+    def test_expired_connection_is_replaced_on_borrow(self):
+        """Test that a connection past max_lifetime is not lent again"""
+        pool = self.create_pool(max_lifetime=0.01)
+        pool.get_connection().close()
+        time.sleep(0.02)
+
+        pool.get_connection()
+
+        self.assertEqual(len(self.connections), 2)
+        self.connections[0].close.assert_called_once()
+        self.assertEqual(pool.stats()['evictedConnections'], 1)
+
+    def test_housekeeping_replaces_idle_connections(self):
+        """Test that idle connections past max_idle_time are reopened in the background"""
+        pool = self.create_pool(pool_size=2, max_idle_time=0.01)
+        pool.warm_up()
+        time.sleep(0.02)
+
+        pool.run_housekeeping()
+
+        stats = pool.stats()
+        self.assertEqual(len(self.connections), 4)
+        self.assertEqual(stats['idle'], 2)
+        self.assertEqual(stats['opened'], 2)
+        self.assertEqual(stats['evictedConnections'], 2)
+        self.connections[0].close.assert_called_once()
+        self.connections[1].close.assert_called_once()
+
+
+class TestReadRetry(TestBoundedConnectionPool):
+    """Tests for replaying read-only statements after a lost connection"""
+
+    def test_read_is_retried_once_on_a_new_connection(self):
+        """Test that a SELECT hitting a dead socket is replayed on a reconnected connection"""
+        pool = self.create_pool()
+        cnx = pool.get_connection()
+        cursor = cnx.cursor()
+        self.connections[0].cursor.return_value.execute.side_effect = OperationalError('Lost connection', errno=2013)
+
+        cursor.execute('SELECT * FROM properties WHERE user_id = %s', [1])
+        cursor.fetchall()
+
+        self.connections[1].cursor.return_value.execute.assert_called_once_with(
+            'SELECT * FROM properties WHERE user_id = %s', [1])
+        self.connections[1].cursor.return_value.fetchall.assert_called_once()
+        self.assertEqual(pool.stats()['reconnects'], 1)
+
+    def test_read_is_not_retried_twice(self):
+        """Test that a second connection error is surfaced to the caller"""
+        lost = OperationalError('Lost connection', errno=2013)
+        pool = self.create_pool()
+        cnx = pool.get_connection()
+        cursor = cnx.cursor()
+        pool.connection_factory = MagicMock(return_value=MagicMock())
+        pool.connection_factory.return_value.cursor.return_value.execute.side_effect = lost
+        self.connections[0].cursor.return_value.execute.side_effect = lost
+
+        with self.assertRaises(OperationalError):
+            cursor.execute('SELECT 1')
+
+        pool.connection_factory.assert_called_once()
+
+    def test_read_after_write_is_not_retried(self):
+        """Test that reads are not replayed once the lease has uncommitted writes"""
+        pool = self.create_pool()
+        cnx = pool.get_connection()
+        cursor = cnx.cursor()
+        cursor.execute('INSERT INTO properties (user_id) VALUES (%s)', [1])
+        self.connections[0].cursor.return_value.execute.side_effect = OperationalError('Lost connection', errno=2013)
+
+        with self.assertRaises(OperationalError):
+            cursor.execute('SELECT LAST_INSERT_ID()')
+
+        self.assertEqual(len(self.connections), 1)
+
+    def test_statement_errors_are_not_retried(self):
+        """Test that errors in the SQL itself are not mistaken for a lost connection"""
+        pool = self.create_pool()
+        cnx = pool.get_connection()
+        cursor = cnx.cursor()
+        self.connections[0].cursor.return_value.execute.side_effect = ProgrammingError('Syntax error', errno=1064)
+
+        with self.assertRaises(ProgrammingError):
+            cursor.execute('SELECT * FORM properties')
+
+        self.assertEqual(len(self.connections), 1)
+
+    def test_read_only_statement_detection(self):
+        """Test the classification of statements that are safe to replay"""
+        self.assertTrue(is_read_only_statement('\n    SELECT id FROM properties'))
+        self.assertTrue(is_read_only_statement('(SELECT 1) UNION (SELECT 2)'))
+        self.assertFalse(is_read_only_statement('SELECT id FROM properties FOR UPDATE'))
+        self.assertFalse(is_read_only_statement('UPDATE properties SET age = 1'))
+        self.assertFalse(is_read_only_statement(None))
+
+
+class TestPreparedStatementCache(TestBoundedConnectionPool):
+    """Tests for the per-connection prepared statement cache"""
+
+    def test_prepared_cursor_is_reused_across_leases(self):
+        """Test that a later lease of the same connection gets the already prepared cursor"""
+        pool = self.create_pool(pool_size=1, prepared_statement_cache_size=4)
+
+        first = pool.get_connection()
+        cursor = first.prepared_cursor('VERIFY_UNIT_OWNERSHIP')
+        first.close()
+        second = pool.get_connection()
+
+        self.assertIs(second.prepared_cursor('VERIFY_UNIT_OWNERSHIP'), cursor)
+        self.connections[0].cursor.assert_called_once_with(prepared=True)
+        stats = pool.stats()
+        self.assertEqual(stats['preparedStatementCacheHits'], 1)
+        self.assertEqual(stats['preparedStatementCacheMisses'], 1)
+
+    def test_least_recently_used_statement_is_closed(self):
+        """Test that the cache stays bounded by closing the oldest prepared statement"""
+        pool = self.create_pool(pool_size=1, prepared_statement_cache_size=2)
+        cnx = pool.get_connection()
+
+        oldest = cnx.prepared_cursor('SELECT_PROPERTIES_STREAM_BY_USER_ID')
+        cnx.prepared_cursor('SELECT_APPLIANCES_BY_PROPERTY_ID')
+        cnx.prepared_cursor('VERIFY_UNIT_OWNERSHIP')
+
+        oldest.close.assert_called_once()
+        self.assertEqual(cnx._entry.prepared_cursors.keys(),
+                         {'SELECT_APPLIANCES_BY_PROPERTY_ID', 'VERIFY_UNIT_OWNERSHIP'})
+
+    def test_cache_is_disabled_by_default(self):
+        """Test that no prepared cursor is handed out unless a cache size is configured"""
+        pool = self.create_pool()
+        cnx = pool.get_connection()
+
+        self.assertIsNone(cnx.prepared_cursor('VERIFY_UNIT_OWNERSHIP'))
+
+    def test_reconnect_drops_prepared_cursors(self):
+        """Test that handles prepared on a lost session are not reused on its replacement"""
+        pool = self.create_pool(pool_size=1, prepared_statement_cache_size=4)
+        cnx = pool.get_connection()
+        cnx.prepared_cursor('VERIFY_UNIT_OWNERSHIP')
+
+        pool.reconnect(cnx._entry, reason='Lost connection to MySQL server during query')
+
+        self.assertEqual(len(cnx._entry.prepared_cursors), 0)
+
+    def test_reconnect_closes_the_dropped_prepared_cursors(self):
+        """Test that the prepared cursors of a lost session are closed before its connection"""
+        pool = self.create_pool(pool_size=1, prepared_statement_cache_size=4)
+        cnx = pool.get_connection()
+        lost = self.connections[0]
+        cnx.prepared_cursor('VERIFY_UNIT_OWNERSHIP')
+        cnx.prepared_cursor('SELECT_APPLIANCES_BY_PROPERTY_ID')
+
+        pool.reconnect(cnx._entry, reason='Lost connection to MySQL server during query')
+
+        # Both handles share the mock cursor of the lost connection
+        self.assertEqual([name for name, _, _ in lost.mock_calls if name in ('close', 'cursor().close')],
+                         ['cursor().close', 'cursor().close', 'close'])
+
+
+class TestStats(TestBoundedConnectionPool):
+    """Tests for the metrics snapshot"""
+
+    def test_stats_reports_acquire_latency(self):
+        """Test that every acquisition is recorded in the latency histogram"""
+        pool = self.create_pool()
+        pool.get_connection().close()
+        pool.get_connection().close()
+
+        stats = pool.stats()
+        self.assertEqual(stats['acquisitions'], 2)
+        self.assertEqual(stats['acquireLatency']['count'], 2)
+        self.assertIn('p95Ms', stats['acquireLatency'])
+        self.assertEqual(stats['poolName'], 'test_pool')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+from backend.db.model.bulk_upload_job_request import BulkUploadJobRequest
+from common.logging.error.error import Error
+
+
+class TestBulkUploadJobRequest(unittest.TestCase):
+
+    def test_valid_job_id(self):
+        """Test that a job id is normalized to the form the upload route answered with"""
+        obj = BulkUploadJobRequest('0B5CBBD0-45B6-4BC5-8F4B-6F0E1B0F4A11')
+
+        self.assertEqual(obj.job_id, '0b5cbbd0-45b6-4bc5-8f4b-6f0e1b0f4a11')
+
+    def test_invalid_job_ids_are_rejected(self):
+        """Test that ids that are not UUIDs raise an error"""
+        for job_id in ('', '42', 'not-a-uuid', None):
+            with self.assertRaises(Error, msg=job_id):
+                BulkUploadJobRequest(job_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
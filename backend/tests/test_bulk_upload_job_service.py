@@ -0,0 +1,242 @@
+import io
+import os
+import time
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+from common.logging.error.error import Error
+from common.logging.error.error_messages import (INVALID_BULK_CSV_FILE, BULK_UPLOAD_JOB_NOT_FOUND,
+                                                 TOO_MANY_BULK_UPLOAD_JOBS)
+from backend.db.client.bulk_upload_job_store import SqliteBulkUploadJobStore
+from backend.db.service.bulk_upload_job_service import BulkUploadJobService, INTERRUPTED_JOB_MESSAGE
+from backend.db.service.property_creation_bulk_insertion_service import (PropertyCreationBulkInsertionService,
+                                                                          REQUIRED_COLUMNS)
+
+
+class TestBulkUploadJobService(unittest.TestCase):
+    """Test cases for BulkUploadJobService"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.mock_pool = MagicMock()
+        self.mock_bulk_insertion_service = MagicMock()
+        self.store = SqliteBulkUploadJobStore()
+        self.spool_directory = tempfile.mkdtemp()
+        self.addCleanup(os.rmdir, self.spool_directory)
+        self.service = self.create_service()
+
+    def create_service(self, max_active_jobs_per_user=2):
+        service = BulkUploadJobService(self.mock_pool, self.mock_bulk_insertion_service, self.store, workers=2,
+                                       max_active_jobs_per_user=max_active_jobs_per_user,
+                                       spool_directory=self.spool_directory)
+        self.addCleanup(service.shutdown)
+        return service
+
+    def create_request(self, content=b'street,city\n1 Main St,Austin\n', file_name='portfolio.csv'):
+        mock_request = MagicMock()
+        mock_request.content = io.BytesIO(content)
+        mock_request.file_name = file_name
+        return mock_request
+
+    def wait_for_jobs(self):
+        self.service.shutdown()
+
+    def wait_for_status(self, job_id, user_id, status):
+        for _ in range(500):
+            if self.service.fetch_job(job_id, user_id)['status'] == status:
+                return
+            time.sleep(0.01)
+        self.fail(f'The job did not reach {status}')
+
+    def test_upload_returns_a_job_id_at_once(self):
+        """Test that the route answers with a queued job before the import runs"""
+        started = threading.Event()
+        release = threading.Event()
+
+        def import_file(*args, **kwargs):
+            started.set()
+            release.wait(5)
+            return {'insertRecordStatus': 200}
+        self.mock_bulk_insertion_service.bulk_upload_properties_into_db.side_effect = import_file
+
+        response = self.service.submit_bulk_upload(self.create_request(), user_id=7)
+
+        self.assertEqual(response['status'], 'queued')
+        self.assertTrue(started.wait(5))
+        self.assertEqual(self.service.fetch_job(response['jobId'], 7)['status'], 'running')
+        release.set()
+        self.wait_for_jobs()
+        job = self.service.fetch_job(response['jobId'], 7)
+        self.assertEqual((job['status'], job['fileName'], job['errors']), ('succeeded', 'portfolio.csv', []))
+        self.mock_pool.record_write.assert_called_once_with(7)
+
+    def test_worker_reads_the_spooled_upload(self):
+        """Test that the worker imports a copy of the upload and removes it afterwards"""
+        seen = {}
+
+        def import_file(bulk_insertion_request, user_id, progress=None, progress_callback=None):
+            seen['content'] = bulk_insertion_request.content.read()
+            seen['file_name'] = bulk_insertion_request.file_name
+        self.mock_bulk_insertion_service.bulk_upload_properties_into_db.side_effect = import_file
+
+        self.service.submit_bulk_upload(self.create_request(b'a,b\n1,2\n'), user_id=7)
+        self.wait_for_jobs()
+
+        self.assertEqual(seen, {'content': b'a,b\n1,2\n', 'file_name': 'portfolio.csv'})
+        self.assertEqual(os.listdir(self.spool_directory), [])
+
+    def test_failed_import_reports_its_rows(self):
+        """Test that a failed job keeps the rows its import failed on"""
+        def import_file(bulk_insertion_request, user_id, progress=None, progress_callback=None):
+            progress.record_chunk(1000)
+            progress.record_error(INVALID_BULK_CSV_FILE.message, 1001)
+            raise Error(INVALID_BULK_CSV_FILE)
+        self.mock_bulk_insertion_service.bulk_upload_properties_into_db.side_effect = import_file
+
+        job_id = self.service.submit_bulk_upload(self.create_request(), user_id=7)['jobId']
+        self.wait_for_jobs()
+
+        job = self.service.fetch_job(job_id, 7)
+        self.assertEqual(job['status'], 'failed')
+        self.assertEqual(job['rowsWritten'], 1000)
+        self.assertEqual(job['errors'],
+                         [{'firstRow': 1001, 'lastRow': None, 'message': INVALID_BULK_CSV_FILE.message}])
+        self.mock_pool.record_write.assert_not_called()
+
+    def test_unexpected_failure_is_recorded(self):
+        """Test that an unexpected exception fails the job instead of leaving it running"""
+        self.mock_bulk_insertion_service.bulk_upload_properties_into_db.side_effect = RuntimeError('boom')
+
+        job_id = self.service.submit_bulk_upload(self.create_request(), user_id=7)['jobId']
+        self.wait_for_jobs()
+
+        job = self.service.fetch_job(job_id, 7)
+        self.assertEqual(job['status'], 'failed')
+        self.assertEqual(len(job['errors']), 1)
+        self.assertIsNone(job['errors'][0]['firstRow'])
+
+    def test_progress_writes_are_throttled(self):
+        """Test that chunks finishing faster than the write interval do not each write the job row"""
+        def import_file(bulk_insertion_request, user_id, progress=None, progress_callback=None):
+            for _ in range(5):
+                progress.record_chunk(100)
+                progress_callback(progress)
+        self.mock_bulk_insertion_service.bulk_upload_properties_into_db.side_effect = import_file
+
+        with patch.object(self.store, 'record_progress', wraps=self.store.record_progress) as mock_record_progress:
+            job_id = self.service.submit_bulk_upload(self.create_request(), user_id=7)['jobId']
+            self.wait_for_jobs()
+
+        self.assertEqual(mock_record_progress.call_count, 1)
+        self.assertEqual(self.service.fetch_job(job_id, 7)['rowsWritten'], 500)
+
+    def test_concurrent_uploads_are_limited_per_user(self):
+        """Test that a user cannot queue more uploads than the limit while others may"""
+        release = threading.Event()
+        self.mock_bulk_insertion_service.bulk_upload_properties_into_db.side_effect = lambda *a, **k: release.wait(5)
+        self.service = self.create_service(max_active_jobs_per_user=1)
+
+        job_id = self.service.submit_bulk_upload(self.create_request(), user_id=7)['jobId']
+        with self.assertRaises(Error) as context:
+            self.service.submit_bulk_upload(self.create_request(), user_id=7)
+        self.service.submit_bulk_upload(self.create_request(), user_id=8)
+
+        self.assertEqual(context.exception.code, TOO_MANY_BULK_UPLOAD_JOBS.code)
+        self.assertEqual(len(self.service.fetch_recent_jobs(7)['jobs']), 1)
+        release.set()
+        self.wait_for_status(job_id, 7, 'succeeded')
+        self.service.submit_bulk_upload(self.create_request(), user_id=7)
+        self.wait_for_jobs()
+        self.assertEqual(len(self.service.fetch_recent_jobs(7)['jobs']), 2)
+
+    def test_unknown_job_is_not_found(self):
+        """Test that another user's or a missing job raises BULK_UPLOAD_JOB_NOT_FOUND"""
+        job_id = self.service.submit_bulk_upload(self.create_request(), user_id=7)['jobId']
+        self.wait_for_jobs()
+
+        with self.assertRaises(Error) as context:
+            self.service.fetch_job(job_id, 8)
+
+        self.assertEqual(context.exception.code, BULK_UPLOAD_JOB_NOT_FOUND.code)
+
+    def test_jobs_interrupted_by_a_restart_are_failed(self):
+        """Test that the startup sweep fails the stale jobs a stopped instance left queued or running"""
+        self.store.create_job('interrupted', 7, 'portfolio.csv', 'stopped-instance')
+
+        self.assertEqual(self.service.fail_interrupted_jobs(stale_after_seconds=-1), 1)
+
+        job = self.service.fetch_job('interrupted', 7)
+        self.assertEqual(job['status'], 'failed')
+        self.assertEqual(job['errors'][0]['message'], INTERRUPTED_JOB_MESSAGE)
+
+    def test_constructing_the_service_does_not_fail_other_instances_jobs(self):
+        """Test that a second instance leaves the jobs of a live instance running"""
+        self.store.create_job('elsewhere', 7, 'portfolio.csv', 'live-instance')
+        self.store.mark_running('elsewhere')
+
+        self.create_service()
+        self.service.fail_interrupted_jobs()
+
+        self.assertEqual(self.service.fetch_job('elsewhere', 7)['status'], 'running')
+
+    def test_heartbeat_refreshes_this_instances_jobs(self):
+        """Test that the heartbeat thread writes the heartbeat of the jobs this instance owns"""
+        release = threading.Event()
+        self.mock_bulk_insertion_service.bulk_upload_properties_into_db.side_effect = lambda *a, **k: release.wait(5)
+
+        with patch('backend.db.service.bulk_upload_job_service.HEARTBEAT_INTERVAL_SECONDS', 0.01), \
+                patch.object(self.store, 'record_heartbeats', wraps=self.store.record_heartbeats) as mock_heartbeats:
+            service = self.create_service()
+            service.submit_bulk_upload(self.create_request(), user_id=7)
+            for _ in range(500):
+                if mock_heartbeats.called:
+                    break
+                time.sleep(0.01)
+            release.set()
+
+        mock_heartbeats.assert_called_with(service.instance_id)
+
+
+class TestBulkUploadJobImport(unittest.TestCase):
+    """Runs a job through the real streaming import against a mocked connection"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.mock_pool = MagicMock()
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+        self.mock_pool.pool.get_connection.return_value = self.mock_connection
+        self.mock_connection.cursor.return_value = self.mock_cursor
+        self.mock_cursor.execute.side_effect = self.execute
+        self.mock_cursor.fetchone.return_value = (1,)
+        self.next_property_id = 1
+
+        self.store = SqliteBulkUploadJobStore()
+        self.service = BulkUploadJobService(self.mock_pool, PropertyCreationBulkInsertionService(self.mock_pool, 2),
+                                            self.store, workers=1)
+        self.addCleanup(self.service.shutdown)
+
+    def execute(self, sql, params=None):
+        if 'INSERT INTO home_pulse_ai.properties' in sql:
+            self.mock_cursor.rowcount = len(params) // 7
+            self.mock_cursor.lastrowid = self.next_property_id
+            self.next_property_id += self.mock_cursor.rowcount
+
+    def test_job_imports_the_file_chunk_by_chunk(self):
+        """Test that the job's counts match the rows of the file"""
+        rows = [f'{i} Main St,Austin,TX,78701,20,-1' + ',' * (len(REQUIRED_COLUMNS) - 6) for i in range(5)]
+        mock_request = MagicMock()
+        mock_request.content = io.BytesIO('\n'.join([','.join(REQUIRED_COLUMNS)] + rows).encode('utf-8'))
+        mock_request.file_name = 'portfolio.csv'
+
+        job_id = self.service.submit_bulk_upload(mock_request, user_id=7)['jobId']
+        self.service.shutdown()
+
+        job = self.service.fetch_job(job_id, 7)
+        self.assertEqual((job['status'], job['rowsWritten'], job['chunksWritten']), ('succeeded', 5, 3))
+        self.mock_connection.commit.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
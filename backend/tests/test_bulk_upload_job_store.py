@@ -0,0 +1,125 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+from backend.db.client.bulk_upload_job_store import BulkUploadJobStore, SqliteBulkUploadJobStore
+from backend.db.model.bulk_import_progress import BulkImportProgress
+
+
+class TestSqliteBulkUploadJobStore(unittest.TestCase):
+    """Test cases for the job table statements, run on the SQLite stand-in"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.store = SqliteBulkUploadJobStore()
+        self.job_id = '0b5cbbd0-45b6-4bc5-8f4b-6f0e1b0f4a11'
+
+    def test_job_lifecycle(self):
+        """Test that a job moves from queued through running to succeeded with its counts"""
+        self.store.create_job(self.job_id, 7, 'portfolio.csv', 'instance-a')
+        self.assertEqual(self.store.fetch_job(self.job_id, 7)[1], 'queued')
+
+        self.store.mark_running(self.job_id)
+        progress = BulkImportProgress()
+        progress.record_chunk(1000)
+        self.store.record_progress(self.job_id, progress)
+        row = self.store.fetch_job(self.job_id, 7)
+        self.assertEqual((row[1], row[3], row[4]), ('running', 1000, 1))
+        self.assertIsNotNone(row[8])
+
+        progress.record_chunk(250)
+        self.store.finish_job(self.job_id, 'succeeded', progress)
+        row = self.store.fetch_job(self.job_id, 7)
+        self.assertEqual((row[1], row[2], row[3], row[4], json.loads(row[6])),
+                         ('succeeded', 'portfolio.csv', 1250, 2, []))
+        self.assertIsNotNone(row[9])
+
+    def test_failed_job_keeps_its_errors(self):
+        """Test that the rows a failed job involved are stored with it"""
+        self.store.create_job(self.job_id, 7, 'portfolio.csv', 'instance-a')
+        progress = BulkImportProgress()
+        progress.record_error('The rows could not be written', 1001, 2000)
+
+        self.store.finish_job(self.job_id, 'failed', progress)
+
+        self.assertEqual(json.loads(self.store.fetch_job(self.job_id, 7)[6]),
+                         [{'firstRow': 1001, 'lastRow': 2000, 'message': 'The rows could not be written'}])
+
+    def test_jobs_are_scoped_to_their_user(self):
+        """Test that a user cannot read another user's job"""
+        self.store.create_job(self.job_id, 7, 'portfolio.csv', 'instance-a')
+
+        self.assertIsNone(self.store.fetch_job(self.job_id, 8))
+        self.assertEqual(self.store.fetch_recent_jobs(8), [])
+        self.assertEqual(len(self.store.fetch_recent_jobs(7)), 1)
+
+    def test_interrupted_jobs_are_failed(self):
+        """Test that jobs with a stale heartbeat are failed and finished ones are kept"""
+        for job_id in ('a', 'b', 'c'):
+            self.store.create_job(job_id, 7, None, 'instance-a')
+        self.store.mark_running('b')
+        self.store.finish_job('c', 'succeeded', BulkImportProgress())
+
+        failed = self.store.fail_interrupted_jobs([{'firstRow': None, 'lastRow': None, 'message': 'restarted'}],
+                                                  stale_after_seconds=-1)
+
+        self.assertEqual(failed, 2)
+        self.assertEqual({row[0]: row[1] for row in self.store.fetch_recent_jobs(7)},
+                         {'a': 'failed', 'b': 'failed', 'c': 'succeeded'})
+
+    def test_jobs_with_a_fresh_heartbeat_are_kept(self):
+        """Test that the jobs of another live instance are not failed"""
+        self.store.create_job(self.job_id, 7, None, 'instance-b')
+        self.store.mark_running(self.job_id)
+        self.store.record_heartbeats('instance-b')
+
+        failed = self.store.fail_interrupted_jobs([], stale_after_seconds=120)
+
+        self.assertEqual(failed, 0)
+        self.assertEqual(self.store.fetch_job(self.job_id, 7)[1], 'running')
+
+    def test_failed_job_is_not_finished_again(self):
+        """Test that a job failed as interrupted does not flip back when its worker finishes after all"""
+        self.store.create_job(self.job_id, 7, None, 'instance-a')
+        self.store.mark_running(self.job_id)
+        self.store.fail_interrupted_jobs([], stale_after_seconds=-1)
+
+        self.assertFalse(self.store.finish_job(self.job_id, 'succeeded', BulkImportProgress()))
+        self.assertFalse(self.store.mark_running(self.job_id))
+        self.assertEqual(self.store.fetch_job(self.job_id, 7)[1], 'failed')
+
+    def test_long_file_names_are_truncated(self):
+        """Test that the file name fits the column"""
+        self.store.create_job(self.job_id, 7, 'x' * 300 + '.csv', 'instance-a')
+
+        self.assertEqual(len(self.store.fetch_job(self.job_id, 7)[2]), 255)
+
+
+class TestBulkUploadJobStore(unittest.TestCase):
+    """Test cases for the MySQL job store"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.mock_pool = MagicMock()
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+        self.mock_pool.pool.get_connection.return_value = self.mock_connection
+        self.mock_connection.cursor.return_value = self.mock_cursor
+        self.store = BulkUploadJobStore(self.mock_pool)
+
+    def test_progress_is_committed_on_its_own_connection(self):
+        """Test that progress writes commit at once, outside the import's transaction"""
+        progress = BulkImportProgress()
+        progress.record_chunk(500)
+
+        self.store.record_progress('job', progress)
+
+        sql, params = self.mock_cursor.execute.call_args.args
+        self.assertIn('UPDATE home_pulse_ai.bulk_upload_jobs', sql)
+        self.assertEqual(params[:2], [500, 1])
+        self.assertEqual(params[4], 'job')
+        self.mock_connection.commit.assert_called_once()
+        self.mock_connection.close.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from unittest.mock import MagicMock
+from backend.db.service.component_due_index_maintenance_service import ComponentDueIndexMaintenanceService
+from backend.db.service.appliance_information_update_service import ApplianceInformationUpdateService
+from backend.db.service.forecasted_replacement_date_update_service import ForecastedReplacementDateUpdateService
+from backend.db.model.query.sql_statements import (DELETE_COMPONENT_DUE_INDEX_BY_PROPERTY_ID,
+                                                   INSERT_COMPONENT_DUE_INDEX_BY_PROPERTY_ID,
+                                                   UPDATE_FORECASTED_REPLACEMENT_DATE)
+
+
+class TestComponentDueIndexMaintenanceService(unittest.TestCase):
+    """Test cases for ComponentDueIndexMaintenanceService"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+        self.mock_connection.cursor.return_value = self.mock_cursor
+
+    def test_refresh_rebuilds_each_property_once(self):
+        """Test that the rows of every distinct property are deleted and rebuilt, then committed"""
+        ComponentDueIndexMaintenanceService.refresh_component_due_index(self.mock_connection, [3, 1, 3])
+
+        self.assertEqual(self.mock_cursor.executemany.call_args_list[0][0],
+                         (DELETE_COMPONENT_DUE_INDEX_BY_PROPERTY_ID, [(3,), (1,)]))
+        self.assertEqual(self.mock_cursor.executemany.call_args_list[1][0],
+                         (INSERT_COMPONENT_DUE_INDEX_BY_PROPERTY_ID, [(3, 3), (1, 1)]))
+        self.mock_connection.commit.assert_called_once()
+
+    def test_refresh_can_leave_the_commit_to_the_caller(self):
+        """Test that commit=False keeps the rebuild in the caller's transaction"""
+        ComponentDueIndexMaintenanceService.refresh_component_due_index(self.mock_connection, [3], commit=False)
+
+        self.mock_connection.commit.assert_not_called()
+
+    def test_refresh_without_properties_still_commits(self):
+        """Test that an empty property list runs no statements but still commits the caller's writes"""
+        ComponentDueIndexMaintenanceService.refresh_component_due_index(self.mock_connection, [])
+
+        self.mock_connection.cursor.assert_not_called()
+        self.mock_connection.commit.assert_called_once()
+
+    def test_refresh_without_properties_can_leave_the_commit_to_the_caller(self):
+        """Test that an empty property list with commit=False does not commit"""
+        ComponentDueIndexMaintenanceService.refresh_component_due_index(self.mock_connection, [], commit=False)
+
+        self.mock_connection.commit.assert_not_called()
+
+    def test_forecasted_date_update_refreshes_in_the_same_transaction(self):
+        """Test that the index is rebuilt before the single commit of the update"""
+        status = ForecastedReplacementDateUpdateService.execute_forecasted_date_update_statement(
+            self.mock_connection, 42, 'Stove', '2030-01-01')
+
+        self.assertEqual(status, 200)
+        self.assertEqual(self.mock_cursor.execute.call_args[0][0], UPDATE_FORECASTED_REPLACEMENT_DATE)
+        self.assertEqual(self.mock_cursor.executemany.call_args[0][1], [(42, 42)])
+        self.mock_connection.commit.assert_called_once()
+
+    def test_failed_refresh_fails_the_appliance_update(self):
+        """Test that the update reports a failure when the index cannot be rebuilt"""
+        self.mock_cursor.executemany.side_effect = [None, Exception('lock wait timeout')]
+
+        status = ApplianceInformationUpdateService.execute_update_statement_for_appliance_table(
+            self.mock_connection, 42, [{'appliance_type': 'Stove', 'age_in_years': 3,
+                                        'estimated_replacement_cost': 900,
+                                        'forecasted_replacement_date': '2030-01-01 00:00:00'}])
+
+        self.assertEqual(status, 500)
+        self.mock_connection.commit.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
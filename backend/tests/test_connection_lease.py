@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import MagicMock
+from mysql.connector.errors import PoolError
+from common.logging.error.error import Error
+from backend.db.client.connection_lease import acquire_connection, acquire_read_only_connection, connection_lease
+
+
+class TestConnectionLease(unittest.TestCase):
+    """Test cases for acquire_connection and connection_lease"""
+
+    def test_acquire_returns_pooled_connection(self):
+        """Test that the connection from the pool is handed back unchanged"""
+        pool = MagicMock()
+
+        cnx = acquire_connection(pool)
+
+        self.assertEqual(cnx, pool.get_connection.return_value)
+
+    def test_acquire_timeout_raises_database_unavailable(self):
+        """Test that an exhausted pool surfaces as a retryable 503"""
+        pool = MagicMock()
+        pool.get_connection.side_effect = PoolError('Timed out')
+
+        with self.assertRaises(Error) as context:
+            acquire_connection(pool)
+
+        self.assertEqual(context.exception.code, 'DATABASE_UNAVAILABLE')
+        self.assertEqual(context.exception.status, 503)
+
+    def test_acquire_failure_raises_internal_service_error(self):
+        """Test that any other pool failure is reported as an internal error"""
+        pool = MagicMock()
+        pool.get_connection.side_effect = Exception('Connection refused')
+
+        with self.assertRaises(Error) as context:
+            acquire_connection(pool)
+
+        self.assertEqual(context.exception.code, 'INTERNAL_SERVICE_ERROR')
+
+    def test_read_only_connection_uses_routed_pool(self):
+        """Test that read-only calls lease from the pool picked by the router"""
+        db_pool = MagicMock()
+
+        cnx = acquire_read_only_connection(db_pool, user_id=1)
+
+        db_pool.read_pool.assert_called_once_with(1)
+        self.assertEqual(cnx, db_pool.read_pool.return_value.get_connection.return_value)
+        db_pool.pool.get_connection.assert_not_called()
+
+    def test_read_only_connection_falls_back_to_primary(self):
+        """Test that a failing replica does not fail the read"""
+        db_pool = MagicMock()
+        db_pool.read_pool.return_value.get_connection.side_effect = PoolError('Timed out')
+
+        with self.assertLogs(level='WARNING'):
+            cnx = acquire_read_only_connection(db_pool, user_id=1)
+
+        self.assertEqual(cnx, db_pool.pool.get_connection.return_value)
+
+    def test_lease_closes_connection_on_success(self):
+        """Test that the connection is returned when the block completes"""
+        cnx = MagicMock()
+
+        with connection_lease(cnx) as leased:
+            self.assertEqual(leased, cnx)
+
+        cnx.close.assert_called_once()
+
+    def test_lease_closes_connection_on_error(self):
+        """Test that the connection is returned and the error propagates when the block raises"""
+        cnx = MagicMock()
+
+        with self.assertRaises(ValueError):
+            with connection_lease(cnx):
+                raise ValueError('boom')
+
+        cnx.close.assert_called_once()
+
+    def test_close_failure_does_not_mask_result(self):
+        """Test that a failure returning the connection is logged rather than raised"""
+        cnx = MagicMock()
+        cnx.close.side_effect = Exception('already closed')
+
+        with self.assertLogs(level='WARNING'):
+            with connection_lease(cnx):
+                pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import inspect
+import unittest
+from unittest.mock import MagicMock
+from dependency_injector import providers
+
+os.environ.setdefault('ENV', 'local')
+
+try:
+    from backend.app.container import Container
+except ModuleNotFoundError as e:
+    raise unittest.SkipTest(f'The container needs the full requirements.txt: {e}')
+
+# Providers that open network connections or load models when built, replaced by mocks so the rest can be built
+EXTERNAL_PROVIDERS = ('home_pulse_db_connection_pool', 'async_home_pulse_db_connection_pool', 'home_bot_ai_service')
+
+
+class TestContainer(unittest.TestCase):
+    """Builds every provider of the Container, so wiring mistakes fail here instead of on the first request"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.container = Container()
+        for name in EXTERNAL_PROVIDERS:
+            getattr(self.container, name).override(providers.Object(MagicMock()))
+        self.addCleanup(self.container.reset_override)
+
+    def test_provider_arguments_match_their_constructors(self):
+        """Test that every provider passes arguments its class accepts, including the mocked ones"""
+        for name, provider in Container.providers.items():
+            if not isinstance(provider, providers.Singleton):
+                continue
+            with self.subTest(provider=name):
+                inspect.signature(provider.cls).bind(*provider.args, **provider.kwargs)
+
+    def test_every_provider_can_be_built(self):
+        """Test that every provider resolves to an instance"""
+        for name, provider in self.container.providers.items():
+            if not isinstance(provider, providers.Singleton):
+                continue
+            with self.subTest(provider=name):
+                instance = provider()
+                self.assertIsNotNone(instance)
+                if name == 'bulk_upload_job_service':
+                    self.addCleanup(instance.shutdown)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from datetime import date
+from backend.db.model.query import sql_statements
+from backend.db.dev.explain_advisor import (recommend_indexes, analyze_plan, render_migration, sample_params,
+                                            IndexRecommendation, STATEMENT_VARIANTS)
+
+
+class TestRecommendIndexes(unittest.TestCase):
+    """Test cases for the index advisor"""
+
+    def columns_by_table(self, statement_name, sql=None):
+        sql = sql or getattr(sql_statements, statement_name)
+        return {recommendation.table: recommendation.columns
+                for recommendation in recommend_indexes(statement_name, sql)}
+
+    def test_management_tab_filters_by_property_then_date(self):
+        """Test that the correlated IN subquery and the date range become one composite index per component"""
+        columns = self.columns_by_table('SELECT_PROPERTY_INFORMATION_BY_USER_FOR_MANAGEMENT_TAB')
+
+        self.assertEqual(columns['appliances'], ('property_id', 'forecasted_replacement_date'))
+        self.assertEqual(columns['structures'], ('property_id', 'forecasted_replacement_date'))
+        self.assertEqual(columns['properties'], ('user_id',))
+
+    def test_property_notes_index_covers_filters_and_sort(self):
+        """Test that the filtered note lookup gets an index ending in the sort column"""
+        columns = self.columns_by_table('FETCH_PROPERTY_NOTES', STATEMENT_VARIANTS['FETCH_PROPERTY_NOTES'][1])
+
+        self.assertEqual(columns['property_notes'],
+                         ('property_id', 'user_id', 'entity_type', 'entity_id', 'created_at'))
+
+    def test_stripe_customer_lookup(self):
+        """Test that a lookup by a non-key column is indexed"""
+        columns = self.columns_by_table('SELECT_USER_ID_BY_STRIPE_CUSTOMER')
+
+        self.assertEqual(columns, {'users': ('stripe_customer_id',)})
+
+    def test_primary_key_lookups_are_skipped(self):
+        """Test that statements already served by the primary key get no recommendation"""
+        self.assertEqual(self.columns_by_table('SELECT_CUSTOMER_FIRST_AND_LAST'), {})
+        self.assertNotIn('units', self.columns_by_table('VERIFY_UNIT_OWNERSHIP'))
+
+    def test_set_clause_is_not_treated_as_a_filter(self):
+        """Test that assigned columns of an UPDATE do not end up in the index"""
+        columns = self.columns_by_table('UPDATE_APPLIANCE_INFORMATION_BULK')
+
+        self.assertEqual(columns, {'appliances': ('property_id', 'appliance_type')})
+
+    def test_inserts_are_ignored(self):
+        """Test that INSERT statements are not analyzed"""
+        self.assertEqual(recommend_indexes('INSERT_PROPERTY_NOTE', sql_statements.INSERT_PROPERTY_NOTE), [])
+
+
+class TestAnalyzePlan(unittest.TestCase):
+    """Test cases for the EXPLAIN analysis"""
+
+    def test_full_scans_and_filesorts_are_flagged(self):
+        """Test that the plan steps reading the whole table or sorting are reported by table name"""
+        plan = [
+            {'table': 'ap', 'type': 'ALL', 'rows': 50000, 'Extra': 'Using where'},
+            {'table': 'pr', 'type': 'eq_ref', 'rows': 1, 'Extra': None},
+            {'table': '<union1,3>', 'type': 'ALL', 'rows': None, 'Extra': 'Using temporary; Using filesort'}
+        ]
+
+        findings = analyze_plan(sql_statements.SELECT_PROPERTY_INFORMATION_BY_USER_FOR_MANAGEMENT_TAB, plan)
+
+        self.assertIn(('appliances', 'full table scan', 50000), findings)
+        self.assertIn(('<union1,3>', 'filesort', 0), findings)
+        self.assertNotIn('properties', [finding.table for finding in findings])
+
+    def test_small_scans_are_ignored(self):
+        """Test that scans of reference tables under the threshold are not flagged"""
+        plan = [{'table': 'appliance_information', 'type': 'ALL', 'rows': 8, 'Extra': None}]
+
+        self.assertEqual(analyze_plan(sql_statements.SELECT_APPLIANCE_INFORMATION_FOR_REPLACEMENT_COST, plan), [])
+
+
+class TestRenderMigration(unittest.TestCase):
+    """Test cases for the generated DDL"""
+
+    def test_prefix_indexes_are_folded_into_longer_ones(self):
+        """Test that an index that is a left prefix of another one on the same table is not created"""
+        migration = render_migration([
+            IndexRecommendation('appliances', ('property_id',), 'SELECT_APPLIANCES_BY_PROPERTY_ID'),
+            IndexRecommendation('appliances', ('property_id', 'appliance_type'), 'UPDATE_FORECASTED_REPLACEMENT_DATE')
+        ])
+
+        self.assertNotIn('idx_appliances_property_id ON', migration)
+        self.assertIn('CREATE INDEX idx_appliances_property_id_appliance_type ON home_pulse_ai.appliances '
+                      '(property_id, appliance_type);', migration)
+        self.assertIn('-- Serves SELECT_APPLIANCES_BY_PROPERTY_ID, UPDATE_FORECASTED_REPLACEMENT_DATE', migration)
+
+    def test_sample_params_match_the_compared_columns(self):
+        """Test that EXPLAIN binds a value of the right type to every placeholder"""
+        self.assertEqual(sample_params(sql_statements.UPDATE_STRUCTURE_INFORMATION_BULK),
+                         [1, 1, date.today(), 1, 'Roof'])
+        self.assertEqual(sample_params(sql_statements.SELECT_USER_ID_BY_STRIPE_CUSTOMER), ['cus_0000000001'])
+
+
+if __name__ == '__main__':
+    unittest.main()
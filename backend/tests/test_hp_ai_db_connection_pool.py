@@ -0,0 +1,89 @@
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from backend.db.client.hp_ai_db_connection_pool import HpAIDbConnectionPool
+
+
+class TestHpAIDbConnectionPool(unittest.TestCase):
+    """Test cases for HpAIDbConnectionPool replica routing"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        patcher = patch('backend.db.client.hp_ai_db_connection_pool.BoundedConnectionPool',
+                        side_effect=lambda **kwargs: MagicMock(pool_name=kwargs['pool_name']))
+        self.mock_pool_class = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_pool(self, replica_host='replica.internal', read_your_writes_window=5.0):
+        return HpAIDbConnectionPool(host='primary.internal', port=3306, user='user', password='password',
+                                    db='home_pulse', replica_host=replica_host,
+                                    read_your_writes_window=read_your_writes_window)
+
+    def test_reads_use_primary_without_replica(self):
+        """Test that reads stay on the primary when no replica is configured"""
+        db_pool = self.create_pool(replica_host=None)
+
+        self.assertIsNone(db_pool.replica_pool)
+        self.assertIs(db_pool.read_pool(user_id=1), db_pool.pool)
+
+    def test_reads_use_replica(self):
+        """Test that reads go to the replica when one is configured"""
+        db_pool = self.create_pool()
+
+        self.assertEqual(db_pool.replica_pool.pool_name, 'hp_ai_db_replica_pool')
+        self.assertIs(db_pool.read_pool(user_id=1), db_pool.replica_pool)
+
+    def test_reads_stay_on_primary_after_own_write(self):
+        """Test that a user's reads go to the primary inside the read-your-writes window"""
+        db_pool = self.create_pool()
+
+        db_pool.record_write(user_id=1)
+
+        self.assertIs(db_pool.read_pool(user_id=1), db_pool.pool)
+        self.assertIs(db_pool.read_pool(user_id=2), db_pool.replica_pool)
+
+    def test_path_user_id_matches_token_user_id(self):
+        """Test that a read with the str user id from the route path sees the write recorded with the int"""
+        db_pool = self.create_pool()
+
+        db_pool.record_write(user_id=42)
+
+        self.assertIs(db_pool.read_pool(user_id='42'), db_pool.pool)
+        self.assertIs(db_pool.read_pool(user_id='43'), db_pool.replica_pool)
+
+    def test_reads_return_to_replica_after_window(self):
+        """Test that the pin to the primary expires"""
+        db_pool = self.create_pool(read_your_writes_window=0.01)
+
+        db_pool.record_write(user_id=1)
+        time.sleep(0.02)
+
+        self.assertIs(db_pool.read_pool(user_id=1), db_pool.replica_pool)
+
+    def test_replica_failure_does_not_stop_startup(self):
+        """Test that an unreachable replica leaves every read on the primary"""
+        def create(**kwargs):
+            if kwargs['pool_name'] == 'hp_ai_db_replica_pool':
+                raise Exception('Connection refused')
+            return MagicMock()
+
+        self.mock_pool_class.side_effect = create
+
+        db_pool = self.create_pool()
+
+        self.assertIsNone(db_pool.replica_pool)
+        self.assertIs(db_pool.read_pool(user_id=1), db_pool.pool)
+
+    def test_pool_stats_include_replica(self):
+        """Test that the metrics include the replica gauges"""
+        db_pool = self.create_pool()
+        db_pool.pool.stats.return_value = {'poolName': 'hp_ai_db_pool'}
+        db_pool.replica_pool.stats.return_value = {'poolName': 'hp_ai_db_replica_pool'}
+
+        stats = db_pool.pool_stats()
+
+        self.assertEqual(stats['replica']['poolName'], 'hp_ai_db_replica_pool')
+
+
+if __name__ == '__main__':
+    unittest.main()
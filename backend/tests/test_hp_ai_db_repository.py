@@ -0,0 +1,186 @@
+import unittest
+from unittest.mock import MagicMock
+from common.logging.error.error import Error
+from backend.db.client.statement_metrics import statement_metrics
+from backend.db.client.hp_ai_db_repository import HpAIDbRepository
+from backend.db.client.bounded_connection_pool import BoundedConnectionPool
+from backend.db.model.query.sql_statements import SELECT_ADDRESSES_BY_USER_ID, UPDATE_FIRST_AND_LAST_OF_CUSTOMER
+
+
+class TestHpAIDbRepository(unittest.TestCase):
+    """Test cases for HpAIDbRepository"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        statement_metrics.reset()
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+        self.mock_connection.cursor.return_value = self.mock_cursor
+        self.mock_cursor.description = [('id',), ('address',)]
+        self.mock_cursor.fetchall.return_value = [(1, '123 Main St'), (2, '456 Oak Ave')]
+
+    def test_fetch_all_runs_statement_by_name(self):
+        """Test that the statement text is looked up from sql_statements.py"""
+        HpAIDbRepository.fetch_all(self.mock_connection, 'SELECT_ADDRESSES_BY_USER_ID', [7])
+
+        self.mock_cursor.execute.assert_called_once_with(SELECT_ADDRESSES_BY_USER_ID, [7])
+        self.mock_cursor.close.assert_called_once()
+
+    def test_fetch_all_returns_typed_rows(self):
+        """Test that rows expose the selected columns by name and stay indexable"""
+        rows = HpAIDbRepository.fetch_all(self.mock_connection, 'SELECT_ADDRESSES_BY_USER_ID', [7])
+
+        self.assertEqual(rows[0].address, '123 Main St')
+        self.assertEqual(rows[1][0], 2)
+        self.assertEqual(type(rows[0]).__name__, 'SelectAddressesByUserIdRow')
+
+    def test_fetch_one_returns_none_without_rows(self):
+        """Test that an empty result is None rather than an empty row"""
+        self.mock_cursor.fetchone.return_value = None
+
+        row = HpAIDbRepository.fetch_one(self.mock_connection, 'SELECT_ADDRESSES_BY_USER_ID', [7])
+
+        self.assertIsNone(row)
+
+    def test_execute_commits_and_reports_result(self):
+        """Test that writes can commit and return the affected rows and generated id"""
+        self.mock_cursor.rowcount = 1
+        self.mock_cursor.lastrowid = 42
+
+        result = HpAIDbRepository.execute(self.mock_connection, 'UPDATE_FIRST_AND_LAST_OF_CUSTOMER',
+                                          ['Ada', 'Lovelace', 7], commit=True)
+
+        self.mock_cursor.execute.assert_called_once_with(UPDATE_FIRST_AND_LAST_OF_CUSTOMER, ['Ada', 'Lovelace', 7])
+        self.mock_connection.commit.assert_called_once()
+        self.assertEqual(result.rowcount, 1)
+        self.assertEqual(result.lastrowid, 42)
+
+    def test_execute_many_uses_executemany(self):
+        """Test that batched writes go through a single executemany call"""
+        HpAIDbRepository.execute_many(self.mock_connection, 'UPDATE_APPLIANCE_INFORMATION', [(1, 'stove')])
+
+        self.mock_cursor.executemany.assert_called_once()
+        self.mock_connection.commit.assert_not_called()
+
+    def test_dynamic_sql_is_recorded_under_statement_name(self):
+        """Test that statements extended with filters keep their base name in the metrics"""
+        HpAIDbRepository.fetch_all(self.mock_connection, 'FETCH_PROPERTY_NOTES', [1, 2],
+                                   sql='SELECT 1 ORDER BY created_at DESC;')
+
+        self.mock_cursor.execute.assert_called_once_with('SELECT 1 ORDER BY created_at DESC;', [1, 2])
+        self.assertIn('FETCH_PROPERTY_NOTES', statement_metrics.snapshot())
+
+    def test_database_error_raises_error_and_closes_cursor(self):
+        """Test that driver failures surface as an internal service error"""
+        self.mock_cursor.execute.side_effect = Exception('Database connection failed')
+
+        with self.assertRaises(Error) as context:
+            HpAIDbRepository.fetch_all(self.mock_connection, 'SELECT_ADDRESSES_BY_USER_ID', [7])
+
+        self.assertEqual(context.exception.code, 'INTERNAL_SERVICE_ERROR')
+        self.mock_cursor.close.assert_called_once()
+        self.assertEqual(statement_metrics.snapshot()['SELECT_ADDRESSES_BY_USER_ID']['errors'], 1)
+
+    def test_unknown_statement_raises_value_error(self):
+        """Test that a typo in a statement name fails loudly instead of reaching the database"""
+        with self.assertRaises(ValueError):
+            HpAIDbRepository.fetch_all(self.mock_connection, 'SELECT_NOTHING', [])
+
+        self.mock_connection.cursor.assert_not_called()
+
+    def test_metrics_record_latency_and_rows(self):
+        """Test that every execution is counted in the central registry"""
+        HpAIDbRepository.fetch_all(self.mock_connection, 'SELECT_ADDRESSES_BY_USER_ID', [7])
+        HpAIDbRepository.fetch_all(self.mock_connection, 'SELECT_ADDRESSES_BY_USER_ID', [8])
+
+        metrics = statement_metrics.snapshot()['SELECT_ADDRESSES_BY_USER_ID']
+        self.assertEqual(metrics['calls'], 2)
+        self.assertEqual(metrics['rows'], 4)
+        self.assertEqual(metrics['avgRows'], 2.0)
+        self.assertEqual(metrics['latency']['count'], 2)
+
+    def test_prepared_statement_is_reused_across_leases(self):
+        """Test that a pool with a prepared statement cache prepares a named statement once per connection"""
+        physical = MagicMock()
+        physical.in_transaction = False
+        prepared = physical.cursor.return_value
+        prepared.description = [('unit_id',)]
+        prepared.fetchall.return_value = [(3,)]
+        pool = BoundedConnectionPool(pool_name='test_pool', connection_factory=lambda: physical, pool_size=1,
+                                     prepared_statement_cache_size=4)
+
+        for _ in range(2):
+            cnx = pool.get_connection()
+            row = HpAIDbRepository.fetch_one(cnx, 'VERIFY_UNIT_OWNERSHIP', [3, 7])
+            cnx.close()
+
+        self.assertEqual(row.unit_id, 3)
+        physical.cursor.assert_called_once_with(prepared=True)
+        self.assertIs(prepared.execute.call_args_list[0][0][0], prepared.execute.call_args_list[1][0][0])
+        prepared.close.assert_not_called()
+
+    def test_dynamic_sql_is_not_prepared(self):
+        """Test that statements extended at runtime use a plain cursor instead of filling the cache"""
+        physical = MagicMock()
+        physical.in_transaction = False
+        pool = BoundedConnectionPool(pool_name='test_pool', connection_factory=lambda: physical, pool_size=1,
+                                     prepared_statement_cache_size=4)
+        cnx = pool.get_connection()
+
+        HpAIDbRepository.fetch_all(cnx, 'FETCH_PROPERTY_NOTES', [1, 2], sql='SELECT 1;')
+
+        physical.cursor.assert_called_once_with()
+        self.assertEqual(len(cnx._entry.prepared_cursors), 0)
+
+    def test_connection_leases_and_returns(self):
+        """Test that the connection helper returns the lease when the block exits"""
+        db_pool = MagicMock()
+        repository = HpAIDbRepository(db_pool)
+
+        with repository.connection() as cnx:
+            self.assertEqual(cnx, db_pool.pool.get_connection.return_value)
+
+        db_pool.pool.get_connection.return_value.close.assert_called_once()
+
+
+    def test_stream_yields_batches_from_an_unbuffered_cursor(self):
+        """Test that rows are fetched a batch at a time and the stream cleans up once read to the end"""
+        self.mock_cursor.fetchmany.side_effect = [[(1, '123 Main St'), (2, '456 Oak Ave')], [(3, '9 Elm St')], []]
+
+        stream = HpAIDbRepository.stream(self.mock_connection, 'SELECT_ADDRESSES_BY_USER_ID', [7],
+                                         transform=lambda rows: [row.address for row in rows], batch_size=2,
+                                         release=True)
+        batches = list(stream)
+
+        self.mock_connection.cursor.assert_called_once_with(buffered=False)
+        self.mock_cursor.fetchmany.assert_called_with(2)
+        self.assertEqual(batches, [['123 Main St', '456 Oak Ave'], ['9 Elm St']])
+        self.mock_cursor.close.assert_called_once()
+        self.mock_connection.consume_results.assert_not_called()
+        self.mock_connection.close.assert_called_once()
+        self.assertEqual(statement_metrics.snapshot()['SELECT_ADDRESSES_BY_USER_ID']['rows'], 3)
+
+    def test_stream_closed_early_discards_unread_rows(self):
+        """Test that abandoning a stream leaves the connection free for the next statement"""
+        self.mock_cursor.fetchmany.return_value = [(1, '123 Main St')]
+
+        stream = HpAIDbRepository.stream(self.mock_connection, 'SELECT_ADDRESSES_BY_USER_ID', [7])
+        next(iter(stream))
+        stream.close()
+
+        self.mock_connection.consume_results.assert_called_once()
+        self.mock_cursor.close.assert_called_once()
+        self.mock_connection.close.assert_not_called()
+
+    def test_stream_failure_to_start_raises_error(self):
+        """Test that a statement failing to run raises before any row is handed out"""
+        self.mock_cursor.execute.side_effect = Exception('boom')
+
+        with self.assertRaises(Error):
+            HpAIDbRepository.stream(self.mock_connection, 'SELECT_ADDRESSES_BY_USER_ID', [7])
+
+        self.mock_cursor.close.assert_called_once()
+        self.assertEqual(statement_metrics.snapshot()['SELECT_ADDRESSES_BY_USER_ID']['errors'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import hashlib
+import unittest
+from backend.db.model.idempotency_request import IdempotencyRequest
+from common.logging.error.error import Error
+
+
+class TestIdempotencyRequest(unittest.TestCase):
+
+    def test_without_key(self):
+        """Test that requests without the header are not deduplicated"""
+        obj = IdempotencyRequest(None, b'[]')
+
+        self.assertIsNone(obj.key)
+        self.assertIsNone(obj.request_hash)
+
+    def test_key_and_body_hash(self):
+        """Test that the key is kept with a hash of the body it was sent with"""
+        obj = IdempotencyRequest('3f2c9a6e-1b7d-4c1e-9a8f-0d2b7e5c4a11', b'[{"address": "1 Main St"}]')
+
+        self.assertEqual(obj.key, '3f2c9a6e-1b7d-4c1e-9a8f-0d2b7e5c4a11')
+        self.assertEqual(obj.request_hash, hashlib.sha256(b'[{"address": "1 Main St"}]').hexdigest())
+
+    def test_invalid_keys_are_rejected(self):
+        """Test that empty, oversized and non token keys raise an error"""
+        for key in ('', 'k' * 129, 'two words', 'key;drop'):
+            with self.assertRaises(Error, msg=key):
+                IdempotencyRequest(key, b'[]')
+
+
+if __name__ == '__main__':
+    unittest.main()
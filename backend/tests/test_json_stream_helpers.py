@@ -0,0 +1,56 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+from flask import Flask
+from common.helpers.json_stream_helpers import streamed_json_response, NDJSON_MIMETYPE
+
+
+class TestJsonStreamHelpers(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+
+    def body(self, batches, response_format, **kwargs):
+        with self.app.app_context():
+            response = streamed_json_response(batches, response_format, **kwargs)
+            return response, response.get_data(as_text=True)
+
+    def test_json_array(self):
+        """Test that the batches make up a single JSON array"""
+        response, body = self.body(iter([[{'id': 1}, {'id': 2}], [], [{'id': 3}]]), 'json')
+
+        self.assertEqual(json.loads(body), [{'id': 1}, {'id': 2}, {'id': 3}])
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertEqual(json.loads(self.body(iter([]), 'json')[1]), [])
+
+    def test_json_object_with_streamed_member(self):
+        """Test that the items are written under list_key after the head members"""
+        _, body = self.body(iter([[{'id': 1}]]), 'json', head={'summary': {'count': 1}}, list_key='items')
+        _, empty_head = self.body(iter([]), 'json', head={}, list_key='notes')
+
+        self.assertEqual(json.loads(body), {'summary': {'count': 1}, 'items': [{'id': 1}]})
+        self.assertEqual(json.loads(empty_head), {'notes': []})
+
+    def test_ndjson(self):
+        """Test one line for the head and one line per item"""
+        response, body = self.body(iter([[{'id': 1}, {'id': 2}]]), 'ndjson', head={'horizonMonths': 3},
+                                   list_key='items')
+
+        self.assertEqual([json.loads(line) for line in body.splitlines()],
+                         [{'horizonMonths': 3}, {'id': 1}, {'id': 2}])
+        self.assertEqual(response.mimetype, NDJSON_MIMETYPE)
+
+    def test_closing_the_response_closes_the_batches(self):
+        """Test that a client going away mid-stream still releases the stream"""
+        batches = MagicMock()
+        batches.__iter__.return_value = iter([[{'id': 1}], [{'id': 2}]])
+        with self.app.app_context():
+            response = streamed_json_response(batches, 'json')
+            next(iter(response.response))
+            response.close()
+
+        batches.close.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
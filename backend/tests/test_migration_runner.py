@@ -0,0 +1,97 @@
+import os
+import re
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from backend.db.migrations.migration_runner import (MigrationRunner, MigrationError, discover_migrations,
+                                                    split_statements, MIGRATIONS_DIR, INSERT_APPLIED_MIGRATION)
+
+
+class TestMigrationRunner(unittest.TestCase):
+    """Test cases for MigrationRunner"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.migrations_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.migrations_dir)
+        self.write('V002__add_notes_index.sql', 'CREATE INDEX idx_b ON home_pulse_ai.property_notes (property_id);')
+        self.write('V001__add_users_index.sql', '-- users\nCREATE INDEX idx_a ON home_pulse_ai.users (email);\n'
+                                                'CREATE INDEX idx_c ON home_pulse_ai.users (stripe_customer_id);')
+        self.write('README.md', 'not a migration')
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+        self.mock_connection.cursor.return_value = self.mock_cursor
+        self.mock_cursor.fetchall.return_value = []
+        self.runner = MigrationRunner(self.mock_connection, self.migrations_dir)
+
+    def write(self, file_name, content):
+        with open(os.path.join(self.migrations_dir, file_name), 'w') as migration_file:
+            migration_file.write(content)
+
+    def test_migrations_are_discovered_in_version_order(self):
+        """Test that only V<version>__<description>.sql files are picked up, lowest version first"""
+        migrations = discover_migrations(self.migrations_dir)
+
+        self.assertEqual([(m.version, m.description) for m in migrations],
+                         [(1, 'add users index'), (2, 'add notes index')])
+
+    def test_migrate_applies_and_records_every_pending_file(self):
+        """Test that each statement runs and each file is recorded after its statements"""
+        applied = self.runner.migrate()
+
+        self.assertEqual([migration.version for migration in applied], [1, 2])
+        executed = [call.args[0] for call in self.mock_cursor.execute.call_args_list]
+        self.assertIn('CREATE INDEX idx_a ON home_pulse_ai.users (email)', executed)
+        self.assertIn('CREATE INDEX idx_c ON home_pulse_ai.users (stripe_customer_id)', executed)
+        self.assertEqual(executed.count(INSERT_APPLIED_MIGRATION), 2)
+        self.assertEqual(self.mock_connection.commit.call_count, 2)
+
+    def test_applied_versions_are_skipped(self):
+        """Test that a migration recorded with the same checksum is not run again"""
+        checksum = discover_migrations(self.migrations_dir)[0].checksum
+        self.mock_cursor.fetchall.return_value = [(1, checksum)]
+
+        self.assertEqual([migration.version for migration in self.runner.pending()], [2])
+
+    def test_target_limits_the_applied_versions(self):
+        """Test that migrate stops at the requested version"""
+        self.assertEqual([migration.version for migration in self.runner.migrate(target=1)], [1])
+
+    def test_edited_migration_is_rejected(self):
+        """Test that a file changed after it was applied fails instead of drifting from the database"""
+        self.mock_cursor.fetchall.return_value = [(1, 'stale-checksum')]
+
+        with self.assertRaises(MigrationError):
+            self.runner.migrate()
+
+    def test_failed_statement_stops_the_run(self):
+        """Test that a failing file is not recorded and later files are not attempted"""
+        self.mock_cursor.execute.side_effect = [None, None, Exception('Duplicate key name')]
+
+        with self.assertRaises(MigrationError):
+            self.runner.migrate()
+
+        self.mock_connection.commit.assert_not_called()
+
+    def test_split_statements_drops_comments(self):
+        """Test that comment lines and empty statements are removed"""
+        self.assertEqual(split_statements('-- note\nSELECT 1;\n\n;SELECT 2;'), ['SELECT 1', 'SELECT 2'])
+
+
+class TestShippedMigrations(unittest.TestCase):
+    """Consistency checks for the migrations in backend/db/migrations"""
+
+    def test_dropped_indexes_were_created_by_an_earlier_version(self):
+        """Test that every DROP INDEX refers to an index an earlier migration created"""
+        created = set()
+        for migration in discover_migrations(MIGRATIONS_DIR):
+            with open(migration.path) as migration_file:
+                script = migration_file.read()
+            for dropped in re.findall(r'DROP INDEX (\w+)', script):
+                self.assertIn(dropped, created, f'V{migration.version} drops unknown index {dropped}')
+            created.update(re.findall(r'(?:CREATE|ADD) INDEX (\w+)', script))
+
+
+if __name__ == '__main__':
+    unittest.main()
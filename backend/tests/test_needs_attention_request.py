@@ -0,0 +1,32 @@
+import unittest
+from backend.db.model.needs_attention_request import (NeedsAttentionRequest, DEFAULT_HORIZON_MONTHS,
+                                                      MAX_HORIZON_MONTHS)
+from common.logging.error.error import Error
+
+
+class TestNeedsAttentionRequest(unittest.TestCase):
+
+    def test_defaults(self):
+        """Test the three month horizon without detail rows"""
+        obj = NeedsAttentionRequest({})
+
+        self.assertEqual(obj.horizon_months, DEFAULT_HORIZON_MONTHS)
+        self.assertFalse(obj.include_details)
+
+    def test_horizon_and_details(self):
+        """Test an explicit horizon with detail rows"""
+        obj = NeedsAttentionRequest({'horizonMonths': '12', 'details': 'True'})
+
+        self.assertEqual(obj.horizon_months, 12)
+        self.assertTrue(obj.include_details)
+
+    def test_invalid_parameters_are_rejected(self):
+        """Test that out of range horizons and malformed flags raise an error"""
+        for args in ({'horizonMonths': '0'}, {'horizonMonths': str(MAX_HORIZON_MONTHS + 1)},
+                     {'horizonMonths': 'soon'}, {'horizonMonths': '²'}, {'details': 'yes'}):
+            with self.assertRaises(Error, msg=args):
+                NeedsAttentionRequest(args)
+
+
+if __name__ == '__main__':
+    unittest.main()
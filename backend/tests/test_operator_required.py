@@ -0,0 +1,44 @@
+import unittest
+from unittest.mock import patch
+from flask import Flask, request
+from common.decorators.operator_required import operator_required
+
+
+class TestOperatorRequired(unittest.TestCase):
+    """Test cases for the operator_required decorator"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.app = Flask(__name__)
+        self.route = operator_required(lambda: ('ok', 200))
+
+    def call_route_as(self, user_id):
+        with self.app.test_request_context('/api/metrics/db-pool'):
+            if user_id is not None:
+                request.user_id = user_id
+            response = self.app.make_response(self.route())
+        return response.status_code
+
+    @patch('common.decorators.operator_required.OPERATOR_USER_IDS', frozenset({1}))
+    def test_operator_is_let_through(self):
+        """Test that a user listed in OPERATOR_USER_IDS reaches the route"""
+        self.assertEqual(self.call_route_as(1), 200)
+
+    @patch('common.decorators.operator_required.OPERATOR_USER_IDS', frozenset({1}))
+    def test_other_users_are_forbidden(self):
+        """Test that any other user gets a 403"""
+        self.assertEqual(self.call_route_as(2), 403)
+
+    @patch('common.decorators.operator_required.OPERATOR_USER_IDS', frozenset())
+    def test_nobody_is_an_operator_by_default(self):
+        """Test that the routes are closed when no operators are configured"""
+        self.assertEqual(self.call_route_as(1), 403)
+
+    @patch('common.decorators.operator_required.OPERATOR_USER_IDS', frozenset({1}))
+    def test_unauthenticated_request_is_forbidden(self):
+        """Test that a request without a user id is refused"""
+        self.assertEqual(self.call_route_as(None), 403)
+
+
+if __name__ == '__main__':
+    unittest.main()
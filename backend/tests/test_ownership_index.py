@@ -0,0 +1,119 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from backend.db.client.ownership_index import OwnershipIndex, ownership_index
+from backend.db.client.authorization_scope import fetch_all_for_user
+
+
+class TestOwnershipIndex(unittest.TestCase):
+    """Test cases for OwnershipIndex"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.index = OwnershipIndex(max_users=2, ttl_seconds=300)
+        self.cnx = MagicMock()
+        self.now = 1000.0
+        monotonic_patcher = patch('backend.db.client.ownership_index.time.monotonic', side_effect=lambda: self.now)
+        monotonic_patcher.start()
+        self.addCleanup(monotonic_patcher.stop)
+        fetch_all_patcher = patch('backend.db.client.ownership_index.HpAIDbRepository.fetch_all',
+                                  side_effect=self.fetch_all)
+        self.mock_fetch_all = fetch_all_patcher.start()
+        self.addCleanup(fetch_all_patcher.stop)
+        self.properties = {7: [(1,), (2,)], 8: [(3,)], 9: [(4,)]}
+        self.units = {7: [(10,)], 8: [], 9: []}
+
+    def fetch_all(self, cnx, statement_name, params):
+        rows = self.properties if statement_name == 'SELECT_ADDRESSES_BY_USER_ID' else self.units
+        return rows[params[0]]
+
+    def test_first_check_loads_and_later_checks_are_lookups(self):
+        """Test that a user's ids are read once, then answered from memory"""
+        self.assertTrue(self.index.owns_property(self.cnx, 7, 1))
+        self.assertTrue(self.index.owns_property(self.cnx, '7', '2'))
+        self.assertTrue(self.index.owns_unit(self.cnx, 7, 10))
+
+        self.assertEqual(self.mock_fetch_all.call_count, 2)
+        self.assertEqual(self.index.stats()['hits'], 2)
+
+    def test_miss_on_fresh_entry_does_not_reload(self):
+        """Test that probing ids the user does not own does not query on every check"""
+        self.index.owns_property(self.cnx, 7, 1)
+
+        self.assertFalse(self.index.owns_property(self.cnx, 7, 3))
+        self.assertEqual(self.mock_fetch_all.call_count, 2)
+
+        self.now += 2
+        self.properties[7].append((3,))
+        self.assertTrue(self.index.owns_property(self.cnx, 7, 3))
+        self.assertEqual(self.mock_fetch_all.call_count, 4)
+
+    def test_entry_expires_after_ttl(self):
+        """Test that a loaded entry is read again once it is older than the TTL"""
+        self.index.owns_property(self.cnx, 7, 1)
+        self.properties[7] = [(2,)]
+        self.now += 301
+
+        self.assertFalse(self.index.owns_property(self.cnx, 7, 1))
+        self.assertEqual(self.index.stats()['loads'], 2)
+
+    def test_least_recently_used_user_is_evicted(self):
+        """Test that only max_users users are kept"""
+        self.index.owns_property(self.cnx, 7, 1)
+        self.index.owns_property(self.cnx, 8, 3)
+        self.index.owns_property(self.cnx, 7, 2)
+        self.index.owns_property(self.cnx, 9, 4)
+
+        self.assertEqual(self.index.stats()['users'], 2)
+        self.assertTrue(self.index.owns_property(None, 7, 1))
+        self.assertFalse(self.index.owns_property(None, 8, 3))
+
+    def test_invalidate_forces_a_reload(self):
+        """Test that the creation services' invalidation makes new properties visible"""
+        self.index.owns_property(self.cnx, 7, 1)
+        self.properties[7].append((5,))
+        self.index.invalidate(7)
+
+        self.assertTrue(self.index.owns_property(self.cnx, 7, 5))
+        self.assertEqual(self.index.stats()['loads'], 2)
+
+    def test_zero_ttl_disables_the_index(self):
+        """Test that an unconfigured index never queries or grants ownership"""
+        self.index.configure(None, 0)
+
+        self.assertFalse(self.index.owns_property(self.cnx, 7, 1))
+        self.mock_fetch_all.assert_not_called()
+
+
+class TestAuthorizationScopeWithOwnershipIndex(unittest.TestCase):
+    """Test cases for the scoped reads when the ownership index is enabled"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        ownership_index.configure(10, 300)
+        self.addCleanup(ownership_index.configure, None, 0)
+        self.cnx = MagicMock()
+
+    @patch('backend.db.client.hp_ai_db_repository.HpAIDbRepository.fetch_all')
+    def test_indexed_property_uses_the_plain_statement(self, mock_fetch_all):
+        """Test that a property in the index is read without the ownership join"""
+        mock_fetch_all.side_effect = [[(1,)], [], [('appliance',)]]
+
+        fetch_all_for_user(self.cnx, 'SELECT_APPLIANCES_BY_PROPERTY_ID', 1, 7)
+
+        self.assertEqual([call.kwargs['statement_name'] for call in mock_fetch_all.call_args_list],
+                         ['SELECT_ADDRESSES_BY_USER_ID', 'SELECT_UNIT_IDS_BY_USER_ID',
+                          'SELECT_APPLIANCES_BY_PROPERTY_ID'])
+        self.assertEqual(mock_fetch_all.call_args.kwargs['params'], [1])
+
+    @patch('backend.db.client.hp_ai_db_repository.HpAIDbRepository.fetch_all')
+    def test_unindexed_property_falls_back_to_the_scoped_read(self, mock_fetch_all):
+        """Test that an index miss is settled by the scoped SQL rather than denied"""
+        mock_fetch_all.side_effect = [[(1,)], [], []]
+
+        self.assertEqual(fetch_all_for_user(self.cnx, 'SELECT_APPLIANCES_BY_PROPERTY_ID', 2, 7), [])
+        mock_fetch_all.assert_called_with(cnx=self.cnx,
+                                          statement_name='SELECT_APPLIANCES_BY_PROPERTY_ID_FOR_USER',
+                                          params=[2, 7])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,9 +2,13 @@ import unittest
 import io
 import pandas as pd
 from unittest.mock import MagicMock, patch, call
-from backend.db.service.property_creation_bulk_insertion_service import PropertyCreationBulkInsertionService
+from backend.db.service.property_creation_bulk_insertion_service import (PropertyCreationBulkInsertionService,
+                                                                          REQUIRED_COLUMNS, coerce_column,
+                                                                          to_optional_int)
 from common.logging.error.error import Error
+from backend.db.model.bulk_import_progress import BulkImportProgress
 from common.logging.error.error_messages import INVALID_BULK_CSV_FILE, INTERNAL_SERVICE_ERROR
+from backend.db.model.query.sql_statements import INSERT_COMPONENT_DUE_INDEX_BY_PROPERTY_ID
 
 
 class TestPropertyCreationBulkInsertionService(unittest.TestCase):
@@ -18,6 +22,43 @@ class TestPropertyCreationBulkInsertionService(unittest.TestCase):
         self.mock_pool.pool.get_connection.return_value = self.mock_connection
         self.mock_connection.cursor.return_value = self.mock_cursor
         self.service = PropertyCreationBulkInsertionService(self.mock_pool)
+        self.next_ids = {'properties': 1001, 'units': 3001}
+        self.mock_cursor.execute.side_effect = self.execute_multi_row_insert
+        self.mock_cursor.fetchone.return_value = (1,)
+
+    def execute_multi_row_insert(self, sql, params=None):
+        """Reports the row count and first id a multi row INSERT into properties or units would"""
+        for table, width in (('properties', 7), ('units', 2)):
+            if f'INSERT INTO home_pulse_ai.{table}' in sql:
+                self.mock_cursor.rowcount = len(params) // width
+                self.mock_cursor.lastrowid = self.next_ids[table]
+                self.next_ids[table] += self.mock_cursor.rowcount
+
+    def property_item(self, unit_number='-1', appliances=None, structures=None, street='123 Main St'):
+        """Helper to build one parsed row of the CSV file"""
+        return {
+            'property': {
+                'user_id': 123,
+                'street': street,
+                'city': 'Springfield',
+                'state': 'IL',
+                'postal_code': '62701',
+                'property_age': 25,
+                'unit_number': unit_number,
+                'address': f'{street}, Springfield, IL'
+            },
+            'appliances': appliances or [],
+            'structures': structures or []
+        }
+
+    def executed(self, table):
+        """The parameters of the statements that wrote to table"""
+        return [params for sql, params in (c.args for c in self.mock_cursor.execute.call_args_list)
+                if f'INSERT INTO home_pulse_ai.{table}' in sql]
+
+    def executed_many(self, table):
+        return [params for sql, params in (c.args for c in self.mock_cursor.executemany.call_args_list)
+                if f'INSERT INTO home_pulse_ai.{table}' in sql]
 
     def create_csv_content(self, rows):
         """Helper to create CSV content from rows"""
@@ -42,7 +83,7 @@ class TestCSVValidation(TestPropertyCreationBulkInsertionService):
             "Rheem,Model4,4,Samsung,Model5,2,Bosch,Model6,6,LG,Model7,8,15,20,10,5"
         ])
 
-        result = self.service.validate_contents_of_csv_file(csv_content)
+        result = next(self.service.validate_contents_of_csv_file(csv_content))
 
         self.assertIsInstance(result, pd.DataFrame)
         self.assertEqual(len(result), 1)
@@ -332,359 +373,188 @@ class TestCSVParsing(TestPropertyCreationBulkInsertionService):
         self.assertEqual(property_data['city'], 'Springfield')
 
 
-class TestBulkInsertion(TestPropertyCreationBulkInsertionService):
-    """Tests for execute_bulk_properties_insertion"""
-
-    def test_insert_single_family_property_with_appliances_and_structures(self):
-        """Test inserting single-family property with appliances and structures"""
-        data_to_upload = [{
-            'property': {
-                'user_id': 123,
-                'street': '123 Main St',
-                'city': 'Springfield',
-                'state': 'IL',
-                'postal_code': '62701',
-                'property_age': 25,
-                'unit_number': '-1',
-                'address': '123 Main St, Springfield, IL'
-            },
-            'appliances': [
-                {'appliance_type': 'stove', 'appliance_brand': 'GE', 'appliance_model': 'Model1', 'age_in_years': 5}
-            ],
-            'structures': [
-                {'structure_type': 'roof', 'age_in_years': 15}
-            ]
-        }]
-
-        self.mock_cursor.lastrowid = 1001
-
-        result = self.service.execute_bulk_properties_insertion(
-            cnx=self.mock_connection,
-            data_to_upload=data_to_upload
-        )
+class TestColumnCoercion(TestPropertyCreationBulkInsertionService):
+    """Tests for the table driven, column wise transformation"""
 
-        self.assertEqual(result, 200)
-        # Verify property insert
-        self.assertGreaterEqual(self.mock_cursor.execute.call_count, 1)
-        # Verify commit was called
-        self.mock_connection.commit.assert_called_once()
-        # Verify cursor closed
-        self.mock_cursor.close.assert_called_once()
+    def test_schema_lays_out_the_documented_columns(self):
+        """Test that COMPONENT_SCHEMA expands to the CSV header in its documented order"""
+        header = self.create_csv_content([]).getvalue().strip().split(',')
 
-    def test_insert_multifamily_property_creates_unit(self):
-        """Test inserting multifamily property creates unit record"""
-        data_to_upload = [{
-            'property': {
-                'user_id': 456,
-                'street': '456 Oak Ave',
-                'city': 'Boston',
-                'state': 'MA',
-                'postal_code': '02101',
-                'property_age': 30,
-                'unit_number': '101',
-                'address': '456 Oak Ave, Boston, MA'
-            },
-            'appliances': [
-                {'appliance_type': 'refrigerator', 'appliance_brand': 'LG', 'appliance_model': 'Model1', 'age_in_years': 3}
-            ],
-            'structures': []
-        }]
+        self.assertEqual(REQUIRED_COLUMNS, header)
 
-        self.mock_cursor.lastrowid = 2001
+    def test_int_coercion_matches_int(self):
+        """Test that whole columns coerce like int() did cell by cell"""
+        text_column = pd.Series([' 12 ', '+3', '5.0', 'abc', '', None, '12'], dtype=object)
+        float_column = pd.Series([5.7, -2.5, float('nan'), 5.7])
 
-        result = self.service.execute_bulk_properties_insertion(
-            cnx=self.mock_connection,
-            data_to_upload=data_to_upload
-        )
+        self.assertEqual(coerce_column(text_column, to_optional_int).tolist(), [12, 3, None, None, None, None, 12])
+        self.assertEqual(coerce_column(float_column, to_optional_int).tolist(), [5, -2, None, 5])
 
-        self.assertEqual(result, 200)
-        # Should execute: property insert, unit insert, appliance insert
-        self.assertGreaterEqual(self.mock_cursor.execute.call_count, 3)
-
-    def test_insert_single_family_appliances_have_null_unit_id(self):
-        """Test that single-family appliances are inserted with unit_id = None"""
-        data_to_upload = [{
-            'property': {
-                'user_id': 123,
-                'street': '123 Main St',
-                'city': 'Springfield',
-                'state': 'IL',
-                'postal_code': '62701',
-                'property_age': 25,
-                'unit_number': '-1',
-                'address': '123 Main St, Springfield, IL'
-            },
-            'appliances': [
-                {'appliance_type': 'stove', 'appliance_brand': 'GE', 'appliance_model': 'Model1', 'age_in_years': 5}
-            ],
-            'structures': []
-        }]
+    def test_components_keep_row_and_type_order(self):
+        """Test that the melt hands every row its own components in schema order"""
+        csv_content = self.create_csv_content([
+            "1 Main St,Springfield,IL,62701,25,-1,,,,Whirlpool,,3,,,,,,,,,,,,,LG,M7,8,,20,,",
+            "2 Main St,Springfield,IL,62701,25,-1,GE,M1,5,,,,,,,,,,,,,,,,,,,15,,,5"
+        ])
 
-        self.mock_cursor.lastrowid = 1001
+        result = self.service.parse_csv_file_for_upload(pd.read_csv(csv_content), user_id=123)
 
-        result = self.service.execute_bulk_properties_insertion(
-            cnx=self.mock_connection,
-            data_to_upload=data_to_upload
-        )
+        self.assertEqual([a['appliance_type'] for a in result[0]['appliances']], ['washer', 'refrigerator'])
+        self.assertIsNone(result[0]['appliances'][0]['appliance_model'])
+        self.assertEqual([s['structure_type'] for s in result[0]['structures']], ['driveway'])
+        self.assertEqual([a['appliance_type'] for a in result[1]['appliances']], ['stove'])
+        self.assertEqual([(s['structure_type'], s['age_in_years']) for s in result[1]['structures']],
+                         [('roof', 15), ('deck', 5)])
 
-        self.assertEqual(result, 200)
-        # Check that appliance insert had None for unit_id (second parameter)
-        appliance_call = [call for call in self.mock_cursor.execute.call_args_list
-                         if 'appliances' in str(call)]
-        self.assertGreater(len(appliance_call), 0)
-        appliance_params = appliance_call[0][0][1]
-        self.assertIsNone(appliance_params[1])  # unit_id should be None
-
-    def test_insert_multifamily_appliances_have_unit_id(self):
-        """Test that multifamily appliances are inserted with unit_id"""
-        data_to_upload = [{
-            'property': {
-                'user_id': 456,
-                'street': '456 Oak Ave',
-                'city': 'Boston',
-                'state': 'MA',
-                'postal_code': '02101',
-                'property_age': 30,
-                'unit_number': '101',
-                'address': '456 Oak Ave, Boston, MA'
-            },
-            'appliances': [
-                {'appliance_type': 'refrigerator', 'appliance_brand': 'LG', 'appliance_model': 'Model1', 'age_in_years': 3}
-            ],
-            'structures': []
-        }]
+    def test_header_only_chunk_parses_to_nothing(self):
+        """Test that an empty chunk yields no rows"""
+        self.assertEqual(self.service.parse_csv_file_for_upload(pd.read_csv(self.create_csv_content([])), 123), [])
 
-        # Mock property_id and unit_id
-        lastrowids = [2001, 3001]
-        call_count = [0]
 
-        def get_lastrowid(*args, **kwargs):
-            result = lastrowids[call_count[0]]
-            if call_count[0] < len(lastrowids) - 1:
-                call_count[0] += 1
-            return result
+class TestBulkInsertion(TestPropertyCreationBulkInsertionService):
+    """Tests for execute_bulk_properties_insertion"""
 
-        type(self.mock_cursor).lastrowid = property(lambda self: get_lastrowid())
+    def test_insert_single_family_property_with_appliances_and_structures(self):
+        """Test inserting single-family property with appliances and structures"""
+        data_chunks = [[self.property_item(
+            appliances=[{'appliance_type': 'stove', 'appliance_brand': 'GE', 'appliance_model': 'Model1',
+                         'age_in_years': 5}],
+            structures=[{'structure_type': 'roof', 'age_in_years': 15}])]]
 
-        result = self.service.execute_bulk_properties_insertion(
+        progress = self.service.execute_bulk_properties_insertion(
             cnx=self.mock_connection,
-            data_to_upload=data_to_upload
+            data_chunks=data_chunks
         )
 
-        self.assertEqual(result, 200)
-        # Verify unit_id was passed to appliance insert
-        appliance_call = [call for call in self.mock_cursor.execute.call_args_list
-                         if 'appliances' in str(call)]
-        self.assertGreater(len(appliance_call), 0)
-
-    def test_insert_structures_always_property_level(self):
-        """Test that structures are always inserted at property level (no unit_id)"""
-        data_to_upload = [{
-            'property': {
-                'user_id': 456,
-                'street': '456 Oak Ave',
-                'city': 'Boston',
-                'state': 'MA',
-                'postal_code': '02101',
-                'property_age': 30,
-                'unit_number': '101',
-                'address': '456 Oak Ave, Boston, MA'
-            },
-            'appliances': [],
-            'structures': [
-                {'structure_type': 'roof', 'age_in_years': 20}
-            ]
-        }]
-
-        self.mock_cursor.lastrowid = 2001
-
-        result = self.service.execute_bulk_properties_insertion(
-            cnx=self.mock_connection,
-            data_to_upload=data_to_upload
-        )
+        self.assertEqual(progress.rows_written, 1)
+        self.assertEqual(self.executed('properties'),
+                         [[123, '123 Main St', 'Springfield', 'IL', '62701', 25, '123 Main St, Springfield, IL']])
+        self.assertEqual(self.executed('units'), [])
+        self.assertEqual(self.executed_many('appliances'), [[(1001, None, 'stove', 'GE', 'Model1', 5, None)]])
+        self.assertEqual(self.executed_many('structures'), [[(1001, 'roof', 15)]])
+        # Verify commit was called
+        self.mock_connection.commit.assert_called_once()
+        # Verify every cursor, including the component_due_index refresh ones, was closed
+        self.assertEqual(self.mock_cursor.close.call_count, self.mock_connection.cursor.call_count)
+        # Verify the new property was indexed for the management tab
+        self.mock_cursor.executemany.assert_any_call(
+            INSERT_COMPONENT_DUE_INDEX_BY_PROPERTY_ID, [(1001, 1001)])
 
-        self.assertEqual(result, 200)
-        # Check that structure insert only has 3 parameters (property_id, structure_type, age)
-        structure_call = [call for call in self.mock_cursor.execute.call_args_list
-                         if 'structures' in str(call)]
-        self.assertGreater(len(structure_call), 0)
-        structure_params = structure_call[0][0][1]
-        self.assertEqual(len(structure_params), 3)
-
-    def test_insert_multiple_properties(self):
-        """Test inserting multiple properties in one transaction"""
-        data_to_upload = [
-            {
-                'property': {
-                    'user_id': 123,
-                    'street': '123 Main St',
-                    'city': 'Springfield',
-                    'state': 'IL',
-                    'postal_code': '62701',
-                    'property_age': 25,
-                    'unit_number': '-1',
-                    'address': '123 Main St, Springfield, IL'
-                },
-                'appliances': [{'appliance_type': 'stove', 'appliance_brand': 'GE', 'appliance_model': 'Model1', 'age_in_years': 5}],
-                'structures': []
-            },
-            {
-                'property': {
-                    'user_id': 123,
-                    'street': '456 Oak Ave',
-                    'city': 'Boston',
-                    'state': 'MA',
-                    'postal_code': '02101',
-                    'property_age': 30,
-                    'unit_number': '-1',
-                    'address': '456 Oak Ave, Boston, MA'
-                },
-                'appliances': [{'appliance_type': 'washer', 'appliance_brand': 'LG', 'appliance_model': 'Model2', 'age_in_years': 2}],
-                'structures': []
-            }
+    def test_insert_multifamily_property_creates_unit(self):
+        """Test that multifamily appliances are inserted with the id of their unit"""
+        data_chunks = [[self.property_item(
+            unit_number='101',
+            appliances=[{'appliance_type': 'refrigerator', 'appliance_brand': 'LG', 'appliance_model': 'Model1',
+                         'age_in_years': 3}])]]
+
+        self.service.execute_bulk_properties_insertion(cnx=self.mock_connection, data_chunks=data_chunks)
+
+        self.assertEqual(self.executed('units'), [[1001, '101']])
+        self.assertEqual(self.executed_many('appliances'),
+                         [[(1001, 3001, 'refrigerator', 'LG', 'Model1', 3, None)]])
+
+    def test_chunk_is_written_with_one_statement_per_table(self):
+        """Test that a chunk's rows share multi row INSERTs instead of a round trip per row"""
+        chunk = [
+            self.property_item(street='1 Main St', unit_number='-1',
+                               appliances=[{'appliance_type': 'stove', 'appliance_brand': 'GE',
+                                            'appliance_model': 'M1', 'age_in_years': 5}]),
+            self.property_item(street='2 Main St', unit_number='7',
+                               appliances=[{'appliance_type': 'washer', 'appliance_brand': 'LG',
+                                            'appliance_model': 'M2', 'age_in_years': 2}],
+                               structures=[{'structure_type': 'deck', 'age_in_years': 4}]),
+            self.property_item(street='3 Main St', unit_number='8')
         ]
 
-        lastrowids = [1001, 2001]
-        call_count = [0]
+        self.service.execute_bulk_properties_insertion(cnx=self.mock_connection, data_chunks=[chunk])
 
-        def get_lastrowid(*args, **kwargs):
-            if call_count[0] < len(lastrowids):
-                result = lastrowids[call_count[0]]
-                call_count[0] += 1
-                return result
-            return lastrowids[-1]
+        self.assertEqual(len(self.executed('properties')), 1)
+        self.assertEqual(self.executed('units'), [[1002, '7', 1003, '8']])
+        self.assertEqual(self.executed_many('appliances'), [[(1001, None, 'stove', 'GE', 'M1', 5, None),
+                                                            (1002, 3001, 'washer', 'LG', 'M2', 2, None)]])
+        self.assertEqual(self.executed_many('structures'), [[(1002, 'deck', 4)]])
 
-        type(self.mock_cursor).lastrowid = property(lambda self: get_lastrowid())
+    def test_every_chunk_is_written_in_one_transaction(self):
+        """Test that the chunks are written in order and committed once, reporting progress after each"""
+        chunks = [[self.property_item(street='1 Main St'), self.property_item(street='2 Main St')],
+                  [self.property_item(street='3 Main St')]]
+        reported = []
 
-        result = self.service.execute_bulk_properties_insertion(
+        progress = self.service.execute_bulk_properties_insertion(
             cnx=self.mock_connection,
-            data_to_upload=data_to_upload
+            data_chunks=iter(chunks),
+            progress_callback=lambda p: reported.append((p.chunks_written, p.rows_written))
         )
 
-        self.assertEqual(result, 200)
-        # Should execute: 2 property inserts, 2 appliance inserts
-        self.assertGreaterEqual(self.mock_cursor.execute.call_count, 4)
+        self.assertEqual(reported, [(1, 2), (2, 3)])
+        self.assertEqual(progress.as_dict()['rowsWritten'], 3)
+        self.assertEqual(len(self.executed('properties')), 2)
+        self.mock_connection.commit.assert_called_once()
+        self.mock_cursor.executemany.assert_any_call(INSERT_COMPONENT_DUE_INDEX_BY_PROPERTY_ID, [(1003, 1003)])
+
+    def test_empty_chunk_writes_nothing(self):
+        """Test that a header-only file commits without statements"""
+        progress = self.service.execute_bulk_properties_insertion(cnx=self.mock_connection, data_chunks=[[]])
+
+        self.assertEqual(progress.rows_written, 0)
+        self.mock_cursor.execute.assert_not_called()
 
     def test_database_error_triggers_rollback(self):
         """Test that database errors trigger transaction rollback"""
-        data_to_upload = [{
-            'property': {
-                'user_id': 123,
-                'street': '123 Main St',
-                'city': 'Springfield',
-                'state': 'IL',
-                'postal_code': '62701',
-                'property_age': 25,
-                'unit_number': '-1',
-                'address': '123 Main St, Springfield, IL'
-            },
-            'appliances': [],
-            'structures': []
-        }]
-
         self.mock_cursor.execute.side_effect = Exception('Database connection error')
 
         with self.assertRaises(Error) as context:
             self.service.execute_bulk_properties_insertion(
                 cnx=self.mock_connection,
-                data_to_upload=data_to_upload
+                data_chunks=[[self.property_item()]]
             )
 
         self.assertEqual(context.exception.code, INTERNAL_SERVICE_ERROR.code)
         self.mock_connection.rollback.assert_called_once()
+        self.mock_connection.commit.assert_not_called()
         self.mock_cursor.close.assert_called_once()
 
-    def test_cursor_closed_in_finally_block(self):
-        """Test that cursor is always closed even on error"""
-        data_to_upload = [{
-            'property': {
-                'user_id': 123,
-                'street': '123 Main St',
-                'city': 'Springfield',
-                'state': 'IL',
-                'postal_code': '62701',
-                'property_age': 25,
-                'unit_number': '-1',
-                'address': '123 Main St, Springfield, IL'
-            },
-            'appliances': [],
-            'structures': []
-        }]
+    def test_failure_in_a_later_chunk_rolls_back_the_earlier_ones(self):
+        """Test that a row that fails to parse midway leaves nothing behind"""
+        def data_chunks():
+            yield [self.property_item()]
+            raise Error(INVALID_BULK_CSV_FILE)
 
-        self.mock_cursor.execute.side_effect = Exception('Database error')
+        with self.assertRaises(Error) as context:
+            self.service.execute_bulk_properties_insertion(cnx=self.mock_connection, data_chunks=data_chunks())
 
-        try:
+        self.assertEqual(context.exception.code, INVALID_BULK_CSV_FILE.code)
+        self.mock_connection.rollback.assert_called_once()
+        self.mock_connection.commit.assert_not_called()
+
+    def test_failure_records_the_rows_of_the_failing_chunk(self):
+        """Test that a chunk that fails to write names its rows of the file"""
+        chunks = [[self.property_item(street='1 Main St'), self.property_item(street='2 Main St')],
+                  [self.property_item(street='3 Main St'), self.property_item(street='4 Main St')]]
+        self.mock_cursor.executemany.side_effect = [None, None, Exception('Deadlock found')]
+        progress = BulkImportProgress()
+
+        with self.assertRaises(Error):
+            self.service.execute_bulk_properties_insertion(cnx=self.mock_connection, data_chunks=chunks,
+                                                           progress=progress)
+
+        self.assertEqual(progress.errors, [{'firstRow': 3, 'lastRow': 4,
+                                            'message': INTERNAL_SERVICE_ERROR.message}])
+
+    def test_short_row_count_is_an_error(self):
+        """Test that a multi row insert reporting fewer rows than sent is rolled back"""
+        self.mock_cursor.execute.side_effect = None
+        self.mock_cursor.rowcount = 1
+        self.mock_cursor.lastrowid = 1001
+
+        with self.assertRaises(Error) as context:
             self.service.execute_bulk_properties_insertion(
                 cnx=self.mock_connection,
-                data_to_upload=data_to_upload
+                data_chunks=[[self.property_item(street='1 Main St'), self.property_item(street='2 Main St')]]
             )
-        except Error:
-            pass
-
-        self.mock_cursor.close.assert_called_once()
-
-    def test_property_age_from_csv(self):
-        """Test that property age is correctly passed from CSV to database"""
-        data_to_upload = [{
-            'property': {
-                'user_id': 123,
-                'street': '123 Main St',
-                'city': 'Springfield',
-                'state': 'IL',
-                'postal_code': '62701',
-                'property_age': 25,
-                'unit_number': '-1',
-                'address': '123 Main St, Springfield, IL'
-            },
-            'appliances': [],
-            'structures': []
-        }]
-
-        self.mock_cursor.lastrowid = 1001
-
-        result = self.service.execute_bulk_properties_insertion(
-            cnx=self.mock_connection,
-            data_to_upload=data_to_upload
-        )
-
-        self.assertEqual(result, 200)
-        # Check property insert parameters
-        property_call = self.mock_cursor.execute.call_args_list[0]
-        property_params = property_call[0][1]
-        self.assertEqual(property_params[5], 25)  # age parameter should be 25
-
-    def test_appliance_estimated_cost_is_none(self):
-        """Test that appliance estimated_replacement_cost is None (calculated later)"""
-        data_to_upload = [{
-            'property': {
-                'user_id': 123,
-                'street': '123 Main St',
-                'city': 'Springfield',
-                'state': 'IL',
-                'postal_code': '62701',
-                'property_age': 25,
-                'unit_number': '-1',
-                'address': '123 Main St, Springfield, IL'
-            },
-            'appliances': [
-                {'appliance_type': 'stove', 'appliance_brand': 'GE', 'appliance_model': 'Model1', 'age_in_years': 5}
-            ],
-            'structures': []
-        }]
 
-        self.mock_cursor.lastrowid = 1001
-
-        result = self.service.execute_bulk_properties_insertion(
-            cnx=self.mock_connection,
-            data_to_upload=data_to_upload
-        )
-
-        self.assertEqual(result, 200)
-        # Check appliance insert parameters
-        appliance_call = [call for call in self.mock_cursor.execute.call_args_list
-                         if 'appliances' in str(call)][0]
-        appliance_params = appliance_call[0][1]
-        self.assertIsNone(appliance_params[6])  # estimated_replacement_cost should be None
+        self.assertEqual(context.exception.code, INTERNAL_SERVICE_ERROR.code)
+        self.mock_connection.rollback.assert_called_once()
 
 
 class TestObtainConnection(TestPropertyCreationBulkInsertionService):
@@ -712,35 +582,58 @@ class TestObtainConnection(TestPropertyCreationBulkInsertionService):
 class TestBulkUploadOrchestration(TestPropertyCreationBulkInsertionService):
     """Integration tests for bulk_upload_properties_into_db orchestration"""
 
+    def create_request(self, rows):
+        mock_request = MagicMock()
+        mock_request.content = io.BytesIO(self.create_csv_content(rows).getvalue().encode('utf-8'))
+        return mock_request
+
+    def csv_row(self, street, unit_number='-1'):
+        return (f"{street},Springfield,IL,62701,25,{unit_number},GE,Model1,5,,,,,,,,,,,,,,,,,,,15,,,")
+
     @patch.object(PropertyCreationBulkInsertionService, 'obtain_connection')
-    @patch.object(PropertyCreationBulkInsertionService, 'validate_contents_of_csv_file')
-    @patch.object(PropertyCreationBulkInsertionService, 'parse_csv_file_for_upload')
-    @patch.object(PropertyCreationBulkInsertionService, 'execute_bulk_properties_insertion')
-    def test_successful_orchestration(self, mock_execute, mock_parse, mock_validate, mock_obtain):
-        """Test successful bulk upload orchestration"""
+    def test_file_is_streamed_in_chunks(self, mock_obtain):
+        """Test that a file larger than a chunk is parsed and written chunk by chunk in one transaction"""
         mock_obtain.return_value = self.mock_connection
-        mock_validate.return_value = MagicMock()
-        mock_parse.return_value = [{'property': {}, 'appliances': [], 'structures': []}]
-        mock_execute.return_value = 200
+        self.service.chunk_rows = 2
 
-        mock_request = MagicMock()
-        mock_request.content = io.StringIO("")
+        result = self.service.bulk_upload_properties_into_db(
+            self.create_request([self.csv_row(f'{i} Main St') for i in range(5)]), user_id=123)
 
-        result = self.service.bulk_upload_properties_into_db(mock_request, user_id=123)
+        self.assertEqual(result, {'insertRecordStatus': 200, 'rowsImported': 5})
+        self.assertEqual(len(self.executed('properties')), 3)
+        self.assertEqual(self.executed_many('appliances')[-1], [(1005, None, 'stove', 'GE', 'Model1', 5, None)])
+        self.mock_connection.commit.assert_called_once()
 
-        self.assertIn('insertRecordStatus', result)
-        self.assertEqual(result['insertRecordStatus'], 200)
+    @patch('backend.db.service.property_creation_bulk_insertion_service.tenant_analytics_cache')
+    @patch('backend.db.service.property_creation_bulk_insertion_service.ownership_index')
+    @patch.object(PropertyCreationBulkInsertionService, 'obtain_connection')
+    def test_import_invalidates_the_cached_reads_of_the_user(self, mock_obtain, mock_ownership_index,
+                                                             mock_tenant_analytics_cache):
+        """Test that imported properties show up in the ownership checks and tenant analytics right away"""
+        mock_obtain.return_value = self.mock_connection
 
-        # Verify all steps called in order
-        mock_obtain.assert_called_once()
-        mock_validate.assert_called_once()
-        mock_parse.assert_called_once()
-        mock_execute.assert_called_once()
+        self.service.bulk_upload_properties_into_db(self.create_request([self.csv_row('1 Main St')]), user_id=123)
+
+        mock_ownership_index.invalidate.assert_called_once_with(123)
+        mock_tenant_analytics_cache.invalidate.assert_called_once_with(123)
+
+    @patch.object(PropertyCreationBulkInsertionService, 'obtain_connection')
+    def test_progress_callback_sees_every_chunk(self, mock_obtain):
+        """Test that the caller can observe the rows written so far"""
+        mock_obtain.return_value = self.mock_connection
+        self.service.chunk_rows = 1
+        reported = []
+
+        self.service.bulk_upload_properties_into_db(
+            self.create_request([self.csv_row(f'{i} Main St') for i in range(3)]), user_id=123,
+            progress_callback=lambda progress: reported.append(progress.rows_written))
+
+        self.assertEqual(reported, [1, 2, 3])
 
     @patch.object(PropertyCreationBulkInsertionService, 'obtain_connection')
     @patch.object(PropertyCreationBulkInsertionService, 'validate_contents_of_csv_file')
     def test_validation_error_propagates(self, mock_validate, mock_obtain):
-        """Test that validation errors are propagated"""
+        """Test that validation errors are raised before a connection is leased"""
         mock_obtain.return_value = self.mock_connection
         mock_validate.side_effect = Error(INVALID_BULK_CSV_FILE)
 
@@ -751,22 +644,30 @@ class TestBulkUploadOrchestration(TestPropertyCreationBulkInsertionService):
             self.service.bulk_upload_properties_into_db(mock_request, user_id=123)
 
         self.assertEqual(context.exception.code, INVALID_BULK_CSV_FILE.code)
+        mock_obtain.assert_not_called()
+
+    @patch.object(PropertyCreationBulkInsertionService, 'obtain_connection')
+    def test_unparseable_row_rolls_back_the_upload(self, mock_obtain):
+        """Test that a malformed row after the first chunk fails the whole upload"""
+        mock_obtain.return_value = self.mock_connection
+        self.service.chunk_rows = 1
+        mock_request = self.create_request([self.csv_row('1 Main St'), '"2 Main St' + self.csv_row('')])
+
+        with self.assertRaises(Error) as context:
+            self.service.bulk_upload_properties_into_db(mock_request, user_id=123)
+
+        self.assertEqual(context.exception.code, INVALID_BULK_CSV_FILE.code)
+        self.mock_connection.rollback.assert_called_once()
+        self.mock_connection.commit.assert_not_called()
 
     @patch.object(PropertyCreationBulkInsertionService, 'obtain_connection')
-    @patch.object(PropertyCreationBulkInsertionService, 'validate_contents_of_csv_file')
     @patch.object(PropertyCreationBulkInsertionService, 'parse_csv_file_for_upload')
-    @patch.object(PropertyCreationBulkInsertionService, 'execute_bulk_properties_insertion')
-    def test_user_id_passed_to_parser(self, mock_execute, mock_parse, mock_validate, mock_obtain):
+    def test_user_id_passed_to_parser(self, mock_parse, mock_obtain):
         """Test that user_id is correctly passed to parser"""
         mock_obtain.return_value = self.mock_connection
-        mock_validate.return_value = MagicMock()
         mock_parse.return_value = []
-        mock_execute.return_value = 200
-
-        mock_request = MagicMock()
-        mock_request.content = io.StringIO("")
 
-        result = self.service.bulk_upload_properties_into_db(mock_request, user_id=999)
+        self.service.bulk_upload_properties_into_db(self.create_request([self.csv_row('1 Main St')]), user_id=999)
 
         # Verify user_id passed to parse method
         mock_parse.assert_called_once()
@@ -1,26 +1,38 @@
+import io
 import unittest
-from unittest.mock import MagicMock
+import pandas as pd
+from werkzeug.datastructures import FileStorage
 from backend.db.model.property_creation_bulk_request import PropertyCreationBulkRequest
 from common.logging.error.error import Error
 
 
 class TestPropertyCreationBulkRequest(unittest.TestCase):
 
+    def create_file(self, content):
+        """Helper to wrap bytes in the FileStorage Flask hands the route"""
+        return FileStorage(stream=io.BytesIO(content), filename='properties.csv', content_type='text/csv')
+
     def test_valid_csv_file_request(self):
         """Test creating a valid PropertyCreationBulkRequest with CSV file"""
-        mock_file = MagicMock()
-        mock_file.read.return_value = b'header1,header2\nvalue1,value2'
+        csv_file = self.create_file(b'header1,header2\nvalue1,value2')
 
         files = {
-            'file': mock_file
+            'file': csv_file
         }
 
         obj = PropertyCreationBulkRequest(files)
 
-        self.assertEqual(obj.csv_file, mock_file)
-        self.assertEqual(obj.raw_bytes, b'header1,header2\nvalue1,value2')
-        self.assertEqual(obj.text, 'header1,header2\nvalue1,value2')
-        self.assertIsNotNone(obj.content)
+        self.assertEqual(obj.csv_file, csv_file)
+        self.assertIs(obj.content, csv_file.stream)
+        self.assertEqual(obj.file_name, 'properties.csv')
+
+    def test_upload_is_not_read_up_front(self):
+        """Test that the request keeps the stream unread for the chunked parser"""
+        csv_file = self.create_file(b'header1,header2\nvalue1,value2')
+
+        obj = PropertyCreationBulkRequest({'file': csv_file})
+
+        self.assertEqual(obj.content.tell(), 0)
 
     def test_missing_file_field(self):
         """Test that Error is raised when file field is missing"""
@@ -30,45 +42,20 @@ class TestPropertyCreationBulkRequest(unittest.TestCase):
             PropertyCreationBulkRequest(files)
 
     def test_file_with_utf8_content(self):
-        """Test that UTF-8 encoded CSV is properly decoded"""
-        mock_file = MagicMock()
-        mock_file.read.return_value = 'Property,Address\nHome,123 Main St'.encode('utf-8')
-
-        files = {
-            'file': mock_file
-        }
+        """Test that UTF-8 encoded CSV is properly decoded by the parser"""
+        csv_file = self.create_file('Property,Address\nHôme,123 Main St'.encode('utf-8'))
 
-        obj = PropertyCreationBulkRequest(files)
+        obj = PropertyCreationBulkRequest({'file': csv_file})
 
-        self.assertEqual(obj.text, 'Property,Address\nHome,123 Main St')
-
-    def test_empty_csv_file(self):
-        """Test that empty CSV file is handled"""
-        mock_file = MagicMock()
-        mock_file.read.return_value = b''
-
-        files = {
-            'file': mock_file
-        }
-
-        obj = PropertyCreationBulkRequest(files)
-
-        self.assertEqual(obj.raw_bytes, b'')
-        self.assertEqual(obj.text, '')
+        self.assertEqual(pd.read_csv(obj.content, encoding='utf-8')['Property'][0], 'Hôme')
 
     def test_csv_file_with_special_characters(self):
         """Test CSV file with special characters"""
-        mock_file = MagicMock()
-        csv_content = 'Name,Address\n"O\'Brien",123 Main St'
-        mock_file.read.return_value = csv_content.encode('utf-8')
+        csv_file = self.create_file('Name,Address\n"O\'Brien",123 Main St'.encode('utf-8'))
 
-        files = {
-            'file': mock_file
-        }
-
-        obj = PropertyCreationBulkRequest(files)
+        obj = PropertyCreationBulkRequest({'file': csv_file})
 
-        self.assertEqual(obj.text, csv_content)
+        self.assertEqual(pd.read_csv(obj.content, encoding='utf-8')['Name'][0], "O'Brien")
 
 
 if __name__ == '__main__':
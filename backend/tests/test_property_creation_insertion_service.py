@@ -1,7 +1,16 @@
+import json
 import unittest
 from unittest.mock import MagicMock, patch, call
 from backend.db.service.property_creation_insertion_service import PropertyCreationInsertionService
 from backend.db.model.property_creation_request import PropertyCreationRequest
+from backend.db.service.property_creation_insertion_service import CreationResult
+from backend.db.model.idempotency_request import IdempotencyRequest
+from backend.db.model.query.sql_statements import (INSERT_UNITS_INTO_UNITS_TABLE, SELECT_AUTO_INCREMENT_INCREMENT,
+                                                   DELETE_EXPIRED_PROPERTY_CREATION_IDEMPOTENCY_KEY,
+                                                   INSERT_PROPERTY_CREATION_IDEMPOTENCY_KEY,
+                                                   UPDATE_PROPERTY_CREATION_IDEMPOTENCY_KEY_RESPONSE)
+from backend.db.client.statement_metrics import statement_metrics
+from common.logging.error.error import Error
 
 
 class MockAppliances:
@@ -64,6 +73,7 @@ class TestUnitsInsertion(TestPropertyCreationInsertionService):
         properties = {
             1: MagicMock(is_multifamily=True, units=[mock_unit])
         }
+        self.mock_cursor.rowcount = 1
         self.mock_cursor.lastrowid = 100
 
         status, unit_id_mappings = self.service.execute_insertion_statement_for_units_table(
@@ -73,31 +83,20 @@ class TestUnitsInsertion(TestPropertyCreationInsertionService):
 
         self.assertEqual(status, 200)
         self.assertEqual(unit_id_mappings, {(1, 'Unit 101'): 100})
-        self.mock_cursor.execute.assert_called_once()
-        self.mock_connection.commit.assert_called_once()
+        self.mock_cursor.execute.assert_called_once_with(INSERT_UNITS_INTO_UNITS_TABLE, [1, 'Unit 101'])
+        self.mock_connection.commit.assert_not_called()
 
     def test_insert_units_for_multifamily_with_multiple_units(self):
-        """Test inserting units for multifamily property with multiple units"""
+        """Test that the units of a property are written by one multi row INSERT without a commit"""
         mock_unit1 = MagicMock(unit_number='Unit 1A')
         mock_unit2 = MagicMock(unit_number='Unit 1B')
         mock_unit3 = MagicMock(unit_number='Unit 2A')
         properties = {
             1: MagicMock(is_multifamily=True, units=[mock_unit1, mock_unit2, mock_unit3])
         }
-        self.mock_cursor.lastrowid = None
-        # Simulate different lastrowid values for each insert
-        self.mock_cursor.configure_mock(**{'lastrowid': 100})
-        lastrowids = [100, 101, 102]
-        self.mock_cursor.lastrowid = None
-
-        def side_effect_lastrowid(*args, **kwargs):
-            if not hasattr(side_effect_lastrowid, 'call_count'):
-                side_effect_lastrowid.call_count = 0
-            result = lastrowids[side_effect_lastrowid.call_count]
-            side_effect_lastrowid.call_count += 1
-            return result
-
-        type(self.mock_cursor).lastrowid = property(lambda self: side_effect_lastrowid())
+        self.mock_cursor.rowcount = 3
+        self.mock_cursor.lastrowid = 100
+        self.mock_cursor.fetchone.return_value = (1,)
 
         status, unit_id_mappings = self.service.execute_insertion_statement_for_units_table(
             cnx=self.mock_connection,
@@ -105,27 +104,23 @@ class TestUnitsInsertion(TestPropertyCreationInsertionService):
         )
 
         self.assertEqual(status, 200)
-        self.assertEqual(len(unit_id_mappings), 3)
-        self.assertEqual(self.mock_cursor.execute.call_count, 3)
-        self.assertEqual(self.mock_connection.commit.call_count, 3)
+        self.assertEqual(unit_id_mappings, {(1, 'Unit 1A'): 100, (1, 'Unit 1B'): 101, (1, 'Unit 2A'): 102})
+        insert_sql, insert_params = self.mock_cursor.execute.call_args_list[0][0]
+        self.assertEqual(insert_sql.count('(%s, %s)'), 3)
+        self.assertEqual(insert_params, [1, 'Unit 1A', 1, 'Unit 1B', 1, 'Unit 2A'])
+        self.mock_connection.commit.assert_not_called()
 
     def test_insert_units_for_multiple_multifamily_properties(self):
-        """Test inserting units for multiple multifamily properties"""
+        """Test that the units of every property share one INSERT and follow auto_increment_increment"""
         mock_unit1_prop1 = MagicMock(unit_number='Unit A')
         mock_unit1_prop2 = MagicMock(unit_number='Unit B')
         properties = {
             1: MagicMock(is_multifamily=True, units=[mock_unit1_prop1]),
             2: MagicMock(is_multifamily=True, units=[mock_unit1_prop2])
         }
-        lastrowids = [100, 200]
-        call_count = [0]
-
-        def side_effect(*args, **kwargs):
-            result = lastrowids[call_count[0]]
-            call_count[0] += 1
-            return result
-
-        type(self.mock_cursor).lastrowid = property(lambda self: side_effect())
+        self.mock_cursor.rowcount = 2
+        self.mock_cursor.lastrowid = 100
+        self.mock_cursor.fetchone.return_value = (2,)
 
         status, unit_id_mappings = self.service.execute_insertion_statement_for_units_table(
             cnx=self.mock_connection,
@@ -133,11 +128,11 @@ class TestUnitsInsertion(TestPropertyCreationInsertionService):
         )
 
         self.assertEqual(status, 200)
-        self.assertEqual(len(unit_id_mappings), 2)
-        self.assertEqual(self.mock_cursor.execute.call_count, 2)
+        self.assertEqual(unit_id_mappings, {(1, 'Unit A'): 100, (2, 'Unit B'): 102})
+        self.assertEqual(self.mock_cursor.execute.call_args_list[1][0][0], SELECT_AUTO_INCREMENT_INCREMENT)
 
-    def test_insert_units_database_error_rollback(self):
-        """Test that database errors trigger rollback"""
+    def test_insert_units_database_error_leaves_the_transaction_to_the_caller(self):
+        """Test that database errors are reported without a rollback, the caller owns the transaction"""
         mock_unit = MagicMock(unit_number='Unit 101')
         properties = {
             1: MagicMock(is_multifamily=True, units=[mock_unit])
@@ -150,7 +145,7 @@ class TestUnitsInsertion(TestPropertyCreationInsertionService):
         )
 
         self.assertEqual(status, 500)
-        self.mock_connection.rollback.assert_called_once()
+        self.mock_connection.rollback.assert_not_called()
 
     def test_insert_units_returns_correct_mapping(self):
         """Test that unit_id mappings are returned correctly"""
@@ -158,6 +153,7 @@ class TestUnitsInsertion(TestPropertyCreationInsertionService):
         properties = {
             42: MagicMock(is_multifamily=True, units=[mock_unit])
         }
+        self.mock_cursor.rowcount = 1
         self.mock_cursor.lastrowid = 999
 
         status, unit_id_mappings = self.service.execute_insertion_statement_for_units_table(
@@ -169,6 +165,47 @@ class TestUnitsInsertion(TestPropertyCreationInsertionService):
         self.assertIn((42, 'Apt 5B'), unit_id_mappings)
         self.assertEqual(unit_id_mappings[(42, 'Apt 5B')], 999)
 
+    def test_insert_units_short_row_count_fails(self):
+        """Test that ids are not guessed when the server reports fewer rows than were sent"""
+        properties = {
+            1: MagicMock(is_multifamily=True, units=[MagicMock(unit_number='A'), MagicMock(unit_number='B')])
+        }
+        self.mock_cursor.rowcount = 1
+        self.mock_cursor.lastrowid = 100
+
+        status, unit_id_mappings = self.service.execute_insertion_statement_for_units_table(
+            cnx=self.mock_connection,
+            properties=properties
+        )
+
+        self.assertEqual(status, 500)
+        self.assertEqual(unit_id_mappings, {})
+
+
+class TestPropertiesInsertion(TestPropertyCreationInsertionService):
+    """Tests for execute_insertion_statement_for_properties_table"""
+
+    def test_properties_are_inserted_in_one_statement(self):
+        """Test that the properties of a request are one multi row INSERT with ids recovered in order"""
+        requests = [MagicMock(street=f'{i} Main St', city='Austin', state='TX', zip='78701', home_age=10,
+                              home_address=f'{i} Main St, Austin, TX') for i in range(3)]
+        self.mock_cursor.rowcount = 3
+        self.mock_cursor.lastrowid = 40
+        self.mock_cursor.fetchone.return_value = (1,)
+
+        status, properties = self.service.execute_insertion_statement_for_properties_table(
+            cnx=self.mock_connection,
+            user_id=7,
+            property_creation_requests=requests
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(properties, {40: requests[0], 41: requests[1], 42: requests[2]})
+        insert_sql, insert_params = self.mock_cursor.execute.call_args_list[0][0]
+        self.assertEqual(insert_sql.count('(%s, %s, %s, %s, %s, %s, %s)'), 3)
+        self.assertEqual(insert_params[:7], [7, '0 Main St', 'Austin', 'TX', '78701', 10, '0 Main St, Austin, TX'])
+        self.mock_connection.commit.assert_not_called()
+
 
 class TestAppliancesFormatting(TestPropertyCreationInsertionService):
     """Tests for format_appliances_for_table_insertion"""
@@ -564,6 +601,29 @@ class TestIntegrationOrchestration(TestPropertyCreationInsertionService):
         mock_structures.assert_called_once()
         mock_format.assert_called_once()
 
+    @patch('backend.db.service.property_creation_insertion_service.tenant_analytics_cache')
+    @patch('backend.db.service.property_creation_insertion_service.ownership_index')
+    @patch.object(PropertyCreationInsertionService, 'execute_insertion_statement_for_properties_table')
+    @patch.object(PropertyCreationInsertionService, 'execute_insertion_statement_for_units_table')
+    @patch.object(PropertyCreationInsertionService, 'execute_retrieval_statement_for_replacement_cost')
+    @patch.object(PropertyCreationInsertionService, 'execute_insertion_statement_for_appliances_table')
+    @patch.object(PropertyCreationInsertionService, 'execute_insertion_statement_for_structures_table')
+    def test_creation_invalidates_the_cached_reads_of_the_user(self, mock_structures, mock_appliances,
+                                                               mock_replacement_cost, mock_units, mock_properties,
+                                                               mock_ownership_index, mock_tenant_analytics_cache):
+        """Test that new properties show up in the ownership checks and tenant analytics right away"""
+        property_requests = [MagicMock()]
+        mock_properties.return_value = (200, {1: property_requests[0]})
+        mock_units.return_value = (200, {(1, 'Unit 101'): 100})
+        mock_replacement_cost.return_value = {}
+        mock_appliances.return_value = (200, [])
+        mock_structures.return_value = (200, [])
+
+        self.service.insert_properties_into_db(123, property_requests)
+
+        mock_ownership_index.invalidate.assert_called_once_with(123)
+        mock_tenant_analytics_cache.invalidate.assert_called_once_with(123)
+
     @patch.object(PropertyCreationInsertionService, 'execute_insertion_statement_for_properties_table')
     @patch.object(PropertyCreationInsertionService, 'execute_insertion_statement_for_units_table')
     @patch.object(PropertyCreationInsertionService, 'execute_retrieval_statement_for_replacement_cost')
@@ -592,6 +652,89 @@ class TestIntegrationOrchestration(TestPropertyCreationInsertionService):
         self.assertIn('unit_id_mappings', call_args.kwargs)
         self.assertEqual(call_args.kwargs['unit_id_mappings'], {(1, 'Unit 101'): 100})
 
+    @patch('backend.db.service.property_creation_insertion_service.ComponentDueIndexMaintenanceService')
+    @patch.object(PropertyCreationInsertionService, 'execute_insertion_statement_for_properties_table')
+    @patch.object(PropertyCreationInsertionService, 'execute_insertion_statement_for_units_table')
+    @patch.object(PropertyCreationInsertionService, 'execute_retrieval_statement_for_replacement_cost')
+    @patch.object(PropertyCreationInsertionService, 'execute_insertion_statement_for_appliances_table')
+    @patch.object(PropertyCreationInsertionService, 'execute_insertion_statement_for_structures_table')
+    def test_failed_step_rolls_back_and_reports_each_failing_property(self, mock_structures, mock_appliances,
+                                                                      mock_replacement_cost, mock_units,
+                                                                      mock_properties, mock_index):
+        """Test that one failed step commits nothing and the replay names the property that fails"""
+        property_requests = [MagicMock(home_address='1 Main St'), MagicMock(home_address='2 Main St')]
+        mock_properties.side_effect = [(200, {1: property_requests[0], 2: property_requests[1]}),
+                                       (200, {3: property_requests[0]}), (200, {4: property_requests[1]})]
+        # The batch fails, then the replay finds only the second property's units failing
+        mock_units.side_effect = [(500, {}), (200, {}), (500, {})]
+        mock_replacement_cost.return_value = {}
+        mock_appliances.return_value = (200, [])
+        mock_structures.return_value = (200, [])
+
+        result = self.service.insert_properties_into_db(123, property_requests)
+
+        mock_index.refresh_component_due_index.assert_not_called()
+        self.mock_connection.commit.assert_not_called()
+        self.assertEqual(self.mock_connection.rollback.call_count, 2)
+        self.assertEqual({result['propertyRecordStatus'], result['unitsRecordStatus'],
+                          result['applianceRecordStatus'], result['applianceStructuresStatus']}, {500})
+        self.assertEqual(result['failedProperties'], [{'index': 1, 'address': '2 Main St', 'failedStep': 'units'}])
+        savepoint_statements = [execute_call[0][0].split(' ')[0] for execute_call
+                                in self.mock_cursor.execute.call_args_list]
+        self.assertEqual(savepoint_statements, ['SAVEPOINT', 'RELEASE', 'SAVEPOINT', 'ROLLBACK'])
+
+
+class TestIdempotentCreation(TestPropertyCreationInsertionService):
+    """Tests for the Idempotency-Key handling of insert_properties_into_db"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        super().setUp()
+        self.idempotency_request = IdempotencyRequest('retry-1', b'[{"address": "1 Main St"}]')
+
+    @patch.object(PropertyCreationInsertionService, 'execute_creation_steps')
+    @patch.object(PropertyCreationInsertionService, 'execute_retrieval_statement_for_replacement_cost')
+    def test_committed_response_is_replayed(self, mock_replacement_cost, mock_steps):
+        """Test that a retry returns the stored response without writing again"""
+        self.mock_cursor.rowcount = 0
+        self.mock_cursor.fetchone.return_value = (self.idempotency_request.request_hash,
+                                                  '{"propertyRecordStatus": 200}')
+
+        result = self.service.insert_properties_into_db(123, [MagicMock()],
+                                                        idempotency_request=self.idempotency_request)
+
+        self.assertEqual(result, {'propertyRecordStatus': 200})
+        mock_steps.assert_not_called()
+        self.mock_connection.commit.assert_not_called()
+
+    def test_key_reused_for_another_request_is_rejected(self):
+        """Test that the same key with a different body is a conflict rather than a replay"""
+        self.mock_cursor.rowcount = 0
+        self.mock_cursor.fetchone.return_value = ('another hash', '{"propertyRecordStatus": 200}')
+
+        with self.assertRaises(Error) as context:
+            self.service.insert_properties_into_db(123, [MagicMock()], idempotency_request=self.idempotency_request)
+
+        self.assertEqual(context.exception.status, 409)
+
+    @patch('backend.db.service.property_creation_insertion_service.ComponentDueIndexMaintenanceService')
+    @patch.object(PropertyCreationInsertionService, 'execute_creation_steps')
+    @patch.object(PropertyCreationInsertionService, 'execute_retrieval_statement_for_replacement_cost')
+    def test_response_is_stored_in_the_creation_transaction(self, mock_replacement_cost, mock_steps, mock_index):
+        """Test that a new key is claimed and its response saved before the single commit"""
+        self.mock_cursor.rowcount = 1
+        mock_steps.return_value = CreationResult(None, {1: MagicMock()}, [], [])
+
+        result = self.service.insert_properties_into_db(123, [MagicMock()],
+                                                        idempotency_request=self.idempotency_request)
+
+        statements = [execute_call[0][0] for execute_call in self.mock_cursor.execute.call_args_list]
+        self.assertEqual(statements, [DELETE_EXPIRED_PROPERTY_CREATION_IDEMPOTENCY_KEY,
+                                      INSERT_PROPERTY_CREATION_IDEMPOTENCY_KEY,
+                                      UPDATE_PROPERTY_CREATION_IDEMPOTENCY_KEY_RESPONSE])
+        self.assertEqual(json.loads(self.mock_cursor.execute.call_args[0][1][0]), json.loads(json.dumps(result)))
+        mock_index.refresh_component_due_index.assert_called_once()
+
     def test_structures_always_property_level(self):
         """Test that structures are always at property-level (unit_id = NULL)"""
         # Test that format_structures_for_table_insertion signature doesn't include unit_id_mappings
@@ -647,5 +790,33 @@ class TestStructuresFormatting(TestPropertyCreationInsertionService):
         self.assertEqual(result[0], (1, 'roof', 10))
 
 
+class TestStatementProfiling(TestPropertyCreationInsertionService):
+    """Tests that the creation statements run through the repository and are profiled"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        super().setUp()
+        statement_metrics.reset()
+        self.addCleanup(statement_metrics.reset)
+
+    def test_replacement_cost_and_component_inserts_are_profiled(self):
+        """Test that the replacement cost lookup and the appliance and structure inserts reach the metrics"""
+        self.mock_cursor.fetchall.return_value = [('STOVE', '500.00')]
+        properties = {1: MockProperty(appliances=MockAppliances(stove=5, stove_brand='GE', stove_model='XYZ'),
+                                      structures=MockStructures(roof=10))}
+
+        replacement_cost = self.service.execute_retrieval_statement_for_replacement_cost(self.mock_connection)
+        appliance_status, _ = self.service.execute_insertion_statement_for_appliances_table(
+            self.mock_connection, properties, {}, replacement_cost)
+        structure_status, _ = self.service.execute_insertion_statement_for_structures_table(
+            self.mock_connection, properties)
+
+        self.assertEqual(replacement_cost, {'STOVE': 500.0})
+        self.assertEqual((appliance_status, structure_status), (200, 200))
+        self.assertTrue({'SELECT_APPLIANCE_INFORMATION_FOR_REPLACEMENT_COST',
+                         'INSERT_PROPERTY_APPLIANCES_INTO_APPLIANCE_TABLE',
+                         'INSERT_PROPERTY_STRUCTURES_INTO_STRUCTURES_TABLE'} <= set(statement_metrics.snapshot()))
+
+
 if __name__ == '__main__':
     unittest.main()
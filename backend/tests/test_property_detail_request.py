@@ -0,0 +1,41 @@
+import unittest
+from backend.db.model.property_detail_request import PropertyDetailRequest, DETAIL_FIELDS
+from common.logging.error.error import Error
+
+
+class TestPropertyDetailRequest(unittest.TestCase):
+
+    def test_all_fields_by_default(self):
+        """Test that every field is returned when none are selected"""
+        obj = PropertyDetailRequest('42', {})
+
+        self.assertEqual(obj.property_id, 42)
+        self.assertEqual(obj.fields, DETAIL_FIELDS)
+
+    def test_selected_fields_keep_canonical_order(self):
+        """Test that the selected fields are de-duplicated and ordered"""
+        obj = PropertyDetailRequest('42', {'fields': 'notes, property,notes'})
+
+        self.assertEqual(obj.fields, ('property', 'notes'))
+
+    def test_unknown_field_is_rejected(self):
+        """Test that a field outside DETAIL_FIELDS raises an error"""
+        with self.assertRaises(Error) as context:
+            PropertyDetailRequest('42', {'fields': 'property,invoices'})
+
+        self.assertEqual(context.exception.status, 400)
+
+    def test_empty_fields_is_rejected(self):
+        """Test that an empty fields parameter raises an error"""
+        with self.assertRaises(Error):
+            PropertyDetailRequest('42', {'fields': ' , '})
+
+    def test_non_numeric_property_id_is_rejected(self):
+        """Test that a non numeric property id raises an error"""
+        for property_id in ('abc', '²'):
+            with self.assertRaises(Error, msg=property_id):
+                PropertyDetailRequest(property_id, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
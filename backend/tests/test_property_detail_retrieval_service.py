@@ -0,0 +1,95 @@
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+from flask import Flask
+from backend.db.model.query.sql_statements import (SELECT_PROPERTY_BY_PROPERTY_ID_FOR_USER,
+                                                   SELECT_APPLIANCES_BY_PROPERTY_ID, GET_UNITS_BY_PROPERTY_ID)
+from backend.db.model.property_detail_request import DETAIL_FIELDS
+from backend.db.service.property_detail_retrieval_service import PropertyDetailRetrievalService
+
+
+class TestPropertyDetailRetrievalService(unittest.TestCase):
+    """Test cases for PropertyDetailRetrievalService"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.mock_pool = MagicMock()
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+        self.mock_pool.pool.get_connection.return_value = self.mock_connection
+        self.mock_pool.read_pool.return_value = self.mock_pool.pool
+        self.mock_connection.cursor.return_value = self.mock_cursor
+        self.mock_image_service = MagicMock()
+        self.mock_note_service = MagicMock()
+        self.service = PropertyDetailRetrievalService(self.mock_pool, self.mock_image_service,
+                                                      self.mock_note_service)
+        self.created_at = datetime(2024, 1, 1)
+        self.property_row = (42, 7, 10, 'street', 'city', 'state', '12345', '1 Main St', self.created_at, 1)
+
+    def test_all_fields_on_one_connection(self):
+        """Test that every field is read through a single leased connection"""
+        self.mock_cursor.fetchone.return_value = self.property_row
+        note_record = (1, 42, 7, 'property', None, 'notes/1.txt', self.created_at, None)
+        self.mock_cursor.fetchall.side_effect = [
+            [(1, 42, 'hvac', 'Trane', 'XR', 5, 4000, None, None)],
+            [(2, 42, 'roof', 12, 9000, None)],
+            [],
+            [(3, 'Unit 101', 42, self.created_at, self.created_at)],
+            [('images/42.jpg',)],
+            [note_record]
+        ]
+        self.mock_image_service.sign_image_url.return_value = 'https://signed'
+        self.mock_note_service.attach_note_contents.return_value = [{'id': 1, 'content': 'note'}]
+
+        result = self.service.fetch_property_details(user_id=7, property_id=42, fields=DETAIL_FIELDS)
+
+        self.assertEqual(set(result), set(DETAIL_FIELDS))
+        self.assertEqual(result['property']['address'], '1 Main St')
+        self.assertEqual(result['appliances'][0]['appliance_type'], 'hvac')
+        self.assertEqual(result['structures'][0]['structure_type'], 'roof')
+        self.assertEqual(result['tenants'], [{}])
+        self.assertEqual(result['units'][0]['unit_number'], 'Unit 101')
+        self.assertEqual(result['image'], {'signedURL': 'https://signed'})
+        self.assertEqual(result['notes'], [{'id': 1, 'content': 'note'}])
+        self.mock_image_service.sign_image_url.assert_called_once_with('images/42.jpg')
+        self.mock_note_service.attach_note_contents.assert_called_once_with([note_record])
+        self.mock_pool.pool.get_connection.assert_called_once()
+        self.mock_connection.close.assert_called_once()
+
+    def test_only_selected_fields_are_read(self):
+        """Test that unselected fields run no statement"""
+        self.mock_cursor.fetchone.return_value = self.property_row
+        self.mock_cursor.fetchall.return_value = [(3, 'Unit 101', 42, self.created_at, self.created_at)]
+
+        result = self.service.fetch_property_details(user_id=7, property_id=42, fields=('units',))
+
+        self.assertEqual(list(result), ['units'])
+        self.assertEqual(self.mock_cursor.execute.call_count, 2)
+        self.mock_note_service.attach_note_contents.assert_not_called()
+
+    def test_property_owned_by_another_user(self):
+        """Test that nothing is read for a property the user does not own"""
+        self.mock_cursor.fetchone.return_value = None
+
+        result = self.service.fetch_property_details(user_id=7, property_id=42, fields=DETAIL_FIELDS)
+
+        self.assertEqual(result, {})
+        self.mock_cursor.execute.assert_called_once_with(SELECT_PROPERTY_BY_PROPERTY_ID_FOR_USER, [42, 7])
+        self.mock_cursor.fetchall.assert_not_called()
+        self.mock_connection.close.assert_called_once()
+
+    def test_verified_property_reads_skip_the_ownership_join(self):
+        """Test that once the property row proves ownership the field reads run unscoped"""
+        self.mock_cursor.fetchone.return_value = self.property_row
+        self.mock_cursor.fetchall.return_value = []
+
+        with Flask(__name__).test_request_context():
+            self.service.fetch_property_details(user_id=7, property_id=42, fields=('appliances', 'units'))
+
+        statements = [execute_call[0] for execute_call in self.mock_cursor.execute.call_args_list]
+        self.assertEqual(statements, [(SELECT_PROPERTY_BY_PROPERTY_ID_FOR_USER, [42, 7]),
+                                      (SELECT_APPLIANCES_BY_PROPERTY_ID, [42]),
+                                      (GET_UNITS_BY_PROPERTY_ID, [42])])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from backend.db.model.property_list_request import (PropertyListRequest, PROPERTY_FIELDS, DEFAULT_PAGE_SIZE,
+                                                    MAX_PAGE_SIZE)
+from common.logging.error.error import Error
+
+
+class TestPropertyListRequest(unittest.TestCase):
+
+    def test_defaults(self):
+        """Test that every property with every field is requested when nothing is passed"""
+        obj = PropertyListRequest({})
+
+        self.assertFalse(obj.paged)
+        self.assertIsNone(obj.limit)
+        self.assertEqual(obj.after, 0)
+        self.assertEqual(obj.fields, PROPERTY_FIELDS)
+
+    def test_cursor_alone_pages_at_the_default_size(self):
+        """Test that passing only a cursor opts into paging with the default page size"""
+        obj = PropertyListRequest({'after': '42'})
+
+        self.assertTrue(obj.paged)
+        self.assertEqual(obj.limit, DEFAULT_PAGE_SIZE)
+        self.assertEqual(obj.after, 42)
+
+    def test_limit_is_capped(self):
+        """Test that a page larger than the cap is served at the cap"""
+        obj = PropertyListRequest({'limit': str(MAX_PAGE_SIZE * 10), 'after': '42'})
+
+        self.assertEqual(obj.limit, MAX_PAGE_SIZE)
+        self.assertEqual(obj.after, 42)
+
+    def test_fields_projection(self):
+        """Test that the selected fields keep the canonical order"""
+        obj = PropertyListRequest({'fields': 'address,id'})
+
+        self.assertEqual(obj.fields, ('id', 'address'))
+
+    def test_invalid_parameters_are_rejected(self):
+        """Test that malformed paging and unknown fields raise an error"""
+        for args in ({'limit': '0'}, {'limit': '-5'}, {'after': 'abc'}, {'after': '²'}, {'fields': 'id,rent'}, {'fields': ','}):
+            with self.assertRaises(Error, msg=args):
+                PropertyListRequest(args)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from decimal import Decimal
+from datetime import datetime
+from unittest.mock import MagicMock
+from backend.db.service.property_needs_attention_retrieval_service import PropertyNeedsAttentionRetrievalService
+from backend.db.model.query.sql_statements import (SELECT_COMPONENTS_DUE_BY_USER_ID,
+                                                   SELECT_COMPONENTS_DUE_TOTALS_BY_PROPERTY,
+                                                   SELECT_COMPONENTS_DUE_TOTALS_BY_MONTH)
+
+
+class TestPropertyNeedsAttentionRetrievalService(unittest.TestCase):
+    """Test cases for PropertyNeedsAttentionRetrievalService"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.mock_pool = MagicMock()
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+        self.mock_pool.pool.get_connection.return_value = self.mock_connection
+        self.mock_pool.read_pool.return_value = self.mock_pool.pool
+        self.mock_connection.cursor.return_value = self.mock_cursor
+        self.service = PropertyNeedsAttentionRetrievalService(self.mock_pool)
+
+    def test_totals_without_details(self):
+        """Test that only the aggregates are read unless detail rows are asked for"""
+        self.mock_cursor.fetchall.side_effect = [
+            [(10, '1 Main St', 2, Decimal('9900.00'), 1, Decimal('900.00')),
+             (11, '2 Main St', 1, Decimal('700.00'), 0, Decimal('0'))],
+            [(202401, 1, Decimal('900.00'), 1, Decimal('900.00')),
+             (209901, 2, Decimal('9700.00'), 0, Decimal('0'))]
+        ]
+
+        response = self.service.fetch_properties_that_need_attention(user_id=7, horizon_months=6)
+
+        statements = [execute_call[0] for execute_call in self.mock_cursor.execute.call_args_list]
+        self.assertEqual(statements, [(SELECT_COMPONENTS_DUE_TOTALS_BY_PROPERTY, [7, 6]),
+                                      (SELECT_COMPONENTS_DUE_TOTALS_BY_MONTH, [7, 6])])
+        self.assertEqual(response['horizonMonths'], 6)
+        self.assertEqual(response['summary'], {'count': 3, 'totalCost': 10600.0, 'overdueCount': 1,
+                                               'overdueCost': 900.0, 'comingDueCount': 2,
+                                               'comingDueCost': 9700.0})
+        self.assertEqual(response['byProperty'][0], {'propertyId': 10, 'address': '1 Main St', 'count': 2,
+                                                     'totalCost': 9900.0, 'overdueCount': 1, 'overdueCost': 900.0,
+                                                     'comingDueCount': 1, 'comingDueCost': 9000.0})
+        self.assertEqual([entry['month'] for entry in response['byMonth']], ['2024-01', '2099-01'])
+        self.assertEqual(response['properties'], [{'id': 10, 'address': '1 Main St'},
+                                                  {'id': 11, 'address': '2 Main St'}])
+        self.assertNotIn('managementItems', response)
+
+    def test_details_carry_their_cost(self):
+        """Test that each detail row is returned once, with its cost and status"""
+        overdue = datetime(2024, 1, 1)
+        coming_due = datetime(2099, 1, 1)
+        self.mock_cursor.fetchall.side_effect = [
+            [(10, '1 Main St', 2, Decimal('9900.00'), 1, Decimal('900.00'))],
+            [(202401, 1, Decimal('900.00'), 1, Decimal('900.00')),
+             (209901, 1, Decimal('9000.00'), 0, Decimal('0'))],
+            [(1, 10, 'Stove', 8, Decimal('900.00'), overdue, '1 Main St', 30),
+             (2, 10, 'Roof', 20, Decimal('9000.00'), coming_due, '1 Main St', -12)]
+        ]
+
+        response = self.service.fetch_properties_that_need_attention(user_id=7, include_details=True)
+
+        self.assertEqual(self.mock_cursor.execute.call_args[0], (SELECT_COMPONENTS_DUE_BY_USER_ID, [7, 3]))
+        self.assertEqual([item['status'] for item in response['managementItems']], ['overdue', 'coming_due'])
+        self.assertEqual(response['managementItems'][1]['cost'], 9000.0)
+        self.assertEqual(response['managementItems'][0]['days_difference'], 30)
+        self.assertNotIn('components', response)
+
+    def test_no_components_due(self):
+        """Test the empty response when nothing is coming due"""
+        self.mock_cursor.fetchall.return_value = []
+
+        response = self.service.fetch_properties_that_need_attention(user_id=7, include_details=True)
+
+        self.assertEqual(response['summary']['count'], 0)
+        self.assertEqual(response['byProperty'], [])
+        self.assertEqual(response['managementItems'], [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -18,6 +18,7 @@ class TestPropertyNoteRetrievalService(unittest.TestCase):
         self.bucket_name = 'test-bucket'
 
         self.mock_pool.pool.get_connection.return_value = self.mock_connection
+        self.mock_pool.read_pool.return_value = self.mock_pool.pool
         self.mock_connection.cursor.return_value = self.mock_cursor
 
         self.service = PropertyNoteRetrievalService(
@@ -3,6 +3,10 @@ from unittest.mock import MagicMock, patch
 from backend.db.service.property_retrieval_service import PropertyRetrievalService
 from common.logging.error.error import Error
 from datetime import datetime
+from backend.db.model.query.sql_statements import (SELECT_PROPERTY_BY_PROPERTY_ID_FOR_USER,
+                                                   SELECT_APPLIANCES_BY_PROPERTY_ID_FOR_USER,
+                                                   SELECT_STRUCTURES_BY_PROPERTY_ID_FOR_USER,
+                                                   SELECT_PROPERTIES_STREAM_BY_USER_ID)
 
 
 class TestPropertyRetrievalService(unittest.TestCase):
@@ -14,6 +18,7 @@ class TestPropertyRetrievalService(unittest.TestCase):
         self.mock_connection = MagicMock()
         self.mock_cursor = MagicMock()
         self.mock_pool.pool.get_connection.return_value = self.mock_connection
+        self.mock_pool.read_pool.return_value = self.mock_pool.pool
         self.mock_connection.cursor.return_value = self.mock_cursor
         self.service = PropertyRetrievalService(self.mock_pool)
 
@@ -183,8 +188,15 @@ class TestExecuteRetrievalStatement(TestPropertyRetrievalService):
 
         # Assert
         self.assertEqual(result, properties_data)
+        self.assertEqual(self.mock_cursor.execute.call_args[0], (SELECT_PROPERTIES_STREAM_BY_USER_ID, [user_id, 0]))
         self.mock_cursor.close.assert_called_once()
 
+    def test_list_statements_group_units_instead_of_a_correlated_subquery(self):
+        """Test that the list statement derives isMultifamily from one grouped join on units"""
+        self.assertIn('LEFT JOIN home_pulse_ai.units u', SELECT_PROPERTIES_STREAM_BY_USER_ID)
+        self.assertIn('GROUP BY p.id', SELECT_PROPERTIES_STREAM_BY_USER_ID)
+        self.assertNotIn('EXISTS', SELECT_PROPERTIES_STREAM_BY_USER_ID)
+
     def test_execute_retrieval_single_property(self):
         """Test executing retrieval for a single property"""
         # Arrange
@@ -201,6 +213,21 @@ class TestExecuteRetrievalStatement(TestPropertyRetrievalService):
         # Assert
         self.assertEqual(result, property_data)
 
+    def test_execute_retrieval_is_scoped_to_the_owner(self):
+        """Test that property keyed reads join on the owning user in the same statement"""
+        # Arrange
+        self.mock_cursor.fetchall.return_value = []
+
+        # Act
+        for retrieval_type in ('SINGLE', 'APPLIANCES', 'STRUCTURES'):
+            PropertyRetrievalService.execute_retrieval_statement(self.mock_connection, 123, 1, retrieval_type)
+
+        # Assert
+        statements = [execute_call[0] for execute_call in self.mock_cursor.execute.call_args_list]
+        self.assertEqual(statements, [(SELECT_PROPERTY_BY_PROPERTY_ID_FOR_USER, [1, 123]),
+                                      (SELECT_APPLIANCES_BY_PROPERTY_ID_FOR_USER, [1, 123]),
+                                      (SELECT_STRUCTURES_BY_PROPERTY_ID_FOR_USER, [1, 123])])
+
     def test_execute_retrieval_appliances(self):
         """Test executing retrieval for appliances"""
         # Arrange
@@ -416,6 +443,30 @@ class TestFormatPropertyResults(TestPropertyRetrievalService):
         self.assertEqual(formatted[0]['structure_type'], 'roof')
         self.assertEqual(formatted[0]['forecasted_replacement_date'], '2026-12-31 00:00:00')
 
+    def test_group_components_by_property(self):
+        """Test folding the portfolio rows into one entry per property"""
+        # Arrange
+        forecasted_date = datetime(2026, 12, 31)
+        results = [
+            ('APPLIANCE', 10, 1, 5, 'stove', 'GE', 'X1', 3, 800.0, forecasted_date),
+            ('APPLIANCE', 11, 1, None, 'washer', 'LG', 'W2', 4, 900.0, None),
+            ('STRUCTURE', 20, 1, None, 'roof', None, None, 15, 5000.0, forecasted_date),
+            ('STRUCTURE', 21, 2, None, 'deck', None, None, 2, 1500.0, None)
+        ]
+
+        # Act
+        formatted = list(PropertyRetrievalService.group_components_by_property(results))
+
+        # Assert
+        self.assertEqual([entry['property_id'] for entry in formatted], [1, 2])
+        self.assertEqual([appliance['id'] for appliance in formatted[0]['appliances']], [10, 11])
+        self.assertEqual(formatted[0]['appliances'][0]['unit_id'], 5)
+        self.assertEqual(formatted[0]['appliances'][0]['forecasted_replacement_date'], '2026-12-31 00:00:00')
+        self.assertEqual(formatted[0]['appliances'][1]['forecasted_replacement_date'], 'TBD')
+        self.assertEqual(formatted[0]['structures'][0]['structure_type'], 'roof')
+        self.assertEqual(formatted[1]['appliances'], [])
+        self.assertEqual(formatted[1]['structures'][0]['structure_type'], 'deck')
+
     def test_format_addresses(self):
         """Test formatting addresses"""
         # Arrange
@@ -433,6 +484,124 @@ class TestFormatPropertyResults(TestPropertyRetrievalService):
         self.assertEqual(formatted[0]['address'], '123 Main St')
 
 
+class TestFetchPropertyPage(TestPropertyRetrievalService):
+    """Tests for fetch_property_page method"""
+
+    def property_rows(self, ids):
+        return [(property_id, 123, 10, 'street', 'city', 'state', '12345', f'{property_id} Main St',
+                 datetime(2024, 1, 1), property_id % 2) for property_id in ids]
+
+    def test_fetch_property_page_with_more_pages(self):
+        """Test that a full page returns the cursor of the next one"""
+        # Arrange
+        self.mock_cursor.fetchall.return_value = self.property_rows([11, 12, 13])
+
+        # Act
+        page, next_cursor = self.service.fetch_property_page(user_id=123, after=10, limit=2,
+                                                             fields=('id', 'isMultifamily'))
+
+        # Assert
+        self.assertEqual(page, [{'id': 11, 'isMultifamily': True}, {'id': 12, 'isMultifamily': False}])
+        self.assertEqual(next_cursor, 12)
+        self.assertEqual(self.mock_cursor.execute.call_args[0][1], [123, 10, 3])
+
+    def test_fetch_property_page_last_page(self):
+        """Test that the last page has no cursor"""
+        # Arrange
+        self.mock_cursor.fetchall.return_value = self.property_rows([11])
+
+        # Act
+        page, next_cursor = self.service.fetch_property_page(user_id=123, after=10, limit=2,
+                                                             fields=('id', 'user_id', 'postal_code', 'age', 'address',
+                                                                     'created_at', 'isMultifamily'))
+
+        # Assert
+        self.assertIsNone(next_cursor)
+        self.assertEqual(page[0], {'id': 11, 'user_id': 123, 'postal_code': '12345', 'age': 10,
+                                   'address': '11 Main St', 'created_at': datetime(2024, 1, 1),
+                                   'isMultifamily': True})
+        self.mock_connection.close.assert_called_once()
+
+    def test_fetch_property_page_without_limit_returns_every_property(self):
+        """Test that an unpaged request reads every property in one query and has no cursor"""
+        # Arrange
+        self.mock_cursor.fetchall.return_value = self.property_rows(range(1, 251))
+
+        # Act
+        page, next_cursor = self.service.fetch_property_page(user_id=123, after=0, limit=None, fields=('id',))
+
+        # Assert
+        self.assertEqual(len(page), 250)
+        self.assertIsNone(next_cursor)
+        self.assertEqual(self.mock_cursor.execute.call_count, 1)
+        self.assertIn('ORDER BY p.id;', self.mock_cursor.execute.call_args[0][0])
+        self.assertEqual(self.mock_cursor.execute.call_args[0][1], [123, 0])
+
+    def test_stream_properties_releases_the_connection_once_read(self):
+        """Test that the stream formats every batch and returns the lease after the last row"""
+        # Arrange
+        self.mock_cursor.fetchmany.side_effect = [self.property_rows([11, 12]), []]
+
+        # Act
+        stream = self.service.stream_properties(user_id=123, after=10, fields=('id', 'isMultifamily'))
+        self.mock_connection.close.assert_not_called()
+        batches = list(stream)
+
+        # Assert
+        self.assertEqual(batches, [[{'id': 11, 'isMultifamily': True}, {'id': 12, 'isMultifamily': False}]])
+        self.assertEqual(self.mock_cursor.execute.call_args[0][1], [123, 10])
+        self.mock_connection.close.assert_called_once()
+
+
+class TestStreamPortfolioComponents(TestPropertyRetrievalService):
+    """Tests for stream_portfolio_components method"""
+
+    @staticmethod
+    def component_row(component_id, property_id):
+        return ('APPLIANCE', component_id, property_id, None, 'stove', 'GE', 'X1', 3, 800.0, None)
+
+    def test_stream_portfolio_components_binds_user_id_for_both_branches(self):
+        """Test that the portfolio statement is bound to the user for appliances and structures"""
+        # Arrange
+        self.mock_cursor.fetchmany.side_effect = [[]]
+
+        # Act
+        list(self.service.stream_portfolio_components(user_id=123))
+
+        # Assert
+        self.assertEqual(self.mock_cursor.execute.call_args[0][1], [123, 123])
+        self.mock_connection.cursor.assert_called_once_with(buffered=False)
+
+    def test_property_split_across_batches_is_sent_once_complete(self):
+        """Test that a property whose rows span two batches is sent as one entry after its last row"""
+        # Arrange
+        self.mock_cursor.fetchmany.side_effect = [
+            [self.component_row(10, 1), self.component_row(11, 2)],
+            [self.component_row(12, 2)],
+            [self.component_row(13, 2), self.component_row(14, 3)],
+            []
+        ]
+
+        # Act
+        stream = self.service.stream_portfolio_components(user_id=123)
+        self.mock_connection.close.assert_not_called()
+        batches = list(stream)
+
+        # Assert
+        self.assertEqual([[entry['property_id'] for entry in batch] for batch in batches], [[1], [2], [3]])
+        self.assertEqual([appliance['id'] for appliance in batches[1][0]['appliances']], [11, 12, 13])
+        self.mock_connection.close.assert_called_once()
+
+    def test_closing_an_unread_stream_releases_the_connection(self):
+        """Test that a response closed before it is read still hands the connection back"""
+        # Act
+        self.service.stream_portfolio_components(user_id=123).close()
+
+        # Assert
+        self.mock_connection.consume_results.assert_called_once()
+        self.mock_connection.close.assert_called_once()
+
+
 class TestObtainConnection(TestPropertyRetrievalService):
     """Tests for obtain_connection method"""
 
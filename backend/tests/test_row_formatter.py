@@ -0,0 +1,40 @@
+import unittest
+from datetime import date, datetime, timezone
+from backend.db.client.row_formatter import RowFormatter, optional, datetime_or_tbd
+
+
+class TestRowFormatter(unittest.TestCase):
+
+    def test_columns_are_projected_and_converted(self):
+        """Test that each key reads its own index through its converter"""
+        formatter = RowFormatter([('id', 0, int), ('name', 2, None), ('cost', 1, optional(float))])
+
+        rows = formatter.format_rows([('1', 5, 'Stove'), ('2', None, 'Roof')])
+
+        self.assertEqual(rows, [{'id': 1, 'name': 'Stove', 'cost': 5.0}, {'id': 2, 'name': 'Roof', 'cost': None}])
+        self.assertEqual(list(rows[0]), ['id', 'name', 'cost'])
+
+    def test_one_index_feeds_several_keys(self):
+        """Test a derived key read from the same column as another"""
+        formatter = RowFormatter([('days', 0, None), ('late', 0, lambda days: days >= 0)])
+
+        self.assertEqual(formatter.format_row((-3,)), {'days': -3, 'late': False})
+
+    def test_single_column_and_empty_results(self):
+        """Test the single column projection and the empty result set"""
+        formatter = RowFormatter([('address', 1, None)])
+
+        self.assertEqual(formatter.format_rows([(7, '1 Main St')]), [{'address': '1 Main St'}])
+        self.assertEqual(formatter.format_rows([]), [])
+        self.assertEqual(formatter.format_rows(None), [])
+
+    def test_datetime_or_tbd_matches_strftime(self):
+        """Test that every supported date type renders the text strftime did"""
+        for value in (datetime(2026, 3, 15, 12, 30, 45, 999), date(2026, 3, 15),
+                      datetime(2026, 3, 15, tzinfo=timezone.utc)):
+            self.assertEqual(datetime_or_tbd(value), value.strftime('%Y-%m-%d %H:%M:%S'))
+        self.assertEqual(datetime_or_tbd(None), 'TBD')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import json
+import unittest
+from common.logging.home_pulse_handler import CONTEXT_FIELDS
+from common.logging.home_pulse_formatter import HomePulseFormatter
+from backend.db.client.statement_metrics import StatementMetricsRegistry
+
+
+class TestStatementMetricsRegistry(unittest.TestCase):
+    """Test cases for StatementMetricsRegistry"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.registry = StatementMetricsRegistry(slow_query_threshold_ms=100)
+
+    def test_slow_statement_is_logged_with_timing(self):
+        """Test that an execution over the threshold emits a structured slow query record"""
+        with self.assertLogs(level='WARNING') as logs:
+            self.registry.record('SELECT_PROPERTIES_BY_USER_ID', 150.0, 12)
+
+        record = logs.records[0]
+        self.assertEqual(record.flag, 'Slow Query')
+        self.assertEqual(record.timing, {'statement': 'SELECT_PROPERTIES_BY_USER_ID', 'elapsedMs': 150.0,
+                                         'rows': 12, 'failed': False, 'thresholdMs': 100.0})
+        formatted = json.loads(HomePulseFormatter(extra=CONTEXT_FIELDS).format(record))
+        self.assertEqual(formatted['timing']['statement'], 'SELECT_PROPERTIES_BY_USER_ID')
+        self.assertEqual(formatted['flag'], 'Slow Query')
+        self.assertEqual(self.registry.snapshot()['SELECT_PROPERTIES_BY_USER_ID']['slowCalls'], 1)
+
+    def test_fast_statement_is_not_logged(self):
+        """Test that executions under the threshold are only counted"""
+        with self.assertNoLogs(level='WARNING'):
+            self.registry.record('VERIFY_UNIT_OWNERSHIP', 2.5, 1)
+
+        self.assertEqual(self.registry.snapshot()['VERIFY_UNIT_OWNERSHIP']['slowCalls'], 0)
+
+    def test_zero_threshold_disables_the_slow_query_log(self):
+        """Test that the slow query log is off unless a threshold is configured"""
+        self.registry.configure(None)
+
+        with self.assertNoLogs(level='WARNING'):
+            self.registry.record('SELECT_PROPERTIES_BY_USER_ID', 5000.0, 12)
+
+    def test_profile_orders_statements_by_total_time(self):
+        """Test that the statement dominating database time is listed first"""
+        self.registry.record('VERIFY_UNIT_OWNERSHIP', 2.0, 1)
+        self.registry.record('VERIFY_UNIT_OWNERSHIP', 2.0, 1)
+        self.registry.record('SELECT_APPLIANCES_BY_PROPERTY_ID', 12.0, 8)
+
+        profile = self.registry.profile()
+
+        self.assertEqual([entry['statement'] for entry in profile['statements']],
+                         ['SELECT_APPLIANCES_BY_PROPERTY_ID', 'VERIFY_UNIT_OWNERSHIP'])
+        self.assertEqual(profile['totalMs'], 16.0)
+        self.assertEqual(profile['statements'][0]['shareOfTotal'], 0.75)
+        self.assertEqual(profile['statements'][1]['latency']['count'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
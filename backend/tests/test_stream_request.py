@@ -0,0 +1,25 @@
+import unittest
+from backend.db.model.stream_request import StreamRequest
+from common.logging.error.error import Error
+
+
+class TestStreamRequest(unittest.TestCase):
+
+    def test_buffered_by_default(self):
+        """Test that routes keep their buffered response without a stream parameter"""
+        self.assertIsNone(StreamRequest({}, 'application/json').response_format)
+
+    def test_stream_parameter_and_accept_header(self):
+        """Test the explicit formats and NDJSON negotiated through Accept"""
+        self.assertEqual(StreamRequest({'stream': 'json'}).response_format, 'json')
+        self.assertEqual(StreamRequest({}, 'application/x-ndjson').response_format, 'ndjson')
+        self.assertEqual(StreamRequest({'stream': 'json'}, 'application/x-ndjson').response_format, 'json')
+
+    def test_unknown_format_is_rejected(self):
+        """Test that an unsupported stream format raises an error"""
+        with self.assertRaises(Error):
+            StreamRequest({'stream': 'csv'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+from backend.db.model.tenant_analytics_request import (TenantAnalyticsRequest, DEFAULT_LEASE_WINDOW_DAYS,
+                                                       MAX_LEASE_WINDOW_DAYS)
+from common.logging.error.error import Error
+
+
+class TestTenantAnalyticsRequest(unittest.TestCase):
+
+    def test_defaults(self):
+        """Test the default window of leases ending"""
+        obj = TenantAnalyticsRequest({})
+
+        self.assertEqual(obj.days, DEFAULT_LEASE_WINDOW_DAYS)
+
+    def test_explicit_window(self):
+        """Test an explicit window of leases ending"""
+        obj = TenantAnalyticsRequest({'days': '90'})
+
+        self.assertEqual(obj.days, 90)
+
+    def test_invalid_parameters_are_rejected(self):
+        """Test that out of range and malformed windows raise an error"""
+        for args in ({'days': str(MAX_LEASE_WINDOW_DAYS + 1)}, {'days': '-1'}, {'days': 'soon'}, {'days': '²'}):
+            with self.assertRaises(Error, msg=args):
+                TenantAnalyticsRequest(args)
+
+
+if __name__ == '__main__':
+    unittest.main()
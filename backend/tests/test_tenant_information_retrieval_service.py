@@ -0,0 +1,76 @@
+import unittest
+from decimal import Decimal
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from backend.db.client.user_response_cache import tenant_analytics_cache
+from backend.db.service.tenant_information_retrieval_service import TenantInformationRetrievalService
+from backend.db.service.tenant_information_update_service import TenantInformationUpdateService
+from backend.db.model.query.sql_statements import (SELECT_TENANT_ANALYTICS_BY_PROPERTY,
+                                                   SELECT_TENANT_LEASES_ENDING_BY_USER_ID)
+
+
+class TestTenantAnalytics(unittest.TestCase):
+    """Test cases for the tenant analytics of TenantInformationRetrievalService"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.mock_pool = MagicMock()
+        self.mock_connection = MagicMock()
+        self.mock_cursor = MagicMock()
+        self.mock_pool.pool.get_connection.return_value = self.mock_connection
+        self.mock_pool.read_pool.return_value = self.mock_pool.pool
+        self.mock_connection.cursor.return_value = self.mock_cursor
+        self.service = TenantInformationRetrievalService(self.mock_pool)
+        tenant_analytics_cache.configure(10, 60)
+        self.addCleanup(tenant_analytics_cache.configure, None, 0)
+        self.property_totals = [(10, '1 Main St', 4, 3, Decimal('4500.00')),
+                                (11, '2 Main St', 1, 0, Decimal('0'))]
+        self.leases_ending = [(5, 10, '1 Main St', 'Ada', 'Lovelace', date(2026, 11, 1), Decimal('1500.00'), 16)]
+
+    def test_analytics_are_aggregated_by_the_database(self):
+        """Test that the portfolio totals come from two grouped reads"""
+        self.mock_cursor.fetchall.side_effect = [self.property_totals, self.leases_ending]
+
+        response = self.service.fetch_tenant_analytics(user_id=7, days=30)
+
+        statements = [execute_call[0] for execute_call in self.mock_cursor.execute.call_args_list]
+        self.assertEqual(statements, [(SELECT_TENANT_ANALYTICS_BY_PROPERTY, [7, 7, 7]),
+                                      (SELECT_TENANT_LEASES_ENDING_BY_USER_ID, [7, 30])])
+        self.assertEqual(response['summary'], {'units': 5, 'occupiedUnits': 3, 'vacantUnits': 2,
+                                               'occupancyRate': 0.6, 'monthlyRent': 4500.0, 'properties': 2,
+                                               'leasesEndingCount': 1, 'leasesEndingRent': 1500.0})
+        self.assertEqual(response['byProperty'][1], {'propertyId': 11, 'address': '2 Main St', 'units': 1,
+                                                     'occupiedUnits': 0, 'vacantUnits': 1, 'occupancyRate': 0.0,
+                                                     'monthlyRent': 0.0})
+        self.assertEqual(response['leasesEnding'], [{'id': 5, 'propertyId': 10, 'address': '1 Main St',
+                                                     'firstName': 'Ada', 'lastName': 'Lovelace',
+                                                     'contractEndDate': '2026-11-01', 'monthlyRent': 1500.0,
+                                                     'daysRemaining': 16}])
+
+    def test_overlapping_leases_do_not_exceed_the_units(self):
+        """Test that a renewal overlapping the current lease does not count as a second occupied unit"""
+        response = self.service.format_tenant_analytics_response([(10, '1 Main St', 1, 2, Decimal('3000'))], [], 30)
+
+        self.assertEqual(response['byProperty'][0]['occupiedUnits'], 1)
+        self.assertEqual(response['byProperty'][0]['vacantUnits'], 0)
+
+    def test_analytics_are_cached_until_a_tenant_is_updated(self):
+        """Test that repeated reads are served from the cache and a tenant update recomputes them"""
+        self.mock_cursor.fetchall.side_effect = [self.property_totals, self.leases_ending,
+                                                 self.property_totals, []]
+
+        first = self.service.fetch_tenant_analytics(user_id=7, days=30)
+        second = self.service.fetch_tenant_analytics(user_id=7, days=30)
+        self.assertIs(first, second)
+        self.assertEqual(self.mock_cursor.execute.call_count, 2)
+
+        update_request = SimpleNamespace(tenant_id=5, monthly_rent=1600)
+        TenantInformationUpdateService(self.mock_pool).update_tenant_information(update_request, user_id=7)
+        third = self.service.fetch_tenant_analytics(user_id=7, days=30)
+
+        self.assertEqual(third['leasesEnding'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,9 @@ from unittest.mock import MagicMock, patch
 from backend.db.service.unit_appliance_retrieval_service import UnitApplianceRetrievalService
 from common.logging.error.error import Error
 from datetime import datetime
+from flask import Flask
+from backend.db.client.authorization_scope import is_verified_property
+from backend.db.model.query.sql_statements import GET_APPLIANCES_BY_UNIT_ID_FOR_USER
 
 
 class TestUnitApplianceRetrievalService(unittest.TestCase):
@@ -66,13 +69,11 @@ class TestUnitApplianceRetrievalService(unittest.TestCase):
         self.mock_connection.close.assert_called_once()
 
     def test_fetch_appliances_unit_not_authorized(self):
-        """Test returning empty list when unit doesn't belong to user's property"""
+        """Test that the ownership check is part of the appliances read, with no separate round trip"""
         # Arrange
         unit_id = 100
         user_id = 456
-
-        # Mock authorization failure (returns None)
-        self.mock_cursor.fetchone.return_value = None
+        self.mock_cursor.fetchall.return_value = []
 
         # Act
         result = self.service.fetch_appliances_by_unit_id(unit_id, user_id)
@@ -80,8 +81,22 @@ class TestUnitApplianceRetrievalService(unittest.TestCase):
         # Assert
         self.assertEqual(result, [])
         self.mock_connection.close.assert_called_once()
-        # Should not execute appliances query
-        self.mock_cursor.fetchall.assert_not_called()
+        self.mock_cursor.execute.assert_called_once_with(GET_APPLIANCES_BY_UNIT_ID_FOR_USER, [100, 456])
+        self.mock_cursor.fetchone.assert_not_called()
+
+    def test_fetch_appliances_remembers_the_verified_property(self):
+        """Test that appliances read for a unit prove its property is the user's for the rest of the request"""
+        # Arrange
+        self.mock_cursor.fetchall.return_value = [(1, 123, 100, 'washer', None, None, 7, None, None)]
+
+        # Act
+        with Flask(__name__).test_request_context():
+            self.service.fetch_appliances_by_unit_id(100, 456)
+            verified = is_verified_property(456, 123)
+
+        # Assert
+        self.assertTrue(verified)
+        self.assertFalse(is_verified_property(456, 123))
 
     def test_fetch_appliances_unit_has_no_appliances(self):
         """Test returning empty list when unit has no appliances"""
@@ -129,52 +144,6 @@ class TestUnitApplianceRetrievalService(unittest.TestCase):
         self.assertEqual(result[0]['estimated_replacement_cost'], None)
         self.assertEqual(result[0]['forecasted_replacement_date'], 'TBD')
 
-    def test_verify_unit_authorization_success(self):
-        """Test verify_unit_authorization with valid authorization"""
-        # Arrange
-        unit_id = 100
-        user_id = 456
-        authorization_result = (100,)
-        self.mock_cursor.fetchone.return_value = authorization_result
-
-        # Act
-        result = UnitApplianceRetrievalService.verify_unit_authorization(
-            self.mock_connection, unit_id, user_id
-        )
-
-        # Assert
-        self.assertTrue(result)
-        self.mock_cursor.close.assert_called_once()
-
-    def test_verify_unit_authorization_unauthorized(self):
-        """Test verify_unit_authorization returns False when not authorized"""
-        # Arrange
-        unit_id = 100
-        user_id = 456
-        self.mock_cursor.fetchone.return_value = None
-
-        # Act
-        result = UnitApplianceRetrievalService.verify_unit_authorization(
-            self.mock_connection, unit_id, user_id
-        )
-
-        # Assert
-        self.assertFalse(result)
-        self.mock_cursor.close.assert_called_once()
-
-    def test_verify_unit_authorization_database_error(self):
-        """Test verify_unit_authorization raises Error on database exception"""
-        # Arrange
-        unit_id = 100
-        user_id = 456
-        self.mock_cursor.execute.side_effect = Exception('Database error')
-
-        # Act & Assert
-        with self.assertRaises(Error):
-            UnitApplianceRetrievalService.verify_unit_authorization(
-                self.mock_connection, unit_id, user_id
-            )
-
     def test_execute_retrieval_statement_success(self):
         """Test execute_retrieval_statement successfully fetches appliances"""
         # Arrange
@@ -186,7 +155,7 @@ class TestUnitApplianceRetrievalService(unittest.TestCase):
 
         # Act
         result = UnitApplianceRetrievalService.execute_retrieval_statement(
-            self.mock_connection, unit_id
+            self.mock_connection, unit_id, 456
         )
 
         # Assert
@@ -203,7 +172,7 @@ class TestUnitApplianceRetrievalService(unittest.TestCase):
         # Act & Assert
         with self.assertRaises(Error):
             UnitApplianceRetrievalService.execute_retrieval_statement(
-                self.mock_connection, unit_id
+                self.mock_connection, unit_id, 456
             )
 
     def test_format_appliance_results_with_data(self):
@@ -341,7 +310,7 @@ class TestUnitApplianceRetrievalService(unittest.TestCase):
         # Arrange
         unit_id = 100
         user_id = 456
-        self.mock_cursor.fetchone.return_value = None
+        self.mock_cursor.fetchall.return_value = []
 
         # Act
         self.service.fetch_appliances_by_unit_id(unit_id, user_id)
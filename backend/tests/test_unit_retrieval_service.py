@@ -3,6 +3,8 @@ from unittest.mock import MagicMock, patch
 from backend.db.service.unit_retrieval_service import UnitRetrievalService
 from common.logging.error.error import Error
 from datetime import datetime
+from flask import Flask
+from backend.db.model.query.sql_statements import GET_UNITS_BY_PROPERTY_ID, GET_UNITS_BY_PROPERTY_ID_FOR_USER
 
 
 class TestUnitRetrievalService(unittest.TestCase):
@@ -14,6 +16,7 @@ class TestUnitRetrievalService(unittest.TestCase):
         self.mock_connection = MagicMock()
         self.mock_cursor = MagicMock()
         self.mock_pool.pool.get_connection.return_value = self.mock_connection
+        self.mock_pool.read_pool.return_value = self.mock_pool.pool
         self.mock_connection.cursor.return_value = self.mock_cursor
         self.service = UnitRetrievalService(self.mock_pool)
 
@@ -54,16 +57,11 @@ class TestUnitRetrievalService(unittest.TestCase):
         self.mock_connection.close.assert_called_once()
 
     def test_fetch_units_property_not_owned_by_user(self):
-        """Test returning empty list when property doesn't belong to user"""
+        """Test that the ownership check is part of the units read, with no separate round trip"""
         # Arrange
         property_id = 123
         user_id = 456
-        different_user_id = 999
-
-        # Mock property data with different user_id
-        property_data = (123, different_user_id, 10, 'street', 'city', 'state', '12345',
-                        '123 Main St', datetime.now(), datetime.now())
-        self.mock_cursor.fetchone.return_value = property_data
+        self.mock_cursor.fetchall.return_value = []
 
         # Act
         result = self.service.fetch_units_by_property_id(property_id, user_id)
@@ -71,25 +69,25 @@ class TestUnitRetrievalService(unittest.TestCase):
         # Assert
         self.assertEqual(result, [])
         self.mock_connection.close.assert_called_once()
-        # Should not execute units query
-        self.mock_cursor.fetchall.assert_not_called()
+        self.mock_cursor.execute.assert_called_once_with(GET_UNITS_BY_PROPERTY_ID_FOR_USER, [123, 456])
+        self.mock_cursor.fetchone.assert_not_called()
 
-    def test_fetch_units_property_not_found(self):
-        """Test returning empty list when property doesn't exist"""
+    def test_verified_property_skips_the_ownership_join(self):
+        """Test that a property proven owned earlier in the request is read without the join"""
         # Arrange
-        property_id = 999
-        user_id = 456
-
-        # Mock property not found
-        self.mock_cursor.fetchone.return_value = None
+        self.mock_cursor.fetchall.return_value = [(1, 'Unit A', 123, datetime.now(), datetime.now())]
 
         # Act
-        result = self.service.fetch_units_by_property_id(property_id, user_id)
+        with Flask(__name__).test_request_context():
+            UnitRetrievalService.execute_retrieval_statement(self.mock_connection, '123', 456)
+            UnitRetrievalService.execute_retrieval_statement(self.mock_connection, 123, 456)
+            UnitRetrievalService.execute_retrieval_statement(self.mock_connection, 123, 789)
 
         # Assert
-        self.assertEqual(result, [])
-        self.mock_connection.close.assert_called_once()
-        self.mock_cursor.fetchall.assert_not_called()
+        statements = [execute_call[0] for execute_call in self.mock_cursor.execute.call_args_list]
+        self.assertEqual(statements, [(GET_UNITS_BY_PROPERTY_ID_FOR_USER, ['123', 456]),
+                                      (GET_UNITS_BY_PROPERTY_ID, [123]),
+                                      (GET_UNITS_BY_PROPERTY_ID_FOR_USER, [123, 789])])
 
     def test_fetch_units_property_has_no_units(self):
         """Test returning empty list when property has no units"""
@@ -142,71 +140,6 @@ class TestUnitRetrievalService(unittest.TestCase):
         self.assertEqual(result[2]['unit_number'], 'Unit 201')
         self.assertEqual(result[3]['unit_number'], 'Unit 202')
 
-    def test_verify_property_ownership_success(self):
-        """Test verify_property_ownership static method with valid ownership"""
-        # Arrange
-        property_id = 123
-        user_id = 456
-        property_data = (123, 456, 10, 'street', 'city', 'state', '12345', '123 Main St',
-                        datetime.now(), datetime.now())
-        self.mock_cursor.fetchone.return_value = property_data
-
-        # Act
-        result = UnitRetrievalService.verify_property_ownership(
-            self.mock_connection, property_id, user_id
-        )
-
-        # Assert
-        self.assertIsNotNone(result)
-        self.assertEqual(result, property_data)
-        self.mock_cursor.close.assert_called_once()
-
-    def test_verify_property_ownership_wrong_user(self):
-        """Test verify_property_ownership returns None when user doesn't own property"""
-        # Arrange
-        property_id = 123
-        user_id = 456
-        wrong_user_id = 999
-        property_data = (123, wrong_user_id, 10, 'street', 'city', 'state', '12345',
-                        '123 Main St', datetime.now(), datetime.now())
-        self.mock_cursor.fetchone.return_value = property_data
-
-        # Act
-        result = UnitRetrievalService.verify_property_ownership(
-            self.mock_connection, property_id, user_id
-        )
-
-        # Assert
-        self.assertIsNone(result)
-
-    def test_verify_property_ownership_property_not_found(self):
-        """Test verify_property_ownership returns None when property doesn't exist"""
-        # Arrange
-        property_id = 999
-        user_id = 456
-        self.mock_cursor.fetchone.return_value = None
-
-        # Act
-        result = UnitRetrievalService.verify_property_ownership(
-            self.mock_connection, property_id, user_id
-        )
-
-        # Assert
-        self.assertIsNone(result)
-
-    def test_verify_property_ownership_database_error(self):
-        """Test verify_property_ownership raises Error on database exception"""
-        # Arrange
-        property_id = 123
-        user_id = 456
-        self.mock_cursor.execute.side_effect = Exception('Database error')
-
-        # Act & Assert
-        with self.assertRaises(Error) as context:
-            UnitRetrievalService.verify_property_ownership(
-                self.mock_connection, property_id, user_id
-            )
-
     def test_execute_retrieval_statement_success(self):
         """Test execute_retrieval_statement successfully fetches units"""
         # Arrange
@@ -219,7 +152,7 @@ class TestUnitRetrievalService(unittest.TestCase):
 
         # Act
         result = UnitRetrievalService.execute_retrieval_statement(
-            self.mock_connection, property_id
+            self.mock_connection, property_id, 456
         )
 
         # Assert
@@ -236,7 +169,7 @@ class TestUnitRetrievalService(unittest.TestCase):
         # Act & Assert
         with self.assertRaises(Error) as context:
             UnitRetrievalService.execute_retrieval_statement(
-                self.mock_connection, property_id
+                self.mock_connection, property_id, 456
             )
 
     def test_format_unit_results_with_data(self):
@@ -0,0 +1,68 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from backend.db.client.user_response_cache import UserResponseCache
+
+
+class TestUserResponseCache(unittest.TestCase):
+    """Test cases for UserResponseCache"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.cache = UserResponseCache(max_users=2, ttl_seconds=60)
+        self.now = 1000.0
+        monotonic_patcher = patch('backend.db.client.user_response_cache.time.monotonic',
+                                  side_effect=lambda: self.now)
+        monotonic_patcher.start()
+        self.addCleanup(monotonic_patcher.stop)
+
+    def test_response_is_computed_once_per_key(self):
+        """Test that a cached response is served until it expires"""
+        compute = MagicMock(side_effect=['first', 'second', 'other'])
+
+        self.assertEqual(self.cache.get_or_compute(7, 30, compute), 'first')
+        self.assertEqual(self.cache.get_or_compute('7', 30, compute), 'first')
+        self.assertEqual(self.cache.get_or_compute(7, 60, compute), 'second')
+        self.now += 61
+        self.assertEqual(self.cache.get_or_compute(7, 30, compute), 'other')
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_invalidate_drops_only_that_user(self):
+        """Test that a write of one user leaves the other users' responses cached"""
+        self.cache.get_or_compute(7, 30, lambda: 'seven')
+        self.cache.get_or_compute(8, 30, lambda: 'eight')
+
+        self.cache.invalidate(7)
+
+        self.assertEqual(self.cache.get_or_compute(7, 30, lambda: 'recomputed'), 'recomputed')
+        self.assertEqual(self.cache.get_or_compute(8, 30, lambda: 'recomputed'), 'eight')
+
+    def test_invalidate_during_compute_is_not_overwritten(self):
+        """Test that a response computed before a write is returned but not stored"""
+        def compute():
+            self.cache.invalidate(7)
+            return 'stale'
+
+        self.assertEqual(self.cache.get_or_compute(7, 30, compute), 'stale')
+        self.assertEqual(self.cache.get_or_compute(7, 30, lambda: 'fresh'), 'fresh')
+
+    def test_least_recently_used_user_is_evicted(self):
+        """Test that only max_users users are kept"""
+        for user_id in (7, 8, 9):
+            self.cache.get_or_compute(user_id, 30, lambda: user_id)
+
+        self.assertEqual(self.cache.stats()['users'], 2)
+        self.assertEqual(self.cache.get_or_compute(7, 30, lambda: 'recomputed'), 'recomputed')
+
+    def test_zero_ttl_disables_the_cache(self):
+        """Test that an unconfigured cache computes every response"""
+        self.cache.configure(None, 0)
+        compute = MagicMock(return_value='response')
+
+        self.cache.get_or_compute(7, 30, compute)
+        self.cache.get_or_compute(7, 30, compute)
+
+        self.assertEqual(compute.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,23 @@
+import os
+import logging
+from functools import wraps
+from flask import request, jsonify
+
+# Comma separated user ids allowed to read the operational routes, nobody when unset
+OPERATOR_USER_IDS = frozenset(int(user_id) for user_id in os.getenv('OPERATOR_USER_IDS', '').split(',')
+                              if user_id.strip().isdecimal())
+
+
+def operator_required(f):
+    """Only lets operators through. Needs to run after token_required, which sets request.user_id"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        user_id = getattr(request, 'user_id', None)
+        if user_id is None or int(user_id) not in OPERATOR_USER_IDS:
+            logging.error('A user who is not an operator requested an operational route',
+                          extra={'information': {'userId': user_id}})
+            return jsonify({'message': 'Operator access is required!'}), 403
+
+        return f(*args, **kwargs)
+
+    return decorated
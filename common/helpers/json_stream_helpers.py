@@ -0,0 +1,66 @@
+from flask import Response, current_app
+from werkzeug.wsgi import ClosingIterator
+
+JSON_MIMETYPE = 'application/json'
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def encode_json_array(batches, dumps):
+    """
+    Writes the items of every batch as one JSON array, a chunk per batch
+    :param batches: python iterable of lists of JSON serializable items
+    :param dumps: python callable encoding one item
+    :return: python generator of str chunks
+    """
+    separator = '['
+    for batch in batches:
+        if batch:
+            yield separator + ','.join(map(dumps, batch))
+            separator = ','
+    yield '[]' if separator == '[' else ']'
+
+
+def encode_json_object(head, list_key, batches, dumps):
+    """
+    Writes head as a JSON object whose list_key member holds the streamed items
+    :param head: python dict, the members sent ahead of the items
+    :param list_key: python str, the member the items are written under
+    :return: python generator of str chunks
+    """
+    opening = dumps(head)[:-1]
+    yield (opening + ',' if head else opening) + dumps(list_key) + ':'
+    yield from encode_json_array(batches, dumps)
+    yield '}'
+
+
+def encode_ndjson(head, batches, dumps):
+    """
+    Writes head, when there is one, then every item, each as its own line of JSON
+    :return: python generator of str chunks
+    """
+    if head:
+        yield dumps(head) + '\n'
+    for batch in batches:
+        if batch:
+            yield '\n'.join(map(dumps, batch)) + '\n'
+
+
+def streamed_json_response(batches, response_format, head=None, list_key=None):
+    """
+    Sends batches of items while they are produced instead of after the whole response is built. Closing the
+    response, including when the client goes away mid-stream, closes batches so its connection is handed back
+    :param batches: python iterable of lists of items, e.g. a RowStream
+    :param response_format: python str, 'json' for one JSON document or 'ndjson' for one item per line
+    :param head: python dict or None, members sent ahead of the items
+    :param list_key: python str or None, the member of head the items belong to, None for a bare JSON array
+    :return: flask Response
+    """
+    dumps = current_app.json.dumps
+    if response_format == 'ndjson':
+        chunks, mimetype = encode_ndjson(head, batches, dumps), NDJSON_MIMETYPE
+    elif list_key is None:
+        chunks, mimetype = encode_json_array(batches, dumps), JSON_MIMETYPE
+    else:
+        chunks, mimetype = encode_json_object(head or {}, list_key, batches, dumps), JSON_MIMETYPE
+    callbacks = [batches.close] if hasattr(batches, 'close') else []
+    return Response(ClosingIterator(chunks, callbacks), mimetype=mimetype)
@@ -0,0 +1,76 @@
+import threading
+
+DEFAULT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    def __init__(self, buckets_ms=DEFAULT_BUCKETS_MS):
+        """
+        Thread-safe, fixed-bucket histogram of latencies measured in milliseconds
+        :param buckets_ms: python tuple, the inclusive upper bound of every bucket in ascending order
+        """
+        self.buckets_ms = tuple(buckets_ms)
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.buckets_ms) + 1)
+        self._count = 0
+        self._total_ms = 0.0
+        self._max_ms = 0.0
+
+    def record(self, elapsed_ms):
+        """
+        Adds a single observation to the histogram
+        :param elapsed_ms: python float, the observed latency in milliseconds
+        """
+        index = len(self.buckets_ms)
+        for i, upper_bound in enumerate(self.buckets_ms):
+            if elapsed_ms <= upper_bound:
+                index = i
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._total_ms += elapsed_ms
+            if elapsed_ms > self._max_ms:
+                self._max_ms = elapsed_ms
+
+    def percentile(self, fraction):
+        """
+        Estimates a percentile from the bucket counts, reporting the upper bound of the matching bucket
+        :param fraction: python float, e.g. 0.95 for the p95
+        :return: python float or None when nothing has been recorded
+        """
+        with self._lock:
+            counts = list(self._counts)
+            count = self._count
+            max_ms = self._max_ms
+        if not count:
+            return None
+        target = fraction * count
+        running = 0
+        for i, bucket_count in enumerate(counts):
+            running += bucket_count
+            if running >= target:
+                return float(self.buckets_ms[i]) if i < len(self.buckets_ms) else max_ms
+        return max_ms
+
+    def snapshot(self):
+        """
+        Returns a JSON serializable view of the histogram
+        :return: python dict
+        """
+        with self._lock:
+            counts = list(self._counts)
+            count = self._count
+            total_ms = self._total_ms
+            max_ms = self._max_ms
+        buckets = {f'le_{upper_bound}ms': counts[i] for i, upper_bound in enumerate(self.buckets_ms)}
+        buckets['le_inf'] = counts[-1]
+        return {
+            'count': count,
+            'avgMs': round(total_ms / count, 3) if count else 0.0,
+            'maxMs': round(max_ms, 3),
+            'p50Ms': self.percentile(0.50),
+            'p95Ms': self.percentile(0.95),
+            'p99Ms': self.percentile(0.99),
+            'buckets': buckets
+        }
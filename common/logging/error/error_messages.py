@@ -36,3 +36,15 @@ DELETION_ISSUE = ErrorCode(code='DELETION_ISSUE',
 HOME_BOT_AI_ERROR = ErrorCode(code='HOME_BOT_AI_ERROR',
                               message='There was an issue booting up HomeBot',
                               status=500)
+DATABASE_UNAVAILABLE = ErrorCode(code='DATABASE_UNAVAILABLE',
+                                 message='The database is busy. Please try again shortly.',
+                                 status=503)
+IDEMPOTENCY_KEY_CONFLICT = ErrorCode(code='IDEMPOTENCY_KEY_CONFLICT',
+                                     message='The Idempotency-Key was already used for a different request',
+                                     status=409)
+BULK_UPLOAD_JOB_NOT_FOUND = ErrorCode(code='BULK_UPLOAD_JOB_NOT_FOUND',
+                                      message='No bulk upload job exists with this id',
+                                      status=404)
+TOO_MANY_BULK_UPLOAD_JOBS = ErrorCode(code='TOO_MANY_BULK_UPLOAD_JOBS',
+                                      message='Too many bulk uploads are in progress. Please wait for one to finish.',
+                                      status=429)
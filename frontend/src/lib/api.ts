@@ -45,7 +45,7 @@ class ApiClient {
   private async request<T>(
     endpoint: string,
     options: RequestInit = {}
-  ): Promise<{ data: T | null; error: any }> {
+  ): Promise<{ data: T | null; error: any; headers?: Headers }> {
     try {
       const token = getAuthToken();
       const headers: Record<string, string> = {
@@ -71,10 +71,10 @@ class ApiClient {
       const data = await response.json();
 
       if (!response.ok) {
-        return { data: null, error: data };
+        return { data: null, error: data, headers: response.headers };
       }
 
-      return { data, error: null };
+      return { data, error: null, headers: response.headers };
     } catch (error) {
       return { data: null, error: { message: 'Network error' } };
     }
@@ -97,6 +97,7 @@ class ApiClient {
 
   // Property endpoints
   async getProperties(): Promise<{ data: any[] | null; error: any }> {
+    // Without limit or after the route returns every property in one response
     return this.request('/v1/properties', {
       method: 'GET',
     });
@@ -120,10 +121,12 @@ class ApiClient {
     });
   }
 
-  async submitProperties(properties: any[]): Promise<{ data: any | null; error: any }> {
+  async submitProperties(properties: any[], idempotencyKey?: string): Promise<{ data: any | null; error: any }> {
+    // Resending the same properties with the same key returns the first response instead of creating them twice
     return this.request('/v1/properties', {
       method: 'POST',
       body: JSON.stringify(properties),
+      headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : undefined,
     });
   }
 
@@ -146,6 +149,13 @@ class ApiClient {
     });
   }
 
+  async getTenantAnalytics(days?: number): Promise<{ data: any | null; error: any }> {
+    const query = days === undefined ? '' : `?days=${days}`;
+    return this.request(`/v1/properties/tenant-analytics${query}`, {
+      method: 'GET',
+    });
+  }
+
   async updateTenant(propertyId: number, tenantId: number, tenantData: any): Promise<{ data: any | null; error: any }> {
     return this.request(`/v1/properties/${propertyId}/tenants/${tenantId}`, {
       method: 'PUT',
@@ -250,9 +260,27 @@ class ApiClient {
     }
   }
 
+  // CSV bulk upload job status endpoint
+  async getBulkUploadJob(jobId: string): Promise<{ data: any | null; error: any }> {
+    return this.request(`/v1/properties/csv-bulk-upload/jobs/${jobId}`, {
+      method: 'GET',
+    });
+  }
+
   // Properties needs attention endpoint
-  async getPropertiesNeedsAttention(userId: number): Promise<{ data: any | null; error: any }> {
-    return this.request(`/v1/properties/${userId}/needs-attention`, {
+  async getPropertiesNeedsAttention(
+    userId: number,
+    options: { horizonMonths?: number; details?: boolean } = {}
+  ): Promise<{ data: any | null; error: any }> {
+    const params = new URLSearchParams();
+    if (options.horizonMonths) {
+      params.set('horizonMonths', String(options.horizonMonths));
+    }
+    if (options.details) {
+      params.set('details', 'true');
+    }
+    const query = params.toString();
+    return this.request(`/v1/properties/${userId}/needs-attention${query ? `?${query}` : ''}`, {
       method: 'GET',
     });
   }
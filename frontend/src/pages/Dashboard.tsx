@@ -250,26 +250,14 @@ const Dashboard = () => {
     setIsLoadingManagement(true);
 
     try {
-      const { data, error } = await apiClient.getPropertiesNeedsAttention(user.user_id);
+      const { data, error } = await apiClient.getPropertiesNeedsAttention(user.user_id, { details: true });
       if (error) {
         console.error('Failed to fetch properties needs attention:', error);
         toast.error('Failed to load management information');
         setManagementItems([]);
       } else {
-        // Extract managementItems and components from the response
-        const items = data?.managementItems || [];
-        const components = data?.components || [];
-
-        // Map cost from components to managementItems
-        const itemsWithCost = items.map((item: ManagementItem) => {
-          const component = components.find((c: any) => c.id === item.id);
-          return {
-            ...item,
-            cost: component?.cost
-          };
-        });
-
-        setManagementItems(itemsWithCost);
+        // Each management item already carries its cost
+        setManagementItems(data?.managementItems || []);
       }
     } catch (error) {
       console.error('Error fetching management data:', error);
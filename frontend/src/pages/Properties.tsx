@@ -70,6 +70,8 @@ const Properties = () => {
   const [uploadMode, setUploadMode] = useState<'form' | 'csv'>('form');
   const [selectedFile, setSelectedFile] = useState<File | null>(null);
   const fileInputRef = useRef<HTMLInputElement>(null);
+  // One key per submission, reused when the same properties are sent again after a lost response
+  const submissionKeyRef = useRef<string | null>(null);
   const navigate = useNavigate();
   const { toast } = useToast();
 
@@ -376,14 +378,28 @@ const Properties = () => {
         }
       });
 
-      const {  data: _data, error } = await apiClient.submitProperties(payload);
+      submissionKeyRef.current ??= crypto.randomUUID();
+      const { data, error } = await apiClient.submitProperties(payload, submissionKeyRef.current);
+      const failedProperties: { index: number; address: string | null; failedStep: string }[] =
+        data?.failedProperties ?? [];
 
-      if (!error) {
+      if (!error && data?.propertyRecordStatus !== 500) {
+        submissionKeyRef.current = null;
         toast({
           title: "Properties Submitted Successfully!",
           description: `${properties.length} property(ies) have been added to your portfolio.`,
         });
         navigate('/dashboard');
+      } else if (!error) {
+        // Nothing was saved, so the corrected properties can be submitted again
+        toast({
+          title: "Submission Failed",
+          description: failedProperties.length
+            ? `No properties were added. Please check: ${failedProperties
+                .map(failed => failed.address || `property ${failed.index + 1}`).join(', ')}`
+            : 'No properties were added. Please try again later',
+          variant: "destructive",
+        });
       } else {
         toast({
           title: "Submission Failed",
@@ -443,7 +459,20 @@ const Properties = () => {
     setIsLoading(true);
 
     try {
-      const { error } = await apiClient.csvBulkUpload(selectedFile);
+      const { data, error: uploadError } = await apiClient.csvBulkUpload(selectedFile);
+      let error = uploadError;
+
+      // The upload is imported in the background, poll the job until it finishes
+      let job = data;
+      while (!error && job && (job.status === 'queued' || job.status === 'running')) {
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        const result = await apiClient.getBulkUploadJob(data.jobId);
+        job = result.data;
+        error = result.error;
+      }
+      if (!error && job?.status === 'failed') {
+        error = job.errors;
+      }
 
       if (!error) {
         toast({